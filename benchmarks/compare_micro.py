@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Compare the results of the micro-benchmarks with the committed baseline.
+
+Takes the JSON report of a micro-benchmark run (`pytest --benchmark-json=...`)
+and compares the best time of each case with the baseline. Exits with a
+non-zero status if a case is slower than the baseline by more than the
+threshold:
+
+    pytest benchmarks/micro -o python_files='bench_*.py' \\
+        --benchmark-json=benchmarks/micro/results.json
+    python benchmarks/compare_micro.py benchmarks/micro/results.json
+
+Timings depend on the machine: regenerate the baseline with `--update` on the
+reference machine before comparing the results of a branch.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Sequence
+
+DEFAULT_BASELINE = Path(__file__).parent / "micro" / "baseline.json"
+DEFAULT_THRESHOLD = 0.2
+
+
+def load_timings(report: Dict[str, Any]) -> Dict[str, float]:
+    """Best time of each case of a pytest-benchmark report, in seconds. The
+    minimum is less sensitive to the load of the machine than the mean or median."""
+    return {
+        benchmark["fullname"]: benchmark["stats"]["min"]
+        for benchmark in report["benchmarks"]
+    }
+
+
+def make_baseline(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Strips a pytest-benchmark report down to what the comparison needs."""
+    return {
+        "commit": report.get("commit_info", {}).get("id"),
+        "machine": report.get("machine_info", {}).get("cpu", {}).get("brand_raw"),
+        "python": report.get("machine_info", {}).get("python_version"),
+        "timings": load_timings(report),
+    }
+
+
+def compare(
+    baseline: Dict[str, float], current: Dict[str, float], threshold: float
+) -> bool:
+    """Prints the changes of each case. Returns False if a case regressed."""
+
+    ok = True
+    print(f"{'benchmark':<70} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, timing in sorted(current.items()):
+        baseline_timing = baseline.get(name)
+        if baseline_timing is None:
+            print(f"{name:<70} {'-':>12} {timing * 1e6:>10.1f}us {'new':>8}")
+            continue
+
+        change = timing / baseline_timing - 1
+        flag = ""
+        if change > threshold:
+            flag = "  SLOWER"
+            ok = False
+        print(
+            f"{name:<70} {baseline_timing * 1e6:>10.1f}us {timing * 1e6:>10.1f}us"
+            f" {change:>+8.1%}{flag}"
+        )
+
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"{name:<70} missing from the current results")
+
+    return ok
+
+
+def main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "report", type=Path, help="JSON report of pytest --benchmark-json."
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help=f"Baseline file. Defaults to {DEFAULT_BASELINE}.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Maximum tolerated slowdown, as a fraction of the baseline "
+        f"timing. Defaults to {DEFAULT_THRESHOLD}.",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Replace the baseline with the report instead of comparing.",
+    )
+    args = parser.parse_args(list(argv))
+
+    report = json.loads(args.report.read_text())
+
+    if args.update:
+        args.baseline.write_text(
+            json.dumps(make_baseline(report), indent=2, sort_keys=True) + "\n"
+        )
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if not compare(baseline["timings"], load_timings(report), args.threshold):
+        print(f"Some benchmarks are more than {args.threshold:.0%} slower.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,17 @@
+from aleph.db.accessors.aggregates import merge_aggregate_elements
+from aleph.services.pricing_utils import get_pricing_timeline
+
+
+def test_merge_aggregate_elements(benchmark, large_aggregate_elements):
+    content = benchmark(merge_aggregate_elements, large_aggregate_elements)
+    assert len(content) == 2000
+
+
+def test_get_pricing_timeline(benchmark, mocker, pricing_aggregate_elements):
+    mocker.patch(
+        "aleph.services.pricing_utils.get_pricing_aggregate_history",
+        return_value=pricing_aggregate_elements,
+    )
+
+    timeline = benchmark(get_pricing_timeline, session=mocker.MagicMock())
+    assert len(timeline) == len(pricing_aggregate_elements) + 1
@@ -0,0 +1,40 @@
+import copy
+import json
+
+from aleph.db.models import MessageDb
+from aleph.schemas.pending_messages import parse_message
+from aleph.types.content_format import ContentFormat
+from aleph.web.controllers.messages import message_matches_filters, message_to_dict
+
+
+def test_parse_message_instance(benchmark, instance_message_dict):
+    # parse_message loads the item content in the message dict
+    benchmark(lambda: parse_message(copy.copy(instance_message_dict)))
+
+
+def test_parse_message_post(benchmark, post_message_dict):
+    benchmark(lambda: parse_message(copy.copy(post_message_dict)))
+
+
+def test_message_db_from_pending_message(benchmark, instance_pending_message):
+    item_content = instance_pending_message.item_content
+
+    benchmark(
+        lambda: MessageDb.from_pending_message(
+            pending_message=instance_pending_message,
+            content_dict=json.loads(item_content),
+            content_size=len(item_content),
+        )
+    )
+
+
+def test_message_to_dict_full(benchmark, instance_message):
+    benchmark(message_to_dict, instance_message)
+
+
+def test_message_to_dict_headers(benchmark, instance_message):
+    benchmark(message_to_dict, instance_message, content_format=ContentFormat.HEADERS)
+
+
+def test_message_matches_wide_filters(benchmark, aleph_post_message, wide_ws_filters):
+    benchmark(message_matches_filters, aleph_post_message, wide_ws_filters)
@@ -0,0 +1,27 @@
+import datetime as dt
+
+import aleph.toolkit.json as aleph_json
+from aleph.toolkit.cursor import decode_message_cursor, encode_message_cursor
+from aleph.web.controllers.messages import message_to_dict
+
+CURSOR_TIME = dt.datetime(2025, 6, 15, 12, 30, tzinfo=dt.timezone.utc)
+CURSOR_HASH = "b3d17833bcefb7a6eb2d9fa7c77cca3eea3a73a33b9a1fd6a0fd6be5ff0d4a8e"
+
+
+def test_json_dumps_message(benchmark, instance_message):
+    message_dict = message_to_dict(instance_message)
+    benchmark(aleph_json.dumps, message_dict)
+
+
+def test_json_loads_message(benchmark, instance_message):
+    serialized_message = aleph_json.dumps(message_to_dict(instance_message))
+    benchmark(aleph_json.loads, serialized_message)
+
+
+def test_encode_message_cursor(benchmark):
+    benchmark(encode_message_cursor, CURSOR_TIME, CURSOR_HASH)
+
+
+def test_decode_message_cursor(benchmark):
+    cursor = encode_message_cursor(CURSOR_TIME, CURSOR_HASH)
+    assert benchmark(decode_message_cursor, cursor) == (CURSOR_TIME, CURSOR_HASH)
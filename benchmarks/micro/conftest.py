@@ -0,0 +1,224 @@
+"""
+Fixtures of the micro-benchmarks.
+
+The fixtures are sized after the largest objects seen in production rather than
+the typical ones: instances with many volumes, aggregates with hundreds of
+revisions and WebSocket clients with wide filters.
+"""
+
+import datetime as dt
+import hashlib
+import json
+from typing import Any, Dict, List
+
+import pytest
+from aleph_message.models import Chain, ItemType, MessageType
+from aleph_message.models import PostMessage as AlephPostMessage
+
+from aleph.db.models import ChainTxDb, MessageDb, PendingMessageDb
+from aleph.db.models.aggregates import AggregateElementDb
+from aleph.schemas.messages_query_params import WsMessageQueryParams
+from aleph.toolkit.constants import (
+    DEFAULT_PRICE_AGGREGATE,
+    PRICE_AGGREGATE_KEY,
+    PRICE_AGGREGATE_OWNER,
+)
+from aleph.types.chain_sync import ChainSyncProtocol
+
+SENDER = "0x9319Ad3B7A8E0eE24f2E639c40D8eD124C5520Ba"
+MESSAGE_TIME = 1_750_000_000.0
+
+
+def _make_message_dict(
+    message_type: MessageType, content: Dict[str, Any]
+) -> Dict[str, Any]:
+    item_content = json.dumps(content)
+    return {
+        "chain": Chain.ETH.value,
+        "sender": SENDER,
+        "type": message_type.value,
+        "channel": "BENCHMARK",
+        "item_type": ItemType.inline.value,
+        "item_content": item_content,
+        "item_hash": hashlib.sha256(item_content.encode()).hexdigest(),
+        "signature": "0x" + "ab" * 65,
+        "time": content["time"],
+    }
+
+
+def _make_instance_content(nb_volumes: int) -> Dict[str, Any]:
+    volumes: List[Dict[str, Any]] = []
+    for i in range(nb_volumes):
+        if i % 3 == 0:
+            volumes.append(
+                {
+                    "mount": f"/opt/immutable-{i}",
+                    "ref": hashlib.sha256(f"volume-{i}".encode()).hexdigest(),
+                    "use_latest": True,
+                }
+            )
+        elif i % 3 == 1:
+            volumes.append(
+                {"mount": f"/var/cache-{i}", "ephemeral": True, "size_mib": 5}
+            )
+        else:
+            volumes.append(
+                {
+                    "mount": f"/var/lib/data-{i}",
+                    "name": f"data-{i}",
+                    "persistence": "host",
+                    "size_mib": 10,
+                }
+            )
+
+    return {
+        "address": SENDER,
+        "time": MESSAGE_TIME,
+        "allow_amend": False,
+        "metadata": {"name": "benchmark", "tags": [f"tag-{i}" for i in range(16)]},
+        "variables": {f"VARIABLE_{i}": f"value-{i}" * 4 for i in range(50)},
+        "environment": {
+            "reproducible": True,
+            "internet": False,
+            "aleph_api": False,
+            "shared_cache": False,
+        },
+        "resources": {"vcpus": 4, "memory": 8192, "seconds": 30},
+        "requirements": {"cpu": {"architecture": "x86_64"}},
+        "rootfs": {
+            "parent": {
+                "ref": "549ec451d9b099cad112d4aaa2c00ac40fb6729a92ff252ff22eef0b5c3cb613",
+                "use_latest": True,
+            },
+            "persistence": "host",
+            "name": "rootfs",
+            "size_mib": 20480,
+        },
+        "authorized_keys": [
+            f"ssh-ed25519 AAAAC3NzaC1lZDI1NTE5{i:040d}" for i in range(10)
+        ],
+        "volumes": volumes,
+    }
+
+
+def _make_post_content(tags: List[str]) -> Dict[str, Any]:
+    return {
+        "address": SENDER,
+        "time": MESSAGE_TIME,
+        "type": "benchmark",
+        "ref": "benchmark-ref",
+        "content": {
+            "title": "Benchmark post",
+            "body": "Lorem ipsum dolor sit amet. " * 100,
+            "tags": tags,
+        },
+    }
+
+
+@pytest.fixture
+def instance_message_dict() -> Dict[str, Any]:
+    return _make_message_dict(MessageType.instance, _make_instance_content(60))
+
+
+@pytest.fixture
+def post_message_dict() -> Dict[str, Any]:
+    return _make_message_dict(
+        MessageType.post, _make_post_content(tags=[f"tag-{i}" for i in range(10)])
+    )
+
+
+@pytest.fixture
+def instance_pending_message(instance_message_dict) -> PendingMessageDb:
+    return PendingMessageDb.from_message_dict(
+        instance_message_dict, fetched=True, reception_time=dt.datetime(2025, 6, 15)
+    )
+
+
+@pytest.fixture
+def instance_message(instance_pending_message) -> MessageDb:
+    item_content = instance_pending_message.item_content
+    assert item_content is not None
+
+    message = MessageDb.from_pending_message(
+        pending_message=instance_pending_message,
+        content_dict=json.loads(item_content),
+        content_size=len(item_content),
+    )
+    message.confirmations = [
+        ChainTxDb(
+            hash=hashlib.sha256(f"tx-{i}".encode()).hexdigest(),
+            chain=Chain.ETH,
+            height=20_000_000 + i,
+            datetime=dt.datetime(2025, 6, 15, tzinfo=dt.timezone.utc),
+            publisher=SENDER,
+            protocol=ChainSyncProtocol.ON_CHAIN_SYNC,
+            protocol_version=1,
+            content="",
+        )
+        for i in range(3)
+    ]
+    return message
+
+
+@pytest.fixture
+def aleph_post_message(post_message_dict) -> AlephPostMessage:
+    return AlephPostMessage.model_validate(
+        {
+            **post_message_dict,
+            "content": json.loads(post_message_dict["item_content"]),
+        }
+    )
+
+
+@pytest.fixture
+def wide_ws_filters(post_message_dict) -> WsMessageQueryParams:
+    """Filters of a client that subscribes to many addresses, channels and tags.
+    The POST fixture matches the last value of each filter, so that all the
+    filters are evaluated."""
+
+    return WsMessageQueryParams(
+        addresses=[f"0x{i:040x}" for i in range(200)] + [SENDER],
+        owners=[f"0x{i:040x}" for i in range(200)] + [SENDER],
+        msgType=MessageType.post,
+        chains=[Chain.SOL, Chain.AVAX, Chain.ETH],
+        channels=[f"channel-{i}" for i in range(50)] + ["BENCHMARK"],
+        contentTypes=[f"type-{i}" for i in range(50)] + ["benchmark"],
+        refs=[f"ref-{i}" for i in range(50)] + ["benchmark-ref"],
+        tags=[f"other-tag-{i}" for i in range(100)] + ["tag-9"],
+    )
+
+
+@pytest.fixture
+def large_aggregate_elements() -> List[AggregateElementDb]:
+    """500 revisions of an aggregate of a few thousand keys."""
+
+    return [
+        AggregateElementDb(
+            item_hash=hashlib.sha256(f"element-{i}".encode()).hexdigest(),
+            key="benchmark",
+            owner=SENDER,
+            content={
+                f"key-{(i * 20 + j) % 2000}": {"revision": i, "values": list(range(5))}
+                for j in range(20)
+            },
+            creation_datetime=dt.datetime(2025, 1, 1) + dt.timedelta(minutes=i),
+        )
+        for i in range(500)
+    ]
+
+
+@pytest.fixture
+def pricing_aggregate_elements() -> List[AggregateElementDb]:
+    """History of the pricing aggregate, one full price update per revision."""
+
+    return [
+        AggregateElementDb(
+            item_hash=hashlib.sha256(f"pricing-{i}".encode()).hexdigest(),
+            key=PRICE_AGGREGATE_KEY,
+            owner=PRICE_AGGREGATE_OWNER,
+            content=DEFAULT_PRICE_AGGREGATE,
+            creation_datetime=dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+            + dt.timedelta(days=i),
+        )
+        for i in range(30)
+    ]
@@ -0,0 +1,693 @@
+#!/usr/bin/env python3
+"""Benchmark the throughput of the message processor, per message type.
+
+Seeds a local Postgres database with N synthetic pending messages of each type
+(POST, AGGREGATE, STORE, PROGRAM, INSTANCE, FORGET) and drives
+`PendingMessageProcessor` until all of them are processed, one type at a time.
+FORGET messages target the POSTs of the same run.
+
+The files of STORE messages and the volumes of VMs are written to a temporary
+filesystem storage engine. IPFS is disabled and replaced by a stand-in that
+fails when used, so no message depends on the network. Redis is still required
+for the node cache. Signatures are not checked: the benchmark measures the
+message handlers, not the signature verifiers.
+
+For each type, the benchmark reports the throughput (messages/s), the p50/p99
+processing time of a message and the number of SQL statements it issued. The
+results are written to a JSON file that can be compared with the results of
+another commit:
+
+    python benchmarks/processing_throughput.py --reset-db -n 500 -o before.json
+    git checkout my-branch
+    python benchmarks/processing_throughput.py --reset-db -n 500 -o after.json \\
+        --baseline before.json
+
+The public schema of the database is dropped and recreated, never point
+the benchmark to the database of a real node.
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import hashlib
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / "src"))
+
+import alembic.command  # noqa: E402
+import alembic.config  # noqa: E402
+from aleph_message.models import Chain, ItemType, MessageType  # noqa: E402
+from configmanager import Config  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+import aleph.config  # noqa: E402
+from aleph.chains.signature_verifier import SignatureVerifier  # noqa: E402
+from aleph.db.accessors.files import (  # noqa: E402
+    insert_message_file_pin,
+    upsert_file_tag,
+)
+from aleph.db.connection import (  # noqa: E402
+    make_db_url,
+    make_engine,
+    make_session_factory,
+)
+from aleph.db.models import (  # noqa: E402
+    AlephBalanceDb,
+    MessageStatusDb,
+    PendingMessageDb,
+    StoredFileDb,
+)
+from aleph.db.models.aggregates import AggregateDb, AggregateElementDb  # noqa: E402
+from aleph.handlers.message_handler import MessageHandler  # noqa: E402
+from aleph.jobs.process_pending_messages import PendingMessageProcessor  # noqa: E402
+from aleph.services.cache.node_cache import NodeCache  # noqa: E402
+from aleph.services.storage.fileystem_engine import (  # noqa: E402
+    FileSystemStorageEngine,
+)
+from aleph.storage import StorageService  # noqa: E402
+from aleph.toolkit.constants import (  # noqa: E402
+    DEFAULT_PRICE_AGGREGATE,
+    DEFAULT_SETTINGS_AGGREGATE,
+    PRICE_AGGREGATE_KEY,
+    PRICE_AGGREGATE_OWNER,
+    SETTINGS_AGGREGATE_KEY,
+    SETTINGS_AGGREGATE_OWNER,
+)
+from aleph.toolkit.timestamp import timestamp_to_datetime  # noqa: E402
+from aleph.types.db_session import DbSessionFactory  # noqa: E402
+from aleph.types.files import FileTag, FileType  # noqa: E402
+from aleph.types.message_status import (  # noqa: E402
+    MessageProcessingStatus,
+    MessageStatus,
+)
+
+LOGGER = logging.getLogger("processing_throughput")
+
+SENDER = "0x9319Ad3B7A8E0eE24f2E639c40D8eD124C5520Ba"
+CHANNEL = "BENCHMARK"
+# After the STORE/PROGRAM cost cutoff and before the credit-only cutoffs,
+# so that the messages go through the cost checks with a holder tier payment.
+BASE_TIMESTAMP = 1_750_000_000
+
+# Volumes referenced by the PROGRAM and INSTANCE messages.
+CODE_REF = "53ee77caeb7d6e0e982abf010b3d6ea2dbc1225e157e09283e3a9d7da757e193"
+RUNTIME_REF = "bd79839bf96e595a06da5ac0b6ba51dea6f7e2591bb913deccded04d831d29f4"
+ROOTFS_REF = "549ec451d9b099cad112d4aaa2c00ac40fb6729a92ff252ff22eef0b5c3cb613"
+VOLUME_REF = "5f31b0706f59404fad3d0bff97ef89ddf24da4761608ea0646329362c662ba51"
+VOLUME_REFS = (CODE_REF, RUNTIME_REF, ROOTFS_REF, VOLUME_REF)
+
+# Processing order. FORGET comes last as it forgets the POST messages.
+MESSAGE_TYPES = (
+    MessageType.post,
+    MessageType.aggregate,
+    MessageType.store,
+    MessageType.program,
+    MessageType.instance,
+    MessageType.forget,
+)
+
+
+class OfflineIpfsService:
+    """IPFS stand-in. The benchmark messages must never need IPFS."""
+
+    def __getattr__(self, name: str):
+        raise RuntimeError(f"IPFS is not available in benchmarks (ipfs.{name})")
+
+
+class NullExchange:
+    """MQ exchange stand-in that drops the processing results."""
+
+    async def publish(self, message, routing_key: str, **kwargs) -> None:
+        pass
+
+
+class NullConnection:
+    async def close(self) -> None:
+        pass
+
+
+class StatementCounter:
+    """Counts the SQL statements sent by an engine."""
+
+    def __init__(self, engine: Engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *_args) -> None:
+        self.count += 1
+
+
+def _message_time(index: int) -> float:
+    return BASE_TIMESTAMP + index * 0.001
+
+
+def _post_content(index: int, _context: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "address": SENDER,
+        "time": _message_time(index),
+        "type": "benchmark",
+        "content": {
+            "title": f"Benchmark post {index}",
+            "body": "Lorem ipsum dolor sit amet. " * 20,
+            "tags": [f"tag-{index % 7}", f"tag-{index % 13}"],
+        },
+    }
+
+
+def _aggregate_content(index: int, _context: Dict[str, Any]) -> Dict[str, Any]:
+    # Spread the elements over a few keys so that aggregates are updated, not
+    # only created.
+    return {
+        "address": SENDER,
+        "time": _message_time(index),
+        "key": f"benchmark-{index % 10}",
+        "content": {
+            f"field-{index % 50}": {"value": index, "labels": ["a", "b", "c"]},
+            "last_index": index,
+        },
+    }
+
+
+def _store_content(index: int, context: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "address": SENDER,
+        "time": _message_time(index),
+        "item_type": ItemType.storage.value,
+        "item_hash": context["store_files"][index],
+    }
+
+
+def _program_content(index: int, _context: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "address": SENDER,
+        "time": _message_time(index),
+        "type": "vm-function",
+        "allow_amend": False,
+        "code": {
+            "encoding": "squashfs",
+            "entrypoint": "python run.py",
+            "ref": CODE_REF,
+            "use_latest": True,
+        },
+        "variables": {"INDEX": str(index)},
+        "on": {"http": True, "persistent": False},
+        "environment": {
+            "reproducible": False,
+            "internet": True,
+            "aleph_api": True,
+            "shared_cache": False,
+        },
+        "resources": {"vcpus": 1, "memory": 256, "seconds": 30},
+        "runtime": {"ref": RUNTIME_REF, "use_latest": True, "comment": "Runtime"},
+        "volumes": [
+            {"mount": "/opt/venv", "ref": VOLUME_REF, "use_latest": True},
+            {
+                "mount": "/data",
+                "persistence": "host",
+                "name": "data",
+                "size_mib": 128,
+            },
+        ],
+    }
+
+
+def _instance_content(index: int, _context: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "address": SENDER,
+        "time": _message_time(index),
+        "allow_amend": False,
+        "variables": {"INDEX": str(index)},
+        "environment": {
+            "reproducible": True,
+            "internet": False,
+            "aleph_api": False,
+            "shared_cache": False,
+        },
+        "resources": {"vcpus": 1, "memory": 2048, "seconds": 30},
+        "requirements": {"cpu": {"architecture": "x86_64"}},
+        "rootfs": {
+            "parent": {"ref": ROOTFS_REF, "use_latest": True},
+            "persistence": "host",
+            "name": f"rootfs-{index}",
+            "size_mib": 20480,
+        },
+        "authorized_keys": [
+            "ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAIGULT6A41Msmw2KEu0R9MvUjhuWNAsbdeZ0DOwYbt4Qt"
+        ],
+        "volumes": [
+            {"mount": "/opt/venv", "ref": VOLUME_REF, "use_latest": False},
+            {"mount": "/var/cache", "ephemeral": True, "size_mib": 5},
+            {
+                "mount": "/var/lib/data",
+                "name": "data",
+                "persistence": "host",
+                "size_mib": 10,
+            },
+            {
+                "mount": "/var/lib/statistics",
+                "name": "statistics",
+                "persistence": "store",
+                "size_mib": 10,
+            },
+        ],
+    }
+
+
+def _forget_content(index: int, context: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "address": SENDER,
+        # After the forgotten POST
+        "time": _message_time(index) + 1,
+        "hashes": [context["post_hashes"][index]],
+        "reason": "benchmark",
+    }
+
+
+CONTENT_BUILDERS: Dict[MessageType, Callable[[int, Dict[str, Any]], Dict]] = {
+    MessageType.post: _post_content,
+    MessageType.aggregate: _aggregate_content,
+    MessageType.store: _store_content,
+    MessageType.program: _program_content,
+    MessageType.instance: _instance_content,
+    MessageType.forget: _forget_content,
+}
+
+
+def reset_db(config: Config, engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("drop schema public cascade"))
+        conn.execute(text("create schema public"))
+
+    db_url = make_db_url(driver="psycopg2", config=config)
+    alembic_cfg = alembic.config.Config(
+        str(PROJECT_DIR / "alembic.ini"),
+        # Equivalent to `alembic -x db_url=...`, so that the migrations do not
+        # load the configuration file of the current directory.
+        cmd_opts=argparse.Namespace(x=[f"db_url={db_url}"]),
+    )
+    alembic_cfg.attributes["configure_logger"] = False
+    current_dir = Path.cwd()
+    os.chdir(PROJECT_DIR)
+    try:
+        alembic.command.upgrade(alembic_cfg, "head")
+    finally:
+        os.chdir(current_dir)
+
+
+def seed_node_state(session_factory: DbSessionFactory) -> None:
+    """Inserts the pricing aggregates, the balance of the sender and the volumes."""
+
+    created = timestamp_to_datetime(BASE_TIMESTAMP - 3600)
+    with session_factory() as session:
+        for item_hash, key, owner, content in (
+            (
+                hashlib.sha256(b"benchmark-prices").hexdigest(),
+                PRICE_AGGREGATE_KEY,
+                PRICE_AGGREGATE_OWNER,
+                DEFAULT_PRICE_AGGREGATE,
+            ),
+            (
+                hashlib.sha256(b"benchmark-settings").hexdigest(),
+                SETTINGS_AGGREGATE_KEY,
+                SETTINGS_AGGREGATE_OWNER,
+                DEFAULT_SETTINGS_AGGREGATE,
+            ),
+        ):
+            session.add(
+                AggregateElementDb(
+                    item_hash=item_hash,
+                    key=key,
+                    owner=owner,
+                    content=content,
+                    creation_datetime=dt.datetime(2025, 1, 31),
+                )
+            )
+            session.add(
+                AggregateDb(
+                    key=key,
+                    owner=owner,
+                    content=content,
+                    creation_datetime=dt.datetime(2025, 1, 31),
+                    last_revision_hash=item_hash,
+                    dirty=False,
+                )
+            )
+
+        session.add(
+            AlephBalanceDb(
+                address=SENDER,
+                chain=Chain.ETH,
+                balance=Decimal(10**12),
+                eth_height=0,
+            )
+        )
+
+        for ref in VOLUME_REFS:
+            file_hash = ref[::-1]
+            session.add(
+                StoredFileDb(hash=file_hash, size=1024 * 1024, type=FileType.FILE)
+            )
+            session.flush()
+            insert_message_file_pin(
+                session=session,
+                file_hash=file_hash,
+                owner=SENDER,
+                item_hash=ref,
+                ref=None,
+                created=created,
+            )
+            upsert_file_tag(
+                session=session,
+                tag=FileTag(ref),
+                owner=SENDER,
+                file_hash=file_hash,
+                last_updated=created,
+            )
+
+        session.commit()
+
+
+async def write_store_files(
+    storage_engine: FileSystemStorageEngine, nb_messages: int
+) -> List[str]:
+    file_hashes = []
+    for index in range(nb_messages):
+        file_content = f"Benchmark file {index}\n".encode("utf-8") * 256
+        file_hash = hashlib.sha256(file_content).hexdigest()
+        await storage_engine.write(filename=file_hash, content=file_content)
+        file_hashes.append(file_hash)
+    return file_hashes
+
+
+def seed_pending_messages(
+    session_factory: DbSessionFactory,
+    message_type: MessageType,
+    nb_messages: int,
+    context: Dict[str, Any],
+) -> List[str]:
+    build_content = CONTENT_BUILDERS[message_type]
+    item_hashes = []
+
+    with session_factory() as session:
+        for index in range(nb_messages):
+            content = build_content(index, context)
+            item_content = json.dumps(content)
+            item_hash = hashlib.sha256(item_content.encode("utf-8")).hexdigest()
+            message_time = timestamp_to_datetime(content["time"])
+            reception_time = message_time + dt.timedelta(seconds=1)
+
+            session.add(
+                PendingMessageDb(
+                    item_hash=item_hash,
+                    type=message_type,
+                    chain=Chain.ETH,
+                    sender=SENDER,
+                    signature=None,
+                    item_type=ItemType.inline,
+                    item_content=item_content,
+                    time=message_time,
+                    channel=CHANNEL,
+                    reception_time=reception_time,
+                    fetched=True,
+                    check_message=False,
+                    retries=0,
+                    next_attempt=reception_time,
+                )
+            )
+            session.add(
+                MessageStatusDb(
+                    item_hash=item_hash,
+                    status=MessageStatus.PENDING,
+                    reception_time=reception_time,
+                )
+            )
+            item_hashes.append(item_hash)
+
+        session.commit()
+
+    return item_hashes
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    sorted_values = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+async def process_all(
+    processor: PendingMessageProcessor, statement_counter: StatementCounter
+) -> Dict[str, Any]:
+    statuses: Counter = Counter()
+    latencies = []
+
+    statements_before = statement_counter.count
+    start = last = time.perf_counter()
+    async for processing_results in processor.make_pipeline():
+        now = time.perf_counter()
+        latencies.append(now - last)
+        last = now
+        for result in processing_results:
+            statuses[result.status.value] += 1
+    duration = time.perf_counter() - start
+
+    nb_messages = len(latencies)
+    nb_statements = statement_counter.count - statements_before
+    return {
+        "messages": nb_messages,
+        "statuses": dict(statuses),
+        "duration_seconds": round(duration, 3),
+        "messages_per_second": round(nb_messages / duration, 2) if duration else 0,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "sql_statements": nb_statements,
+        "sql_statements_per_message": (
+            round(nb_statements / nb_messages, 2) if nb_messages else 0
+        ),
+    }
+
+
+def get_git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(
+    config: Config, message_types: Sequence[MessageType], nb_messages: int
+) -> Dict[str, Any]:
+    engine = make_engine(config=config, application_name="aleph-benchmark")
+    session_factory = make_session_factory(engine)
+    statement_counter = StatementCounter(engine)
+
+    seed_node_state(session_factory)
+
+    storage_engine = FileSystemStorageEngine(folder=config.storage.folder.value)
+    context: Dict[str, Any] = {}
+    results: Dict[str, Any] = {}
+
+    async with NodeCache.from_config(config) as node_cache:
+        storage_service = StorageService(
+            storage_engine=storage_engine,
+            ipfs_service=OfflineIpfsService(),  # type: ignore[arg-type]
+            node_cache=node_cache,
+        )
+        message_handler = MessageHandler(
+            signature_verifier=SignatureVerifier(),
+            storage_service=storage_service,
+            config=config,
+        )
+        processor = PendingMessageProcessor(
+            session_factory=session_factory,
+            message_handler=message_handler,
+            max_retries=0,
+            mq_conn=NullConnection(),  # type: ignore[arg-type]
+            mq_message_exchange=NullExchange(),  # type: ignore[arg-type]
+            pending_message_queue=None,  # type: ignore[arg-type]
+        )
+
+        for message_type in message_types:
+            if message_type == MessageType.store:
+                context["store_files"] = await write_store_files(
+                    storage_engine, nb_messages
+                )
+            if message_type == MessageType.forget and "post_hashes" not in context:
+                LOGGER.warning("Skipping FORGET: it forgets the POST messages")
+                continue
+
+            item_hashes = seed_pending_messages(
+                session_factory=session_factory,
+                message_type=message_type,
+                nb_messages=nb_messages,
+                context=context,
+            )
+            if message_type == MessageType.post:
+                context["post_hashes"] = item_hashes
+
+            LOGGER.info("Processing %d %s messages", nb_messages, message_type.value)
+            results[message_type.value] = await process_all(
+                processor, statement_counter
+            )
+
+    engine.dispose()
+    return results
+
+
+def print_results(
+    results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None
+) -> None:
+    header = f"{'type':<10} {'msg/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'SQL/msg':>10}"
+    if baseline:
+        header += f" {'msg/s vs baseline':>18}"
+    print(header)
+
+    for message_type, type_results in results.items():
+        line = (
+            f"{message_type:<10} {type_results['messages_per_second']:>10}"
+            f" {type_results['latency_p50_ms']:>10} {type_results['latency_p99_ms']:>10}"
+            f" {type_results['sql_statements_per_message']:>10}"
+        )
+        baseline_results = (baseline or {}).get(message_type)
+        if baseline_results and baseline_results["messages_per_second"]:
+            change = (
+                type_results["messages_per_second"]
+                / baseline_results["messages_per_second"]
+                - 1
+            )
+            line += f" {change:>+18.1%}"
+        print(line)
+
+        rejected = {
+            status: count
+            for status, count in type_results["statuses"].items()
+            if status
+            not in (
+                MessageProcessingStatus.PROCESSED_NEW_MESSAGE.value,
+                MessageProcessingStatus.PROCESSED_CONFIRMATION.value,
+            )
+        }
+        if rejected:
+            print(f"{'':<10} warning: not processed: {rejected}")
+
+
+def main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-n",
+        "--messages",
+        type=int,
+        default=200,
+        help="Number of messages per type.",
+    )
+    parser.add_argument(
+        "-t",
+        "--types",
+        nargs="+",
+        type=str.upper,
+        choices=[message_type.value for message_type in MESSAGE_TYPES],
+        default=[message_type.value for message_type in MESSAGE_TYPES],
+        help="Message types to benchmark. FORGET requires POST.",
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        dest="config_file",
+        type=Path,
+        help="Node configuration file. Defaults to the default configuration.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=Path("processing_throughput.json"),
+        help="Path of the JSON results file.",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="Results of a previous run, to compare the throughput with.",
+    )
+    parser.add_argument(
+        "--reset-db",
+        action="store_true",
+        help="Confirm that the database can be dropped and recreated.",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Enable debug logging."
+    )
+    args = parser.parse_args(list(argv))
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    LOGGER.setLevel(logging.INFO)
+
+    if not args.reset_db:
+        parser.error("The benchmark drops the database schema, pass --reset-db")
+
+    config = aleph.config.app_config
+    if args.config_file is not None:
+        config.yaml.load(args.config_file)
+
+    # Keep the order of MESSAGE_TYPES, FORGET needs the POSTs.
+    message_types = [
+        message_type
+        for message_type in MESSAGE_TYPES
+        if message_type.value in args.types
+    ]
+
+    with tempfile.TemporaryDirectory(prefix="aleph-benchmark-") as storage_folder:
+        config.storage.folder.value = storage_folder
+        config.storage.store_files.value = True
+        config.ipfs.enabled.value = False
+
+        engine = make_engine(config=config, application_name="aleph-benchmark")
+        reset_db(config, engine)
+        engine.dispose()
+
+        results = asyncio.run(
+            run_benchmark(
+                config=config, message_types=message_types, nb_messages=args.messages
+            )
+        )
+
+    output = {
+        "revision": get_git_revision(),
+        "date": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "messages_per_type": args.messages,
+        "results": results,
+    }
+    args.output.write_text(json.dumps(output, indent=2))
+
+    baseline = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())["results"]
+    print_results(results, baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,140 @@
+"""Create the message_counts_by_day table and trigger
+
+Revision ID: b8d4f0a3e6c2
+Revises: a7c3e9f2d5b1
+Create Date: 2026-07-24
+
+message_counts only tracks (type, status, sender, owner) combinations, so any
+count filtered on chain, channel, content type or time falls back to a
+COUNT(*) over messages. message_counts_by_day keeps one counter per
+(day, type, status, chain, channel, content_type) combination. Counts with
+any mix of these filters, including multi-value filters and date ranges, are
+answered by summing counter rows. Days are UTC calendar days.
+
+The table is backfilled from messages before the trigger is attached. The
+node must not process messages while this migration runs.
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = "b8d4f0a3e6c2"
+down_revision = "a7c3e9f2d5b1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        text(
+            """
+        CREATE TABLE message_counts_by_day (
+            day             DATE NOT NULL,
+            type            VARCHAR NOT NULL DEFAULT '',
+            status          VARCHAR NOT NULL DEFAULT '',
+            chain           VARCHAR NOT NULL DEFAULT '',
+            channel         VARCHAR NOT NULL DEFAULT '',
+            content_type    VARCHAR NOT NULL DEFAULT '',
+            count           BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, type, status, chain, channel, content_type)
+        );
+
+        -- Helper: add p_delta to the counter of a message.
+        CREATE OR REPLACE FUNCTION _update_message_counts_by_day(
+            p_time TIMESTAMPTZ, p_type VARCHAR, p_status VARCHAR, p_chain VARCHAR,
+            p_channel VARCHAR, p_content_type VARCHAR, p_delta BIGINT
+        ) RETURNS VOID AS $$
+        BEGIN
+            INSERT INTO message_counts_by_day (
+                day, type, status, chain, channel, content_type, count
+            )
+            VALUES (
+                (p_time AT TIME ZONE 'UTC')::date,
+                COALESCE(p_type, ''),
+                COALESCE(p_status, ''),
+                COALESCE(p_chain, ''),
+                COALESCE(p_channel, ''),
+                COALESCE(p_content_type, ''),
+                p_delta
+            )
+            ON CONFLICT (day, type, status, chain, channel, content_type)
+            DO UPDATE SET count = message_counts_by_day.count + p_delta;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION update_message_counts_by_day()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM _update_message_counts_by_day(
+                    NEW.time, NEW.type, NEW.status, NEW.chain,
+                    NEW.channel, NEW.content_type, 1
+                );
+                RETURN NEW;
+            END IF;
+
+            IF TG_OP = 'UPDATE' THEN
+                IF (OLD.time, OLD.type, OLD.status, OLD.chain, OLD.channel, OLD.content_type)
+                    IS DISTINCT FROM
+                   (NEW.time, NEW.type, NEW.status, NEW.chain, NEW.channel, NEW.content_type)
+                THEN
+                    PERFORM _update_message_counts_by_day(
+                        OLD.time, OLD.type, OLD.status, OLD.chain,
+                        OLD.channel, OLD.content_type, -1
+                    );
+                    PERFORM _update_message_counts_by_day(
+                        NEW.time, NEW.type, NEW.status, NEW.chain,
+                        NEW.channel, NEW.content_type, 1
+                    );
+                END IF;
+                RETURN NEW;
+            END IF;
+
+            IF TG_OP = 'DELETE' THEN
+                PERFORM _update_message_counts_by_day(
+                    OLD.time, OLD.type, OLD.status, OLD.chain,
+                    OLD.channel, OLD.content_type, -1
+                );
+                RETURN OLD;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        INSERT INTO message_counts_by_day (
+            day, type, status, chain, channel, content_type, count
+        )
+        SELECT (time AT TIME ZONE 'UTC')::date,
+               COALESCE(type, ''),
+               COALESCE(status, ''),
+               COALESCE(chain, ''),
+               COALESCE(channel, ''),
+               COALESCE(content_type, ''),
+               COUNT(*)
+        FROM messages
+        GROUP BY 1, 2, 3, 4, 5, 6;
+
+        CREATE TRIGGER trg_message_counts_by_day
+            AFTER INSERT OR UPDATE OR DELETE ON messages
+            FOR EACH ROW
+            EXECUTE FUNCTION update_message_counts_by_day();
+        """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        text(
+            """
+        DROP TRIGGER IF EXISTS trg_message_counts_by_day ON messages;
+        DROP FUNCTION IF EXISTS update_message_counts_by_day();
+        DROP FUNCTION IF EXISTS _update_message_counts_by_day(
+            TIMESTAMPTZ, VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR, BIGINT
+        );
+        DROP TABLE IF EXISTS message_counts_by_day;
+        """
+        )
+    )
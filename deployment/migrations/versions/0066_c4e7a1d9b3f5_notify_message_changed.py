@@ -0,0 +1,76 @@
+"""Notify the changes of messages
+
+Revision ID: c4e7a1d9b3f5
+Revises: b8d4f0a3e6c2
+Create Date: 2026-07-29
+
+The API caches the serialized message responses. Processed messages only
+change when they are confirmed or when their status changes (forget, removal,
+...). These triggers send the item hash of the changed message on the
+message_changed channel so that the API processes can evict it from their cache.
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = "c4e7a1d9b3f5"
+down_revision = "b8d4f0a3e6c2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        text(
+            """
+        CREATE OR REPLACE FUNCTION notify_message_changed()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('message_changed', OLD.item_hash);
+                RETURN OLD;
+            END IF;
+
+            PERFORM pg_notify('message_changed', NEW.item_hash);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_message_status_updated
+            AFTER UPDATE OF status ON message_status
+            FOR EACH ROW
+            WHEN (OLD.status IS DISTINCT FROM NEW.status)
+            EXECUTE FUNCTION notify_message_changed();
+
+        CREATE TRIGGER trg_message_status_deleted
+            AFTER DELETE ON message_status
+            FOR EACH ROW
+            EXECUTE FUNCTION notify_message_changed();
+
+        CREATE TRIGGER trg_message_confirmations_changed
+            AFTER INSERT OR DELETE ON message_confirmations
+            FOR EACH ROW
+            EXECUTE FUNCTION notify_message_changed();
+
+        CREATE TRIGGER trg_messages_changed
+            AFTER UPDATE OR DELETE ON messages
+            FOR EACH ROW
+            EXECUTE FUNCTION notify_message_changed();
+        """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        text(
+            """
+        DROP TRIGGER IF EXISTS trg_messages_changed ON messages;
+        DROP TRIGGER IF EXISTS trg_message_confirmations_changed ON message_confirmations;
+        DROP TRIGGER IF EXISTS trg_message_status_deleted ON message_status;
+        DROP TRIGGER IF EXISTS trg_message_status_updated ON message_status;
+        DROP FUNCTION IF EXISTS notify_message_changed();
+        """
+        )
+    )
@@ -0,0 +1,29 @@
+"""Add pending_messages.fetched_at
+
+Revision ID: d2f8b6a0c4e1
+Revises: c4e7a1d9b3f5
+Create Date: 2026-08-05
+
+Time at which the fetcher retrieved the content of a pending message. Used to
+measure the time messages spend waiting for the message processor.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d2f8b6a0c4e1"
+down_revision = "c4e7a1d9b3f5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "pending_messages",
+        sa.Column("fetched_at", sa.TIMESTAMP(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("pending_messages", "fetched_at")
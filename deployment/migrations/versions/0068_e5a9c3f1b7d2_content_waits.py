@@ -0,0 +1,55 @@
+"""Add content_waits and pending_messages.waiting_for
+
+Revision ID: e5a9c3f1b7d2
+Revises: d2f8b6a0c4e1
+Create Date: 2026-10-18
+
+Pending messages whose content or file is unavailable wait for it in
+content_waits instead of being retried until it shows up.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5a9c3f1b7d2"
+down_revision = "d2f8b6a0c4e1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_waits",
+        sa.Column("hash", sa.String(), nullable=False),
+        sa.Column("item_type", sa.String(), nullable=False),
+        sa.Column("creation_datetime", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("next_probe", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("probes", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    op.create_index(
+        op.f("ix_content_waits_next_probe"),
+        "content_waits",
+        ["next_probe"],
+        unique=False,
+    )
+    op.add_column(
+        "pending_messages",
+        sa.Column("waiting_for", sa.String(), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_pending_messages_waiting_for"),
+        "pending_messages",
+        ["waiting_for"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_pending_messages_waiting_for"), table_name="pending_messages"
+    )
+    op.drop_column("pending_messages", "waiting_for")
+    op.drop_index(op.f("ix_content_waits_next_probe"), table_name="content_waits")
+    op.drop_table("content_waits")
@@ -0,0 +1,60 @@
+"""Add dead_letter_messages and pending_messages.error_history
+
+Revision ID: f7b1d4e8a2c6
+Revises: e5a9c3f1b7d2
+Create Date: 2026-10-18
+
+Pending messages that exhaust their attempts are kept in dead_letter_messages,
+with the history of their errors, so that they can be requeued.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "f7b1d4e8a2c6"
+down_revision = "e5a9c3f1b7d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "pending_messages",
+        sa.Column(
+            "error_history", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+    )
+    op.create_table(
+        "dead_letter_messages",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("item_hash", sa.String(), nullable=False),
+        sa.Column("message", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("reception_time", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("check_message", sa.Boolean(), nullable=False),
+        sa.Column("tx_hash", sa.String(), nullable=True),
+        sa.Column("origin", sa.String(), nullable=True),
+        sa.Column("error_code", sa.Integer(), nullable=False),
+        sa.Column("details", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column(
+            "error_history", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+        ),
+        sa.Column("creation_datetime", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["tx_hash"], ["chain_txs.hash"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_dead_letter_messages_item_hash"),
+        "dead_letter_messages",
+        ["item_hash"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_dead_letter_messages_item_hash"), table_name="dead_letter_messages"
+    )
+    op.drop_table("dead_letter_messages")
+    op.drop_column("pending_messages", "error_history")
@@ -7,7 +7,15 @@ from configmanager import Config
 
 import aleph.config
 from aleph.chains.signature_verifier import SignatureVerifier
-from aleph.db.connection import make_engine, make_session_factory
+from aleph.db.connection import (
+    make_async_engine,
+    make_async_session_factory,
+    make_engine,
+    make_session_factory,
+)
+from aleph.db.read_replicas import ReadReplicas
+from aleph.services.cache.counters import BufferedCounters
+from aleph.services.cache.message_cache import MessageCache
 from aleph.services.cache.node_cache import NodeCache
 from aleph.services.ipfs import IpfsService
 from aleph.services.p2p import init_p2p_client
@@ -18,12 +26,16 @@ from aleph.toolkit.lifecycle import safe_async_cleanup
 from aleph.toolkit.monitoring import setup_sentry
 from aleph.web import create_aiohttp_app
 from aleph.web.controllers.app_state_getters import (
+    APP_STATE_ASYNC_READ_SESSION_FACTORY,
+    APP_STATE_ASYNC_SESSION_FACTORY,
     APP_STATE_CONFIG,
     APP_STATE_MESSAGE_BROADCASTER,
+    APP_STATE_MESSAGE_CACHE,
     APP_STATE_MQ_CHANNEL,
     APP_STATE_MQ_CONN,
     APP_STATE_NODE_CACHE,
     APP_STATE_P2P_CLIENT,
+    APP_STATE_READ_SESSION_FACTORY,
     APP_STATE_SESSION_FACTORY,
     APP_STATE_SIGNATURE_VERIFIER,
     APP_STATE_STATUS_BROADCASTER,
@@ -45,15 +57,36 @@ async def configure_aiohttp_app(
             application_name="aleph-api",
         )
         session_factory = make_session_factory(engine)
-
-        node_cache = NodeCache(
-            redis_host=config.redis.host.value,
-            redis_port=config.redis.port.value,
-            message_count_cache_ttl=config.perf.message_count_cache_ttl.value,
+        # Used by the read endpoints, so that slow queries do not block the event loop.
+        async_engine = make_async_engine(
+            config,
+            echo=config.logging.level.value == logging.DEBUG,
+            application_name="aleph-api",
         )
+        async_session_factory = make_async_session_factory(async_engine)
+        # Listings and other lag-tolerant reads go to the read replicas, if any.
+        read_replicas = ReadReplicas.from_config(
+            config,
+            session_factory=session_factory,
+            async_session_factory=async_session_factory,
+            application_name="aleph-api",
+        )
+        await read_replicas.open()
+
+        node_cache = NodeCache.from_config(config)
         await node_cache.open()
         ipfs_service = IpfsService.new(config)
 
+        message_cache = None
+        if (message_cache_size := config.perf.message_cache.size.value) > 0:
+            message_cache = MessageCache(
+                engine=async_engine,
+                max_size=message_cache_size,
+                node_cache=node_cache,
+                redis_ttl=config.perf.message_cache.redis_ttl.value,
+            )
+            await message_cache.open()
+
         storage_service = StorageService(
             storage_engine=FileSystemStorageEngine(folder=config.storage.folder.value),
             ipfs_service=ipfs_service,
@@ -68,13 +101,19 @@ async def configure_aiohttp_app(
         # Channel for non-WS API operations.
         mq_channel = await mq_conn.channel()
 
+        # Shared by the WS broadcasters to avoid one Redis round trip per event.
+        counters = BufferedCounters(
+            node_cache=node_cache,
+            flush_interval=config.perf.counters_flush_interval.value,
+        )
         status_broadcaster = StatusBroadcaster(
             session_factory=session_factory,
             node_cache=node_cache,
+            counters=counters,
             max_connections=config.websocket.max_status_connections.value,
         )
         message_broadcaster = MessageBroadcaster(
-            mq_conn=mq_conn, config=config, node_cache=node_cache
+            mq_conn=mq_conn, config=config, node_cache=node_cache, counters=counters
         )
 
         app[APP_STATE_CONFIG] = config
@@ -84,20 +123,29 @@ async def configure_aiohttp_app(
         app[APP_STATE_NODE_CACHE] = node_cache
         app[APP_STATE_STORAGE_SERVICE] = storage_service
         app[APP_STATE_SESSION_FACTORY] = session_factory
+        app[APP_STATE_ASYNC_SESSION_FACTORY] = async_session_factory
+        app[APP_STATE_READ_SESSION_FACTORY] = read_replicas.session
+        app[APP_STATE_ASYNC_READ_SESSION_FACTORY] = read_replicas.async_session
         app[APP_STATE_SIGNATURE_VERIFIER] = signature_verifier
         app[APP_STATE_STATUS_BROADCASTER] = status_broadcaster
         app[APP_STATE_MESSAGE_BROADCASTER] = message_broadcaster
+        app[APP_STATE_MESSAGE_CACHE] = message_cache
 
         async def _on_cleanup(_app: web.Application):
             await message_broadcaster.shutdown()
             await status_broadcaster.shutdown()
+            await safe_async_cleanup("counters", counters.close())
             # mq_channel borrows from p2p_client's connection; close it first.
             await safe_async_cleanup("mq channel", mq_channel.close())
             # Closing the p2p client also closes the underlying mq connection.
             await safe_async_cleanup("p2p client", p2p_client.close())
             await safe_async_cleanup("ipfs service", ipfs_service.close())
+            if message_cache is not None:
+                await safe_async_cleanup("message cache", message_cache.close())
             await safe_async_cleanup("node cache", node_cache.close())
             await safe_async_cleanup("p2p HTTP sessions", close_sessions())
+            await safe_async_cleanup("read replicas", read_replicas.close())
+            await safe_async_cleanup("async DB engine", async_engine.dispose())
             engine.dispose()
 
         app.on_cleanup.append(_on_cleanup)
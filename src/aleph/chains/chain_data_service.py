@@ -1,6 +1,18 @@
 import asyncio
 import json
-from typing import Any, Dict, List, Mapping, Optional, Self, Set, Type, Union, cast
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Self,
+    Sequence,
+    Set,
+    Type,
+    Union,
+    cast,
+)
 
 import aio_pika.abc
 from aleph_message.models import Chain, ItemHash, ItemType, MessageType, StoreContent
@@ -29,6 +41,7 @@ from aleph.schemas.chains.tezos_indexer_response import (
     MessageEventPayload as TezosMessageEventPayload,
 )
 from aleph.storage import StorageService
+from aleph.toolkit.rabbitmq import BatchPublisher
 from aleph.toolkit.timestamp import utc_now
 from aleph.types.chain_sync import ChainSyncProtocol
 from aleph.types.db_session import DbSession, DbSessionFactory
@@ -243,20 +256,45 @@ async def make_pending_tx_exchange(config: Config) -> aio_pika.abc.AbstractExcha
 
 
 class PendingTxPublisher:
-    def __init__(self, pending_tx_exchange: aio_pika.abc.AbstractExchange):
+    def __init__(
+        self,
+        pending_tx_exchange: aio_pika.abc.AbstractExchange,
+        publish_batch_size: int = 100,
+    ):
         self.pending_tx_exchange = pending_tx_exchange
+        self.batch_publisher = BatchPublisher(
+            exchange=pending_tx_exchange, max_batch_size=publish_batch_size
+        )
 
     @staticmethod
     def add_pending_tx(session: DbSession, tx: ChainTxDb):
         upsert_chain_tx(session=session, tx=tx)
         upsert_pending_tx(session=session, tx_hash=tx.hash)
 
+    @staticmethod
+    def _make_mq_message(tx: ChainTxDb) -> aio_pika.Message:
+        return aio_pika.Message(body=tx.hash.encode("utf-8"))
+
+    @staticmethod
+    def _make_routing_key(tx: ChainTxDb) -> str:
+        return f"{tx.chain.value}.{tx.publisher}.{tx.hash}"
+
     async def publish_pending_tx(self, tx: ChainTxDb):
-        message = aio_pika.Message(body=tx.hash.encode("utf-8"))
         await self.pending_tx_exchange.publish(
-            message=message, routing_key=f"{tx.chain.value}.{tx.publisher}.{tx.hash}"
+            message=self._make_mq_message(tx), routing_key=self._make_routing_key(tx)
         )
 
+    async def publish_pending_txs(self, txs: Sequence[ChainTxDb]):
+        """
+        Publishes pending txs in pipelined batches. Returns once all the txs
+        are confirmed by the broker.
+        """
+        for tx in txs:
+            await self.batch_publisher.publish(
+                self._make_mq_message(tx), routing_key=self._make_routing_key(tx)
+            )
+        await self.batch_publisher.flush()
+
     async def add_and_publish_pending_tx(self, session: DbSession, tx: ChainTxDb):
         """
         Add an event published on one of the supported chains.
@@ -275,4 +313,5 @@ class PendingTxPublisher:
         pending_tx_exchange = await make_pending_tx_exchange(config=config)
         return cls(
             pending_tx_exchange=pending_tx_exchange,
+            publish_batch_size=config.rabbitmq.publish_batch_size.value,
         )
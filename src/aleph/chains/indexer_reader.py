@@ -332,8 +332,7 @@ class AlephIndexerReader:
             session.commit()
 
             # Now that the txs are committed to the DB, add them to the pending tx message queue
-            for tx in txs:
-                await self.pending_tx_publisher.publish_pending_tx(tx)
+            await self.pending_tx_publisher.publish_pending_txs(txs)
 
             if nb_events_fetched < limit:
                 LOGGER.info(
@@ -78,6 +78,16 @@ def parse_args(args):
         type=str,
         default="keys",
     )
+    parser.add_argument(
+        "--requeue-dead-letters",
+        dest="requeue_dead_letters",
+        help="Put the pending messages that exhausted their retries back in the "
+        "pending messages and exit. Requeues all of them if no item hash is "
+        "specified.",
+        nargs="*",
+        metavar="ITEM_HASH",
+        default=None,
+    )
     parser.add_argument(
         "--disable-sentry",
         dest="sentry_disabled",
@@ -27,6 +27,7 @@ import aleph.config
 from aleph.chains.chain_data_service import ChainDataService, PendingTxPublisher
 from aleph.chains.connector import ChainConnector
 from aleph.cli.args import parse_args
+from aleph.db.accessors.dead_letters import requeue_dead_letter_messages
 from aleph.db.connection import make_db_url, make_engine, make_session_factory
 from aleph.exceptions import InvalidConfigException, KeyNotFoundException
 from aleph.jobs import JobsRunner, start_jobs
@@ -69,14 +70,25 @@ def run_db_migrations(config: Config):
 
 
 async def init_node_cache(config: Config) -> NodeCache:
-    node_cache = NodeCache(
-        redis_host=config.redis.host.value,
-        redis_port=config.redis.port.value,
-        message_count_cache_ttl=config.perf.message_count_cache_ttl.value,
-    )
+    node_cache = NodeCache.from_config(config)
     return node_cache
 
 
+def requeue_dead_letters(config: Config, item_hashes: List[str]) -> None:
+    engine = make_engine(config, application_name="aleph-requeue-dead-letters")
+    session_factory = make_session_factory(engine)
+    try:
+        with session_factory() as session:
+            nb_requeued = requeue_dead_letter_messages(
+                session=session, item_hashes=item_hashes or None
+            )
+            session.commit()
+    finally:
+        engine.dispose()
+
+    LOGGER.info("Requeued %d dead-letter messages", nb_requeued)
+
+
 async def main(args: List[str]) -> None:
     """Main entry point allowing external calls
 
@@ -129,6 +141,10 @@ async def main(args: List[str]) -> None:
         run_db_migrations(config)
     LOGGER.info("Database initialized.")
 
+    if args.requeue_dead_letters is not None:
+        requeue_dead_letters(config, args.requeue_dead_letters)
+        return
+
     if get_start_method(allow_none=True) != "spawn":
         set_start_method("spawn")
 
@@ -209,6 +225,7 @@ async def main(args: List[str]) -> None:
                 session_factory=session_factory,
                 ipfs_service=ipfs_service,
                 use_processes=True,
+                node_cache=node_cache,
             )
             tasks += runner.tasks
         stack.push_async_callback(runner.stop)
@@ -88,11 +88,41 @@ def get_defaults():
                     # when the fetcher has nothing in flight. Bounds the latency
                     # for delayed retries that arrive without an MQ notification.
                     "idle_timeout": 3,
+                    # Number of processes that process messages in parallel, each
+                    # one for the owners of its shard. Messages that depend on
+                    # other owners (FORGETs, VMs, balance updates) are processed by
+                    # an additional global process. 1 processes all the messages in
+                    # a single process.
+                    "shards": 1,
                 },
                 "pending_txs": {
                     # Maximum number of chain/sync events processed at the same time.
                     "max_concurrency": 20,
                 },
+                "autoscaling": {
+                    # Whether to adapt the message workers to the backlog of pending
+                    # messages, ex: after an outage or a long chain sync. The
+                    # pending_messages shards and max_concurrency values are then
+                    # the lower bounds of the number of shards and of concurrent
+                    # fetches.
+                    "enabled": False,
+                    # Upper bound of the number of message processor shards.
+                    "max_shards": 8,
+                    # Upper bound of the number of messages/files fetched at the
+                    # same time.
+                    "max_fetch_concurrency": 50,
+                    # Scale up while the backlog would take longer than this to
+                    # process at the current throughput, in seconds.
+                    "target_drain_time": 300,
+                    # Interval between two samples of the backlog, in seconds.
+                    "interval": 30,
+                    # Minimum time between two changes of the number of shards,
+                    # in seconds. Re-sharding restarts all the message processors.
+                    "cooldown": 600,
+                    # Time given to the message processors to finish their current
+                    # message when they are stopped, in seconds.
+                    "drain_timeout": 60,
+                },
                 # Maximum number of unconfirmed messages collected per packing cycle.
                 "max_unconfirmed_messages": 10000,
                 "cron": {
@@ -134,6 +164,13 @@ def get_defaults():
             ],
             # Topics to listen to by default on the P2P service.
             "topics": ["ALIVE", "ALEPH-TEST"],
+            "peer_scoring": {
+                # Whether to record the latency and reliability of HTTP peers and
+                # use them to pick the peers to fetch content from.
+                "enabled": True,
+                # Weight of the latest request in the moving averages of peer stats.
+                "ewma_alpha": 0.2,
+            },
         },
         "storage": {
             # Folder used to store files on the node.
@@ -228,6 +265,20 @@ def get_defaults():
             "pool_pre_ping": True,
             # Recycle DB connections after this many seconds of inactivity.
             "pool_recycle": 3600,
+            "read_replicas": {
+                # Read replicas of the database, as "host" or "host:port". They use the same
+                # database, user and password. The API sends the queries of the list and count
+                # endpoints to them. Leave empty to send every query to the primary.
+                "hosts": [],
+                # Maximum replication lag of a replica, in seconds. Queries are sent to the primary
+                # when no replica is within this bound.
+                "max_staleness": 5,
+                # Interval between two measures of the replication lag, in seconds.
+                "check_interval": 2,
+                # Timeout of a measure of the replication lag, in seconds. Replicas that do
+                # not answer in time are not used until the next successful measure.
+                "check_timeout": 2,
+            },
         },
         "ipfs": {
             # Whether to enable storage and communication on IPFS.
@@ -301,12 +352,25 @@ def get_defaults():
             "pending_tx_exchange": "aleph-pending-txs",
             # Heartbeat interval in seconds to prevent connection timeouts during long operations.
             "heartbeat": 600,
+            # Maximum number of messages published (and confirmed) concurrently by the jobs.
+            "publish_batch_size": 100,
+            # Maximum time a message waits for its batch to be published, in seconds.
+            "publish_batch_delay": 0.05,
         },
         "redis": {
             # Hostname of the Redis service.
             "host": "redis",
             # Port of the Redis service.
             "port": 6379,
+            "local_cache": {
+                # Whether to keep an in-process copy of hot Redis values. Copies are
+                # evicted from every process when the value is modified.
+                "enabled": False,
+                # TTL of the local copy of the list of API servers, in seconds.
+                "api_servers_ttl": 10,
+                # TTL of the local copy of the cached message counts, in seconds.
+                "message_count_ttl": 10,
+            },
         },
         "sentry": {
             # Sentry DSN.
@@ -315,8 +379,24 @@ def get_defaults():
             "traces_sample_rate": None,
         },
         "perf": {
-            # TTL of the cache in front of DB count queries on the messages table.
+            # TTL of the cache in front of DB count queries (messages, posts and aggregates).
             "message_count_cache_ttl": 300,
+            # Age of cached counts after which they are recomputed in the background, in seconds.
+            # The cached value is served until the recomputation completes.
+            "count_cache_soft_ttl": 60,
+            # TTL of the page boundaries used to serve deep page= requests with keyset pagination,
+            # in seconds. 0 disables the conversion and pages are always fetched with OFFSET.
+            "page_boundary_cache_ttl": 300,
+            # Interval between flushes of the buffered Redis counters (WebSocket metrics), in seconds.
+            "counters_flush_interval": 1,
+            "message_cache": {
+                # Serialized message responses (GET /messages/{hash}) kept in memory by each
+                # API process. 0 disables the cache.
+                "size": 10000,
+                # TTL of the copy of the responses shared between API processes through Redis,
+                # in seconds. 0 disables the Redis copy.
+                "redis_ttl": 0,
+            },
         },
         "websocket": {
             # Maximum concurrent message WebSocket connections.
@@ -325,6 +405,8 @@ def get_defaults():
             "max_status_connections": 1000,
             # WebSocket heartbeat interval in seconds (ping/pong).
             "heartbeat": 30,
+            # Maximum message history replays running at the same time, per worker.
+            "max_concurrent_history_replays": 10,
         },
     }
 
@@ -2,11 +2,13 @@ import datetime as dt
 import logging
 from typing import (
     Any,
+    Collection,
     Dict,
     Iterable,
     Literal,
     Optional,
     Sequence,
+    Set,
     Tuple,
     Union,
     cast,
@@ -16,9 +18,10 @@ from typing import (
 from sqlalchemy import delete, func, literal_column, select, update
 from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
 from sqlalchemy.orm import defer, selectinload
+from sqlalchemy.sql import Select
 
 from aleph.db.models import AggregateDb, AggregateElementDb
-from aleph.types.db_session import DbSession
+from aleph.types.db_session import AsyncDbSession, DbSession
 from aleph.types.sort_order import SortByAggregate, SortOrder
 
 logger = logging.getLogger(__name__)
@@ -31,10 +34,52 @@ def aggregate_exists(session: DbSession, key: str, owner: str) -> bool:
     )
 
 
+def get_existing_aggregate_keys(
+    session: DbSession, owner: str, keys: Collection[str]
+) -> Set[str]:
+    """
+    Returns the keys of the aggregates of `owner` that exist among `keys`.
+    """
+    select_stmt = select(AggregateDb.key).where(
+        (AggregateDb.owner == owner) & AggregateDb.key.in_(keys)
+    )
+    return set(session.execute(select_stmt).scalars())
+
+
 AggregateContent = Iterable[Tuple[str, Dict[str, Any]]]
 AggregateContentWithInfo = Iterable[Tuple[str, dt.datetime, dt.datetime, str, str]]
 
 
+def make_aggregates_by_owner_query(
+    owner: str, with_info: bool, keys: Optional[Sequence[str]] = None
+) -> Select:
+    where_clause = AggregateDb.owner == owner
+    if keys:
+        where_clause = where_clause & AggregateDb.key.in_(keys)
+    if with_info:
+        return (
+            select(
+                AggregateDb.key,
+                AggregateDb.content,
+                AggregateDb.creation_datetime.label("created"),
+                AggregateElementDb.creation_datetime.label("last_updated"),
+                AggregateDb.last_revision_hash.label("last_update_item_hash"),
+                AggregateElementDb.item_hash.label("original_item_hash"),
+            )
+            .join(
+                AggregateElementDb,
+                AggregateDb.last_revision_hash == AggregateElementDb.item_hash,
+            )
+            .where(AggregateDb.owner == owner)
+        )
+
+    return (
+        select(AggregateDb.key, AggregateDb.content)
+        .where(where_clause)
+        .order_by(AggregateDb.key)
+    )
+
+
 @overload
 def get_aggregates_by_owner(
     session: Any,
@@ -60,32 +105,27 @@ def get_aggregates_by_owner(
 
 
 def get_aggregates_by_owner(session, owner, with_info, keys=None):
-    where_clause = AggregateDb.owner == owner
-    if keys:
-        where_clause = where_clause & AggregateDb.key.in_(keys)
-    if with_info:
-        query = (
-            session.query(
-                AggregateDb.key,
-                AggregateDb.content,
-                AggregateDb.creation_datetime.label("created"),
-                AggregateElementDb.creation_datetime.label("last_updated"),
-                AggregateDb.last_revision_hash.label("last_update_item_hash"),
-                AggregateElementDb.item_hash.label("original_item_hash"),
-            )
-            .join(
-                AggregateElementDb,
-                AggregateDb.last_revision_hash == AggregateElementDb.item_hash,
-            )
-            .filter(AggregateDb.owner == owner)
-        )
-    else:
-        query = (
-            session.query(AggregateDb.key, AggregateDb.content)
-            .filter(where_clause)
-            .order_by(AggregateDb.key)
-        )
-    return query.all()
+    query = make_aggregates_by_owner_query(owner=owner, with_info=with_info, keys=keys)
+    return session.execute(query).all()
+
+
+async def get_aggregates_by_owner_async(
+    session: AsyncDbSession,
+    owner: str,
+    with_info: bool,
+    keys: Optional[Sequence[str]] = None,
+) -> Union[AggregateContent, AggregateContentWithInfo]:
+    query = make_aggregates_by_owner_query(owner=owner, with_info=with_info, keys=keys)
+    return cast(
+        Union[AggregateContent, AggregateContentWithInfo],
+        (await session.execute(query)).all(),
+    )
+
+
+def make_dirty_aggregate_keys_query(owner: str) -> Select:
+    return select(AggregateDb.key).where(
+        (AggregateDb.owner == owner) & AggregateDb.dirty
+    )
 
 
 def get_aggregate_by_key(
@@ -112,6 +152,19 @@ def get_aggregate_by_key(
     ).scalar()
 
 
+def get_aggregates_by_owners(
+    session: DbSession, key: str, owners: Collection[str]
+) -> Sequence[AggregateDb]:
+    """
+    Returns the aggregates with the same key of several owners, ex: their
+    security aggregates.
+    """
+    select_stmt = select(AggregateDb).where(
+        (AggregateDb.key == key) & AggregateDb.owner.in_(owners)
+    )
+    return session.execute(select_stmt).scalars().all()
+
+
 def get_aggregate_content_keys(
     session: DbSession, owner: str, key: str
 ) -> Iterable[str]:
@@ -295,6 +348,26 @@ def delete_aggregate_element(session: DbSession, item_hash: str) -> None:
     session.execute(delete_element_stmt)
 
 
+def delete_aggregate_elements(session: DbSession, item_hashes: Collection[str]) -> None:
+    delete_element_stmt = delete(AggregateElementDb).where(
+        AggregateElementDb.item_hash.in_(item_hashes)
+    )
+    session.execute(delete_element_stmt)
+
+
+def get_aggregate_element_hashes(
+    session: DbSession, owner: str, keys: Collection[str]
+) -> Sequence[str]:
+    """
+    Returns the hashes of the messages that make up the aggregates of `owner`
+    with the given keys.
+    """
+    select_stmt = select(AggregateElementDb.item_hash).where(
+        (AggregateElementDb.owner == owner) & AggregateElementDb.key.in_(keys)
+    )
+    return session.execute(select_stmt).scalars().all()
+
+
 def get_aggregates(
     session: DbSession,
     keys: Optional[Sequence[str]] = None,
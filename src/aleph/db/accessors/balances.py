@@ -34,7 +34,7 @@ from aleph.toolkit.constants import (
 )
 from aleph.toolkit.timestamp import timestamp_to_datetime, utc_now
 from aleph.types.credit import CreditFlow
-from aleph.types.db_session import DbSession
+from aleph.types.db_session import AsyncDbSession, DbSession
 from aleph.types.sort_order import SortByCreditHistory, SortOrder
 
 
@@ -130,53 +130,80 @@ def get_total_balance(
     return Decimal(0) if result is None else result.balance or Decimal(0)
 
 
-def get_total_detailed_balance(
-    session: DbSession,
-    address: str,
-    chain: Optional[str] = None,
-    include_dapps: bool = False,
-) -> tuple[Decimal, Dict[str, Decimal]]:
+def _make_detailed_balance_queries(
+    address: str, chain: Optional[str], include_dapps: bool
+) -> Tuple[Select, Optional[Select]]:
+    """
+    Returns the query of the total balance and, if no chain is specified,
+    the query of the balance by chain.
+    """
+    where_clause = (AlephBalanceDb.address == address) & (
+        (AlephBalanceDb.dapp.is_(None)) if not include_dapps else True
+    )
+
     if chain is not None:
         balance_on_chain_query = (
             select(func.sum(AlephBalanceDb.balance))
-            .where(
-                (AlephBalanceDb.address == address)
-                & (AlephBalanceDb.chain == chain)
-                & ((AlephBalanceDb.dapp.is_(None)) if not include_dapps else True)
-            )
+            .where(where_clause & (AlephBalanceDb.chain == chain))
             .group_by(AlephBalanceDb.address)
         )
-
-        result = session.execute(balance_on_chain_query).first()
-        return result[0] if result is not None else Decimal(0), {}
+        return balance_on_chain_query, None
 
     balance_by_chain_query = (
         select(AlephBalanceDb.chain, func.sum(AlephBalanceDb.balance).label("balance"))
-        .where(
-            (AlephBalanceDb.address == address)
-            & ((AlephBalanceDb.dapp.is_(None)) if not include_dapps else True)
-        )
+        .where(where_clause)
         .group_by(AlephBalanceDb.chain)
     )
-
-    balances_by_chain = {
-        row.chain: row.balance or Decimal(0)
-        for row in session.execute(balance_by_chain_query).fetchall()
-    }
-
     total_balance_query = (
         select(func.sum(AlephBalanceDb.balance))
-        .where(
-            (AlephBalanceDb.address == address)
-            & ((AlephBalanceDb.dapp.is_(None)) if not include_dapps else True)
-        )
+        .where(where_clause)
         .group_by(AlephBalanceDb.address)
     )
+    return total_balance_query, balance_by_chain_query
+
+
+def get_total_detailed_balance(
+    session: DbSession,
+    address: str,
+    chain: Optional[str] = None,
+    include_dapps: bool = False,
+) -> tuple[Decimal, Dict[str, Decimal]]:
+    total_balance_query, balance_by_chain_query = _make_detailed_balance_queries(
+        address=address, chain=chain, include_dapps=include_dapps
+    )
+
+    balances_by_chain: Dict[str, Decimal] = {}
+    if balance_by_chain_query is not None:
+        balances_by_chain = {
+            row.chain: row.balance or Decimal(0)
+            for row in session.execute(balance_by_chain_query).fetchall()
+        }
 
     result = session.execute(total_balance_query).first()
     return result[0] if result is not None else Decimal(0), balances_by_chain
 
 
+async def get_total_detailed_balance_async(
+    session: AsyncDbSession,
+    address: str,
+    chain: Optional[str] = None,
+    include_dapps: bool = False,
+) -> tuple[Decimal, Dict[str, Decimal]]:
+    total_balance_query, balance_by_chain_query = _make_detailed_balance_queries(
+        address=address, chain=chain, include_dapps=include_dapps
+    )
+
+    balances_by_chain: Dict[str, Decimal] = {}
+    if balance_by_chain_query is not None:
+        balances_by_chain = {
+            row.chain: row.balance or Decimal(0)
+            for row in (await session.execute(balance_by_chain_query)).fetchall()
+        }
+
+    result = (await session.execute(total_balance_query)).first()
+    return result[0] if result is not None else Decimal(0), balances_by_chain
+
+
 def update_balances(
     session: DbSession,
     chain: Chain,
@@ -384,6 +411,16 @@ def _valid_lot_filter(cutoff: Union[dt.datetime, ColumnElement[dt.datetime]]):
     )
 
 
+def _make_credit_balance_query(address: str, now: Optional[dt.datetime]) -> Select:
+    cutoff = now if now is not None else func.now()
+    return select(
+        func.coalesce(func.sum(AlephCreditBalanceDb.amount_remaining), 0)
+    ).where(
+        AlephCreditBalanceDb.address == address,
+        _valid_lot_filter(cutoff),
+    )
+
+
 def get_credit_balance(
     session: DbSession, address: str, now: Optional[dt.datetime] = None
 ) -> int:
@@ -391,13 +428,14 @@ def get_credit_balance(
 
     Pure read: no FIFO walk, no write-back. Writers keep the cache up to date.
     """
-    cutoff = now if now is not None else func.now()
-    result = session.execute(
-        select(func.coalesce(func.sum(AlephCreditBalanceDb.amount_remaining), 0)).where(
-            AlephCreditBalanceDb.address == address,
-            _valid_lot_filter(cutoff),
-        )
-    ).scalar()
+    result = session.execute(_make_credit_balance_query(address, now)).scalar()
+    return max(0, int(result or 0))
+
+
+async def get_credit_balance_async(
+    session: AsyncDbSession, address: str, now: Optional[dt.datetime] = None
+) -> int:
+    result = (await session.execute(_make_credit_balance_query(address, now))).scalar()
     return max(0, int(result or 0))
 
 
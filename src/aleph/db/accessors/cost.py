@@ -1,5 +1,5 @@
 from decimal import Decimal
-from typing import Iterable, List, Optional, Tuple
+from typing import Collection, Iterable, List, Optional, Tuple
 
 from aleph_message.models import PaymentType
 from sqlalchemy import and_, asc, delete, func, select
@@ -153,6 +153,13 @@ def delete_costs_for_message(session: DbSession, item_hash: str) -> None:
     session.execute(delete_stmt)
 
 
+def delete_costs_for_messages(session: DbSession, item_hashes: Collection[str]) -> None:
+    delete_stmt = delete(AccountCostsDb).where(
+        AccountCostsDb.item_hash.in_(item_hashes)
+    )
+    session.execute(delete_stmt)
+
+
 def delete_costs_for_forgotten_and_deleted_messages(session: DbSession) -> None:
     delete_stmt = (
         delete(AccountCostsDb)
@@ -0,0 +1,107 @@
+from typing import Any, Collection, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from aleph.db.models import (
+    DeadLetterMessageDb,
+    MessageStatusDb,
+    PendingMessageDb,
+    RejectedMessageDb,
+)
+from aleph.toolkit.timestamp import utc_now
+from aleph.types.db_session import DbSession
+from aleph.types.message_status import MessageOrigin, MessageStatus
+
+from .messages import make_message_status_upsert_query
+
+
+def add_dead_letter_message(
+    session: DbSession,
+    pending_message: PendingMessageDb,
+    rejected_message: RejectedMessageDb,
+    error_history: List[Dict[str, Any]],
+) -> None:
+    """
+    Keeps a pending message that exhausted its attempts, once rejected.
+
+    :param rejected_message: The rejection of the message, with its last error.
+    :param error_history: Errors of all the attempts.
+    """
+
+    session.add(
+        DeadLetterMessageDb(
+            item_hash=pending_message.item_hash,
+            message=rejected_message.message,
+            reception_time=pending_message.reception_time,
+            check_message=pending_message.check_message,
+            tx_hash=pending_message.tx_hash,
+            origin=pending_message.origin,
+            error_code=rejected_message.error_code,
+            details=rejected_message.details,
+            error_history=error_history,
+            creation_datetime=utc_now(),
+        )
+    )
+
+
+def get_dead_letter_messages(
+    session: DbSession, item_hashes: Optional[Collection[str]] = None
+) -> Sequence[DeadLetterMessageDb]:
+    select_stmt = select(DeadLetterMessageDb).order_by(DeadLetterMessageDb.id)
+    if item_hashes is not None:
+        select_stmt = select_stmt.where(DeadLetterMessageDb.item_hash.in_(item_hashes))
+    return session.execute(select_stmt).scalars().all()
+
+
+def requeue_dead_letter_messages(
+    session: DbSession, item_hashes: Optional[Collection[str]] = None
+) -> int:
+    """
+    Puts dead-letter messages back in the pending messages, with a fresh retry
+    count. Their status goes back from rejected to pending.
+
+    :param item_hashes: Messages to requeue. Defaults to all the dead-letter messages.
+    :return: The number of requeued messages.
+    """
+
+    dead_letter_messages = get_dead_letter_messages(
+        session=session, item_hashes=item_hashes
+    )
+
+    for dead_letter_message in dead_letter_messages:
+        pending_message = PendingMessageDb.from_message_dict(
+            dead_letter_message.message,
+            reception_time=dead_letter_message.reception_time,
+            fetched=False,
+            tx_hash=dead_letter_message.tx_hash,
+            check_message=dead_letter_message.check_message,
+            origin=(
+                MessageOrigin(dead_letter_message.origin)
+                if dead_letter_message.origin
+                else None
+            ),
+        )
+        # Retry immediately, even for historical messages
+        pending_message.next_attempt = utc_now()
+
+        session.execute(
+            make_message_status_upsert_query(
+                item_hash=pending_message.item_hash,
+                new_status=MessageStatus.PENDING,
+                reception_time=pending_message.reception_time,
+                where=MessageStatusDb.status == MessageStatus.REJECTED,
+            )
+        )
+        session.execute(
+            insert(PendingMessageDb)
+            .values(pending_message.to_dict(exclude={"id"}))
+            .on_conflict_do_nothing("uq_pending_message")
+        )
+
+    session.execute(
+        delete(DeadLetterMessageDb).where(
+            DeadLetterMessageDb.id.in_([message.id for message in dead_letter_messages])
+        )
+    )
+    return len(dead_letter_messages)
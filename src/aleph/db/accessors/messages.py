@@ -1,17 +1,29 @@
 import datetime as dt
 import traceback
-from typing import Any, Iterable, Mapping, Optional, Sequence, Tuple, Union, overload
+from typing import (
+    Any,
+    Collection,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    overload,
+)
 
 from aleph_message.models import Chain, ItemHash, MessageType, PaymentType
 from sqlalchemy import delete, func, nullsfirst, nullslast, select, text, update
-from sqlalchemy.dialects.postgresql import array, insert
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import load_only, selectinload
-from sqlalchemy.sql import Insert, Select
+from sqlalchemy.sql import ColumnElement, Insert, Select
 from sqlalchemy.sql.elements import literal
 
 from aleph.db.accessors.address_stats import escape_like_pattern
-from aleph.db.accessors.cost import delete_costs_for_message
-from aleph.db.models.message_counts import MessageCountsDb
+from aleph.db.accessors.cost import delete_costs_for_messages
+from aleph.db.models.message_counts import MessageCountsByDayDb, MessageCountsDb
 from aleph.toolkit.timestamp import coerce_to_datetime, utc_now
 from aleph.types.channel import Channel
 from aleph.types.db_session import DbSession
@@ -47,6 +59,13 @@ def get_message_by_item_hash(
     return (session.execute(select_stmt)).scalar()
 
 
+def get_messages_by_item_hashes(
+    session: DbSession, item_hashes: Collection[str]
+) -> Sequence[MessageDb]:
+    select_stmt = select(MessageDb).where(MessageDb.item_hash.in_(item_hashes))
+    return session.execute(select_stmt).scalars().all()
+
+
 def message_exists(session: DbSession, item_hash: str) -> bool:
     return MessageDb.exists(
         session=session,
@@ -54,6 +73,18 @@ def message_exists(session: DbSession, item_hash: str) -> bool:
     )
 
 
+def get_existing_message_hashes(
+    session: DbSession, item_hashes: Collection[str]
+) -> Set[str]:
+    """
+    Returns the hashes of the messages that exist among `item_hashes`.
+    """
+    select_stmt = select(MessageDb.item_hash).where(
+        MessageDb.item_hash.in_(item_hashes)
+    )
+    return set(session.execute(select_stmt).scalars())
+
+
 def get_one_message_by_item_hash(
     session: DbSession, item_hash: str
 ) -> Optional[MessageDb]:
@@ -133,7 +164,7 @@ def make_matching_messages_query(
     if content_keys:
         select_stmt = select_stmt.where(MessageDb.content_key.in_(content_keys))
     if tags:
-        select_stmt = select_stmt.where(MessageDb.tags.overlap(array(tags)))
+        select_stmt = select_stmt.where(MessageDb.tags.overlap(list(tags)))
     if channels:
         select_stmt = select_stmt.where(MessageDb.channel.in_(channels))
     # Payment types - direct column, no JOIN to account_costs
@@ -179,7 +210,8 @@ def make_matching_messages_query(
                 MessageDb.item_hash.asc(),
             )
 
-    # Cursor pagination (if cursor values provided, ignore page)
+    # Keyset pagination. In cursor mode the page is ignored, otherwise pages
+    # are counted from the keyset.
     if after_time is not None:
         if sort_order == SortOrder.DESCENDING:
             select_stmt = select_stmt.where(
@@ -191,24 +223,22 @@ def make_matching_messages_query(
                 (MessageDb.time > after_time)
                 | ((MessageDb.time == after_time) & (MessageDb.item_hash > after_hash))
             )
-    elif page > 1:
+    if page > 1 and not cursor_mode:
         select_stmt = select_stmt.offset((page - 1) * pagination)
 
     select_stmt = select_stmt.order_by(*order_by_columns)
 
     # If pagination == 0, return all matching results
     if pagination:
-        select_stmt = select_stmt.limit(
-            pagination + 1 if after_time is not None or cursor_mode else pagination
-        )
+        select_stmt = select_stmt.limit(pagination + 1 if cursor_mode else pagination)
 
     return select_stmt
 
 
 def count_matching_messages(
     session: DbSession,
-    start_date: float = 0.0,
-    end_date: float = 0.0,
+    start_date: Optional[Union[float, dt.datetime]] = 0.0,
+    end_date: Optional[Union[float, dt.datetime]] = 0.0,
     sort_by: SortBy = SortBy.TIME,
     sort_order: SortOrder = SortOrder.DESCENDING,
     page: int = 1,
@@ -250,10 +280,10 @@ def get_matching_messages(
 
 def count_matching_messages_fast(
     session: DbSession,
-    message_type: Optional[str] = None,
+    message_types: Optional[Sequence[str]] = None,
     statuses: Optional[Sequence[str]] = None,
-    sender: Optional[str] = None,
-    owner: Optional[str] = None,
+    senders: Optional[Sequence[str]] = None,
+    owners: Optional[Sequence[str]] = None,
 ) -> Optional[int]:
     """
     Fast count from the message_counts table using SUM over matching rows.
@@ -261,29 +291,30 @@ def count_matching_messages_fast(
     The trigger maintains these dimension combos:
       (status), (type, status), (sender, status), (sender, type, status),
       (owner, status).
-    Combinations not tracked (e.g. sender+owner, owner+type) return None
-    so the caller can fall back to a full COUNT(*).
+    Rows of a combo are disjoint, so multi-value filters are answered by summing
+    the rows of each value. Combinations not tracked (e.g. sender+owner,
+    owner+type) return None so the caller can fall back to a full COUNT(*).
     """
     # Reject dimension combos the trigger doesn't maintain.
-    if sender and owner:
+    if senders and owners:
         return None
-    if owner and message_type:
+    if owners and message_types:
         return None
 
-    filters = []
+    filters: List[ColumnElement[bool]] = []
 
-    if message_type:
-        filters.append(MessageCountsDb.type == message_type)
+    if message_types:
+        filters.append(MessageCountsDb.type.in_(message_types))
     else:
         filters.append(MessageCountsDb.type == "")
 
-    if sender:
-        filters.append(MessageCountsDb.sender == sender)
+    if senders:
+        filters.append(MessageCountsDb.sender.in_(senders))
     else:
         filters.append(MessageCountsDb.sender == "")
 
-    if owner:
-        filters.append(MessageCountsDb.owner == owner)
+    if owners:
+        filters.append(MessageCountsDb.owner.in_(owners))
     else:
         filters.append(MessageCountsDb.owner == "")
 
@@ -301,6 +332,94 @@ def count_matching_messages_fast(
     return int(session.execute(select_stmt).scalar_one())
 
 
+def _start_of_day(datetime: dt.datetime) -> dt.datetime:
+    return datetime.astimezone(dt.timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def count_matching_messages_by_day(
+    session: DbSession,
+    message_types: Optional[Sequence[MessageType]] = None,
+    message_statuses: Optional[Sequence[MessageStatus]] = None,
+    chains: Optional[Sequence[Chain]] = None,
+    channels: Optional[Sequence[str]] = None,
+    content_types: Optional[Sequence[str]] = None,
+    start_date: Optional[Union[float, dt.datetime]] = None,
+    end_date: Optional[Union[float, dt.datetime]] = None,
+) -> int:
+    """
+    Counts messages using the message_counts_by_day table.
+
+    Days fully covered by [start_date, end_date) are counted by summing counter
+    rows. The partial days at the edges of the range, if any, are counted from
+    the messages table, which only scans the messages of these two days.
+    """
+    start_datetime = coerce_to_datetime(start_date)
+    end_datetime = coerce_to_datetime(end_date)
+
+    # Full days are in [first_full_day, end_of_full_days)
+    first_full_day = None
+    if start_datetime:
+        first_full_day = _start_of_day(start_datetime)
+        if first_full_day != start_datetime:
+            first_full_day += dt.timedelta(days=1)
+    end_of_full_days = _start_of_day(end_datetime) if end_datetime else None
+
+    def count_messages_between(
+        start: Optional[dt.datetime], end: Optional[dt.datetime]
+    ) -> int:
+        return count_matching_messages(
+            session,
+            message_types=message_types,
+            message_statuses=message_statuses,
+            chains=chains,
+            channels=channels,
+            content_types=content_types,
+            start_date=start,
+            end_date=end,
+        )
+
+    if (
+        first_full_day is not None
+        and end_of_full_days is not None
+        and first_full_day >= end_of_full_days
+    ):
+        # The range does not cover a full day
+        return count_messages_between(start_datetime, end_datetime)
+
+    filters: List[ColumnElement[bool]] = []
+    if message_types:
+        filters.append(MessageCountsByDayDb.type.in_([t.value for t in message_types]))
+    if message_statuses:
+        filters.append(
+            MessageCountsByDayDb.status.in_([s.value for s in message_statuses])
+        )
+    if chains:
+        filters.append(MessageCountsByDayDb.chain.in_([c.value for c in chains]))
+    if channels:
+        filters.append(MessageCountsByDayDb.channel.in_(channels))
+    if content_types:
+        filters.append(MessageCountsByDayDb.content_type.in_(content_types))
+    if first_full_day is not None:
+        filters.append(MessageCountsByDayDb.day >= first_full_day.date())
+    if end_of_full_days is not None:
+        filters.append(MessageCountsByDayDb.day < end_of_full_days.date())
+
+    select_stmt = select(
+        func.coalesce(func.sum(MessageCountsByDayDb.row_count), 0)
+    ).where(*filters)
+    # SUM(bigint) returns numeric/Decimal in PostgreSQL; cast to int.
+    n_matches = int(session.execute(select_stmt).scalar_one())
+
+    if start_datetime and first_full_day != start_datetime:
+        n_matches += count_messages_between(start_datetime, first_full_day)
+    if end_datetime and end_of_full_days != end_datetime:
+        n_matches += count_messages_between(end_of_full_days, end_datetime)
+
+    return n_matches
+
+
 def get_message_stats_by_address(
     session: DbSession,
     addresses: Optional[Sequence[str]] = None,
@@ -461,6 +580,15 @@ def get_message_status(
     ).scalar()
 
 
+def get_message_statuses(
+    session: DbSession, item_hashes: Collection[str]
+) -> Sequence[MessageStatusDb]:
+    select_stmt = select(MessageStatusDb).where(
+        MessageStatusDb.item_hash.in_(item_hashes)
+    )
+    return session.execute(select_stmt).scalars().all()
+
+
 def get_rejected_message(
     session: DbSession, item_hash: str
 ) -> Optional[RejectedMessageDb]:
@@ -859,6 +987,28 @@ def forget_message(
     :param forgotten_at: Time of the FORGET message.
     """
 
+    forget_messages(
+        session=session,
+        item_hashes=[item_hash],
+        forget_message_hash=forget_message_hash,
+        forgotten_at=forgotten_at,
+    )
+
+
+def forget_messages(
+    session: DbSession,
+    item_hashes: Collection[str],
+    forget_message_hash: str,
+    forgotten_at: dt.datetime,
+) -> None:
+    """
+    Marks processed messages as forgotten, with one statement per table
+    whatever the number of messages. See `forget_message`.
+    """
+
+    if not item_hashes:
+        return
+
     # File size preserved for billing (STORE messages; NULL otherwise).
     size_subquery = (
         select(StoredFileDb.size)
@@ -899,42 +1049,59 @@ def forget_message(
             func.coalesce(MessageDb.payment_type, "hold"),
             size_subquery,
             literal(forgotten_at),
-        ).where(MessageDb.item_hash == item_hash),
+        ).where(MessageDb.item_hash.in_(item_hashes)),
     )
     session.execute(copy_row_stmt)
 
     # Delete confirmations before the message (FK constraint)
     session.execute(
         delete(message_confirmations).where(
-            message_confirmations.c.item_hash == item_hash
+            message_confirmations.c.item_hash.in_(item_hashes)
         )
     )
 
     # Delete the message from the messages table
-    session.execute(delete(MessageDb).where(MessageDb.item_hash == item_hash))
+    session.execute(delete(MessageDb).where(MessageDb.item_hash.in_(item_hashes)))
 
     # Dual-write to message_status during transition
     session.execute(
         update(MessageStatusDb)
         .values(status=MessageStatus.FORGOTTEN)
-        .where(MessageStatusDb.item_hash == item_hash)
+        .where(MessageStatusDb.item_hash.in_(item_hashes))
     )
 
-    # The target may have been REMOVING: forgetting supersedes removal.
-    delete_removed_message(session=session, item_hash=item_hash)
+    # The targets may have been REMOVING: forgetting supersedes removal.
+    session.execute(
+        delete(RemovedMessageDb).where(RemovedMessageDb.item_hash.in_(item_hashes))
+    )
 
-    delete_costs_for_message(
+    delete_costs_for_messages(
         session=session,
-        item_hash=item_hash,
+        item_hashes=item_hashes,
     )
 
 
 def append_to_forgotten_by(
     session: DbSession, forgotten_message_hash: str, forget_message_hash: str
 ) -> None:
+    append_to_forgotten_by_many(
+        session=session,
+        forgotten_message_hashes=[forgotten_message_hash],
+        forget_message_hash=forget_message_hash,
+    )
+
+
+def append_to_forgotten_by_many(
+    session: DbSession,
+    forgotten_message_hashes: Collection[str],
+    forget_message_hash: str,
+) -> None:
+    if not forgotten_message_hashes:
+        return
+
     update_stmt = (
         update(ForgottenMessageDb)
-        .where(ForgottenMessageDb.item_hash == forgotten_message_hash)
+        .where(ForgottenMessageDb.item_hash.in_(forgotten_message_hashes))
         .values(
             forgotten_by=text(
                 f"array_append({ForgottenMessageDb.forgotten_by.name}, :forget_hash)"
@@ -1061,6 +1228,13 @@ def mark_pending_message_as_rejected(
     )
 
 
+# Columns of the pending messages that track their processing and are not part
+# of the message.
+PENDING_MESSAGE_PROCESSING_FIELDS = frozenset(
+    {"fetched_at", "waiting_for", "error_history"}
+)
+
+
 @overload
 def reject_new_pending_message(
     session: DbSession,
@@ -1100,6 +1274,7 @@ def reject_new_pending_message(
                 "fetched",
                 "tx_hash",
                 "reception_time",
+                *PENDING_MESSAGE_PROCESSING_FIELDS,
             }
         )
     else:
@@ -1154,6 +1329,7 @@ def reject_existing_pending_message(
             "fetched",
             "tx_hash",
             "reception_time",
+            *PENDING_MESSAGE_PROCESSING_FIELDS,
         }
     )
     pending_message_dict["time"] = pending_message_dict["time"].timestamp()
@@ -1,13 +1,50 @@
 import datetime as dt
-from typing import Any, Collection, Dict, Iterable, Optional, Sequence
+from typing import Any, Collection, Dict, Iterable, Optional, Sequence, cast
 
-from aleph_message.models import Chain
-from sqlalchemy import delete, func, select, update
+from aleph_message.models import Chain, ItemType
+from sqlalchemy import (
+    ColumnElement,
+    and_,
+    delete,
+    exists,
+    func,
+    literal,
+    not_,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.orm import selectinload
 from sqlalchemy.sql import Update
 
-from aleph.db.models import ChainTxDb, PendingMessageDb
+from aleph.db.models import ChainTxDb, ContentWaitDb, PendingMessageDb
+from aleph.toolkit.timestamp import utc_now
 from aleph.types.db_session import DbSession
+from aleph.types.message_shard import GLOBAL_SHARD_MESSAGE_TYPES, MessageShard
+
+
+def make_shard_filter(shard: MessageShard) -> ColumnElement[bool]:
+    """
+    Filters the pending messages of a shard, see MessageShard.
+    """
+
+    owner = func.coalesce(
+        PendingMessageDb.content["address"].astext, PendingMessageDb.sender
+    )
+    is_global: ColumnElement[bool] = PendingMessageDb.type.in_(
+        GLOBAL_SHARD_MESSAGE_TYPES
+    )
+    if shard.global_senders:
+        is_global = or_(is_global, PendingMessageDb.sender.in_(shard.global_senders))
+
+    if shard.is_global:
+        return is_global
+
+    # Modulo before abs(): abs(-2^31) overflows
+    shard_index = func.abs(func.hashtext(owner) % shard.nb_shards)
+    return and_(not_(is_global), shard_index == shard.index)
 
 
 def get_next_pending_message(
@@ -16,18 +53,25 @@ def get_next_pending_message(
     offset: int = 0,
     fetched: Optional[bool] = None,
     exclude_item_hashes: Optional[Sequence[str]] = None,
+    shard: Optional[MessageShard] = None,
 ) -> Optional[PendingMessageDb]:
     select_stmt = (
         select(PendingMessageDb)
         .order_by(PendingMessageDb.next_attempt.asc())
         .offset(offset)
         .options(selectinload(PendingMessageDb.tx))
-        .where(PendingMessageDb.next_attempt <= current_time)
+        .where(
+            PendingMessageDb.next_attempt <= current_time,
+            PendingMessageDb.waiting_for.is_(None),
+        )
     )
 
     if fetched is not None:
         select_stmt = select_stmt.where(PendingMessageDb.fetched == fetched)
 
+    if shard is not None:
+        select_stmt = select_stmt.where(make_shard_filter(shard))
+
     if exclude_item_hashes:
         select_stmt = select_stmt.where(
             PendingMessageDb.item_hash.not_in(exclude_item_hashes)
@@ -50,7 +94,10 @@ def get_next_pending_messages(
         .order_by(PendingMessageDb.next_attempt.asc())
         .offset(offset)
         .options(selectinload(PendingMessageDb.tx))
-        .where(PendingMessageDb.next_attempt <= current_time)
+        .where(
+            PendingMessageDb.next_attempt <= current_time,
+            PendingMessageDb.waiting_for.is_(None),
+        )
     )
 
     if fetched is not None:
@@ -102,24 +149,70 @@ def count_pending_messages(session: DbSession, chain: Optional[Chain] = None) ->
     return (session.execute(select_stmt)).scalar_one()
 
 
+def count_ready_pending_messages(
+    session: DbSession,
+    current_time: dt.datetime,
+    fetched: bool,
+    limit: Optional[int] = None,
+) -> int:
+    """
+    Counts the pending messages that the fetch job (fetched=False) or the process
+    jobs (fetched=True) can pick up, i.e. the backlog of these jobs.
+
+    :param limit: Stop counting after this number of messages, to bound the cost
+                  of the query when the backlog is large.
+    """
+    select_stmt = select(PendingMessageDb.id).where(
+        PendingMessageDb.next_attempt <= current_time,
+        PendingMessageDb.waiting_for.is_(None),
+        PendingMessageDb.fetched == fetched,
+    )
+    if limit is not None:
+        select_stmt = select_stmt.limit(limit)
+
+    count_stmt = select(func.count()).select_from(select_stmt.subquery())
+    return session.execute(count_stmt).scalar_one()
+
+
 def make_pending_message_fetched_statement(
     pending_message: PendingMessageDb, content: Dict[str, Any]
 ) -> Update:
     update_stmt = (
         update(PendingMessageDb)
         .where(PendingMessageDb.id == pending_message.id)
-        .values(fetched=True, content=content, retries=0)
+        .values(fetched=True, fetched_at=utc_now(), content=content, retries=0)
     )
     return update_stmt
 
 
+def _append_to_error_history(error: Optional[Dict[str, Any]]):
+    if error is None:
+        return PendingMessageDb.error_history
+
+    return func.coalesce(PendingMessageDb.error_history, literal([], type_=JSONB)).op(
+        "||"
+    )(literal([error], type_=JSONB))
+
+
 def set_next_retry(
-    session: DbSession, pending_message: PendingMessageDb, next_attempt: dt.datetime
+    session: DbSession,
+    pending_message: PendingMessageDb,
+    next_attempt: dt.datetime,
+    error: Optional[Dict[str, Any]] = None,
 ) -> None:
+    """
+    :param error: Error of the failed attempt, added to the error history.
+    """
     update_stmt = (
         update(PendingMessageDb)
         .where(PendingMessageDb.id == pending_message.id)
-        .values(retries=PendingMessageDb.retries + 1, next_attempt=next_attempt)
+        .values(
+            retries=PendingMessageDb.retries + 1,
+            next_attempt=next_attempt,
+            error_history=_append_to_error_history(error),
+        )
+        # The caller updates the retries of the object, do not increment them twice.
+        .execution_options(synchronize_session=False)
     )
     session.execute(update_stmt)
 
@@ -130,3 +223,115 @@ def delete_pending_message(
     session.execute(
         delete(PendingMessageDb).where(PendingMessageDb.id == pending_message.id)
     )
+
+
+def park_pending_message(
+    session: DbSession,
+    pending_message: PendingMessageDb,
+    content_hash: str,
+    item_type: ItemType,
+    error: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Puts a pending message on the wait list of a content that is not available.
+    The message is not retried until the content is available, see
+    `release_waiting_messages`.
+
+    :param error: Error of the failed attempt, added to the error history.
+    """
+
+    now = utc_now()
+    session.execute(
+        insert(ContentWaitDb)
+        .values(
+            hash=content_hash,
+            item_type=item_type,
+            creation_datetime=now,
+            next_probe=now,
+            probes=0,
+        )
+        .on_conflict_do_nothing()
+    )
+    session.execute(
+        update(PendingMessageDb)
+        .where(PendingMessageDb.id == pending_message.id)
+        .values(
+            waiting_for=content_hash,
+            fetched=False,
+            retries=PendingMessageDb.retries + 1,
+            error_history=_append_to_error_history(error),
+        )
+        # The caller updates the retries of the object, do not increment them twice.
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_content_waits_to_probe(
+    session: DbSession, current_time: dt.datetime, limit: int
+) -> Sequence[ContentWaitDb]:
+    select_stmt = (
+        select(ContentWaitDb)
+        .where(ContentWaitDb.next_probe <= current_time)
+        .order_by(ContentWaitDb.next_probe.asc())
+        .limit(limit)
+    )
+    return session.execute(select_stmt).scalars().all()
+
+
+def set_next_probe(
+    session: DbSession, content_hash: str, next_probe: dt.datetime
+) -> None:
+    session.execute(
+        update(ContentWaitDb)
+        .where(ContentWaitDb.hash == content_hash)
+        .values(probes=ContentWaitDb.probes + 1, next_probe=next_probe)
+    )
+
+
+def release_waiting_messages(
+    session: DbSession,
+    content_hashes: Collection[str],
+    current_time: dt.datetime,
+    min_retries: Optional[int] = None,
+) -> int:
+    """
+    Removes contents from the wait list and schedules the messages that wait
+    for them immediately.
+
+    :param min_retries: Minimum retry count of the released messages. Used to
+                        reject the messages at their next failure when giving up
+                        on a content.
+    :return: The number of released messages.
+    """
+
+    values: Dict[str, Any] = {"waiting_for": None, "next_attempt": current_time}
+    if min_retries is not None:
+        values["retries"] = func.greatest(PendingMessageDb.retries, min_retries)
+
+    result = cast(
+        CursorResult,
+        session.execute(
+            update(PendingMessageDb)
+            .where(PendingMessageDb.waiting_for.in_(content_hashes))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ),
+    )
+    session.execute(delete(ContentWaitDb).where(ContentWaitDb.hash.in_(content_hashes)))
+    return result.rowcount
+
+
+def delete_unused_content_waits(session: DbSession) -> Sequence[str]:
+    """
+    Deletes the contents that no pending message waits for anymore, ex: if the
+    messages were processed through another path.
+
+    :return: The hashes of the deleted contents.
+    """
+
+    delete_stmt = (
+        delete(ContentWaitDb)
+        .where(~exists().where(PendingMessageDb.waiting_for == ContentWaitDb.hash))
+        .returning(ContentWaitDb.hash)
+    )
+    return session.execute(delete_stmt).scalars().all()
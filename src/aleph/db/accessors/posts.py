@@ -13,7 +13,7 @@ from typing import (
 )
 
 from aleph_message.models import Chain, ItemHash, ItemType
-from sqlalchemy import TIMESTAMP, Float, String, case
+from sqlalchemy import TIMESTAMP, Float, String, Text, case
 from sqlalchemy import cast as sqla_cast
 from sqlalchemy import (
     delete,
@@ -25,7 +25,7 @@ from sqlalchemy import (
     select,
     update,
 )
-from sqlalchemy.dialects.postgresql import ARRAY, array
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql import Select
 
@@ -33,7 +33,7 @@ from aleph.db.models import ChainTxDb, MessageDb, message_confirmations
 from aleph.db.models.posts import PostDb
 from aleph.toolkit.timestamp import coerce_to_datetime
 from aleph.types.channel import Channel
-from aleph.types.db_session import DbSession
+from aleph.types.db_session import AsyncDbSession, DbSession
 from aleph.types.sort_order import SortBy, SortOrder
 
 
@@ -217,7 +217,7 @@ def filter_post_select_stmt(
         select_stmt = select_stmt.where(literal_column("original_type").in_(post_types))
     if tags:
         select_stmt = select_stmt.where(
-            literal_column("tags", type_=ARRAY(String)).overlap(array(tags))
+            literal_column("tags", type_=ARRAY(Text)).overlap(list(tags))
         )
     if channels:
         select_stmt = select_stmt.where(literal_column("channel").in_(channels))
@@ -275,7 +275,8 @@ def filter_post_select_stmt(
                 )
         select_stmt = select_stmt.order_by(*order_by_columns)
 
-    # Cursor filtering
+    # Keyset filtering. In cursor mode the page is ignored, otherwise pages
+    # are counted from the keyset.
     if after_time is not None and sort_by == SortBy.TIME:
         if sort_order == SortOrder.DESCENDING:
             select_stmt = select_stmt.where(
@@ -293,13 +294,11 @@ def filter_post_select_stmt(
                     & (select_merged_post_subquery.c.original_item_hash > after_hash)
                 )
             )
-    elif page > 1:
+    if page > 1 and not cursor_mode:
         select_stmt = select_stmt.offset((page - 1) * pagination)
 
     if pagination:
-        select_stmt = select_stmt.limit(
-            pagination + 1 if after_time is not None or cursor_mode else pagination
-        )
+        select_stmt = select_stmt.limit(pagination + 1 if cursor_mode else pagination)
 
     return select_stmt
 
@@ -456,6 +455,16 @@ def get_matching_posts(
     return cast(List[MergedPost], session.execute(filtered_select_stmt).all())
 
 
+async def get_matching_posts_async(
+    session: AsyncDbSession,
+    # Same as make_matching_posts_query
+    **kwargs,
+) -> List[MergedPost]:
+    select_stmt = make_select_merged_post_stmt()
+    filtered_select_stmt = filter_post_select_stmt(select_stmt, **kwargs)
+    return cast(List[MergedPost], (await session.execute(filtered_select_stmt)).all())
+
+
 def delete_amends(session: DbSession, item_hash: str) -> Iterable[str]:
     return session.execute(
         delete(PostDb).where(PostDb.amends == item_hash).returning(PostDb.item_hash)
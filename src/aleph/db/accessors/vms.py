@@ -1,7 +1,7 @@
 import datetime as dt
-from typing import Iterable, Optional
+from typing import Collection, Dict, Iterable, Optional
 
-from sqlalchemy import delete, func, or_, select
+from sqlalchemy import delete, func, or_, select, union_all
 from sqlalchemy.dialects.postgresql import insert
 
 from aleph.db.models.vms import (
@@ -120,6 +120,44 @@ def get_vms_dependent_volumes(
     return session.execute(statement).scalars().first()
 
 
+def get_vms_depending_on_volumes(
+    session: DbSession, volume_hashes: Collection[str]
+) -> Dict[str, str]:
+    """
+    Bulk version of `get_vms_dependent_volumes`.
+
+    :return: For each volume used by at least one VM, the hash of one of them.
+    """
+
+    if not volume_hashes:
+        return {}
+
+    ref_columns = [
+        (ImmutableVolumeDb.ref, ImmutableVolumeDb.vm_hash),
+        (CodeVolumeDb.ref, CodeVolumeDb.program_hash),
+        (DataVolumeDb.ref, DataVolumeDb.program_hash),
+        (RuntimeDb.ref, RuntimeDb.program_hash),
+        (RootfsVolumeDb.parent_ref, RootfsVolumeDb.instance_hash),
+        (VProgramDb.runtime_ref, VProgramDb.item_hash),
+        (VProgramDb.workload_ref, VProgramDb.item_hash),
+        (VProgramDb.workload_hash_tree, VProgramDb.item_hash),
+        (VProgramVerifiedVolumeDb.ref, VProgramVerifiedVolumeDb.vm_hash),
+        (VProgramVerifiedVolumeDb.hash_tree, VProgramVerifiedVolumeDb.vm_hash),
+    ]
+    statement = union_all(
+        *(
+            select(
+                ref_column.label("volume_hash"), vm_hash_column.label("vm_hash")
+            ).where(ref_column.in_(volume_hashes))
+            for ref_column, vm_hash_column in ref_columns
+        )
+    )
+    return {
+        volume_hash: vm_hash
+        for volume_hash, vm_hash in session.execute(statement).all()
+    }
+
+
 def upsert_vm_version(
     session: DbSession,
     vm_hash: str,
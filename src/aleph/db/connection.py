@@ -1,17 +1,21 @@
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from configmanager import Config
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from aleph.config import get_config
-from aleph.types.db_session import DbSessionFactory
+from aleph.types.db_session import AsyncDbSessionFactory, DbSessionFactory
 
 
 def make_db_url(
-    driver: str, config: Config, application_name: Optional[str] = None
+    driver: str,
+    config: Config,
+    application_name: Optional[str] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
 ) -> str:
     """
     Returns the database connection string from configuration values.
@@ -19,11 +23,13 @@ def make_db_url(
     :param driver: Driver name. Ex: psycopg2, asyncpg.
     :param config: Configuration. If not specified, the global configuration object is used.
     :param application_name: Application name.
+    :param host: Database host, ex: a read replica. Defaults to the configured host.
+    :param port: Database port. Defaults to the configured port.
     :returns: The database connection string.
     """
 
-    host = config.postgres.host.value
-    port = config.postgres.port.value
+    host = host or config.postgres.host.value
+    port = port or config.postgres.port.value
     user = config.postgres.user.value
     password = config.postgres.password.value
     database = config.postgres.database.value
@@ -50,13 +56,19 @@ def make_engine(
     config: Optional[Config] = None,
     echo: bool = False,
     application_name: Optional[str] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
 ) -> Engine:
     if config is None:
         config = get_config()
 
     return create_engine(
         make_db_url(
-            driver="psycopg2", config=config, application_name=application_name
+            driver="psycopg2",
+            config=config,
+            application_name=application_name,
+            host=host,
+            port=port,
         ),
         echo=echo,
         pool_size=config.postgres.pool_size.value,
@@ -69,13 +81,32 @@ def make_async_engine(
     config: Optional[Config] = None,
     echo: bool = False,
     application_name: Optional[str] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
 ) -> AsyncEngine:
+    if config is None:
+        config = get_config()
+
+    # asyncpg does not accept application_name as a connection parameter,
+    # it must be passed as a server setting instead.
+    connect_args: Dict[str, Any] = {}
+    if application_name:
+        connect_args["server_settings"] = {"application_name": application_name}
+
     return create_async_engine(
-        make_db_url(driver="asyncpg", config=config, application_name=application_name),
+        make_db_url(driver="asyncpg", config=config, host=host, port=port),
         future=True,
         echo=echo,
+        connect_args=connect_args,
+        pool_size=config.postgres.pool_size.value,
+        pool_pre_ping=config.postgres.pool_pre_ping.value,
+        pool_recycle=config.postgres.pool_recycle.value,
     )
 
 
 def make_session_factory(engine: Engine) -> DbSessionFactory:
     return sessionmaker(engine, expire_on_commit=False)
+
+
+def make_async_session_factory(engine: AsyncEngine) -> AsyncDbSessionFactory:
+    return async_sessionmaker(engine, expire_on_commit=False)
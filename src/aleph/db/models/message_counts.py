@@ -1,4 +1,6 @@
-from sqlalchemy import BigInteger, String
+import datetime as dt
+
+from sqlalchemy import BigInteger, Date, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -14,3 +16,22 @@ class MessageCountsDb(Base):
     row_count: Mapped[int] = mapped_column(
         "count", BigInteger, nullable=False, default=0
     )
+
+
+class MessageCountsByDayDb(Base):
+    """
+    Number of messages per UTC day and (type, status, chain, channel, content_type).
+    Maintained by a trigger on messages, NULL values are stored as "".
+    """
+
+    __tablename__ = "message_counts_by_day"
+
+    day: Mapped[dt.date] = mapped_column(Date, primary_key=True)
+    type: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    status: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    chain: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    channel: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    content_type: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    row_count: Mapped[int] = mapped_column(
+        "count", BigInteger, nullable=False, default=0
+    )
@@ -1,5 +1,15 @@
 import datetime as dt
-from typing import Any, ClassVar, Dict, FrozenSet, List, Mapping, Optional, Type
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Type,
+)
 
 from aleph_message.models import (
     AggregateContent,
@@ -7,6 +17,7 @@ from aleph_message.models import (
     Chain,
     ForgetContent,
     InstanceContent,
+    ItemHash,
     ItemType,
     MessageType,
     PostContent,
@@ -24,6 +35,7 @@ from sqlalchemy import (
     Integer,
     String,
     Table,
+    Text,
     UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
@@ -104,12 +116,7 @@ message_confirmations = Table(
 )
 
 
-def validate_message_content(
-    message_type: MessageType,
-    content_dict: Dict[str, Any],
-) -> BaseContent:
-    content_type = CONTENT_TYPE_MAP[message_type]
-    content = content_type.model_validate(content_dict)
+def check_content_time(content_dict: Mapping[str, Any]) -> None:
     # Validate that the content time can be converted to datetime. This will
     # raise a ValueError and be caught
     # TODO: move this validation in aleph-message
@@ -118,9 +125,112 @@ def validate_message_content(
     except ValueError as e:
         raise ValidationError(str(e)) from e
 
+
+def validate_message_content(
+    message_type: MessageType,
+    content_dict: Dict[str, Any],
+) -> BaseContent:
+    content_type = CONTENT_TYPE_MAP[message_type]
+    content = content_type.model_validate(content_dict)
+    check_content_time(content_dict)
     return content
 
 
+def _required_fields(content_type: Type[BaseContent]) -> FrozenSet[str]:
+    return frozenset(
+        name for name, field in content_type.model_fields.items() if field.is_required()
+    )
+
+
+_REQUIRED_CONTENT_FIELDS: Dict[MessageType, FrozenSet[str]] = {
+    message_type: _required_fields(content_type)
+    for message_type, content_type in CONTENT_TYPE_MAP.items()
+}
+
+
+def _construct_aggregate_content(content_dict: Dict[str, Any]) -> Optional[BaseContent]:
+    # Legacy keys are AggregateContentKey objects
+    if not isinstance(content_dict["key"], str):
+        return None
+    return AggregateContent.model_construct(
+        **{**content_dict, "time": float(content_dict["time"])}
+    )
+
+
+def _construct_forget_content(content_dict: Dict[str, Any]) -> Optional[BaseContent]:
+    return ForgetContent.model_construct(
+        **{
+            **content_dict,
+            "time": float(content_dict["time"]),
+            "hashes": [ItemHash(h) for h in content_dict["hashes"]],
+            "aggregates": [ItemHash(h) for h in content_dict.get("aggregates", [])],
+        }
+    )
+
+
+def _construct_post_content(content_dict: Dict[str, Any]) -> Optional[BaseContent]:
+    # Chain refs are ChainRef objects
+    ref = content_dict.get("ref")
+    if ref is not None and not isinstance(ref, str):
+        return None
+    return PostContent.model_construct(
+        **{**content_dict, "time": float(content_dict["time"])}
+    )
+
+
+def _construct_store_content(content_dict: Dict[str, Any]) -> Optional[BaseContent]:
+    if content_dict.get("payment") is not None:
+        return None
+    return StoreContent.model_construct(
+        **{
+            **content_dict,
+            "time": float(content_dict["time"]),
+            "item_type": ItemType(content_dict["item_type"]),
+            "item_hash": ItemHash(content_dict["item_hash"]),
+        }
+    )
+
+
+_CONTENT_CONSTRUCTORS: Dict[
+    MessageType, Callable[[Dict[str, Any]], Optional[BaseContent]]
+] = {
+    MessageType.aggregate: _construct_aggregate_content,
+    MessageType.forget: _construct_forget_content,
+    MessageType.post: _construct_post_content,
+    MessageType.store: _construct_store_content,
+}
+
+
+def construct_message_content(
+    message_type: MessageType,
+    content_dict: Dict[str, Any],
+) -> BaseContent:
+    """
+    Builds the content model of a message that was validated before its insertion
+    in the DB, without validating it again.
+
+    Contents made of plain fields are built with `model_construct`. The others
+    (VMs, STORE payments, POST chain refs, legacy aggregate keys) hold nested
+    models and are validated.
+
+    VM contents are validated on purpose: they are small and made of nested
+    models, which pydantic-core validates faster than Python code can construct
+    them (about 50us to validate an INSTANCE content with volumes against 120us
+    to construct it recursively). `model_construct` pays off on contents with
+    large free-form payloads, like aggregates and posts.
+    """
+    constructor = _CONTENT_CONSTRUCTORS.get(message_type)
+    if (
+        constructor is not None
+        and content_dict.keys() >= _REQUIRED_CONTENT_FIELDS[message_type]
+    ):
+        content = constructor(content_dict)
+        if content is not None:
+            return content
+
+    return validate_message_content(message_type, content_dict)
+
+
 class MessageStatusDb(Base):
     __tablename__ = "message_status"
 
@@ -201,7 +311,7 @@ class MessageDb(Base):
     )
     payment_type: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     content_item_hash: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    tags: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String), nullable=True)
+    tags: Mapped[Optional[List[str]]] = mapped_column(ARRAY(Text), nullable=True)
 
     confirmations: Mapped[List[ChainTxDb]] = relationship(
         "ChainTxDb", secondary=message_confirmations
@@ -244,8 +354,10 @@ class MessageDb(Base):
 
     @property
     def parsed_content(self):
+        # Messages are validated once, in from_pending_message. The content of
+        # the rows loaded from the DB is trusted.
         if getattr(self, "_parsed_content", None) is None:
-            self._parsed_content = validate_message_content(self.type, self.content)
+            self._parsed_content = construct_message_content(self.type, self.content)
         return self._parsed_content
 
     @staticmethod
@@ -265,11 +377,23 @@ class MessageDb(Base):
         content_dict: Dict[str, Any],
         content_size: int,
         reception_time: Optional[dt.datetime] = None,
+        parsed_content: Optional[BaseContent] = None,
     ) -> "MessageDb":
+        """
+        Validates the content of a pending message and builds the message to insert.
+
+        :param parsed_content: Content model of `content_dict`, if it was already
+                               validated (ex: by `parse_message`).
+        """
         if reception_time is None:
             reception_time = pending_message.reception_time
         content_dict = cls._coerce_content(pending_message, content_dict)
-        parsed_content = validate_message_content(pending_message.type, content_dict)
+        if parsed_content is None:
+            parsed_content = validate_message_content(
+                pending_message.type, content_dict
+            )
+        else:
+            check_content_time(content_dict)
 
         # Derive payment_type from parsed content for types that support it
         payment_type = None
@@ -1,5 +1,5 @@
 import datetime as dt
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Dict, List, Mapping, Optional
 
 from aleph_message.models import Chain, ItemType, MessageType
 from sqlalchemy import (
@@ -20,7 +20,7 @@ from sqlalchemy_utils.types.choice import ChoiceType
 from aleph.schemas.pending_messages import BasePendingMessage
 from aleph.toolkit.timestamp import timestamp_to_datetime, utc_now
 from aleph.types.channel import Channel
-from aleph.types.message_status import MessageOrigin
+from aleph.types.message_status import ErrorCode, MessageOrigin
 
 from .base import Base
 from .chains import ChainTxDb
@@ -74,9 +74,22 @@ class PendingMessageDb(Base):
         ForeignKey("chain_txs.hash"), nullable=True
     )
     fetched: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    # Time at which the content was fetched, if it was not available on reception.
+    fetched_at: Mapped[Optional[dt.datetime]] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
     origin: Mapped[Optional[str]] = mapped_column(
         String, nullable=True, default=MessageOrigin.P2P
     )
+    # Hash of the content (message content or file) that the message waits for,
+    # see ContentWaitDb. Waiting messages are not retried until it is available.
+    waiting_for: Mapped[Optional[str]] = mapped_column(
+        String, nullable=True, index=True
+    )
+    # Time, error code and description of the failed attempts.
+    error_history: Mapped[Optional[List[Dict[str, Any]]]] = mapped_column(
+        JSONB, nullable=True
+    )
 
     __table_args__ = (
         CheckConstraint(
@@ -157,5 +170,58 @@ class PendingMessageDb(Base):
         )
 
 
+class ContentWaitDb(Base):
+    """
+    A content that pending messages wait for, because it could not be found
+    locally or on the network.
+
+    The content wait resolver probes each content with its own backoff instead
+    of retrying all the messages that wait for it.
+    """
+
+    __tablename__ = "content_waits"
+
+    hash: Mapped[str] = mapped_column(String, primary_key=True)
+    item_type: Mapped[ItemType] = mapped_column(ChoiceType(ItemType), nullable=False)
+    creation_datetime: Mapped[dt.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False
+    )
+    next_probe: Mapped[dt.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, index=True
+    )
+    probes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class DeadLetterMessageDb(Base):
+    """
+    A pending message that exhausted its attempts. The message is rejected, but
+    can be put back in the pending messages once the cause of the failures is
+    fixed, see `requeue_dead_letter_messages`.
+    """
+
+    __tablename__ = "dead_letter_messages"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    item_hash: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    # The message, in the format of the rejected messages.
+    message: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    reception_time: Mapped[dt.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False
+    )
+    check_message: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    tx_hash: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("chain_txs.hash"), nullable=True
+    )
+    origin: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    error_code: Mapped[ErrorCode] = mapped_column(
+        ChoiceType(ErrorCode, impl=Integer()), nullable=False
+    )
+    details: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    error_history: Mapped[List[Dict[str, Any]]] = mapped_column(JSONB, nullable=False)
+    creation_datetime: Mapped[dt.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False
+    )
+
+
 # Used when processing pending messages
 Index("ix_next_attempt", PendingMessageDb.next_attempt.asc())
@@ -1,7 +1,7 @@
 import datetime as dt
 from typing import Any, List, Optional
 
-from sqlalchemy import TIMESTAMP, ForeignKey, String
+from sqlalchemy import TIMESTAMP, ForeignKey, String, Text
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -27,7 +27,7 @@ class PostDb(Base):
     )
 
     latest_amend: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    tags: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String), nullable=True)
+    tags: Mapped[Optional[List[str]]] = mapped_column(ARRAY(Text), nullable=True)
 
     def __init__(self, **kwargs: Any) -> None:
         if "tags" not in kwargs:
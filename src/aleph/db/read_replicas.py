@@ -0,0 +1,206 @@
+import asyncio
+import itertools
+import logging
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import AsyncContextManager, ContextManager, List, Optional, Tuple
+
+from configmanager import Config
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from aleph.db.connection import (
+    make_async_engine,
+    make_async_session_factory,
+    make_engine,
+    make_session_factory,
+)
+from aleph.types.db_session import (
+    AsyncDbSession,
+    AsyncDbSessionFactory,
+    DbSession,
+    DbSessionFactory,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+# Replication lag of a standby, in seconds. The lag is 0 if all the WAL received
+# by the standby is replayed, so that an idle primary does not look stale.
+# This only holds while the standby streams from the primary: a standby without
+# a streaming WAL receiver can be arbitrarily stale, its lag is NULL. A silent
+# primary is detected by the receiver itself, which stops streaming after
+# `wal_receiver_timeout`.
+REPLICATION_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+@dataclass
+class ReadReplica:
+    name: str
+    engine: Engine
+    async_engine: AsyncEngine
+    session_factory: DbSessionFactory
+    async_session_factory: AsyncDbSessionFactory
+    # Last measured replication lag, in seconds. None if unknown or unreachable.
+    lag: Optional[float] = None
+
+
+def _parse_host(host: str) -> Tuple[str, Optional[int]]:
+    hostname, _, port = host.partition(":")
+    return hostname, int(port) if port else None
+
+
+class ReadReplicas:
+    """
+    Routes read-only sessions to the read replicas of the database.
+
+    Sessions are distributed round-robin over the replicas whose replication lag
+    is at most `max_staleness` seconds. The lags are measured every
+    `check_interval` seconds once `open()` is called, and replicas that do not
+    answer within `check_timeout` seconds are left out. When no replica
+    qualifies, sessions are opened on the primary.
+
+    Only use these sessions for queries that tolerate stale data: paths that must
+    read their own writes (ex: a message right after its submission) must use the
+    primary session factories.
+    """
+
+    def __init__(
+        self,
+        session_factory: DbSessionFactory,
+        async_session_factory: AsyncDbSessionFactory,
+        replicas: List[ReadReplica],
+        max_staleness: float,
+        check_interval: float,
+        check_timeout: float,
+    ):
+        """
+        :param session_factory: Session factory of the primary.
+        :param async_session_factory: Async session factory of the primary.
+        """
+        self.primary_session_factory = session_factory
+        self.primary_async_session_factory = async_session_factory
+        self.replicas = replicas
+        self.max_staleness = max_staleness
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+
+        self._round_robin = itertools.count()
+        self._check_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Config,
+        session_factory: DbSessionFactory,
+        async_session_factory: AsyncDbSessionFactory,
+        application_name: Optional[str] = None,
+    ) -> "ReadReplicas":
+        replicas = []
+        for host in config.postgres.read_replicas.hosts.value:
+            hostname, port = _parse_host(host)
+            engine = make_engine(
+                config, application_name=application_name, host=hostname, port=port
+            )
+            async_engine = make_async_engine(
+                config, application_name=application_name, host=hostname, port=port
+            )
+            replicas.append(
+                ReadReplica(
+                    name=host,
+                    engine=engine,
+                    async_engine=async_engine,
+                    session_factory=make_session_factory(engine),
+                    async_session_factory=make_async_session_factory(async_engine),
+                )
+            )
+
+        return cls(
+            session_factory=session_factory,
+            async_session_factory=async_session_factory,
+            replicas=replicas,
+            max_staleness=config.postgres.read_replicas.max_staleness.value,
+            check_interval=config.postgres.read_replicas.check_interval.value,
+            check_timeout=config.postgres.read_replicas.check_timeout.value,
+        )
+
+    async def open(self) -> None:
+        if self.replicas:
+            self._check_task = asyncio.create_task(self._check_lags_loop())
+
+    async def close(self) -> None:
+        if self._check_task is not None:
+            self._check_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._check_task
+            self._check_task = None
+
+        for replica in self.replicas:
+            replica.lag = None
+            await replica.async_engine.dispose()
+            replica.engine.dispose()
+
+    @staticmethod
+    async def _measure_lag(replica: ReadReplica) -> Optional[float]:
+        async with replica.async_engine.connect() as connection:
+            lag = (await connection.execute(REPLICATION_LAG_QUERY)).scalar()
+        # NULL if the server is not a streaming standby, or has not replayed
+        # anything yet.
+        return float(lag) if lag is not None else None
+
+    async def _check_lag(self, replica: ReadReplica) -> None:
+        try:
+            replica.lag = await asyncio.wait_for(
+                self._measure_lag(replica), timeout=self.check_timeout
+            )
+        except asyncio.TimeoutError:
+            LOGGER.warning(
+                "Could not measure the lag of replica %s within %.1fs",
+                replica.name,
+                self.check_timeout,
+            )
+            replica.lag = None
+        except Exception:
+            LOGGER.exception("Could not measure the lag of replica %s", replica.name)
+            replica.lag = None
+
+    async def check_lags(self) -> None:
+        await asyncio.gather(*(self._check_lag(replica) for replica in self.replicas))
+
+    async def _check_lags_loop(self) -> None:
+        while True:
+            await self.check_lags()
+            await asyncio.sleep(self.check_interval)
+
+    def _pick_replica(self) -> Optional[ReadReplica]:
+        up_to_date_replicas = [
+            replica
+            for replica in self.replicas
+            if replica.lag is not None and replica.lag <= self.max_staleness
+        ]
+        if not up_to_date_replicas:
+            return None
+        return up_to_date_replicas[next(self._round_robin) % len(up_to_date_replicas)]
+
+    def session(self) -> ContextManager[DbSession]:
+        """Read-only session, on a replica if one is up to date. A DbSessionFactory."""
+        if (replica := self._pick_replica()) is None:
+            return self.primary_session_factory()
+        return replica.session_factory()
+
+    def async_session(self) -> AsyncContextManager[AsyncDbSession]:
+        """Async version of `session()`. An AsyncDbSessionFactory."""
+        if (replica := self._pick_replica()) is None:
+            return self.primary_async_session_factory()
+        return replica.async_session_factory()
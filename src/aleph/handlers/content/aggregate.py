@@ -8,6 +8,7 @@ from aleph.db.accessors.aggregates import (
     count_aggregate_elements,
     delete_aggregate,
     delete_aggregate_element,
+    delete_aggregate_elements,
     get_aggregate_by_key,
     get_aggregate_content_keys,
     insert_aggregate,
@@ -240,3 +241,26 @@ class AggregateMessageHandler(ContentHandler):
         refresh_aggregate(session=session, owner=owner, key=str(key))
 
         return set()
+
+    async def forget_messages(
+        self, session: DbSession, messages: Sequence[MessageDb]
+    ) -> Set[str]:
+        # Forgetting all the elements of an aggregate, ex: by aggregate key,
+        # refreshes it once instead of once per element.
+        aggregates = {
+            (content.address, str(content.key))
+            for content in map(_get_aggregate_content, messages)
+        }
+        for owner, key in aggregates:
+            delete_aggregate(session=session, owner=owner, key=key)
+
+        LOGGER.debug("Deleting %d aggregate elements...", len(messages))
+        delete_aggregate_elements(
+            session=session, item_hashes=[message.item_hash for message in messages]
+        )
+
+        for owner, key in aggregates:
+            LOGGER.debug("Refreshing aggregate %s/%s...", owner, key)
+            refresh_aggregate(session=session, owner=owner, key=key)
+
+        return set()
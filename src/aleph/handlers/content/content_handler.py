@@ -1,5 +1,5 @@
 import abc
-from typing import List, Set
+from typing import List, Sequence, Set
 
 from aleph.db.models import MessageDb
 from aleph.db.models.account_costs import AccountCostsDb
@@ -126,3 +126,27 @@ class ContentHandler(abc.ABC):
         :return: The set of additional item hashes to forget.
         """
         pass
+
+    async def forget_messages(
+        self, session: DbSession, messages: Sequence[MessageDb]
+    ) -> Set[str]:
+        """
+        Clean up message-type specific objects when forgetting several messages
+        of the type of this handler at once, see `forget_message`.
+
+        Messages already returned as additional messages to forget by a previous
+        one are skipped, their objects are already cleaned up. Handlers can
+        override this method to clean up the messages with set-based statements.
+
+        :param session: DB session.
+        :param messages: The messages to forget, in order.
+        :return: The set of additional item hashes to forget.
+        """
+        additional_hashes: Set[str] = set()
+        for message in messages:
+            if message.item_hash in additional_hashes:
+                continue
+            additional_hashes |= await self.forget_message(
+                session=session, message=message
+            )
+        return additional_hashes
@@ -1,23 +1,26 @@
 from __future__ import annotations
 
 import logging
-from typing import Dict, List, Sequence, Set, cast
+from typing import Dict, List, Sequence, Set, Tuple, cast
 
 from aleph_message.models import ForgetContent, ItemHash, MessageType
-from sqlalchemy import select
 
-from aleph.db.accessors.aggregates import aggregate_exists
+from aleph.db.accessors.aggregates import (
+    get_aggregate_element_hashes,
+    get_aggregates_by_owners,
+    get_existing_aggregate_keys,
+)
 from aleph.db.accessors.messages import (
-    append_to_forgotten_by,
-    forget_message,
-    get_message_by_item_hash,
-    get_message_status,
-    message_exists,
+    append_to_forgotten_by_many,
+    forget_messages,
+    get_existing_message_hashes,
+    get_message_statuses,
+    get_messages_by_item_hashes,
 )
-from aleph.db.accessors.vms import get_vms_dependent_volumes
-from aleph.db.models import AggregateElementDb, MessageDb
+from aleph.db.accessors.vms import get_vms_depending_on_volumes
+from aleph.db.models import MessageDb, MessageStatusDb
 from aleph.handlers.content.content_handler import ContentHandler
-from aleph.permissions import is_sender_authorized_for_owner
+from aleph.permissions import is_sender_authorized_by_security_aggregate
 from aleph.types.db_session import DbSession
 from aleph.types.message_status import (
     CannotForgetForgetMessage,
@@ -31,6 +34,9 @@ from aleph.types.message_status import (
 
 logger = logging.getLogger(__name__)
 
+# Only messages that are processed or marked for removing can be forgotten.
+FORGETTABLE_STATUSES = (MessageStatus.PROCESSED, MessageStatus.REMOVING)
+
 
 class ForgetMessageHandler(ContentHandler):
     def __init__(
@@ -57,25 +63,32 @@ class ForgetMessageHandler(ContentHandler):
             # The user did not specify anything to forget.
             raise NoForgetTarget()
 
-        for item_hash in content.hashes:
-            if not message_exists(session=session, item_hash=item_hash):
-                raise ForgetTargetNotFound(item_hash)
-
+        if content.hashes:
+            existing_hashes = get_existing_message_hashes(
+                session=session, item_hashes=content.hashes
+            )
             # Check file references, on VM volumes, as data volume and as code volume
             # to block the deletion if we found ones
-            dependent_volumes = get_vms_dependent_volumes(
-                session=session, volume_hash=item_hash
+            dependent_vms = get_vms_depending_on_volumes(
+                session=session, volume_hashes=existing_hashes
             )
-            if dependent_volumes is not None:
-                raise ForgetNotAllowed(
-                    file_hash=item_hash, vm_hash=dependent_volumes.item_hash
-                )
 
-        for aggregate_key in content.aggregates:
-            if not aggregate_exists(
-                session=session, key=aggregate_key, owner=content.address
-            ):
-                raise ForgetTargetNotFound(aggregate_key=aggregate_key)
+            for item_hash in content.hashes:
+                if item_hash not in existing_hashes:
+                    raise ForgetTargetNotFound(item_hash)
+
+                if item_hash in dependent_vms:
+                    raise ForgetNotAllowed(
+                        file_hash=item_hash, vm_hash=dependent_vms[item_hash]
+                    )
+
+        if content.aggregates:
+            existing_aggregate_keys = get_existing_aggregate_keys(
+                session=session, owner=content.address, keys=content.aggregates
+            )
+            for aggregate_key in content.aggregates:
+                if aggregate_key not in existing_aggregate_keys:
+                    raise ForgetTargetNotFound(aggregate_key=aggregate_key)
 
     @staticmethod
     async def _list_target_messages(
@@ -84,19 +97,44 @@ class ForgetMessageHandler(ContentHandler):
         content = cast(ForgetContent, forget_message.parsed_content)
 
         aggregate_messages_to_forget: List[ItemHash] = []
-        for aggregate in content.aggregates:
-            # TODO: write accessor
-            aggregate_messages_to_forget.extend(
-                ItemHash(value)
-                for value in session.execute(
-                    select(AggregateElementDb.item_hash).where(
-                        (AggregateElementDb.key == aggregate)
-                        & (AggregateElementDb.owner == content.address)
-                    )
-                ).scalars()
-            )
+        if content.aggregates:
+            aggregate_messages_to_forget = [
+                ItemHash(item_hash)
+                for item_hash in get_aggregate_element_hashes(
+                    session=session, owner=content.address, keys=content.aggregates
+                )
+            ]
 
-        return content.hashes + aggregate_messages_to_forget
+        # A target listed twice is only forgotten once.
+        return list(dict.fromkeys(content.hashes + aggregate_messages_to_forget))
+
+    @staticmethod
+    def _get_targets(
+        session: DbSession, target_hashes: Sequence[str]
+    ) -> Tuple[Dict[str, MessageStatusDb], Dict[str, MessageDb]]:
+        """
+        Loads the statuses of the targets of a FORGET and the targets that can be
+        forgotten, with one query each whatever the number of targets.
+        """
+
+        target_statuses = {
+            target_status.item_hash: target_status
+            for target_status in get_message_statuses(
+                session=session, item_hashes=target_hashes
+            )
+        }
+        forgettable_hashes = [
+            target_hash
+            for target_hash, target_status in target_statuses.items()
+            if target_status.status in FORGETTABLE_STATUSES
+        ]
+        target_messages = {
+            target_message.item_hash: target_message
+            for target_message in get_messages_by_item_hashes(
+                session=session, item_hashes=forgettable_hashes
+            )
+        }
+        return target_statuses, target_messages
 
     async def check_permissions(self, session: DbSession, message: MessageDb):
         # FORGET is authorized per-target: a sender can forget a target if
@@ -107,8 +145,30 @@ class ForgetMessageHandler(ContentHandler):
         target_hashes = await self._list_target_messages(
             session=session, forget_message=message
         )
+        target_statuses, target_messages = self._get_targets(
+            session=session, target_hashes=target_hashes
+        )
+
+        # Load the security aggregates of all the owners at once. The sender
+        # is always authorized for their own messages.
+        other_owners = {
+            target_message.parsed_content.address
+            for target_message in target_messages.values()
+            if target_message.parsed_content.address.lower() != message.sender.lower()
+        }
+        security_aggregates = {
+            aggregate.owner: aggregate
+            for aggregate in (
+                get_aggregates_by_owners(
+                    session=session, key="security", owners=other_owners
+                )
+                if other_owners
+                else []
+            )
+        }
+
         for target_hash in target_hashes:
-            target_status = get_message_status(session=session, item_hash=target_hash)
+            target_status = target_statuses.get(target_hash)
             if not target_status:
                 raise ForgetTargetNotFound(target_hash=target_hash)
 
@@ -120,15 +180,10 @@ class ForgetMessageHandler(ContentHandler):
                 continue
 
             # Note: Only allow to forget messages that are processed or marked for removing
-            if (
-                target_status.status != MessageStatus.PROCESSED
-                and target_status.status != MessageStatus.REMOVING
-            ):
+            if target_status.status not in FORGETTABLE_STATUSES:
                 raise ForgetTargetNotFound(target_hash=target_hash)
 
-            target_message = get_message_by_item_hash(
-                session=session, item_hash=target_hash
-            )
+            target_message = target_messages.get(target_hash)
             if not target_message:
                 raise InternalError(
                     f"Target message {target_hash} is marked as processed but does not exist."
@@ -144,11 +199,12 @@ class ForgetMessageHandler(ContentHandler):
             # Authorize the sender against the target as if they were
             # creating it: same owner aggregate, same type/channel/chain
             # filters, evaluated against the target's attributes.
-            if not is_sender_authorized_for_owner(
-                session=session,
-                sender=message.sender,
-                owner_address=target_owner,
-                message=target_message,
+            if target_owner in other_owners and not (
+                is_sender_authorized_by_security_aggregate(
+                    sender=message.sender,
+                    security_aggregate=security_aggregates.get(target_owner),
+                    message=target_message,
+                )
             ):
                 raise PermissionDenied(
                     f"Sender {message.sender} is not authorized to forget message "
@@ -157,87 +213,45 @@ class ForgetMessageHandler(ContentHandler):
                 )
 
     async def _forget_by_message_type(
-        self, session: DbSession, message: MessageDb
+        self, session: DbSession, messages: Sequence[MessageDb]
     ) -> Set[str]:
         """
         When processing a FORGET message, performs additional cleanup depending
-        on the type of message that is being forgotten.
+        on the type of the messages that are being forgotten.
         """
-        content_handler = self.content_handlers[message.type]
-        return await content_handler.forget_message(session=session, message=message)
 
-    async def _forget_message(
-        self, session: DbSession, message: MessageDb, forgotten_by: MessageDb
+        messages_by_type: Dict[MessageType, List[MessageDb]] = {}
+        for message in messages:
+            messages_by_type.setdefault(message.type, []).append(message)
+
+        additional_messages_to_forget: Set[str] = set()
+        for message_type, messages_of_type in messages_by_type.items():
+            content_handler = self.content_handlers[message_type]
+            additional_messages_to_forget |= await content_handler.forget_messages(
+                session=session, messages=messages_of_type
+            )
+        return additional_messages_to_forget
+
+    async def _forget_messages(
+        self, session: DbSession, messages: Sequence[MessageDb], forgotten_by: MessageDb
     ):
-        forget_message(
+        item_hashes = {message.item_hash for message in messages}
+        forget_messages(
             session=session,
-            item_hash=message.item_hash,
+            item_hashes=item_hashes,
             forget_message_hash=forgotten_by.item_hash,
             forgotten_at=forgotten_by.time,
         )
 
         additional_messages_to_forget = await self._forget_by_message_type(
-            session=session, message=message
+            session=session, messages=messages
         )
 
-        for item_hash in additional_messages_to_forget:
-            forget_message(
-                session=session,
-                item_hash=item_hash,
-                forget_message_hash=forgotten_by.item_hash,
-                forgotten_at=forgotten_by.time,
-            )
-
-    async def _forget_item_hash(
-        self, session: DbSession, item_hash: str, forgotten_by: MessageDb
-    ):
-        message_status = get_message_status(
-            session=session, item_hash=ItemHash(item_hash)
-        )
-        if not message_status:
-            raise ForgetTargetNotFound(target_hash=item_hash)
-
-        if message_status.status == MessageStatus.REJECTED:
-            logger.info("Message %s was rejected, nothing to do.", item_hash)
-        if message_status.status == MessageStatus.REMOVED:
-            logger.info("Message %s was removed, nothing to do.", item_hash)
-        if message_status.status == MessageStatus.FORGOTTEN:
-            logger.info("Message %s is already forgotten, nothing to do.", item_hash)
-            append_to_forgotten_by(
-                session=session,
-                forgotten_message_hash=item_hash,
-                forget_message_hash=forgotten_by.item_hash,
-            )
-            return
-
-        # Note: Only allow to forget messages that are processed or marked for removing
-        if (
-            message_status.status != MessageStatus.PROCESSED
-            and message_status.status != MessageStatus.REMOVING
-        ):
-            logger.error(
-                "FORGET message %s targets message %s which is not processed yet. This should not happen.",
-                forgotten_by.item_hash,
-                item_hash,
-            )
-            raise ForgetTargetNotFound(item_hash)
-
-        message = get_message_by_item_hash(
-            session=session, item_hash=ItemHash(item_hash)
-        )
-        if not message:
-            raise ForgetTargetNotFound(item_hash)
-
-        if message.type == MessageType.forget:
-            # This should have been detected in check_permissions(). Raise an exception
-            # if it happens nonetheless as it indicates an unforeseen concurrent modification
-            # of the database.
-            raise CannotForgetForgetMessage(message.item_hash)
-
-        await self._forget_message(
+        forget_messages(
             session=session,
-            message=message,
-            forgotten_by=forgotten_by,
+            item_hashes=additional_messages_to_forget - item_hashes,
+            forget_message_hash=forgotten_by.item_hash,
+            forgotten_at=forgotten_by.time,
         )
 
     async def _process_forget_message(self, session: DbSession, message: MessageDb):
@@ -245,11 +259,58 @@ class ForgetMessageHandler(ContentHandler):
         hashes_to_forget = await self._list_target_messages(
             session=session, forget_message=message
         )
+        target_statuses, target_messages = self._get_targets(
+            session=session, target_hashes=hashes_to_forget
+        )
+
+        messages_to_forget: List[MessageDb] = []
+        already_forgotten_hashes: List[str] = []
 
         for item_hash in hashes_to_forget:
-            await self._forget_item_hash(
-                session=session, item_hash=item_hash, forgotten_by=message
-            )
+            message_status = target_statuses.get(item_hash)
+            if not message_status:
+                raise ForgetTargetNotFound(target_hash=item_hash)
+
+            if message_status.status == MessageStatus.REJECTED:
+                logger.info("Message %s was rejected, nothing to do.", item_hash)
+            if message_status.status == MessageStatus.REMOVED:
+                logger.info("Message %s was removed, nothing to do.", item_hash)
+            if message_status.status == MessageStatus.FORGOTTEN:
+                logger.info(
+                    "Message %s is already forgotten, nothing to do.", item_hash
+                )
+                already_forgotten_hashes.append(item_hash)
+                continue
+
+            # Note: Only allow to forget messages that are processed or marked for removing
+            if message_status.status not in FORGETTABLE_STATUSES:
+                logger.error(
+                    "FORGET message %s targets message %s which is not processed yet. This should not happen.",
+                    message.item_hash,
+                    item_hash,
+                )
+                raise ForgetTargetNotFound(item_hash)
+
+            target_message = target_messages.get(item_hash)
+            if not target_message:
+                raise ForgetTargetNotFound(item_hash)
+
+            if target_message.type == MessageType.forget:
+                # This should have been detected in check_permissions(). Raise an exception
+                # if it happens nonetheless as it indicates an unforeseen concurrent modification
+                # of the database.
+                raise CannotForgetForgetMessage(target_message.item_hash)
+
+            messages_to_forget.append(target_message)
+
+        append_to_forgotten_by_many(
+            session=session,
+            forgotten_message_hashes=already_forgotten_hashes,
+            forget_message_hash=message.item_hash,
+        )
+        await self._forget_messages(
+            session=session, messages=messages_to_forget, forgotten_by=message
+        )
 
     async def process(self, session: DbSession, messages: List[MessageDb]) -> None:
 
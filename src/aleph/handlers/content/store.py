@@ -251,6 +251,7 @@ class StoreMessageHandler(ContentHandler):
                     file_type=file_stats.file_type,
                     size=file_stats.size,
                 )
+                await self.storage_service.notify_content_available(file_hash)
                 return
 
         # Otherwise, fetch content directly from the Aleph network storage API
@@ -5,7 +5,7 @@ from typing import Any, Dict, List, Mapping, Optional
 import aio_pika.abc
 import psycopg2
 import sqlalchemy.exc
-from aleph_message.models import ItemHash, ItemType, MessageType
+from aleph_message.models import BaseContent, ItemHash, ItemType, MessageType
 from configmanager import Config
 from pydantic import ValidationError
 from sqlalchemy.dialects.postgresql import insert
@@ -25,7 +25,7 @@ from aleph.db.accessors.messages import (
 from aleph.db.accessors.pending_messages import delete_pending_message
 from aleph.db.models import MessageDb, MessageStatusDb, PendingMessageDb
 from aleph.db.models.account_costs import AccountCostsDb
-from aleph.db.models.messages import ForgottenMessageDb
+from aleph.db.models.messages import ForgottenMessageDb, construct_message_content
 from aleph.exceptions import ContentCurrentlyUnavailable, InvalidContent
 from aleph.handlers.content.aggregate import AggregateMessageHandler
 from aleph.handlers.content.content_handler import ContentHandler
@@ -96,8 +96,21 @@ class BaseMessageHandler:
         return self.content_handlers[message_type]
 
     async def fetch_pending_message(
-        self, pending_message: PendingMessageDb
+        self,
+        pending_message: PendingMessageDb,
+        parsed_content: Optional[BaseContent] = None,
     ) -> MessageDb:
+        """
+        Fetches and validates the content of a pending message.
+
+        The returned message carries its validated content (`parsed_content`)
+        to the content handlers and to `insert_message`. The content of a pending
+        message that was already fetched (`pending_message.content`) was validated
+        by the fetch job or on reception, it is not validated again.
+
+        :param parsed_content: Content model of the message, if the content was
+                               already validated. Skips the validation.
+        """
         item_hash = pending_message.item_hash
 
         try:
@@ -115,11 +128,16 @@ class BaseMessageHandler:
             )
 
         try:
+            if parsed_content is None and pending_message.content is not None:
+                parsed_content = construct_message_content(
+                    pending_message.type, pending_message.content
+                )
             validated_message = MessageDb.from_pending_message(
                 pending_message=pending_message,
                 content_dict=content.value,
                 content_size=len(content.raw_value),
                 reception_time=pending_message.reception_time,
+                parsed_content=parsed_content,
             )
         except ValidationError as e:
             raise InvalidMessageFormat(errors=e.errors()) from e
@@ -127,7 +145,10 @@ class BaseMessageHandler:
         return validated_message
 
     async def load_fetched_content(
-        self, session: DbSession, pending_message: PendingMessageDb
+        self,
+        session: DbSession,
+        pending_message: PendingMessageDb,
+        parsed_content: Optional[BaseContent] = None,
     ) -> PendingMessageDb:
         if pending_message.item_type != ItemType.inline:
             pending_message.fetched = False
@@ -135,7 +156,9 @@ class BaseMessageHandler:
 
         # We reuse fetch_pending_messages to load the inline content. The check
         # above ensures we will not load content from the network here.
-        message = await self.fetch_pending_message(pending_message=pending_message)
+        message = await self.fetch_pending_message(
+            pending_message=pending_message, parsed_content=parsed_content
+        )
         content_handler = self.get_content_handler(message.type)
         is_fetched = await content_handler.is_related_content_fetched(
             session=session, message=message
@@ -221,8 +244,9 @@ class MessagePublisher(BaseMessageHandler):
             )
 
             try:
+                # parse_message already validated the inline content
                 pending_message = await self.load_fetched_content(
-                    session, pending_message
+                    session, pending_message, parsed_content=message.content
                 )
             except InvalidMessageException as e:
                 LOGGER.warning("Invalid message: %s - %s", message.item_hash, str(e))
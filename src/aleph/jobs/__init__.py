@@ -1,63 +1,138 @@
 import asyncio
 import logging
+from contextlib import suppress
 from dataclasses import dataclass, field
 from multiprocessing import Process
-from typing import Coroutine, List
+from typing import Coroutine, List, Optional
 
+from configmanager import Config
+
+from aleph.jobs.autoscaler import JobsAutoscaler
 from aleph.jobs.fetch_pending_messages import fetch_pending_messages_subprocess
 from aleph.jobs.process_pending_messages import (
     fetch_and_process_messages_task,
+    make_message_shards,
     pending_messages_subprocess,
 )
 from aleph.jobs.process_pending_txs import handle_txs_task, pending_txs_subprocess
 from aleph.jobs.reconnect_ipfs import reconnect_ipfs_job
+from aleph.services.cache.node_cache import NodeCache
 from aleph.services.ipfs import IpfsService
 from aleph.types.db_session import DbSessionFactory
 
 LOGGER = logging.getLogger("jobs")
 
 
+async def stop_processes(
+    processes: List[Process], terminate_timeout: float = 10.0
+) -> None:
+    """Send SIGTERM to every process, then join with timeout.
+
+    Joins all processes before returning so they are fully reaped by the OS.
+    Falls back to SIGKILL for any process that does not exit within
+    `terminate_timeout` seconds. Processes are joined in parallel so total
+    wall time is bounded by `terminate_timeout + 1.0` regardless of their
+    count.
+    """
+    alive = [p for p in processes if p.is_alive()]
+    if not alive:
+        return
+
+    for p in alive:
+        LOGGER.info("Terminating subprocess %s (pid=%s)", p.name, p.pid)
+        p.terminate()
+
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *(loop.run_in_executor(None, p.join, terminate_timeout) for p in alive)
+    )
+
+    still_alive = [p for p in alive if p.is_alive()]
+    for p in still_alive:
+        LOGGER.warning(
+            "Subprocess %s (pid=%s) did not exit within %.1fs, killing",
+            p.name,
+            p.pid,
+            terminate_timeout,
+        )
+        p.kill()
+
+    if still_alive:
+        await asyncio.gather(
+            *(loop.run_in_executor(None, p.join, 1.0) for p in still_alive)
+        )
+
+
 @dataclass
 class JobsRunner:
     processes: List[Process] = field(default_factory=list)
     tasks: List[Coroutine] = field(default_factory=list)
+    # Subset of `processes` that process messages, one per shard.
+    message_processors: List[Process] = field(default_factory=list)
 
-    async def stop(self, terminate_timeout: float = 10.0) -> None:
-        """Send SIGTERM to every child process, then join with timeout.
+    # Serializes the restarts of the message processors and `stop()`, so that no
+    # processor is started once the runner is stopping.
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+    _stopping: bool = field(default=False, init=False)
+    _autoscaler_task: Optional[asyncio.Task] = field(default=None, init=False)
+
+    def start_message_processors(
+        self, config: Config, nb_shards: Optional[int] = None
+    ) -> None:
+        """
+        :param nb_shards: Number of shards. Defaults to the value of the config.
+        """
+        config_values = config.dump_values()
+        for shard in make_message_shards(config, nb_shards=nb_shards):
+            name = pending_messages_subprocess.__name__
+            if shard is not None:
+                name = f"{name}_{shard.name}"
+            p = Process(
+                target=pending_messages_subprocess,
+                args=(config_values, shard),
+                name=name,
+            )
+            p.start()
+            self.processes.append(p)
+            self.message_processors.append(p)
 
-        Joins all processes before returning so they are fully reaped by the OS.
-        Falls back to SIGKILL for any process that does not exit within
-        `terminate_timeout` seconds. Children are joined in parallel so total
-        wall time is bounded by `terminate_timeout + 1.0` regardless of child
-        count.
+    async def restart_message_processors(
+        self, config: Config, nb_shards: int, terminate_timeout: float = 10.0
+    ) -> None:
         """
-        alive = [p for p in self.processes if p.is_alive()]
-        if not alive:
-            return
+        Re-shards the message processors. The processors finish their current
+        message and exit before the new ones start, so that the messages of an
+        owner are never processed by two processors at the same time.
+        """
+        async with self._lock:
+            if self._stopping:
+                return
 
-        for p in alive:
-            LOGGER.info("Terminating subprocess %s (pid=%s)", p.name, p.pid)
-            p.terminate()
+            await stop_processes(self.message_processors, terminate_timeout)
+            self.processes = [
+                p for p in self.processes if p not in self.message_processors
+            ]
+            self.message_processors = []
+            self.start_message_processors(config, nb_shards=nb_shards)
 
-        loop = asyncio.get_running_loop()
-        await asyncio.gather(
-            *(loop.run_in_executor(None, p.join, terminate_timeout) for p in alive)
-        )
+    async def run_autoscaler(self, autoscaler: JobsAutoscaler) -> None:
+        """
+        Runs the autoscaler of the jobs until `stop()` is called.
+        """
+        self._autoscaler_task = asyncio.current_task()
+        await autoscaler.run()
 
-        still_alive = [p for p in alive if p.is_alive()]
-        for p in still_alive:
-            LOGGER.warning(
-                "Subprocess %s (pid=%s) did not exit within %.1fs, killing",
-                p.name,
-                p.pid,
-                terminate_timeout,
-            )
-            p.kill()
+    async def stop(self, terminate_timeout: float = 10.0) -> None:
+        """Stop every child process, see `stop_processes`."""
+        if self._autoscaler_task is not None:
+            self._autoscaler_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._autoscaler_task
+            self._autoscaler_task = None
 
-        if still_alive:
-            await asyncio.gather(
-                *(loop.run_in_executor(None, p.join, 1.0) for p in still_alive)
-            )
+        async with self._lock:
+            self._stopping = True
+            await stop_processes(self.processes, terminate_timeout)
 
 
 def start_jobs(
@@ -65,22 +140,39 @@ def start_jobs(
     session_factory: DbSessionFactory,
     ipfs_service: IpfsService,
     use_processes: bool = True,
+    node_cache: Optional[NodeCache] = None,
 ) -> JobsRunner:
+    """
+    :param node_cache: Node cache of the main process. Required to autoscale
+                       the jobs.
+    """
     LOGGER.info("starting jobs")
     runner = JobsRunner()
 
     if use_processes:
         config_values = config.dump_values()
-        for target in (
-            fetch_pending_messages_subprocess,
-            pending_messages_subprocess,
-            pending_txs_subprocess,
-        ):
+        for target in (fetch_pending_messages_subprocess, pending_txs_subprocess):
             p = Process(target=target, args=(config_values,), name=target.__name__)
             p.start()
             runner.processes.append(p)
+
+        runner.start_message_processors(config)
+
+        if config.aleph.jobs.autoscaling.enabled.value:
+            if node_cache is None:
+                raise ValueError("Autoscaling the jobs requires the node cache")
+            autoscaler = JobsAutoscaler(
+                config=config,
+                session_factory=session_factory,
+                node_cache=node_cache,
+                jobs_runner=runner,
+            )
+            runner.tasks.append(runner.run_autoscaler(autoscaler))
     else:
-        runner.tasks.append(fetch_and_process_messages_task(config=config))
+        for shard in make_message_shards(config):
+            runner.tasks.append(
+                fetch_and_process_messages_task(config=config, shard=shard)
+            )
         runner.tasks.append(handle_txs_task(config))
 
     if config.ipfs.enabled.value:
@@ -0,0 +1,284 @@
+"""
+Supervisor that adapts the message jobs to the backlog of the node.
+
+After an outage or a long chain sync, pending messages pile up faster than the
+static configuration of the jobs can handle them. Every `interval` seconds, the
+autoscaler samples the backlog of the fetch and process jobs and their
+throughput, then, within the bounds of the configuration:
+* resizes the number of concurrent fetches of the fetch job, through Redis,
+* re-shards the message processors, i.e. starts or stops processor processes.
+
+A job is scaled up while its backlog would take longer than `target_drain_time`
+to drain at its current throughput, and back down once its backlog is mostly
+drained.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from aleph_message.models import MessageType
+from configmanager import Config
+
+from aleph.db.accessors.pending_messages import count_ready_pending_messages
+from aleph.db.accessors.pending_txs import count_pending_txs
+from aleph.services.cache.node_cache import NodeCache
+from aleph.toolkit.metrics_keys import PipelineStage, pipeline_stage_keys
+from aleph.toolkit.timestamp import utc_now
+from aleph.types.db_session import DbSessionFactory
+
+from .fetch_pending_messages import FETCH_CONCURRENCY_KEY
+
+if TYPE_CHECKING:
+    from aleph.jobs import JobsRunner
+
+LOGGER = logging.getLogger(__name__)
+
+
+# Backlogs are only counted up to this value, to bound the cost of the queries.
+MAX_COUNTED_BACKLOG = 100_000
+# A job is scaled down once its backlog takes less than this fraction of the
+# target drain time to drain.
+SCALE_DOWN_RATIO = 0.25
+# Adding processors is pointless if the previous addition did not improve the
+# throughput by this factor, ex: if the DB is the bottleneck.
+MIN_SCALE_UP_GAIN = 1.2
+
+
+@dataclass(frozen=True)
+class WorkloadSample:
+    # Monotonic time of the sample, in seconds.
+    time: float
+    # Pending messages that the fetch/process jobs can pick up right now.
+    messages_to_fetch: int
+    messages_to_process: int
+    pending_txs: int
+    # Number of messages fetched/processed since the metrics were reset.
+    fetched_total: int
+    processed_total: int
+
+
+def compute_scale(
+    current: int,
+    minimum: int,
+    maximum: int,
+    backlog: int,
+    throughput: float,
+    target_drain_time: float,
+) -> int:
+    """
+    Returns the next scale of a job: doubled while its backlog takes longer than
+    `target_drain_time` to drain at its current throughput, halved once the
+    backlog is mostly drained, always within [minimum, maximum].
+
+    :param throughput: Number of messages handled per second.
+    """
+
+    drain_capacity = throughput * target_drain_time
+    if backlog > drain_capacity:
+        scale = current * 2
+    elif backlog <= drain_capacity * SCALE_DOWN_RATIO:
+        scale = current // 2
+    else:
+        scale = current
+
+    return max(minimum, min(scale, maximum))
+
+
+class JobsAutoscaler:
+    def __init__(
+        self,
+        config: Config,
+        session_factory: DbSessionFactory,
+        node_cache: NodeCache,
+        jobs_runner: "JobsRunner",
+    ):
+        self.config = config
+        self.session_factory = session_factory
+        self.node_cache = node_cache
+        self.jobs_runner = jobs_runner
+
+        autoscaling_config = config.aleph.jobs.autoscaling
+        pending_messages_config = config.aleph.jobs.pending_messages
+
+        self.min_shards = pending_messages_config.shards.value
+        self.max_shards = max(autoscaling_config.max_shards.value, self.min_shards)
+        self.min_fetch_concurrency = pending_messages_config.max_concurrency.value
+        self.max_fetch_concurrency = max(
+            autoscaling_config.max_fetch_concurrency.value, self.min_fetch_concurrency
+        )
+        self.target_drain_time = autoscaling_config.target_drain_time.value
+        self.interval = autoscaling_config.interval.value
+        self.cooldown = autoscaling_config.cooldown.value
+        self.drain_timeout = autoscaling_config.drain_timeout.value
+
+        self.nb_shards = self.min_shards
+        self.fetch_concurrency = self.min_fetch_concurrency
+        self.last_sample: Optional[WorkloadSample] = None
+        # The processors were just started, wait for the cooldown before
+        # re-sharding them.
+        self.last_resharding_time = time.monotonic()
+        # Processing throughput before the last re-sharding, if it added shards.
+        self.throughput_before_scale_up: Optional[float] = None
+
+    async def _get_stage_total(self, stage: PipelineStage) -> int:
+        count_keys = [
+            pipeline_stage_keys(stage, message_type)[1] for message_type in MessageType
+        ]
+        counts: Sequence[Optional[bytes]] = await self.node_cache.get_many(count_keys)
+        return sum(int(count) for count in counts if count)
+
+    async def sample(self) -> WorkloadSample:
+        with self.session_factory() as session:
+            now = utc_now()
+            messages_to_fetch = count_ready_pending_messages(
+                session=session,
+                current_time=now,
+                fetched=False,
+                limit=MAX_COUNTED_BACKLOG,
+            )
+            messages_to_process = count_ready_pending_messages(
+                session=session,
+                current_time=now,
+                fetched=True,
+                limit=MAX_COUNTED_BACKLOG,
+            )
+            pending_txs = count_pending_txs(session=session)
+
+        return WorkloadSample(
+            time=time.monotonic(),
+            messages_to_fetch=messages_to_fetch,
+            messages_to_process=messages_to_process,
+            pending_txs=pending_txs,
+            fetched_total=await self._get_stage_total(PipelineStage.FETCH),
+            processed_total=await self._get_stage_total(PipelineStage.PROCESS),
+        )
+
+    async def _scale_fetch_concurrency(self, throughput: float, backlog: int) -> None:
+        fetch_concurrency = compute_scale(
+            current=self.fetch_concurrency,
+            minimum=self.min_fetch_concurrency,
+            maximum=self.max_fetch_concurrency,
+            backlog=backlog,
+            throughput=throughput,
+            target_drain_time=self.target_drain_time,
+        )
+        if fetch_concurrency != self.fetch_concurrency:
+            LOGGER.info(
+                "Scaling fetch concurrency from %d to %d (%d messages to fetch, %.1f/s)",
+                self.fetch_concurrency,
+                fetch_concurrency,
+                backlog,
+                throughput,
+            )
+            self.fetch_concurrency = fetch_concurrency
+
+        # Set at every sample with an expiration, so that the fetch job goes
+        # back to its configured concurrency if the autoscaler stops.
+        await self.node_cache.set(
+            FETCH_CONCURRENCY_KEY, self.fetch_concurrency, expiration=3 * self.interval
+        )
+
+    async def _scale_message_processors(
+        self, now: float, throughput: float, backlog: int
+    ) -> None:
+        if now - self.last_resharding_time < self.cooldown:
+            return
+
+        nb_shards = compute_scale(
+            current=self.nb_shards,
+            minimum=self.min_shards,
+            maximum=self.max_shards,
+            backlog=backlog,
+            throughput=throughput,
+            target_drain_time=self.target_drain_time,
+        )
+        if nb_shards == self.nb_shards:
+            return
+
+        scale_up = nb_shards > self.nb_shards
+        if (
+            scale_up
+            and self.throughput_before_scale_up is not None
+            and throughput < self.throughput_before_scale_up * MIN_SCALE_UP_GAIN
+        ):
+            LOGGER.info(
+                "Not adding message processors: the last ones did not improve "
+                "the throughput (%.1f/s before, %.1f/s after)",
+                self.throughput_before_scale_up,
+                throughput,
+            )
+            return
+
+        LOGGER.info(
+            "Re-sharding message processors from %d to %d shards "
+            "(%d messages to process, %.1f/s)",
+            self.nb_shards,
+            nb_shards,
+            backlog,
+            throughput,
+        )
+        await self.jobs_runner.restart_message_processors(
+            config=self.config,
+            nb_shards=nb_shards,
+            terminate_timeout=self.drain_timeout,
+        )
+        self.nb_shards = nb_shards
+        self.last_resharding_time = time.monotonic()
+        self.throughput_before_scale_up = throughput if scale_up else None
+
+    async def scale(self, sample: WorkloadSample) -> None:
+        """
+        Scales the jobs according to the throughput since the previous sample.
+        """
+
+        last_sample, self.last_sample = self.last_sample, sample
+        if last_sample is None:
+            return
+
+        elapsed = sample.time - last_sample.time
+        if elapsed <= 0:
+            return
+
+        # The totals go down if the metrics are reset.
+        nb_fetched = max(sample.fetched_total - last_sample.fetched_total, 0)
+        nb_processed = max(sample.processed_total - last_sample.processed_total, 0)
+        fetch_throughput = nb_fetched / elapsed
+        process_throughput = nb_processed / elapsed
+
+        LOGGER.debug(
+            "Backlog: %d messages to fetch (%.1f/s), %d messages to process "
+            "(%.1f/s), %d pending txs",
+            sample.messages_to_fetch,
+            fetch_throughput,
+            sample.messages_to_process,
+            process_throughput,
+            sample.pending_txs,
+        )
+
+        await self._scale_fetch_concurrency(
+            throughput=fetch_throughput, backlog=sample.messages_to_fetch
+        )
+        await self._scale_message_processors(
+            now=sample.time,
+            throughput=process_throughput,
+            backlog=sample.messages_to_process,
+        )
+
+    async def run(self) -> None:
+        LOGGER.info(
+            "Autoscaling message jobs: %d-%d shards, %d-%d concurrent fetches",
+            self.min_shards,
+            self.max_shards,
+            self.min_fetch_concurrency,
+            self.max_fetch_concurrency,
+        )
+        while True:
+            try:
+                await self.scale(await self.sample())
+            except Exception:
+                LOGGER.exception("Error in jobs autoscaler")
+
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,257 @@
+"""
+Job in charge of the contents that pending messages wait for.
+
+Pending messages that fail because their content or a file they point to is not
+available are put on the wait list of this content instead of being retried
+(see `park_until_content_available`). For each content, this job:
+* probes the network and IPFS with its own backoff, instead of each waiting
+  message fetching the content again,
+* releases the waiting messages as soon as the content is stored locally by any
+  path (upload, fetch by another message, etc.), or found by a probe.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Collection, Iterable, List, Tuple
+
+import aio_pika.abc
+from aleph_message.models import ItemType
+
+from aleph.config import get_config
+from aleph.db.accessors.pending_messages import (
+    delete_unused_content_waits,
+    get_content_waits_to_probe,
+    release_waiting_messages,
+    set_next_probe,
+)
+from aleph.storage import StorageService
+from aleph.toolkit.timestamp import utc_now
+from aleph.types.db_session import DbSessionFactory
+
+from .job_utils import compute_next_retry_interval
+
+LOGGER = logging.getLogger(__name__)
+
+
+# Timeout of a probe request to the network or IPFS, in seconds.
+PROBE_TIMEOUT = 5
+# Maximum number of contents released at once when they arrive.
+ARRIVED_CONTENT_BATCH_SIZE = 1000
+# Time between two checks of the arrived contents and of the probes to perform.
+POLL_INTERVAL = 1
+
+
+class ContentWaitResolver:
+    def __init__(
+        self,
+        session_factory: DbSessionFactory,
+        storage_service: StorageService,
+        pending_message_exchange: aio_pika.abc.AbstractExchange,
+        max_retries: int,
+        max_concurrency: int,
+    ):
+        """
+        :param max_retries: Maximum number of retries of the pending messages.
+            Also the number of failed probes after which the messages that wait
+            for a content are released for a last attempt.
+        :param max_concurrency: Maximum number of contents probed at the same time.
+        """
+        self.session_factory = session_factory
+        self.storage_service = storage_service
+        self.pending_message_exchange = pending_message_exchange
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+
+    async def _notify_released(self, content_hashes: Iterable[str]) -> None:
+        """Wakes up the fetch job for the released messages."""
+        for content_hash in content_hashes:
+            await self.pending_message_exchange.publish(
+                aio_pika.Message(body=content_hash.encode("utf-8")),
+                routing_key=f"fetch.{content_hash}",
+            )
+
+    async def probe(self, content_hash: str, item_type: ItemType) -> bool:
+        """
+        Checks whether a content can be fetched, without downloading IPFS files.
+        """
+
+        storage_service = self.storage_service
+        if await storage_service.storage_engine.exists(content_hash):
+            return True
+
+        try:
+            if item_type == ItemType.ipfs and get_config().ipfs.enabled.value:
+                size = await storage_service.ipfs_service.get_ipfs_size(
+                    content_hash, timeout=PROBE_TIMEOUT
+                )
+                return size is not None
+
+            # Files of the Aleph storage engine are small enough to be fetched
+            # and stored directly.
+            await storage_service.get_hash_content(
+                content_hash,
+                engine=item_type,
+                timeout=PROBE_TIMEOUT,
+                use_ipfs=False,
+            )
+            return True
+        except Exception as e:
+            LOGGER.debug("Content %s is still unavailable: %s", content_hash, e)
+            return False
+
+    async def release_arrived_content(self) -> int:
+        """
+        Releases the messages that wait for contents stored since the last call.
+
+        :return: The number of released contents.
+        """
+
+        node_cache = self.storage_service.node_cache
+        content_hashes = await node_cache.pop_arrived_content(
+            ARRIVED_CONTENT_BATCH_SIZE
+        )
+        if not content_hashes:
+            return 0
+
+        with self.session_factory() as session:
+            nb_released = release_waiting_messages(
+                session=session, content_hashes=content_hashes, current_time=utc_now()
+            )
+            session.commit()
+
+        LOGGER.info(
+            "Released %d messages waiting for %d arrived contents",
+            nb_released,
+            len(content_hashes),
+        )
+        await self._notify_released(content_hashes)
+        return len(content_hashes)
+
+    def _update_content_waits(
+        self,
+        available: Collection[str],
+        unavailable: Collection[Tuple[str, int]],
+    ) -> List[str]:
+        """
+        Releases the messages that wait for the available contents and schedules
+        the next probe of the other ones.
+
+        :return: The contents that are not waited for anymore.
+        """
+
+        now = utc_now()
+        given_up: List[str] = []
+
+        with self.session_factory() as session:
+            if available:
+                release_waiting_messages(
+                    session=session, content_hashes=available, current_time=now
+                )
+
+            for content_hash, probes in unavailable:
+                if probes + 1 >= self.max_retries:
+                    given_up.append(content_hash)
+                else:
+                    set_next_probe(
+                        session=session,
+                        content_hash=content_hash,
+                        next_probe=now + compute_next_retry_interval(probes),
+                    )
+
+            # The waiting messages get a last attempt before being rejected.
+            if given_up:
+                LOGGER.warning(
+                    "Giving up on %d unavailable contents: %s",
+                    len(given_up),
+                    ", ".join(given_up),
+                )
+                release_waiting_messages(
+                    session=session,
+                    content_hashes=given_up,
+                    current_time=now,
+                    min_retries=self.max_retries,
+                )
+            session.commit()
+
+        return [*available, *given_up]
+
+    async def probe_content_waits(self) -> int:
+        """
+        Probes the contents whose next probe is due.
+
+        :return: The number of probed contents.
+        """
+
+        node_cache = self.storage_service.node_cache
+
+        with self.session_factory() as session:
+            unused_content_hashes = delete_unused_content_waits(session)
+            content_waits = [
+                (content_wait.hash, content_wait.item_type, content_wait.probes)
+                for content_wait in get_content_waits_to_probe(
+                    session=session,
+                    current_time=utc_now(),
+                    limit=self.max_concurrency,
+                )
+            ]
+            session.commit()
+
+        await node_cache.remove_waited_content(*unused_content_hashes)
+        if not content_waits:
+            return 0
+
+        # Register the contents before probing them: a content stored after this
+        # point is released by release_arrived_content, one stored before is
+        # found by the probe.
+        await node_cache.add_waited_content(
+            *(content_hash for content_hash, _, _ in content_waits)
+        )
+        results = await asyncio.gather(
+            *(
+                self.probe(content_hash, item_type)
+                for content_hash, item_type, _ in content_waits
+            )
+        )
+
+        available = [
+            content_hash
+            for (content_hash, _, _), is_available in zip(content_waits, results)
+            if is_available
+        ]
+        unavailable = [
+            (content_hash, probes)
+            for (content_hash, _, probes), is_available in zip(content_waits, results)
+            if not is_available
+        ]
+        released = self._update_content_waits(
+            available=available, unavailable=unavailable
+        )
+
+        await node_cache.remove_waited_content(*released)
+        await self._notify_released(released)
+        return len(content_waits)
+
+    @staticmethod
+    async def _run_periodically(
+        coroutine_function: Callable[[], Awaitable[int]], name: str
+    ) -> None:
+        while True:
+            try:
+                nb_processed = await coroutine_function()
+            except Exception:
+                LOGGER.exception("Unexpected error in content wait %s", name)
+                nb_processed = 0
+
+            if not nb_processed:
+                await asyncio.sleep(POLL_INTERVAL)
+
+    async def run(self) -> None:
+        """
+        Releases arrived contents and probes unavailable ones until cancelled.
+        Both run concurrently, so that slow probes do not delay the release of
+        messages when their content arrives.
+        """
+        await asyncio.gather(
+            self._run_periodically(self.release_arrived_content, "release"),
+            self._run_periodically(self.probe_content_waits, "probe"),
+        )
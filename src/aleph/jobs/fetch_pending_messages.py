@@ -6,7 +6,16 @@ import asyncio
 import faulthandler
 import sys
 from logging import getLogger
-from typing import AsyncIterator, Dict, List, NewType, Sequence, Set, TypedDict
+from typing import (
+    AsyncIterator,
+    Dict,
+    List,
+    NewType,
+    Optional,
+    Sequence,
+    Set,
+    TypedDict,
+)
 
 import aio_pika.abc
 from configmanager import Config
@@ -22,15 +31,18 @@ from aleph.db.models import MessageDb, PendingMessageDb
 from aleph.handlers.message_handler import MessageHandler
 from aleph.services.cache.node_cache import NodeCache
 from aleph.services.ipfs import IpfsService
+from aleph.services.pipeline_metrics import PipelineMetrics
 from aleph.services.storage.fileystem_engine import FileSystemStorageEngine
 from aleph.storage import StorageService
 from aleph.toolkit.lifecycle import install_signal_handlers
 from aleph.toolkit.logging import setup_logging
+from aleph.toolkit.metrics_keys import PipelineStage
 from aleph.toolkit.monitoring import setup_sentry
 from aleph.toolkit.timestamp import utc_now
 from aleph.types.db_session import DbSessionFactory
 
 from ..toolkit.rabbitmq import make_mq_conn
+from .content_waits import ContentWaitResolver
 from .job_utils import MessageJob, make_pending_message_queue, prepare_config
 
 LOGGER = getLogger(__name__)
@@ -40,6 +52,10 @@ MessageId = NewType("MessageId", str)
 
 # Redis key tracking the number of in-flight fetch tasks. Used by /metrics.
 ACTIVE_FETCH_TASKS_KEY = "retry_messages_job_tasks"
+# Redis key of the number of concurrent fetches set by the autoscaler, if any.
+FETCH_CONCURRENCY_KEY = "fetch_concurrency"
+# Interval between two reads of the number of concurrent fetches, in seconds.
+FETCH_CONCURRENCY_REFRESH_INTERVAL = 5
 
 
 class MetricState(TypedDict):
@@ -56,6 +72,7 @@ class PendingMessageFetcher(MessageJob):
         max_retries: int,
         pending_message_queue: aio_pika.abc.AbstractQueue,
         pending_message_exchange: aio_pika.abc.AbstractExchange,
+        pipeline_metrics: Optional[PipelineMetrics] = None,
     ):
         super().__init__(
             session_factory=session_factory,
@@ -65,6 +82,7 @@ class PendingMessageFetcher(MessageJob):
         )
         self.pending_message_queue = pending_message_queue
         self.pending_message_exchange = pending_message_exchange
+        self.pipeline_metrics = pipeline_metrics
 
     async def _notify_message_fetched(self, pending_message: PendingMessageDb) -> None:
         """Publish to MQ to wake up the process job after a message is fetched."""
@@ -75,6 +93,7 @@ class PendingMessageFetcher(MessageJob):
         )
 
     async def fetch_pending_message(self, pending_message: PendingMessageDb):
+        start_time = utc_now()
         with self.session_factory() as session:
             try:
                 message = await self.message_handler.verify_and_fetch_message(
@@ -92,6 +111,17 @@ class PendingMessageFetcher(MessageJob):
                 )
                 session.commit()
 
+                if self.pipeline_metrics:
+                    self.pipeline_metrics.observe_since(
+                        PipelineStage.FETCH_WAIT,
+                        pending_message.type,
+                        start=pending_message.reception_time,
+                        end=start_time,
+                    )
+                    self.pipeline_metrics.observe_since(
+                        PipelineStage.FETCH, pending_message.type, start=start_time
+                    )
+
                 # Notify process job that a message is ready
                 await self._notify_message_fetched(pending_message)
 
@@ -202,12 +232,28 @@ class PendingMessageFetcher(MessageJob):
         await node_cache.set(ACTIVE_FETCH_TASKS_KEY, current)
         state["last"] = current
 
+    @staticmethod
+    async def _get_max_concurrency(node_cache: NodeCache, default: int) -> int:
+        """
+        Returns the number of concurrent fetches set by the autoscaler, or the
+        value of the config if autoscaling is disabled.
+        """
+        try:
+            max_concurrency = await node_cache.get(FETCH_CONCURRENCY_KEY)
+        except Exception:
+            LOGGER.warning("Failed to read %s", FETCH_CONCURRENCY_KEY, exc_info=True)
+            return default
+
+        return int(max_concurrency) if max_concurrency else default
+
     async def fetch_pending_messages(
         self, config: Config, node_cache: NodeCache, loop: bool = True
     ) -> AsyncIterator[Sequence[MessageDb]]:
         LOGGER.info("starting fetch job")
 
-        max_concurrent_tasks = config.aleph.jobs.pending_messages.max_concurrency.value
+        default_max_concurrency = (
+            config.aleph.jobs.pending_messages.max_concurrency.value
+        )
         idle_timeout = config.aleph.jobs.pending_messages.idle_timeout.value
 
         # State is local to the generator call so a make_pipeline restart after
@@ -219,8 +265,22 @@ class PendingMessageFetcher(MessageJob):
         await node_cache.set(ACTIVE_FETCH_TASKS_KEY, 0)
         metric_state["last"] = 0
 
+        loop_time = asyncio.get_running_loop().time
+        max_concurrent_tasks = default_max_concurrency
+        next_concurrency_refresh = loop_time()
+
         try:
             while True:
+                # 0. Follow the autoscaler. When the concurrency is reduced, the
+                #    tasks in flight finish before the pool is refilled.
+                if loop_time() >= next_concurrency_refresh:
+                    max_concurrent_tasks = await self._get_max_concurrency(
+                        node_cache, default_max_concurrency
+                    )
+                    next_concurrency_refresh = (
+                        loop_time() + FETCH_CONCURRENCY_REFRESH_INTERVAL
+                    )
+
                 # 1. Refill the pool from the DB.
                 slots = max_concurrent_tasks - len(in_flight)
                 for pending_message in self._claim_messages(slots, busy_hashes):
@@ -298,11 +358,8 @@ async def fetch_messages_task(config: Config):
     )
 
     async with (
-        NodeCache(
-            redis_host=config.redis.host.value,
-            redis_port=config.redis.port.value,
-            message_count_cache_ttl=config.perf.message_count_cache_ttl.value,
-        ) as node_cache,
+        NodeCache.from_config(config) as node_cache,
+        PipelineMetrics.from_config(config, node_cache) as pipeline_metrics,
         IpfsService.new(config) as ipfs_service,
     ):
         storage_service = StorageService(
@@ -322,25 +379,41 @@ async def fetch_messages_task(config: Config):
             max_retries=config.aleph.jobs.pending_messages.max_retries.value,
             pending_message_queue=pending_message_queue,
             pending_message_exchange=pending_message_exchange,
+            pipeline_metrics=pipeline_metrics,
         )
 
-        async with fetcher:
-            while True:
-                try:
-                    fetch_pipeline = fetcher.make_pipeline(
-                        config=config, node_cache=node_cache
-                    )
-                    async for fetched_messages in fetch_pipeline:
-                        for fetched_message in fetched_messages:
-                            LOGGER.info(
-                                "Successfully fetched %s", fetched_message.item_hash
-                            )
-
-                except Exception:
-                    LOGGER.exception("Unexpected error in pending messages fetch job")
+        content_wait_resolver = ContentWaitResolver(
+            session_factory=session_factory,
+            storage_service=storage_service,
+            pending_message_exchange=pending_message_exchange,
+            max_retries=config.aleph.jobs.pending_messages.max_retries.value,
+            max_concurrency=config.aleph.jobs.pending_messages.max_concurrency.value,
+        )
+        content_wait_task = asyncio.create_task(content_wait_resolver.run())
 
-                LOGGER.debug("Waiting 1 second(s) for new pending messages...")
-                await asyncio.sleep(1)
+        try:
+            async with fetcher:
+                while True:
+                    try:
+                        fetch_pipeline = fetcher.make_pipeline(
+                            config=config, node_cache=node_cache
+                        )
+                        async for fetched_messages in fetch_pipeline:
+                            for fetched_message in fetched_messages:
+                                LOGGER.info(
+                                    "Successfully fetched %s",
+                                    fetched_message.item_hash,
+                                )
+
+                    except Exception:
+                        LOGGER.exception(
+                            "Unexpected error in pending messages fetch job"
+                        )
+
+                    LOGGER.debug("Waiting 1 second(s) for new pending messages...")
+                    await asyncio.sleep(1)
+        finally:
+            content_wait_task.cancel()
 
 
 def fetch_pending_messages_subprocess(config_values: Dict):
@@ -1,32 +1,41 @@
 import asyncio
 import datetime as dt
 import logging
-import random
-from typing import Dict, Optional, Union
+from typing import Any, Dict, Optional, Union
 
 import aio_pika
+from aleph_message.models import ItemType
 from configmanager import Config
 from sqlalchemy import update
 
 import aleph.config
+from aleph.db.accessors.dead_letters import add_dead_letter_message
 from aleph.db.accessors.messages import reject_existing_pending_message
-from aleph.db.accessors.pending_messages import set_next_retry
+from aleph.db.accessors.pending_messages import park_pending_message, set_next_retry
 from aleph.db.models import PendingMessageDb
+from aleph.exceptions import UnknownHashError
 from aleph.handlers.message_handler import MessageHandler
 from aleph.toolkit.timestamp import utc_now
 from aleph.types.db_session import DbSession, DbSessionFactory
 from aleph.types.message_processing_result import RejectedMessage, WillRetryMessage
 from aleph.types.message_status import (
     ErrorCode,
+    FileNotFoundException,
     InvalidMessageException,
     MessageContentUnavailable,
+    MessageProcessingException,
     RetryMessageException,
 )
+from aleph.utils import item_type_from_hash
 
-LOGGER = logging.getLogger(__name__)
+from .retry_policies import DEFAULT_RETRY_POLICY
+from .retry_policies import MAX_RETRY_INTERVAL as MAX_RETRY_INTERVAL
+from .retry_policies import RetryPolicy, get_retry_policy
 
+LOGGER = logging.getLogger(__name__)
 
-MAX_RETRY_INTERVAL: int = 300
+# Maximum length of the description of an error in the error history.
+MAX_ERROR_DESCRIPTION_LENGTH = 1000
 
 
 async def _make_pending_queue(
@@ -82,34 +91,60 @@ async def make_pending_message_queue(
     )
 
 
-def compute_next_retry_interval(attempts: int) -> dt.timedelta:
+def compute_next_retry_interval(
+    attempts: int, retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY
+) -> dt.timedelta:
     """
     Computes the time interval for the next attempt/retry of a message.
 
-    Uses exponential backoff with full jitter: the interval is drawn
-    uniformly from ``[0, min(2**attempts, MAX_RETRY_INTERVAL)]`` seconds.
-    The jitter decorrelates the next-attempt time across nodes that failed
-    the same attempt at roughly the same moment, so a retry storm does not
-    re-converge into the same instant. The maximum number of retries is
-    controlled in the node configuration.
+    Uses exponential backoff with full jitter: with the default policy, the
+    interval is drawn uniformly from ``[0, min(2**attempts, MAX_RETRY_INTERVAL)]``
+    seconds. The jitter decorrelates the next-attempt time across nodes that
+    failed the same attempt at roughly the same moment, so a retry storm does not
+    re-converge into the same instant. See `get_retry_policy` for the policies
+    of each error.
 
     :param attempts: Current number of attempts.
+    :param retry_policy: Backoff parameters of the error that made the attempt fail.
     :return: The time interval between the previous processing attempt and the next one.
     """
 
-    cap = min(2**attempts, MAX_RETRY_INTERVAL)
-    seconds = random.uniform(0, cap)
-    return dt.timedelta(seconds=seconds)
+    return retry_policy.next_retry_interval(attempts)
+
+
+def make_error_history_entry(exception: BaseException) -> Dict[str, Any]:
+    """
+    Describes the error of a failed attempt, for the error history of the
+    pending message.
+    """
+
+    if isinstance(exception, MessageProcessingException):
+        errors = exception.args[0] if exception.args else None
+        description = (
+            "; ".join(str(error) for error in errors) if errors else str(exception)
+        )
+    else:
+        description = f"{type(exception).__name__}: {exception}"
+
+    return {
+        "time": utc_now().isoformat(),
+        "error_code": getattr(exception, "error_code", ErrorCode.INTERNAL_ERROR),
+        "error": description[:MAX_ERROR_DESCRIPTION_LENGTH],
+    }
 
 
 def schedule_next_attempt(
-    session: DbSession, pending_message: PendingMessageDb
+    session: DbSession,
+    pending_message: PendingMessageDb,
+    exception: Optional[BaseException] = None,
 ) -> None:
     """
     Schedules the next attempt time for a failed pending message.
 
     :param session: DB session.
     :param pending_message: Pending message to retry.
+    :param exception: Error that made the attempt fail. Determines the retry policy
+                      and is added to the error history of the message.
     """
 
     # Set the next attempt in the future, even if the message is old. The message
@@ -121,14 +156,55 @@ def schedule_next_attempt(
     # rescheduled, later than the message they depend on. This guarantees that messages
     # are processed in the right order while leaving enough time for the issue that
     # caused the original message to be rescheduled to get resolved.
-    next_attempt = utc_now() + compute_next_retry_interval(pending_message.retries)
+    retry_policy = (
+        get_retry_policy(exception) if exception is not None else DEFAULT_RETRY_POLICY
+    )
+    next_attempt = utc_now() + compute_next_retry_interval(
+        pending_message.retries, retry_policy
+    )
     set_next_retry(
-        session=session, pending_message=pending_message, next_attempt=next_attempt
+        session=session,
+        pending_message=pending_message,
+        next_attempt=next_attempt,
+        error=make_error_history_entry(exception) if exception is not None else None,
     )
     pending_message.next_attempt = next_attempt
     pending_message.retries += 1
 
 
+def park_until_content_available(
+    session: DbSession,
+    pending_message: PendingMessageDb,
+    exception: FileNotFoundException,
+) -> bool:
+    """
+    Puts a pending message that failed because a content is unavailable on the
+    wait list of this content, see ContentWaitResolver.
+
+    :return: False if the message could not be parked and must be scheduled
+             for retry instead.
+    """
+
+    if isinstance(exception, MessageContentUnavailable):
+        item_type = ItemType(pending_message.item_type)
+    else:
+        try:
+            item_type = item_type_from_hash(exception.file_hash)
+        except UnknownHashError:
+            return False
+
+    park_pending_message(
+        session=session,
+        pending_message=pending_message,
+        content_hash=exception.file_hash,
+        item_type=item_type,
+        error=make_error_history_entry(exception),
+    )
+    pending_message.waiting_for = exception.file_hash
+    pending_message.retries += 1
+    return True
+
+
 def prepare_config(config_values: Dict) -> Config:
     """
     Loads the application config from values forwarded by the main process.
@@ -204,12 +280,28 @@ class MessageJob(MqWatcher):
         session: DbSession,
         pending_message: PendingMessageDb,
         exception: BaseException,
+        dead_letter: bool = False,
     ) -> RejectedMessage:
+        """
+        :param dead_letter: Whether to keep the message in the dead-letter messages,
+                            for messages that exhausted their attempts.
+        """
         rejected_message_db = reject_existing_pending_message(
             session=session,
             pending_message=pending_message,
             exception=exception,
         )
+        if dead_letter and rejected_message_db:
+            add_dead_letter_message(
+                session=session,
+                pending_message=pending_message,
+                rejected_message=rejected_message_db,
+                error_history=[
+                    *(pending_message.error_history or []),
+                    make_error_history_entry(exception),
+                ],
+            )
+
         # The call to reject the message can actually return None if the message was not
         # actually marked as rejected (ex: a valid version of the message exists).
         # In that case, determine the error code here.
@@ -250,7 +342,8 @@ class MessageJob(MqWatcher):
                 "Unexpected error while fetching message", exc_info=exception
             )
 
-        if pending_message.retries >= self.max_retries:
+        max_attempts = get_retry_policy(exception).get_max_attempts(self.max_retries)
+        if pending_message.retries >= max_attempts:
             LOGGER.warning(
                 "Rejecting pending message: %s - too many retries",
                 pending_message.item_hash,
@@ -259,14 +352,30 @@ class MessageJob(MqWatcher):
                 session=session,
                 pending_message=pending_message,
                 exception=exception,
+                dead_letter=True,
             )
         else:
-            LOGGER.warning(
-                "Message %s marked for retry: %s",
-                pending_message.item_hash,
-                str(exception),
-            )
-            schedule_next_attempt(session=session, pending_message=pending_message)
+            if isinstance(
+                exception, FileNotFoundException
+            ) and park_until_content_available(
+                session=session, pending_message=pending_message, exception=exception
+            ):
+                LOGGER.warning(
+                    "Message %s waits for content %s",
+                    pending_message.item_hash,
+                    exception.file_hash,
+                )
+            else:
+                LOGGER.warning(
+                    "Message %s marked for retry: %s",
+                    pending_message.item_hash,
+                    str(exception),
+                )
+                schedule_next_attempt(
+                    session=session,
+                    pending_message=pending_message,
+                    exception=exception,
+                )
             return WillRetryMessage(
                 pending_message=pending_message, error_code=error_code
             )
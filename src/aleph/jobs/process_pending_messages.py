@@ -3,10 +3,11 @@ Job in charge of (re-) processing Aleph messages waiting in the pending queue.
 """
 
 import asyncio
+import datetime as dt
 import faulthandler
 import sys
 from logging import getLogger
-from typing import AsyncIterator, Dict, Sequence
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 
 import aio_pika.abc
 from configmanager import Config
@@ -16,17 +17,26 @@ import aleph.toolkit.json as aleph_json
 from aleph.chains.signature_verifier import SignatureVerifier
 from aleph.db.accessors.pending_messages import get_next_pending_message
 from aleph.db.connection import make_engine, make_session_factory
+from aleph.db.models import PendingMessageDb
 from aleph.handlers.message_handler import MessageHandler
 from aleph.services.cache.node_cache import NodeCache
 from aleph.services.ipfs import IpfsService
+from aleph.services.pipeline_metrics import PipelineMetrics
 from aleph.services.storage.fileystem_engine import FileSystemStorageEngine
 from aleph.storage import StorageService
+from aleph.toolkit.constants import PRICE_AGGREGATE_OWNER, SETTINGS_AGGREGATE_OWNER
 from aleph.toolkit.lifecycle import install_signal_handlers
 from aleph.toolkit.logging import setup_logging
+from aleph.toolkit.metrics_keys import PipelineStage
 from aleph.toolkit.monitoring import setup_sentry
+from aleph.toolkit.rabbitmq import BatchPublisher
 from aleph.toolkit.timestamp import utc_now
 from aleph.types.db_session import DbSessionFactory
-from aleph.types.message_processing_result import MessageProcessingResult
+from aleph.types.message_processing_result import (
+    MessageProcessingResult,
+    ProcessedMessage,
+)
+from aleph.types.message_shard import MessageShard
 
 from ..types.message_status import MessageOrigin
 from .job_utils import MessageJob, prepare_config
@@ -34,6 +44,37 @@ from .job_utils import MessageJob, prepare_config
 LOGGER = getLogger(__name__)
 
 
+def make_message_shards(
+    config: Config, nb_shards: Optional[int] = None
+) -> List[Optional[MessageShard]]:
+    """
+    Returns the shards of the message processors to start. A single None shard
+    if sharding is disabled, i.e. one processor for all the messages.
+
+    :param nb_shards: Number of shards. Defaults to the value of the config.
+    """
+
+    if nb_shards is None:
+        nb_shards = config.aleph.jobs.pending_messages.shards.value
+    if nb_shards <= 1:
+        return [None]
+
+    global_senders = frozenset(
+        [
+            *config.aleph.balances.addresses.value,
+            *config.aleph.credit_balances.addresses.value,
+            PRICE_AGGREGATE_OWNER,
+            SETTINGS_AGGREGATE_OWNER,
+        ]
+    )
+    shards: List[Optional[MessageShard]] = [
+        MessageShard(nb_shards=nb_shards, index=index, global_senders=global_senders)
+        for index in range(nb_shards)
+    ]
+    shards.append(MessageShard(nb_shards=nb_shards, global_senders=global_senders))
+    return shards
+
+
 class PendingMessageProcessor(MessageJob):
     def __init__(
         self,
@@ -43,7 +84,18 @@ class PendingMessageProcessor(MessageJob):
         mq_conn: aio_pika.abc.AbstractConnection,
         mq_message_exchange: aio_pika.abc.AbstractExchange,
         pending_message_queue: aio_pika.abc.AbstractQueue,
+        publish_batch_size: int = 100,
+        publish_batch_delay: float = 0.05,
+        pipeline_metrics: Optional[PipelineMetrics] = None,
+        shard: Optional[MessageShard] = None,
+        stop_event: Optional[asyncio.Event] = None,
     ):
+        """
+        :param shard: Shard of the pending messages to process. None to process
+                      all of them.
+        :param stop_event: Stops the processing of messages when set, once the
+                           current message is processed.
+        """
         super().__init__(
             session_factory=session_factory,
             message_handler=message_handler,
@@ -52,7 +104,15 @@ class PendingMessageProcessor(MessageJob):
         )
 
         self.mq_conn = mq_conn
+        self.pipeline_metrics = pipeline_metrics
+        self.shard = shard
+        self.stop_event = stop_event or asyncio.Event()
         self.mq_message_exchange = mq_message_exchange
+        self.mq_publisher = BatchPublisher(
+            exchange=mq_message_exchange,
+            max_batch_size=publish_batch_size,
+            max_delay=publish_batch_delay,
+        )
 
     @classmethod
     async def new(
@@ -67,6 +127,11 @@ class PendingMessageProcessor(MessageJob):
         message_exchange_name: str,
         pending_message_exchange_name: str,
         mq_heartbeat: int,
+        publish_batch_size: int = 100,
+        publish_batch_delay: float = 0.05,
+        pipeline_metrics: Optional[PipelineMetrics] = None,
+        shard: Optional[MessageShard] = None,
+        stop_event: Optional[asyncio.Event] = None,
     ):
         mq_conn = await aio_pika.connect_robust(
             host=mq_host,
@@ -86,9 +151,17 @@ class PendingMessageProcessor(MessageJob):
             type=aio_pika.ExchangeType.TOPIC,
             auto_delete=False,
         )
-        pending_message_queue = await channel.declare_queue(
-            name="pending_message_queue"
-        )
+        if shard is None:
+            pending_message_queue = await channel.declare_queue(
+                name="pending_message_queue"
+            )
+        else:
+            # Each shard is notified of all the new pending messages. The queues
+            # of shards are dropped with their processor, so that reducing the
+            # number of shards does not leave orphan queues behind.
+            pending_message_queue = await channel.declare_queue(
+                name=f"pending_message_queue_{shard.name}", auto_delete=True
+            )
         await pending_message_queue.bind(
             pending_message_exchange, routing_key="process.*"
         )
@@ -100,22 +173,32 @@ class PendingMessageProcessor(MessageJob):
             mq_conn=mq_conn,
             mq_message_exchange=mq_message_exchange,
             pending_message_queue=pending_message_queue,
+            publish_batch_size=publish_batch_size,
+            publish_batch_delay=publish_batch_delay,
+            pipeline_metrics=pipeline_metrics,
+            shard=shard,
+            stop_event=stop_event,
         )
 
     async def close(self):
+        await self.mq_publisher.close()
         await self.mq_conn.close()
 
     async def process_messages(
         self,
     ) -> AsyncIterator[Sequence[MessageProcessingResult]]:
-        while True:
+        while not self.stop_event.is_set():
             with self.session_factory() as session:
                 pending_message = get_next_pending_message(
-                    current_time=utc_now(), session=session, fetched=True
+                    current_time=utc_now(),
+                    session=session,
+                    fetched=True,
+                    shard=self.shard,
                 )
                 if not pending_message:
                     break
 
+                start_time = utc_now()
                 try:
                     result: MessageProcessingResult = (
                         await self.message_handler.process(
@@ -133,39 +216,80 @@ class PendingMessageProcessor(MessageJob):
                     )
                     session.commit()
 
+                self._observe_processing(pending_message, result, start_time)
                 yield [result]
 
+    def _observe_processing(
+        self,
+        pending_message: PendingMessageDb,
+        result: MessageProcessingResult,
+        start_time: dt.datetime,
+    ) -> None:
+        if not self.pipeline_metrics:
+            return
+
+        message_type = pending_message.type
+        self.pipeline_metrics.observe_since(
+            PipelineStage.PROCESS_WAIT,
+            message_type,
+            start=pending_message.fetched_at or pending_message.reception_time,
+            end=start_time,
+        )
+        self.pipeline_metrics.observe_since(
+            PipelineStage.PROCESS, message_type, start=start_time
+        )
+        if isinstance(result, ProcessedMessage):
+            self.pipeline_metrics.observe_since(
+                PipelineStage.END_TO_END,
+                message_type,
+                start=pending_message.reception_time,
+            )
+
     async def publish_to_mq(
         self, message_iterator: AsyncIterator[Sequence[MessageProcessingResult]]
     ) -> AsyncIterator[Sequence[MessageProcessingResult]]:
-        async for processing_results in message_iterator:
-            for result in processing_results:
-                if result.origin != MessageOrigin.ONCHAIN:
-                    mq_message = aio_pika.Message(
-                        body=aleph_json.dumps(result.to_dict())
-                    )
-                    await self.mq_message_exchange.publish(
-                        mq_message,
-                        routing_key=f"{result.status.value}.{result.item_hash}",
-                    )
+        try:
+            async for processing_results in message_iterator:
+                for result in processing_results:
+                    if result.origin != MessageOrigin.ONCHAIN:
+                        mq_message = aio_pika.Message(
+                            body=aleph_json.dumps(result.to_dict())
+                        )
+                        await self.mq_publisher.publish(
+                            mq_message,
+                            routing_key=f"{result.status.value}.{result.item_hash}",
+                        )
 
-            yield processing_results
+                yield processing_results
+        finally:
+            # Do not hold back the last results until the next batch.
+            await self.mq_publisher.flush()
 
     def make_pipeline(self) -> AsyncIterator[Sequence[MessageProcessingResult]]:
         message_processor = self.process_messages()
         return self.publish_to_mq(message_iterator=message_processor)
 
 
-async def fetch_and_process_messages_task(config: Config):
-    engine = make_engine(config=config, application_name="aleph-process")
+async def fetch_and_process_messages_task(
+    config: Config,
+    shard: Optional[MessageShard] = None,
+    stop_event: Optional[asyncio.Event] = None,
+):
+    """
+    :param stop_event: Stops the task when set, once the current message is
+                       processed.
+    """
+
+    stop_event = stop_event or asyncio.Event()
+    application_name = "aleph-process"
+    if shard is not None:
+        application_name = f"{application_name}-{shard.name}"
+    engine = make_engine(config=config, application_name=application_name)
     session_factory = make_session_factory(engine)
 
     async with (
-        NodeCache(
-            redis_host=config.redis.host.value,
-            redis_port=config.redis.port.value,
-            message_count_cache_ttl=config.perf.message_count_cache_ttl.value,
-        ) as node_cache,
+        NodeCache.from_config(config) as node_cache,
+        PipelineMetrics.from_config(config, node_cache) as pipeline_metrics,
         IpfsService.new(config) as ipfs_service,
     ):
         storage_service = StorageService(
@@ -190,10 +314,15 @@ async def fetch_and_process_messages_task(config: Config):
             message_exchange_name=config.rabbitmq.message_exchange.value,
             pending_message_exchange_name=config.rabbitmq.pending_message_exchange.value,
             mq_heartbeat=config.rabbitmq.heartbeat.value,
+            publish_batch_size=config.rabbitmq.publish_batch_size.value,
+            publish_batch_delay=config.rabbitmq.publish_batch_delay.value,
+            pipeline_metrics=pipeline_metrics,
+            shard=shard,
+            stop_event=stop_event,
         )
 
         async with pending_message_processor:
-            while True:
+            while not stop_event.is_set():
                 with session_factory() as session:
                     try:
                         message_processing_pipeline = (
@@ -209,6 +338,9 @@ async def fetch_and_process_messages_task(config: Config):
                         LOGGER.exception("Error in pending messages job")
                         session.rollback()
 
+                if stop_event.is_set():
+                    break
+
                 LOGGER.info("Waiting for new pending messages...")
                 # We still loop periodically for retried messages as we do not bother sending a message
                 # on the MQ for these.
@@ -217,28 +349,52 @@ async def fetch_and_process_messages_task(config: Config):
                 except TimeoutError:
                     pass
 
+    LOGGER.info("Stopped processing messages")
 
-def pending_messages_subprocess(config_values: Dict):
+
+def pending_messages_subprocess(
+    config_values: Dict, shard: Optional[MessageShard] = None
+):
     """
     Background task that processes all the messages received by the node.
 
     :param config_values: Application configuration, as a dictionary.
+    :param shard: Shard of the messages to process. None to process all of them.
     """
 
+    process_name = "messages_task_loop"
+    if shard is not None:
+        process_name = f"{process_name}_{shard.name}"
+
     faulthandler.enable(file=sys.stderr)
-    setproctitle("aleph.jobs.messages_task_loop")
+    setproctitle(f"aleph.jobs.{process_name}")
     config = prepare_config(config_values)
 
     setup_sentry(config)
     setup_logging(
         loglevel=config.logging.level.value,
-        filename="/tmp/messages_task_loop.log",
+        filename=f"/tmp/{process_name}.log",
         max_log_file_size=config.logging.max_log_file_size.value,
     )
 
     async def _runner():
-        task = asyncio.create_task(fetch_and_process_messages_task(config=config))
-        install_signal_handlers(asyncio.get_running_loop(), task.cancel)
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(
+            fetch_and_process_messages_task(
+                config=config, shard=shard, stop_event=stop_event
+            )
+        )
+
+        def _stop():
+            # Finish the current message on the first signal, so that stopping
+            # the processors to re-shard them does not waste work. Cancel on the
+            # next one.
+            if stop_event.is_set():
+                task.cancel()
+            else:
+                stop_event.set()
+
+        install_signal_handlers(asyncio.get_running_loop(), _stop)
         try:
             await task
         except asyncio.CancelledError:
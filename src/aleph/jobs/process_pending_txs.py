@@ -19,10 +19,12 @@ from aleph.db.models import PendingTxDb
 from aleph.handlers.message_handler import MessagePublisher
 from aleph.services.cache.node_cache import NodeCache
 from aleph.services.ipfs.service import IpfsService
+from aleph.services.pipeline_metrics import PipelineMetrics
 from aleph.services.storage.fileystem_engine import FileSystemStorageEngine
 from aleph.storage import StorageService
 from aleph.toolkit.lifecycle import install_signal_handlers
 from aleph.toolkit.logging import setup_logging
+from aleph.toolkit.metrics_keys import PipelineStage
 from aleph.toolkit.monitoring import setup_sentry
 from aleph.toolkit.rabbitmq import make_mq_conn
 from aleph.toolkit.timestamp import utc_now
@@ -42,6 +44,7 @@ class PendingTxProcessor(MqWatcher):
         message_publisher: MessagePublisher,
         chain_data_service: ChainDataService,
         pending_tx_queue: aio_pika.abc.AbstractQueue,
+        pipeline_metrics: Optional[PipelineMetrics] = None,
     ):
         super().__init__(mq_queue=pending_tx_queue)
 
@@ -49,6 +52,7 @@ class PendingTxProcessor(MqWatcher):
         self.message_publisher = message_publisher
         self.chain_data_service = chain_data_service
         self.pending_tx_queue = pending_tx_queue
+        self.pipeline_metrics = pipeline_metrics
 
     async def handle_pending_tx(
         self, pending_tx: PendingTxDb, seen_ids: Optional[Set[str]] = None
@@ -58,6 +62,7 @@ class PendingTxProcessor(MqWatcher):
         )
 
         tx = pending_tx.tx
+        start_time = utc_now()
 
         # If the chain data file is unavailable, we leave it to the pending tx
         # processor to log the content unavailable exception and retry later.
@@ -67,13 +72,25 @@ class PendingTxProcessor(MqWatcher):
 
         if messages:
             for i, message_dict in enumerate(messages):
-                await self.message_publisher.add_pending_message(
+                pending_message = await self.message_publisher.add_pending_message(
                     message_dict=message_dict,
                     reception_time=utc_now(),
                     tx_hash=tx.hash,
                     check_message=tx.protocol != ChainSyncProtocol.SMART_CONTRACT,
                     origin=MessageOrigin.ONCHAIN,
                 )
+                if pending_message is not None and self.pipeline_metrics:
+                    self.pipeline_metrics.observe_since(
+                        PipelineStage.CHAIN_SYNC,
+                        pending_message.type,
+                        start=tx.datetime,
+                        end=start_time,
+                    )
+                    self.pipeline_metrics.observe_since(
+                        PipelineStage.PENDING_TX,
+                        pending_message.type,
+                        start=start_time,
+                    )
 
             # bogus or handled, we remove it.
             with self.session_factory() as session:
@@ -135,11 +152,8 @@ async def handle_txs_task(config: Config):
     pending_tx_queue = await make_pending_tx_queue(config=config, channel=mq_channel)
 
     async with (
-        NodeCache(
-            redis_host=config.redis.host.value,
-            redis_port=config.redis.port.value,
-            message_count_cache_ttl=config.perf.message_count_cache_ttl.value,
-        ) as node_cache,
+        NodeCache.from_config(config) as node_cache,
+        PipelineMetrics.from_config(config, node_cache) as pipeline_metrics,
         IpfsService.new(config) as ipfs_service,
     ):
         storage_service = StorageService(
@@ -161,6 +175,7 @@ async def handle_txs_task(config: Config):
             message_publisher=message_publisher,
             chain_data_service=chain_data_service,
             pending_tx_queue=pending_tx_queue,
+            pipeline_metrics=pipeline_metrics,
         )
 
         async with pending_tx_processor:
@@ -0,0 +1,83 @@
+"""
+Retry policies of the pending messages, depending on the error that made them fail.
+
+Transient errors (DB deadlocks, network timeouts) are retried quickly, while
+missing dependencies, which can take a while to be synced, are retried over a
+longer period. Messages that exhaust their attempts are rejected and moved to
+the dead-letter table.
+"""
+
+import datetime as dt
+import math
+import random
+from dataclasses import dataclass
+from typing import Dict, Type
+
+import sqlalchemy.exc
+
+from aleph.types.message_status import ErrorCode
+
+# Maximum retry interval of the default policy, in seconds.
+MAX_RETRY_INTERVAL: int = 300
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: the interval before attempt N + 1 is
+    drawn uniformly from [0, min(base * 2**N, cap)] seconds. The jitter
+    decorrelates the next attempts of messages that failed at the same moment,
+    across nodes as well.
+    """
+
+    # Base and maximum intervals, in seconds.
+    base: float
+    cap: float
+    # Multiplier of the max_retries value of the config. The configured value
+    # stays the bound: setting max_retries to 0 disables the retries of all
+    # the policies.
+    max_retries_factor: float = 1.0
+
+    def next_retry_interval(self, attempts: int) -> dt.timedelta:
+        cap = min(self.base * 2**attempts, self.cap)
+        return dt.timedelta(seconds=random.uniform(0, cap))
+
+    def get_max_attempts(self, max_retries: int) -> int:
+        return math.ceil(max_retries * self.max_retries_factor)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy(base=1, cap=MAX_RETRY_INTERVAL)
+
+# The message depends on a message that the node did not receive yet. It can
+# take a while to arrive, ex: if it is only synced through on-chain archives.
+MISSING_DEPENDENCY_RETRY_POLICY = RetryPolicy(base=4, cap=1800, max_retries_factor=1.5)
+
+# Deadlocks, serialization failures and lost connections resolve themselves
+# within seconds.
+TRANSIENT_DB_ERROR_RETRY_POLICY = RetryPolicy(base=0.5, cap=30, max_retries_factor=2)
+
+RETRY_POLICIES_BY_ERROR_CODE: Dict[ErrorCode, RetryPolicy] = {
+    ErrorCode.POST_AMEND_TARGET_NOT_FOUND: MISSING_DEPENDENCY_RETRY_POLICY,
+    ErrorCode.STORE_REF_NOT_FOUND: MISSING_DEPENDENCY_RETRY_POLICY,
+    ErrorCode.VM_REF_NOT_FOUND: MISSING_DEPENDENCY_RETRY_POLICY,
+    ErrorCode.VM_VOLUME_NOT_FOUND: MISSING_DEPENDENCY_RETRY_POLICY,
+    ErrorCode.FORGET_TARGET_NOT_FOUND: MISSING_DEPENDENCY_RETRY_POLICY,
+}
+
+# Policies of the exceptions that have no error code, matched on their class
+# and its parent classes.
+RETRY_POLICIES_BY_EXCEPTION_CLASS: Dict[Type[BaseException], RetryPolicy] = {
+    sqlalchemy.exc.OperationalError: TRANSIENT_DB_ERROR_RETRY_POLICY,
+}
+
+
+def get_retry_policy(exception: BaseException) -> RetryPolicy:
+    error_code = getattr(exception, "error_code", None)
+    if error_code is not None and error_code in RETRY_POLICIES_BY_ERROR_CODE:
+        return RETRY_POLICIES_BY_ERROR_CODE[error_code]
+
+    for exception_class in type(exception).__mro__:
+        if exception_class in RETRY_POLICIES_BY_EXCEPTION_CLASS:
+            return RETRY_POLICIES_BY_EXCEPTION_CLASS[exception_class]
+
+    return DEFAULT_RETRY_POLICY
@@ -1,8 +1,10 @@
+from typing import Optional
+
 from aleph_message.models import ItemHash, MessageType, PostContent
 
 from aleph.db.accessors.aggregates import get_aggregate_by_key
 from aleph.db.accessors.messages import get_message_by_item_hash
-from aleph.db.models import MessageDb
+from aleph.db.models import AggregateDb, MessageDb
 from aleph.types.db_session import DbSession
 
 
@@ -42,11 +44,25 @@ def is_sender_authorized_for_owner(
     aggregate = get_aggregate_by_key(
         session=session, key="security", owner=owner_address
     )
+    return is_sender_authorized_by_security_aggregate(
+        sender=sender, security_aggregate=aggregate, message=message
+    )
+
+
+def is_sender_authorized_by_security_aggregate(
+    sender: str, security_aggregate: Optional[AggregateDb], message: MessageDb
+) -> bool:
+    """Check the authorizations that a security aggregate grants to `sender`
+    for `message`, see `is_sender_authorized_for_owner`.
+
+    Does not query the DB, so that callers that check many messages can load
+    the security aggregates of all their owners at once.
+    """
 
-    if not aggregate:
+    if not security_aggregate:
         return False
 
-    authorizations = aggregate.content.get("authorizations", [])
+    authorizations = security_aggregate.content.get("authorizations", [])
 
     for auth in authorizations:
         if auth.get("address", "").lower() != sender.lower():
@@ -209,6 +209,12 @@ class WsMessageQueryParams(BaseMessageQueryParams):
         lt=200,
         description="Historical elements to send through the websocket.",
     )
+    history_batch: bool = Field(
+        default=False,
+        alias="historyBatch",
+        description="Send the historical elements as a single JSON array "
+        "instead of one message per element.",
+    )
 
 
 class MessageHashesQueryParams(BaseModel):
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import suppress
+from typing import Dict, Optional
+
+from aleph.services.cache.node_cache import NodeCache
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BufferedCounters:
+    """
+    Redis counters updated in batches.
+
+    Increments and decrements are accumulated in memory and flushed to Redis in a
+    single pipelined round trip every `flush_interval` seconds, instead of one
+    INCR per event. The Redis values are therefore shared by all processes like
+    regular NodeCache counters, but lag behind by up to `flush_interval` seconds.
+
+    The flush loop starts with the first update. Call `close()` on shutdown
+    to flush the remaining deltas.
+    """
+
+    def __init__(self, node_cache: NodeCache, flush_interval: float = 1.0):
+        self.node_cache = node_cache
+        self.flush_interval = flush_interval
+
+        self._deltas: Dict[str, int] = defaultdict(int)
+        self._flush_task: Optional[asyncio.Task] = None
+        # Flush started by the flush loop, awaited on close.
+        self._pending_flush: Optional[asyncio.Future] = None
+
+    def incr(self, key: str, amount: int = 1) -> None:
+        self._deltas[key] += amount
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def decr(self, key: str, amount: int = 1) -> None:
+        self.incr(key, -amount)
+
+    async def flush(self) -> None:
+        deltas = {key: delta for key, delta in self._deltas.items() if delta}
+        self._deltas.clear()
+        if not deltas:
+            return
+
+        try:
+            await self.node_cache.incrby_many(deltas)
+        except BaseException:
+            # Keep the deltas for the next flush, also if cancelled
+            for key, delta in deltas.items():
+                self._deltas[key] += delta
+            raise
+
+    async def _flush_loop(self) -> None:
+        while self._deltas:
+            await asyncio.sleep(self.flush_interval)
+            # Shielded so that close() can wait for the flush instead of
+            # cancelling it halfway through.
+            self._pending_flush = asyncio.ensure_future(self.flush())
+            try:
+                await asyncio.shield(self._pending_flush)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                LOGGER.exception("Could not flush counters to Redis")
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+
+        if self._pending_flush is not None:
+            try:
+                await self._pending_flush
+            except Exception:
+                # The deltas were put back, retry below
+                LOGGER.warning("Could not flush counters to Redis, retrying")
+            self._pending_flush = None
+
+        await self.flush()
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from typing import Any, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from aleph.services.cache.node_cache import NodeCache
+from aleph.toolkit.lru_cache import LRUCache
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MessageCache:
+    """
+    Cache of the serialized responses of the message endpoints, by item hash.
+
+    Processed messages only change when they are confirmed, forgotten or removed.
+    The database notifies these changes on the `message_changed` channel
+    (see the `notify_message_changed` trigger) and the cache evicts the message,
+    so cached responses are served without querying the database.
+
+    Responses are kept in an in-process LRU and optionally in Redis, to share them
+    between API workers. Entries are only served while the cache listens to the
+    notifications. Redis entries also expire after `redis_ttl` seconds, which bounds
+    the staleness of entries whose notification was missed by every worker.
+
+    Callers must read `version` before querying the database and pass it to `set()`:
+    the value is discarded if a message changed in the meantime.
+    """
+
+    NOTIFICATION_CHANNEL = "message_changed"
+    REDIS_KEY_PREFIX = "message_response:"
+    # Response kinds
+    MESSAGE = "message"
+    CONTENT = "content"
+    KINDS = (MESSAGE, CONTENT)
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_size: int,
+        node_cache: Optional[NodeCache] = None,
+        redis_ttl: int = 0,
+    ):
+        """
+        :param engine: Engine used to listen to the notifications of the database.
+        :param max_size: Maximum number of responses kept in memory.
+        :param node_cache: Node cache used to share responses between processes.
+        :param redis_ttl: TTL of the responses stored in Redis, in seconds.
+            0 disables Redis.
+        """
+        self.engine = engine
+        self.node_cache = node_cache if redis_ttl > 0 else None
+        self.redis_ttl = redis_ttl
+
+        self._responses: LRUCache[Tuple[str, str], bytes] = LRUCache(maxsize=max_size)
+        # Incremented on every eviction, see `set()`.
+        self.version = 0
+        self._listening = False
+        self._listen_task: Optional[asyncio.Task] = None
+        self._eviction_tasks: Set[asyncio.Task] = set()
+
+    def _redis_key(self, item_hash: str, kind: str) -> str:
+        return f"{self.REDIS_KEY_PREFIX}{kind}:{item_hash}"
+
+    async def open(self) -> None:
+        self._listen_task = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            self._listen_task = None
+        for task in self._eviction_tasks:
+            task.cancel()
+        self._eviction_tasks.clear()
+        self._stop_listening()
+
+    def _start_listening(self) -> None:
+        # Messages may have changed while we were not listening.
+        self._responses.clear()
+        self.version += 1
+        self._listening = True
+
+    def _stop_listening(self) -> None:
+        self._listening = False
+        self._responses.clear()
+        self.version += 1
+
+    def _on_notification(
+        self, _connection: Any, _pid: int, _channel: str, payload: str
+    ):
+        self._evict_local(payload)
+        if self.node_cache is not None:
+            task = asyncio.create_task(self._evict_redis(payload))
+            self._eviction_tasks.add(task)
+            task.add_done_callback(self._eviction_tasks.discard)
+
+    def _evict_local(self, item_hash: str) -> None:
+        self.version += 1
+        for kind in self.KINDS:
+            self._responses.pop((item_hash, kind))
+
+    async def _evict_redis(self, item_hash: str) -> None:
+        assert self.node_cache is not None
+        try:
+            await self.node_cache.delete(
+                *(self._redis_key(item_hash, kind) for kind in self.KINDS)
+            )
+        except Exception:
+            LOGGER.exception("Could not evict message %s from Redis", item_hash)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.engine.connect() as connection:
+                    raw_connection = await connection.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    assert driver_connection is not None
+                    await driver_connection.add_listener(
+                        self.NOTIFICATION_CHANNEL, self._on_notification
+                    )
+                    self._start_listening()
+                    try:
+                        while not driver_connection.is_closed():
+                            await asyncio.sleep(1)
+                    finally:
+                        self._stop_listening()
+                LOGGER.warning("Message notification connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                LOGGER.exception("Message notification listener failed")
+            await asyncio.sleep(1)
+
+    async def get(self, item_hash: str, kind: str) -> Optional[bytes]:
+        if not self._listening:
+            return None
+
+        key = (item_hash, kind)
+        if (response := self._responses.get(key)) is not None:
+            return response
+
+        if self.node_cache is None:
+            return None
+
+        version = self.version
+        response = await self.node_cache.get(self._redis_key(item_hash, kind))
+        if response is not None and version == self.version:
+            self._responses.set(key, response)
+        return response
+
+    async def set(self, item_hash: str, kind: str, response: bytes, version: int):
+        """
+        Caches a response.
+
+        :param version: Value of `version` before the response was read from the DB.
+        """
+        if not self._listening or version != self.version:
+            return
+
+        self._responses.set((item_hash, kind), response)
+        if self.node_cache is not None:
+            await self.node_cache.set(
+                self._redis_key(item_hash, kind), response, expiration=self.redis_ttl
+            )
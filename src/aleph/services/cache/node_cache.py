@@ -1,30 +1,167 @@
+import asyncio
+import logging
+import math
+import time
+import uuid
+from dataclasses import dataclass
 from hashlib import sha256
-from typing import Any, Dict, List, Optional, Set
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    cast,
+)
 
 import redis.asyncio as redis_asyncio
+from configmanager import Config
 
 import aleph.toolkit.json as aleph_json
+from aleph.db.accessors.aggregates import count_aggregates
 from aleph.db.accessors.messages import (
     count_matching_messages,
+    count_matching_messages_by_day,
     count_matching_messages_fast,
 )
+from aleph.db.accessors.posts import count_matching_posts
 from aleph.schemas.messages_query_params import MessageQueryParams
+from aleph.toolkit.single_flight import SingleFlight
 from aleph.types.db_session import DbSessionFactory
+from aleph.utils import run_in_executor
+
+LOGGER = logging.getLogger(__name__)
 
 CacheKey = Any
 CacheValue = bytes
 
 
+# Updates the EWMA statistics of a peer and its score in a single atomic step,
+# so that concurrent fetches from several processes do not lose samples.
+# KEYS[1]: stats hash of the peer, KEYS[2]: sorted set of peer scores.
+# ARGV: peer URI, alpha, latency (s), success (0/1), throughput (bytes/s, or -1).
+_RECORD_PEER_REQUEST_SCRIPT = """
+local alpha = tonumber(ARGV[2])
+local latency = tonumber(ARGV[3])
+local success = tonumber(ARGV[4])
+local throughput = tonumber(ARGV[5])
+
+local stats = redis.call('HMGET', KEYS[1], 'latency', 'success_rate', 'bytes_per_second', 'requests')
+local requests = tonumber(stats[4])
+
+if requests == nil then
+    stats = {latency, success, math.max(throughput, 0)}
+    requests = 0
+else
+    stats = {tonumber(stats[1]), tonumber(stats[2]), tonumber(stats[3])}
+    stats[1] = alpha * latency + (1 - alpha) * stats[1]
+    stats[2] = alpha * success + (1 - alpha) * stats[2]
+    if throughput >= 0 then
+        stats[3] = alpha * throughput + (1 - alpha) * stats[3]
+    end
+end
+
+local score = stats[2] / math.max(stats[1], 0.001)
+redis.call('HSET', KEYS[1],
+    'latency', tostring(stats[1]),
+    'success_rate', tostring(stats[2]),
+    'bytes_per_second', tostring(stats[3]),
+    'requests', requests + 1)
+redis.call('ZADD', KEYS[2], score, ARGV[1])
+"""
+
+
+@dataclass
+class PeerScore:
+    """EWMA statistics of the requests sent to an HTTP peer."""
+
+    latency: float
+    success_rate: float
+    bytes_per_second: float
+    requests: int
+    # Successful requests per second: success rate / latency.
+    score: float
+
+
 class NodeCache:
     API_SERVERS_KEY = "api_servers"
     PUBLIC_ADDRESSES_KEY = "public_addresses"
-
-    def __init__(self, redis_host: str, redis_port: int, message_count_cache_ttl):
+    PEER_SCORES_KEY = "api_server_scores"
+    PEER_STATS_KEY_PREFIX = "api_server_stats:"
+    MESSAGE_COUNT_KEY_PREFIX = "message_count:"
+    POST_COUNT_KEY_PREFIX = "post_count:"
+    AGGREGATE_COUNT_KEY_PREFIX = "aggregate_count:"
+    PAGE_BOUNDARIES_KEY_PREFIX = "page_boundaries:"
+    # Hashes of the content that pending messages wait for, and the ones among
+    # them that were stored since the content wait resolver last checked.
+    WAITED_CONTENT_KEY = "waited_content"
+    ARRIVED_CONTENT_KEY = "arrived_content"
+    # Suffix of the lock taken by the process that revalidates a cached value.
+    REVALIDATION_LOCK_SUFFIX = ":revalidating"
+    # Pub/sub channel used to evict keys from the local cache of every process.
+    INVALIDATION_CHANNEL = "node_cache_invalidation"
+
+    def __init__(
+        self,
+        redis_host: str,
+        redis_port: int,
+        message_count_cache_ttl,
+        local_cache_ttls: Optional[Dict[str, float]] = None,
+        count_cache_soft_ttl: Optional[float] = None,
+    ):
+        """
+        :param local_cache_ttls: TTL (in seconds) of the in-process copy of the keys
+            starting with each prefix. Keys that match no prefix are always read
+            from Redis. The local copies of a key are evicted in all processes
+            when the key is modified through a NodeCache.
+        :param count_cache_soft_ttl: Age (in seconds) after which cached counts are
+            recomputed in the background. Defaults to `message_count_cache_ttl`,
+            i.e. counts are only recomputed once expired.
+        """
         self.redis_host = redis_host
         self.redis_port = redis_port
         self.message_cache_count_ttl = message_count_cache_ttl
+        self.count_cache_soft_ttl = (
+            count_cache_soft_ttl
+            if count_cache_soft_ttl is not None
+            else message_count_cache_ttl
+        )
+        self.local_cache_ttls = local_cache_ttls or {}
 
         self._redis_client: Optional[redis_asyncio.Redis] = None
+        self._local_cache: Dict[str, Tuple[float, Any]] = {}
+        # Incremented on every eviction, so that a value read from Redis before
+        # an eviction is not stored in the local cache after it.
+        self._local_cache_version = 0
+        self._invalidation_task: Optional[asyncio.Task] = None
+        # Identifies the invalidation messages sent by this instance.
+        self._instance_id = uuid.uuid4().hex
+        self._computations: SingleFlight[Any] = SingleFlight()
+        self._revalidation_tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "NodeCache":
+        local_cache_config = config.redis.local_cache
+        local_cache_ttls = (
+            {
+                cls.API_SERVERS_KEY: local_cache_config.api_servers_ttl.value,
+                cls.MESSAGE_COUNT_KEY_PREFIX: local_cache_config.message_count_ttl.value,
+            }
+            if local_cache_config.enabled.value
+            else None
+        )
+        return cls(
+            redis_host=config.redis.host.value,
+            redis_port=config.redis.port.value,
+            message_count_cache_ttl=config.perf.message_count_cache_ttl.value,
+            local_cache_ttls=local_cache_ttls,
+            count_cache_soft_ttl=config.perf.count_cache_soft_ttl.value,
+        )
 
     @property
     def redis_client(self) -> redis_asyncio.Redis:
@@ -40,12 +177,24 @@ class NodeCache:
         self._redis_client = redis_asyncio.Redis(
             host=self.redis_host, port=self.redis_port
         )
+        if self.local_cache_ttls:
+            self._invalidation_task = asyncio.create_task(
+                self._listen_to_invalidations()
+            )
 
     async def __aenter__(self):
         await self.open()
         return self
 
     async def close(self):
+        if self._invalidation_task is not None:
+            self._invalidation_task.cancel()
+            self._invalidation_task = None
+        for task in self._revalidation_tasks:
+            task.cancel()
+        self._revalidation_tasks.clear()
+        self._local_cache.clear()
+
         if self.redis_client:
             await self.redis_client.aclose()
             self._redis_client = None
@@ -59,38 +208,321 @@ class NodeCache:
         """
         await self.redis_client.delete(self.PUBLIC_ADDRESSES_KEY)
 
+    def _local_ttl(self, key: CacheKey) -> Optional[float]:
+        if not isinstance(key, str):
+            return None
+
+        for prefix, ttl in self.local_cache_ttls.items():
+            if key.startswith(prefix):
+                return ttl
+        return None
+
+    def _evict_local(self, key: str) -> None:
+        self._local_cache_version += 1
+        self._local_cache.pop(key, None)
+
+    async def _invalidate(self, key: CacheKey) -> None:
+        """Evicts a key from the local cache of this process and of the others."""
+        if self._local_ttl(key) is None:
+            return
+
+        self._evict_local(key)
+        await self.redis_client.publish(
+            self.INVALIDATION_CHANNEL, f"{self._instance_id} {key}"
+        )
+
+    async def _listen_to_invalidations(self) -> None:
+        while True:
+            try:
+                async with self.redis_client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                    # Local values may have been modified while we were not listening.
+                    self._local_cache.clear()
+
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        sender, key = message["data"].decode().split(" ", 1)
+                        # Our own modifications are already evicted locally.
+                        if sender != self._instance_id:
+                            self._evict_local(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                LOGGER.exception("Node cache invalidation listener failed")
+                self._local_cache.clear()
+                await asyncio.sleep(1)
+
+    async def _get_cached(
+        self, key: CacheKey, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Returns the local copy of a key, or fetches the value from Redis
+        and keeps it locally if the key has a local TTL.
+        """
+        ttl = self._local_ttl(key)
+        if ttl is None:
+            return await fetch()
+
+        if (entry := self._local_cache.get(key)) is not None:
+            expiration_time, value = entry
+            if expiration_time > time.monotonic():
+                return value
+
+        version = self._local_cache_version
+        value = await fetch()
+        if version == self._local_cache_version:
+            self._local_cache[key] = (time.monotonic() + ttl, value)
+        return value
+
     async def get(self, key: CacheKey) -> Optional[CacheValue]:
-        return await self.redis_client.get(key)
+        return await self._get_cached(key, lambda: self.redis_client.get(key))
+
+    async def get_many(self, keys: Sequence[CacheKey]) -> List[Optional[CacheValue]]:
+        """Reads several keys in a single round trip."""
+        if not keys:
+            return []
+        return await self.redis_client.mget(keys)
 
     async def set(self, key: CacheKey, value: Any, expiration: Optional[int] = None):
         await self.redis_client.set(key, value, ex=expiration)
+        await self._invalidate(key)
+
+    async def delete(self, *keys: CacheKey):
+        if not keys:
+            return
+        await self.redis_client.delete(*keys)
+        for key in keys:
+            await self._invalidate(key)
 
     async def incr(self, key: CacheKey):
         await self.redis_client.incr(key)
+        await self._invalidate(key)
 
     async def incrby(self, key: CacheKey, amount: int):
         await self.redis_client.incrby(key, amount)
+        await self._invalidate(key)
+
+    async def incrby_many(self, amounts: Dict[str, int]) -> None:
+        """Increments several counters in a single round trip."""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for key, amount in amounts.items():
+                pipe.incrby(key, amount)
+            await pipe.execute()
+
+        for key in amounts:
+            await self._invalidate(key)
 
     async def decr(self, key: CacheKey):
         await self.redis_client.decr(key)
+        await self._invalidate(key)
 
     async def decrby(self, key: CacheKey, amount: int):
         await self.redis_client.decrby(key, amount)
+        await self._invalidate(key)
 
     async def get_api_servers(self) -> Set[str]:
-        return set(
-            api_server.decode()
-            for api_server in await self.redis_client.smembers(self.API_SERVERS_KEY)
+        api_servers = await self._get_cached(
+            self.API_SERVERS_KEY,
+            lambda: self.redis_client.smembers(self.API_SERVERS_KEY),
         )
+        return set(api_server.decode() for api_server in api_servers)
 
     async def add_api_server(self, api_server: str) -> None:
         await self.redis_client.sadd(self.API_SERVERS_KEY, api_server)
+        await self._invalidate(self.API_SERVERS_KEY)
 
     async def has_api_server(self, api_server: str) -> bool:
         return await self.redis_client.sismember(self.API_SERVERS_KEY, api_server)
 
     async def remove_api_server(self, api_server: str) -> None:
         await self.redis_client.srem(self.API_SERVERS_KEY, api_server)
+        await self._invalidate(self.API_SERVERS_KEY)
+
+    def _peer_stats_key(self, peer_uri: str) -> str:
+        return f"{self.PEER_STATS_KEY_PREFIX}{peer_uri}"
+
+    async def record_peer_request(
+        self,
+        peer_uri: str,
+        latency: float,
+        success: bool,
+        n_bytes: int = 0,
+        alpha: float = 0.2,
+    ) -> None:
+        """
+        Records the outcome of a request to an HTTP peer.
+
+        :param peer_uri: Base URI of the peer.
+        :param latency: Duration of the request, in seconds.
+        :param success: Whether the peer returned the expected response.
+        :param n_bytes: Size of the response body. Only used for successful requests.
+        :param alpha: Smoothing factor of the moving averages.
+        """
+        throughput = n_bytes / max(latency, 0.001) if success and n_bytes else -1
+        await self.redis_client.eval(
+            _RECORD_PEER_REQUEST_SCRIPT,
+            2,
+            self._peer_stats_key(peer_uri),
+            self.PEER_SCORES_KEY,
+            peer_uri,
+            alpha,
+            latency,
+            int(success),
+            throughput,
+        )
+
+    async def get_api_server_scores(self, peers: Iterable[str]) -> Dict[str, float]:
+        """
+        Returns the score of each of the specified peers.
+        Peers that were never contacted are absent from the result.
+        """
+        peers = list(peers)
+        if not peers:
+            return {}
+
+        scores = await self.redis_client.zmscore(self.PEER_SCORES_KEY, peers)
+        return {
+            peer: float(score)
+            for peer, score in zip(peers, scores)
+            if score is not None
+        }
+
+    async def get_peer_scores(self) -> Dict[str, PeerScore]:
+        peers = [
+            peer.decode()
+            for peer in await self.redis_client.zrange(self.PEER_SCORES_KEY, 0, -1)
+        ]
+        if not peers:
+            return {}
+
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for peer in peers:
+                pipe.hgetall(self._peer_stats_key(peer))
+            pipe.zmscore(self.PEER_SCORES_KEY, peers)
+            *all_stats, scores = await pipe.execute()
+
+        peer_scores = {}
+        for peer, stats, score in zip(peers, all_stats, scores):
+            if not stats or score is None:
+                continue
+            peer_scores[peer] = PeerScore(
+                latency=float(stats[b"latency"]),
+                success_rate=float(stats[b"success_rate"]),
+                bytes_per_second=float(stats[b"bytes_per_second"]),
+                requests=int(stats[b"requests"]),
+                score=float(score),
+            )
+
+        return peer_scores
+
+    async def _compute_and_store(
+        self, key: str, compute: Callable[[], Awaitable[Any]], hard_ttl: int
+    ) -> Any:
+        value = await compute()
+        await self.set(key, aleph_json.dumps([time.time(), value]), expiration=hard_ttl)
+        return value
+
+    async def _revalidate(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        soft_ttl: float,
+        hard_ttl: int,
+    ) -> None:
+        # Only one process recomputes the value, the others keep serving
+        # the stale one until the lock expires.
+        lock_acquired = await self.redis_client.set(
+            f"{key}{self.REVALIDATION_LOCK_SUFFIX}",
+            self._instance_id,
+            nx=True,
+            ex=max(1, math.ceil(soft_ttl)),
+        )
+        if lock_acquired:
+            await self._computations.run(
+                key, lambda: self._compute_and_store(key, compute, hard_ttl)
+            )
+
+    def _on_revalidation_done(self, task: asyncio.Task) -> None:
+        self._revalidation_tasks.discard(task)
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            LOGGER.error("Could not revalidate cached value", exc_info=exc)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        soft_ttl: float,
+        hard_ttl: int,
+    ) -> Any:
+        """
+        Returns a cached value, computing it if needed (stale-while-revalidate).
+
+        Values younger than `soft_ttl` seconds are returned as is. Older values are
+        still returned, but recomputed in the background by a single process.
+        Values expire from Redis after `hard_ttl` seconds: the next caller computes
+        the value and waits for the result. Concurrent computations of the same key
+        in this process are coalesced.
+
+        :param compute: Computes the value. The value must be JSON serializable.
+        """
+        cached = await self.get(key)
+        entry = aleph_json.loads(cached) if cached is not None else None
+        # Values stored by older versions are not timestamped
+        if not isinstance(entry, list) or len(entry) != 2:
+            return await self._computations.run(
+                key, lambda: self._compute_and_store(key, compute, hard_ttl)
+            )
+
+        computed_at, value = entry
+        if time.time() - computed_at >= soft_ttl and key not in self._computations:
+            task = asyncio.create_task(
+                self._revalidate(key, compute, soft_ttl=soft_ttl, hard_ttl=hard_ttl)
+            )
+            self._revalidation_tasks.add(task)
+            task.add_done_callback(self._on_revalidation_done)
+
+        return value
+
+    def _page_boundaries_key(self, filters: Dict[str, Any]) -> str:
+        return f"{self.PAGE_BOUNDARIES_KEY_PREFIX}{self._message_filter_id(filters)}"
+
+    async def get_page_boundary(
+        self, filters: Dict[str, Any], page: int
+    ) -> Optional[Tuple[int, str]]:
+        """
+        Returns the closest known page boundary at or before a page.
+
+        :param filters: Query filters, including the page size but not the page.
+        :return: The page that starts at the boundary and the cursor of the last
+            item of the previous page, or None if no boundary is known.
+        """
+        boundaries = await self.redis_client.zrevrangebyscore(
+            self._page_boundaries_key(filters),
+            max=page,
+            min=2,
+            start=0,
+            num=1,
+            withscores=True,
+        )
+        if not boundaries:
+            return None
+
+        cursor, boundary_page = boundaries[0]
+        return int(boundary_page), cursor.decode()
+
+    async def set_page_boundary(
+        self, filters: Dict[str, Any], page: int, cursor: str, ttl: int
+    ) -> None:
+        """
+        Records the cursor of the last item before a page.
+        All the boundaries of a query expire `ttl` seconds after the last update.
+        """
+        key = self._page_boundaries_key(filters)
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.zadd(key, {cursor: page})
+            pipe.expire(key, ttl)
+            await pipe.execute()
 
     async def add_public_address(self, public_address: str) -> None:
         await self.redis_client.sadd(self.PUBLIC_ADDRESSES_KEY, public_address)
@@ -99,6 +531,29 @@ class NodeCache:
         addresses = await self.redis_client.smembers(self.PUBLIC_ADDRESSES_KEY)
         return [addr.decode() for addr in addresses]
 
+    async def add_waited_content(self, *content_hashes: str) -> None:
+        if content_hashes:
+            await self.redis_client.sadd(self.WAITED_CONTENT_KEY, *content_hashes)
+
+    async def remove_waited_content(self, *content_hashes: str) -> None:
+        if content_hashes:
+            await self.redis_client.srem(self.WAITED_CONTENT_KEY, *content_hashes)
+
+    async def mark_content_arrived(self, content_hash: str) -> bool:
+        """
+        Records that a content is now available locally, if pending messages
+        wait for it. Returns True if the content was waited for.
+        """
+        return await self.redis_client.smove(
+            self.WAITED_CONTENT_KEY, self.ARRIVED_CONTENT_KEY, content_hash
+        )
+
+    async def pop_arrived_content(self, count: int) -> List[str]:
+        content_hashes = cast(
+            List[bytes], await self.redis_client.spop(self.ARRIVED_CONTENT_KEY, count)
+        )
+        return [content_hash.decode() for content_hash in content_hashes]
+
     @staticmethod
     def _message_filter_id(filters: Dict[str, Any]):
         filters_json = aleph_json.dumps(filters, sort_keys=True)
@@ -109,9 +564,12 @@ class NodeCache:
         session_factory: DbSessionFactory, query_params: MessageQueryParams
     ) -> Optional[int]:
         """
-        Try an O(1) lookup from message_counts for simple queries.
-        Returns None if the query has filters that cannot be answered
-        by the counter table (date ranges, hashes, refs, etc.).
+        Try to answer a count query from the counter tables.
+
+        Sender and owner filters are answered by message_counts, chain, channel,
+        content type and date filters by message_counts_by_day. Returns None if
+        the query has filters that cannot be answered by the counter tables
+        (hashes, refs, tags, sender + date range, etc.).
         """
         # Fast path only works when no non-dimension filters are set
         if (
@@ -119,52 +577,54 @@ class NodeCache:
             or query_params.refs
             or query_params.content_hashes
             or query_params.content_keys
-            or query_params.content_types
-            or query_params.chains
-            or query_params.channels
             or query_params.tags
             or query_params.payment_types
-            or query_params.start_date
-            or query_params.end_date
             or query_params.start_block
             or query_params.end_block
         ):
             return None
 
-        # Fast path only supports single-value dimensions
-        if query_params.addresses and len(query_params.addresses) > 1:
-            return None
-        if query_params.owners and len(query_params.owners) > 1:
-            return None
         message_types = query_params.message_types or (
             [query_params.message_type] if query_params.message_type else None
         )
-        if message_types and len(message_types) > 1:
-            return None
-
-        sender = query_params.addresses[0] if query_params.addresses else None
-        owner = query_params.owners[0] if query_params.owners else None
-        msg_type = message_types[0].value if message_types else None
-        statuses = (
-            [s.value for s in query_params.message_statuses]
-            if query_params.message_statuses
-            else None
+        by_day = bool(
+            query_params.chains
+            or query_params.channels
+            or query_params.content_types
+            or query_params.start_date
+            or query_params.end_date
         )
 
-        # The trigger only maintains specific dimension combos.
-        # Reject combinations it doesn't track.
-        if sender and owner:
-            return None
-        if owner and msg_type:
-            return None
+        if by_day:
+            # message_counts_by_day does not track senders and owners
+            if query_params.addresses or query_params.owners:
+                return None
+
+            with session_factory() as session:
+                return count_matching_messages_by_day(
+                    session,
+                    message_types=message_types,
+                    message_statuses=query_params.message_statuses,
+                    chains=query_params.chains,
+                    channels=query_params.channels,
+                    content_types=query_params.content_types,
+                    start_date=query_params.start_date,
+                    end_date=query_params.end_date,
+                )
 
         with session_factory() as session:
             return count_matching_messages_fast(
                 session,
-                message_type=msg_type,
-                statuses=statuses,
-                sender=sender,
-                owner=owner,
+                message_types=(
+                    [t.value for t in message_types] if message_types else None
+                ),
+                statuses=(
+                    [s.value for s in query_params.message_statuses]
+                    if query_params.message_statuses
+                    else None
+                ),
+                senders=query_params.addresses,
+                owners=query_params.owners,
             )
 
     async def count_messages(
@@ -177,16 +637,62 @@ class NodeCache:
 
         # Fall back to Redis-cached COUNT(*)
         filters = query_params.model_dump(exclude_none=True)
-        cache_key = f"message_count:{self._message_filter_id(filters)}"
+        cache_key = f"{self.MESSAGE_COUNT_KEY_PREFIX}{self._message_filter_id(filters)}"
+
+        def count() -> int:
+            # Slow, can take a few seconds
+            with session_factory() as session:
+                return count_matching_messages(session, **filters)
+
+        return await self.get_or_compute(
+            cache_key,
+            lambda: run_in_executor(None, count),
+            soft_ttl=self.count_cache_soft_ttl,
+            hard_ttl=self.message_cache_count_ttl,
+        )
 
-        cached_result = await self.get(cache_key)
-        if cached_result is not None:
-            return int(cached_result.decode())
+    async def count_posts(
+        self, session_factory: DbSessionFactory, filters: Dict[str, Any]
+    ) -> int:
+        """
+        Cached version of `count_matching_posts`.
+        """
+        # Counts ignore pagination, all pages share the same cache key.
+        filters = {k: v for k, v in filters.items() if k not in ("page", "pagination")}
+        cache_key = f"{self.POST_COUNT_KEY_PREFIX}{self._message_filter_id(filters)}"
+
+        def count() -> int:
+            with session_factory() as session:
+                return count_matching_posts(session, **filters)
+
+        return await self.get_or_compute(
+            cache_key,
+            lambda: run_in_executor(None, count),
+            soft_ttl=self.count_cache_soft_ttl,
+            hard_ttl=self.message_cache_count_ttl,
+        )
 
-        # Slow, can take a few seconds
-        with session_factory() as session:
-            n_matches = count_matching_messages(session, **filters)
+    async def count_aggregates(
+        self,
+        session_factory: DbSessionFactory,
+        keys: Optional[Sequence[str]] = None,
+        addresses: Optional[Sequence[str]] = None,
+    ) -> int:
+        """
+        Cached version of `count_aggregates`.
+        """
+        filters = {"keys": keys, "addresses": addresses}
+        cache_key = (
+            f"{self.AGGREGATE_COUNT_KEY_PREFIX}{self._message_filter_id(filters)}"
+        )
 
-        await self.set(cache_key, n_matches, expiration=self.message_cache_count_ttl)
+        def count() -> int:
+            with session_factory() as session:
+                return count_aggregates(session, keys=keys, addresses=addresses)
 
-        return n_matches
+        return await self.get_or_compute(
+            cache_key,
+            lambda: run_in_executor(None, count),
+            soft_ttl=self.count_cache_soft_ttl,
+            hard_ttl=self.message_cache_count_ttl,
+        )
@@ -5,30 +5,90 @@ HTTP connection to standard rest API.
 import asyncio
 import base64
 import logging
+import time
+from hashlib import sha256
 from random import sample
-from typing import List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
 import aiohttp
+from aleph_message.models import ItemType
+
+import aleph.toolkit.json as aleph_json
+from aleph.config import get_config
+from aleph.exceptions import UnknownHashError
+from aleph.services.cache.node_cache import NodeCache
+from aleph.utils import item_type_from_hash
 
 LOGGER = logging.getLogger("P2P.HTTP")
 
 SESSIONS: dict[int, aiohttp.ClientSession] = {}
 
+RAW_CONTENT_CHUNK_SIZE = 64 * 1024
+
+# Peers known to serve /storage/raw. A 404 from these peers means that
+# the file is missing, not that the endpoint does not exist.
+RAW_CONTENT_PEERS: Set[str] = set()
+# Peers that only serve the legacy base64 JSON endpoint, with the time at which
+# they were detected. They are probed again after LEGACY_PEER_RECHECK_INTERVAL.
+LEGACY_CONTENT_PEERS: Dict[str, float] = {}
+LEGACY_PEER_RECHECK_INTERVAL = 3600
+
+
+class _RawContentUnsupported(Exception):
+    pass
+
+
+async def _record_peer_request(
+    node_cache: Optional[NodeCache],
+    base_uri: str,
+    start_time: float,
+    success: bool,
+    n_bytes: int = 0,
+) -> None:
+    config = get_config()
+    if node_cache is None or not config.p2p.peer_scoring.enabled.value:
+        return
+
+    latency = time.perf_counter() - start_time
+    try:
+        await node_cache.record_peer_request(
+            base_uri,
+            latency=latency,
+            success=success,
+            n_bytes=n_bytes,
+            alpha=config.p2p.peer_scoring.ewma_alpha.value,
+        )
+    except Exception:
+        # Scoring is best effort, never fail a fetch because of it.
+        LOGGER.exception("Could not record the score of peer %s", base_uri)
 
-async def api_get_request(base_uri, method, timeout=1):
+
+def _get_session(timeout: int) -> aiohttp.ClientSession:
     if timeout not in SESSIONS:
         connector = aiohttp.TCPConnector(limit_per_host=5)
         SESSIONS[timeout] = aiohttp.ClientSession(
             read_timeout=timeout, connector=connector
         )
+    return SESSIONS[timeout]
+
 
+async def _api_get_request(
+    base_uri: str, method: str, timeout: int = 1
+) -> Tuple[Any, int]:
+    """
+    Sends a GET request to the API of another node.
+    Returns the decoded JSON response (or None) and the size of the response body.
+    """
     uri = f"{base_uri}/api/v0/{method}"
+    n_bytes = 0
     try:
-        async with SESSIONS[timeout].get(uri) as resp:
+        async with _get_session(timeout).get(uri) as resp:
             if resp.status != 200:
                 result = None
             else:
-                result = await resp.json()
+                body = await resp.read()
+                n_bytes = len(body)
+                result = aleph_json.loads(body)
     except (
         TimeoutError,
         asyncio.TimeoutError,
@@ -40,30 +100,217 @@ async def api_get_request(base_uri, method, timeout=1):
     except Exception:
         LOGGER.exception("Error in retrieval")
         result = None
+    return result, n_bytes
+
+
+async def api_get_request(
+    base_uri: str,
+    method: str,
+    timeout: int = 1,
+    node_cache: Optional[NodeCache] = None,
+):
+    """
+    Sends a GET request to the API of another node.
+
+    If a node cache is specified, the latency and outcome of the request
+    are recorded in the score of the peer.
+    """
+    start_time = time.perf_counter()
+    result, n_bytes = await _api_get_request(base_uri, method, timeout=timeout)
+    await _record_peer_request(
+        node_cache,
+        base_uri,
+        start_time=start_time,
+        success=result is not None,
+        n_bytes=n_bytes,
+    )
     return result
 
 
+def _is_legacy_peer(base_uri: str) -> bool:
+    detection_time = LEGACY_CONTENT_PEERS.get(base_uri)
+    if detection_time is None:
+        return False
+
+    if time.monotonic() - detection_time > LEGACY_PEER_RECHECK_INTERVAL:
+        del LEGACY_CONTENT_PEERS[base_uri]
+        return False
+
+    return True
+
+
+async def _get_peer_raw_content(
+    base_uri: str, item_hash: str, timeout: int, max_size: int
+) -> Optional[bytes]:
+    """
+    Streams a file from the /storage/raw endpoint of a peer.
+
+    The hash of storage (sha256) files is computed while the file is downloaded,
+    files that do not match their hash are discarded. IPFS hashes cannot be checked
+    without the IPFS daemon and must be verified by the caller.
+
+    :raises _RawContentUnsupported: The peer does not (or may not) serve raw content.
+    """
+    try:
+        hasher = (
+            sha256() if item_type_from_hash(item_hash) == ItemType.storage else None
+        )
+    except UnknownHashError:
+        hasher = None
+
+    uri = f"{base_uri}/api/v0/storage/raw/{item_hash}"
+    chunks = []
+    size = 0
+
+    try:
+        async with _get_session(timeout).get(uri) as resp:
+            if resp.status == 404 and base_uri not in RAW_CONTENT_PEERS:
+                raise _RawContentUnsupported()
+            if resp.status != 200:
+                return None
+
+            if resp.content_length is not None and resp.content_length > max_size:
+                LOGGER.warning(
+                    "File %s from %s is too large (%d bytes)",
+                    item_hash,
+                    base_uri,
+                    resp.content_length,
+                )
+                return None
+
+            async for chunk in resp.content.iter_chunked(RAW_CONTENT_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    LOGGER.warning(
+                        "File %s from %s exceeds %d bytes",
+                        item_hash,
+                        base_uri,
+                        max_size,
+                    )
+                    return None
+                if hasher is not None:
+                    hasher.update(chunk)
+                chunks.append(chunk)
+    except (
+        TimeoutError,
+        asyncio.TimeoutError,
+        ConnectionRefusedError,
+        aiohttp.ClientError,
+        OSError,
+    ):
+        return None
+
+    RAW_CONTENT_PEERS.add(base_uri)
+
+    if hasher is not None and hasher.hexdigest() != item_hash:
+        LOGGER.warning("Got a bad hash for %s from %s", item_hash, base_uri)
+        return None
+
+    return b"".join(chunks)
+
+
+async def _get_peer_json_content(
+    base_uri: str, item_hash: str, timeout: int
+) -> Tuple[Optional[bytes], int]:
+    item, n_bytes = await _api_get_request(
+        base_uri, f"storage/{item_hash}", timeout=timeout
+    )
+    if item is not None and item["status"] == "success" and item["content"] is not None:
+        return base64.decodebytes(item["content"].encode("utf-8")), n_bytes
+
+    return None, n_bytes
+
+
 async def get_peer_hash_content(
-    base_uri: str, item_hash: str, timeout: int = 1
+    base_uri: str,
+    item_hash: str,
+    timeout: int = 1,
+    node_cache: Optional[NodeCache] = None,
 ) -> Optional[bytes]:
+    """
+    Fetches a file from another node.
+
+    Files are streamed from the raw storage endpoint. Peers that do not serve it
+    are queried through the legacy endpoint that returns base64 content in JSON.
+    """
     result = None
-    item = await api_get_request(base_uri, f"storage/{item_hash}", timeout=timeout)
-    if item is not None and item["status"] == "success" and item["content"] is not None:
-        # TODO: IMPORTANT /!\ verify the hash of received data!
-        return base64.decodebytes(item["content"].encode("utf-8"))
+    n_bytes = 0
+    start_time = time.perf_counter()
+
+    if not _is_legacy_peer(base_uri):
+        try:
+            result = await _get_peer_raw_content(
+                base_uri,
+                item_hash,
+                timeout=timeout,
+                max_size=get_config().storage.max_file_size.value,
+            )
+            n_bytes = len(result) if result is not None else 0
+        except _RawContentUnsupported:
+            result, n_bytes = await _get_peer_json_content(
+                base_uri, item_hash, timeout=timeout
+            )
+            if result is not None:
+                LEGACY_CONTENT_PEERS[base_uri] = time.monotonic()
     else:
+        result, n_bytes = await _get_peer_json_content(
+            base_uri, item_hash, timeout=timeout
+        )
+
+    if result is None:
         LOGGER.debug(f"can't get hash {item_hash}")
 
+    await _record_peer_request(
+        node_cache,
+        base_uri,
+        start_time=start_time,
+        success=result is not None,
+        n_bytes=n_bytes,
+    )
     return result
 
 
+async def sort_peers_by_score(
+    api_servers: Sequence[str], node_cache: NodeCache
+) -> List[str]:
+    """
+    Sorts peers from best to worst score.
+
+    Peers that were never contacted are ranked with the median score, so that
+    new peers get a chance to be tried before the slow or unreliable ones.
+    Peers with the same score are returned in random order to spread the load.
+    """
+    uris: List[str] = sample(api_servers, k=len(api_servers))
+
+    try:
+        scores = await node_cache.get_api_server_scores(uris)
+    except Exception:
+        LOGGER.exception("Could not fetch peer scores")
+        return uris
+
+    if not scores:
+        return uris
+
+    known_scores = sorted(scores.values())
+    default_score = known_scores[len(known_scores) // 2]
+    return sorted(uris, key=lambda uri: scores.get(uri, default_score), reverse=True)
+
+
 async def request_hash(
-    api_servers: Sequence[str], item_hash: str, timeout: int = 1
+    api_servers: Sequence[str],
+    item_hash: str,
+    timeout: int = 1,
+    node_cache: Optional[NodeCache] = None,
 ) -> Optional[bytes]:
-    uris: List[str] = sample(api_servers, k=len(api_servers))
+    if node_cache is not None and get_config().p2p.peer_scoring.enabled.value:
+        uris = await sort_peers_by_score(api_servers, node_cache=node_cache)
+    else:
+        uris = sample(api_servers, k=len(api_servers))
 
     for uri in uris:
-        content = await get_peer_hash_content(uri, item_hash, timeout=timeout)
+        content = await get_peer_hash_content(
+            uri, item_hash, timeout=timeout, node_cache=node_cache
+        )
         if content is not None:
             return content
 
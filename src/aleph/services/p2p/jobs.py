@@ -57,9 +57,13 @@ async def reconnect_p2p_job(
         await asyncio.sleep(config.p2p.reconnect_delay.value)
 
 
-async def check_peer(peer_uri: str, timeout: int = 1) -> PeerStatus:
+async def check_peer(
+    peer_uri: str, timeout: int = 1, node_cache: Optional[NodeCache] = None
+) -> PeerStatus:
     try:
-        version_info = await api_get_request(peer_uri, "version", timeout=timeout)
+        version_info = await api_get_request(
+            peer_uri, "version", timeout=timeout, node_cache=node_cache
+        )
         if version_info is not None:
             return PeerStatus(peer_uri=peer_uri, is_online=True, version=version_info)
 
@@ -91,7 +95,7 @@ async def tidy_http_peers_job(
                 if my_ip in peer:
                     continue
 
-                jobs.append(check_peer(peer))
+                jobs.append(check_peer(peer, node_cache=node_cache))
             peer_statuses = await asyncio.gather(*jobs)
 
             for peer_status in peer_statuses:
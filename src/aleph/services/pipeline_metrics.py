@@ -0,0 +1,83 @@
+import datetime as dt
+from typing import Optional
+
+from aleph_message.models import MessageType
+from configmanager import Config
+
+from aleph.services.cache.counters import BufferedCounters
+from aleph.services.cache.node_cache import NodeCache
+from aleph.toolkit.metrics_keys import (
+    PIPELINE_STAGE_BUCKETS,
+    PIPELINE_STAGE_INF_BUCKET,
+    PipelineStage,
+    pipeline_stage_bucket_label,
+    pipeline_stage_keys,
+)
+from aleph.toolkit.timestamp import utc_now
+
+
+class PipelineMetrics:
+    """
+    Latency histograms of the stages of the message processing pipeline.
+
+    Observations are accumulated by `BufferedCounters` and flushed to Redis,
+    where the histograms of the tx, fetch and process jobs add up. The API
+    exports them on /metrics. Each histogram has a fixed set of buckets and there
+    is one histogram per stage and message type, so the number of Redis keys
+    is bounded.
+    """
+
+    def __init__(self, counters: BufferedCounters):
+        self.counters = counters
+
+    @classmethod
+    def from_config(cls, config: Config, node_cache: NodeCache) -> "PipelineMetrics":
+        return cls(
+            BufferedCounters(
+                node_cache=node_cache,
+                flush_interval=config.perf.counters_flush_interval.value,
+            )
+        )
+
+    async def close(self) -> None:
+        await self.counters.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def observe(
+        self, stage: PipelineStage, message_type: MessageType, duration: float
+    ) -> None:
+        """
+        Records the duration of a stage, in seconds.
+        """
+        # Clock skew between the chain and the node may yield negative durations.
+        duration = max(duration, 0.0)
+
+        bucket_keys, count_key, duration_ms_sum_key = pipeline_stage_keys(
+            stage, message_type
+        )
+        le = next(
+            (
+                pipeline_stage_bucket_label(upper_bound)
+                for upper_bound in PIPELINE_STAGE_BUCKETS
+                if duration <= upper_bound
+            ),
+            PIPELINE_STAGE_INF_BUCKET,
+        )
+        self.counters.incr(bucket_keys[le])
+        self.counters.incr(count_key)
+        self.counters.incr(duration_ms_sum_key, round(duration * 1000))
+
+    def observe_since(
+        self,
+        stage: PipelineStage,
+        message_type: MessageType,
+        start: dt.datetime,
+        end: Optional[dt.datetime] = None,
+    ) -> None:
+        end = end or utc_now()
+        self.observe(stage, message_type, (end - start).total_seconds())
@@ -27,6 +27,7 @@ from aleph.services.ipfs import IpfsService
 from aleph.services.ipfs.common import get_cid_version
 from aleph.services.p2p.http import request_hash as p2p_http_request_hash
 from aleph.services.storage.engine import StorageEngine
+from aleph.toolkit.single_flight import SingleFlight
 from aleph.types.db_session import DbSession
 from aleph.types.files import FileType
 from aleph.utils import get_sha256
@@ -63,6 +64,9 @@ class StorageService:
         self.ipfs_service = ipfs_service
         self.node_cache = node_cache
 
+        # Fetches of the same content in progress, shared between concurrent callers.
+        self._content_fetches: SingleFlight[RawContent] = SingleFlight()
+
     async def get_message_content(
         self, message: AlephBaseMessage | PendingMessageDb
     ) -> MessageContent:
@@ -115,7 +119,10 @@ class StorageService:
         if "http" in enabled_clients:
             api_servers = list(await self.node_cache.get_api_servers())
             content = await p2p_http_request_hash(
-                api_servers=api_servers, item_hash=content_hash, timeout=timeout
+                api_servers=api_servers,
+                item_hash=content_hash,
+                timeout=timeout,
+                node_cache=self.node_cache,
             )
 
         if content is not None:
@@ -192,6 +199,36 @@ class StorageService:
         use_network: bool = True,
         use_ipfs: bool = True,
         store_value: bool = True,
+    ) -> RawContent:
+        """
+        Fetches a file from the local storage, the network or IPFS.
+
+        Concurrent calls for the same content share a single fetch: the local read,
+        the network requests and the write to the local storage are only performed
+        once. Timeout and retry values are those of the first caller.
+        """
+        return await self._content_fetches.run(
+            (content_hash, engine, use_network, use_ipfs, store_value),
+            lambda: self._get_hash_content(
+                content_hash,
+                engine=engine,
+                timeout=timeout,
+                tries=tries,
+                use_network=use_network,
+                use_ipfs=use_ipfs,
+                store_value=store_value,
+            ),
+        )
+
+    async def _get_hash_content(
+        self,
+        content_hash: str,
+        engine: ItemType,
+        timeout: int,
+        tries: int,
+        use_network: bool,
+        use_ipfs: bool,
+        store_value: bool,
     ) -> RawContent:
         # TODO: determine which storage engine to use
 
@@ -228,7 +265,7 @@ class StorageService:
         # Store content locally if we fetched it from the network
         if store_value and source != ContentSource.DB:
             LOGGER.debug(f"Storing content for '{content_hash}'.")
-            await self.storage_engine.write(filename=content_hash, content=content)
+            await self._write_content(content_hash, content)
 
         return RawContent(hash=content_hash, value=content, source=source)
 
@@ -243,8 +280,8 @@ class StorageService:
         file_type: FileType = FileType.FILE,
     ) -> StreamContent:
         # Try to retrieve the data from the DB, then from IPFS.
-        # P2P retrieval via HTTP does not easily support streaming yet in this codebase
-        # as it fetches JSON with base64 content.
+        # P2P retrieval via HTTP buffers the whole file in memory (it needs to be
+        # verified before it can be served), so it is only used as a fallback.
 
         source = None
 
@@ -338,7 +375,7 @@ class StorageService:
         else:
             raise NotImplementedError("storage engine %s not supported" % engine)
 
-        await self.storage_engine.write(filename=chash, content=content)
+        await self._write_content(chash, content)
         upsert_file(
             session=session,
             file_hash=chash,
@@ -348,10 +385,22 @@ class StorageService:
 
         return chash
 
+    async def notify_content_available(self, content_hash: str) -> None:
+        """
+        Releases the pending messages that wait for a content, now available
+        locally. See ContentWaitResolver.
+        """
+        if await self.node_cache.mark_content_arrived(content_hash):
+            LOGGER.debug("Content '%s' is now available.", content_hash)
+
+    async def _write_content(self, content_hash: str, content: bytes) -> None:
+        await self.storage_engine.write(filename=content_hash, content=content)
+        await self.notify_content_available(content_hash)
+
     async def add_file_content_to_local_storage(
         self, file_content: bytes, file_hash: str
     ) -> None:
-        await self.storage_engine.write(filename=file_hash, content=file_content)
+        await self._write_content(file_hash, file_content)
 
     async def add_file(
         self, session: DbSession, file_content: bytes, engine: ItemType = ItemType.ipfs
@@ -1,11 +1,14 @@
 """Shared Redis key constants for node metrics.
 
 Kept in toolkit (a leaf module that imports nothing from the web or handler
-layers) so both the writer (``handlers/content/store.py``) and the reader
-(``web/controllers/metrics.py``) use the same strings without a circular import.
+layers) so the writers (``handlers/content/store.py``,
+``services/pipeline_metrics.py``) and the reader (``web/controllers/metrics.py``)
+use the same strings without a circular import.
 """
 
-from aleph_message.models import ItemType
+from enum import Enum
+
+from aleph_message.models import ItemType, MessageType
 
 # STORE file-fetch metrics, split by item type because the fetch source differs:
 # `storage` files are pulled from CCN HTTP APIs, `ipfs` files come through the
@@ -33,3 +36,51 @@ def store_fetch_keys(item_type: ItemType) -> tuple[str, str, str]:
         STORE_FETCH_STORAGE_FAILED_KEY,
         STORE_FETCH_STORAGE_DURATION_MS_SUM_KEY,
     )
+
+
+class PipelineStage(str, Enum):
+    """Stages of the message processing pipeline, see `PipelineMetrics`."""
+
+    # From the chain event to the pending tx job picking it up.
+    CHAIN_SYNC = "chain_sync"
+    # From the pending tx job picking up the tx to the creation of the pending message.
+    PENDING_TX = "pending_tx"
+    # From the reception of a pending message to its successful fetch attempt.
+    FETCH_WAIT = "fetch_wait"
+    # Fetch of the content of a message.
+    FETCH = "fetch"
+    # From the message being ready (received or fetched) to its processing.
+    PROCESS_WAIT = "process_wait"
+    # Processing of a message.
+    PROCESS = "process"
+    # From the reception of a pending message to the message being processed.
+    END_TO_END = "end_to_end"
+
+
+# Latency histograms of the pipeline stages, by stage and message type. Every
+# observation increments its bucket counter (buckets are not cumulative in Redis,
+# the reader adds them up), the count and the sum of the durations in ms.
+PIPELINE_STAGE_DURATION_METRIC = "pyaleph_pipeline_stage_duration_seconds"
+# Upper bounds of the histogram buckets, in seconds. The last bucket is +Inf.
+PIPELINE_STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600)
+PIPELINE_STAGE_INF_BUCKET = "+Inf"
+
+
+def pipeline_stage_bucket_label(upper_bound: float) -> str:
+    return f"{upper_bound:g}"
+
+
+def pipeline_stage_keys(
+    stage: PipelineStage, message_type: MessageType
+) -> tuple[dict[str, str], str, str]:
+    """
+    Return the Redis keys of a (stage, message type) histogram:
+    the bucket keys by `le` label, the count key and the duration_ms_sum key.
+    """
+    prefix = f"{PIPELINE_STAGE_DURATION_METRIC}:{stage.value}:{message_type.value}"
+    bucket_labels = [
+        pipeline_stage_bucket_label(upper_bound)
+        for upper_bound in PIPELINE_STAGE_BUCKETS
+    ] + [PIPELINE_STAGE_INF_BUCKET]
+    bucket_keys = {le: f"{prefix}:bucket:{le}" for le in bucket_labels}
+    return bucket_keys, f"{prefix}:count", f"{prefix}:duration_ms_sum"
@@ -1,5 +1,11 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
 import aio_pika
 
+LOGGER = logging.getLogger(__name__)
+
 
 async def make_mq_conn(config) -> aio_pika.abc.AbstractConnection:
     mq_conn = await aio_pika.connect_robust(
@@ -10,3 +16,112 @@ async def make_mq_conn(config) -> aio_pika.abc.AbstractConnection:
         heartbeat=config.rabbitmq.heartbeat.value,
     )
     return mq_conn
+
+
+class BatchPublisher:
+    """
+    Publishes messages on an exchange in batches.
+
+    Channels use publisher confirms, so each publish waits for the broker to
+    acknowledge the message. Publishing messages one at a time costs one round
+    trip per message. This class buffers the messages and publishes each batch
+    concurrently: the confirms of a whole batch arrive in about one round trip.
+
+    A batch is published once it holds `max_batch_size` messages, or `max_delay`
+    seconds after its first message. Call `flush()` to publish the buffered
+    messages right away, ex: once a unit of work is done, and `close()` on shutdown.
+
+    `flush()` and publishes that fill a batch raise publication errors to the
+    caller. The delayed flush has no caller: it keeps the messages it could not
+    publish in the buffer, for the next flush.
+    """
+
+    def __init__(
+        self,
+        exchange: aio_pika.abc.AbstractExchange,
+        max_batch_size: int = 100,
+        max_delay: float = 0.05,
+    ):
+        self.exchange = exchange
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        self._batch: List[Tuple[aio_pika.abc.AbstractMessage, str]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # Set once the delayed flush is done waiting, cancelling it would then
+        # drop the batch it publishes.
+        self._delayed_flush_started = False
+
+    async def publish(
+        self, message: aio_pika.abc.AbstractMessage, routing_key: str
+    ) -> None:
+        self._batch.append((message, routing_key))
+        if len(self._batch) >= self.max_batch_size:
+            await self._publish_batch()
+        elif self._flush_task is None or self._flush_task.done():
+            self._schedule_delayed_flush()
+
+    def _schedule_delayed_flush(self) -> None:
+        self._delayed_flush_started = False
+        self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _publish_batch(self, requeue_failed: bool = False) -> None:
+        """
+        :param requeue_failed: Put the messages that could not be published back
+                               in the buffer, to publish them with the next batch.
+        """
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+
+        results = await asyncio.gather(
+            *(
+                self.exchange.publish(message, routing_key=routing_key)
+                for message, routing_key in batch
+            ),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            LOGGER.error("Could not publish %d/%d messages", len(errors), len(batch))
+            if requeue_failed:
+                self._batch[:0] = [
+                    item
+                    for item, result in zip(batch, results)
+                    if isinstance(result, BaseException)
+                ]
+            raise errors[0]
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.max_delay)
+        self._delayed_flush_started = True
+        try:
+            # Nobody awaits this task: keep the failed messages until the next
+            # publish or flush instead of dropping them.
+            await self._publish_batch(requeue_failed=True)
+        except Exception:
+            LOGGER.exception("Could not publish batch")
+            return
+
+        # Messages published while this batch was in flight
+        if self._batch:
+            self._schedule_delayed_flush()
+
+    async def flush(self) -> None:
+        """
+        Publishes the buffered messages and waits for the broker to confirm them.
+        """
+        flush_task, self._flush_task = self._flush_task, None
+        if flush_task is not None and not self._delayed_flush_started:
+            flush_task.cancel()
+            flush_task = None
+
+        await self._publish_batch()
+        if flush_task is not None:
+            await flush_task
+            # Retry the messages of the delayed flush that failed, so that the
+            # error reaches the caller.
+            await self._publish_batch()
+
+    async def close(self) -> None:
+        await self.flush()
@@ -0,0 +1,60 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call(Generic[T]):
+    task: asyncio.Task[T]
+    waiters: int = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent calls that share the same key.
+
+    The first caller for a key starts the operation, callers that arrive while it
+    is still running wait for the same result (or exception) instead of starting
+    their own. Cancelling a caller does not affect the others: the operation is
+    only cancelled once every caller waiting for it has been cancelled.
+
+    Usage:
+    >>> single_flight = SingleFlight()
+    >>> content = await single_flight.run(item_hash, lambda: fetch(item_hash))
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call[T]] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, call: _Call[T]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+
+            async def _run() -> T:
+                return await func()
+
+            call = _Call(task=asyncio.create_task(_run()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _task: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up, new callers must start a new operation.
+                self._forget(key, call)
+                call.task.cancel()
@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+from typing import FrozenSet, Optional
+
+from aleph_message.models import MessageType
+
+# Messages that depend on the messages or files of other owners: FORGETs can
+# target messages of other owners, VMs reference volumes of other owners and
+# their costs depend on global state.
+GLOBAL_SHARD_MESSAGE_TYPES: FrozenSet[MessageType] = frozenset(
+    {
+        MessageType.forget,
+        MessageType.instance,
+        MessageType.program,
+        MessageType.v_program,
+    }
+)
+
+
+@dataclass(frozen=True)
+class MessageShard:
+    """
+    Subset of the pending messages handled by one message processor.
+
+    Pending messages are partitioned over `nb_shards` shards by a hash of their
+    owner (`content.address`), so that the messages of an owner are processed in
+    order by a single processor. Messages with cross-owner dependencies go to the
+    global shard (`index` is None), also processed serially:
+    * messages of the types in GLOBAL_SHARD_MESSAGE_TYPES,
+    * messages sent by `global_senders`, ex: balance updates and price aggregates.
+    """
+
+    nb_shards: int
+    index: Optional[int] = None
+    global_senders: FrozenSet[str] = field(default_factory=frozenset)
+
+    def __post_init__(self):
+        if self.nb_shards < 1:
+            raise ValueError("nb_shards must be at least 1")
+        if self.index is not None and not 0 <= self.index < self.nb_shards:
+            raise ValueError(f"Invalid shard index: {self.index}")
+
+    @property
+    def is_global(self) -> bool:
+        return self.index is None
+
+    @property
+    def name(self) -> str:
+        return "global" if self.is_global else str(self.index)
@@ -15,11 +15,11 @@ from aleph.db.accessors.balances import (
     get_address_credit_history,
     get_address_credit_history_summary,
     get_balances_by_chain,
-    get_credit_balance,
+    get_credit_balance_async,
     get_credit_balance_with_details,
     get_credit_balances,
     get_resource_consumed_credits,
-    get_total_detailed_balance,
+    get_total_detailed_balance_async,
 )
 from aleph.db.accessors.cost import get_total_cost_for_address
 from aleph.db.accessors.files import get_address_files_for_api, get_address_files_stats
@@ -60,7 +60,10 @@ from aleph.toolkit.cursor import (
     encode_message_cursor,
 )
 from aleph.types.db_session import DbSessionFactory
-from aleph.web.controllers.app_state_getters import get_session_factory_from_request
+from aleph.web.controllers.app_state_getters import (
+    get_async_read_session_factory_from_request,
+    get_read_session_factory_from_request,
+)
 from aleph.web.controllers.utils import (
     get_item_hash_str_from_request,
     validate_cursor_pagination,
@@ -185,7 +188,7 @@ async def addresses_stats_view_v1(request: web.Request):
       '422':
         description: Validation error
     """
-    session_factory = get_session_factory_from_request(request)
+    session_factory = get_read_session_factory_from_request(request)
 
     try:
         query_params = AddressesQueryParams.model_validate(request.query)
@@ -336,17 +339,17 @@ async def get_account_balance(request: web.Request):
     except ValidationError as e:
         raise web.HTTPUnprocessableEntity(text=e.json())
 
-    session_factory: DbSessionFactory = get_session_factory_from_request(request)
-    with session_factory() as session:
-        balance, details = get_total_detailed_balance(
+    async_session_factory = get_async_read_session_factory_from_request(request)
+    async with async_session_factory() as session:
+        balance, details = await get_total_detailed_balance_async(
             session=session, address=address, chain=query_params.chain
         )
-        total_cost = get_total_cost_for_address(session=session, address=address)
+        total_cost = await session.run_sync(get_total_cost_for_address, address=address)
 
         credit_balance_details = None
         if query_params.include_credit_details:
-            credits, detail_items = get_credit_balance_with_details(
-                session=session, address=address
+            credits, detail_items = await session.run_sync(
+                get_credit_balance_with_details, address=address
             )
             credit_balance_details = [
                 CreditBalanceDetailItem(
@@ -356,7 +359,7 @@ async def get_account_balance(request: web.Request):
                 for d in detail_items
             ]
         else:
-            credits = get_credit_balance(session=session, address=address)
+            credits = await get_credit_balance_async(session=session, address=address)
 
         if credits is None:
             credits = 0
@@ -421,7 +424,7 @@ async def get_chain_balances(request: web.Request) -> web.Response:
         raise web.HTTPUnprocessableEntity(text=e.json())
 
     cursor = query_params.cursor
-    session_factory: DbSessionFactory = get_session_factory_from_request(request)
+    session_factory: DbSessionFactory = get_read_session_factory_from_request(request)
 
     if cursor is not None:
         pagination_per_page = validate_cursor_pagination(
@@ -531,7 +534,7 @@ async def get_credit_balances_handler(request: web.Request) -> web.Response:
         raise web.HTTPUnprocessableEntity(text=e.json())
 
     cursor = query_params.cursor
-    session_factory: DbSessionFactory = get_session_factory_from_request(request)
+    session_factory: DbSessionFactory = get_read_session_factory_from_request(request)
 
     if cursor is not None:
         pagination_per_page = validate_cursor_pagination(
@@ -657,7 +660,7 @@ async def get_account_files(request: web.Request) -> web.Response:
         raise web.HTTPUnprocessableEntity(text=e.json())
 
     cursor = query_params.cursor
-    session_factory: DbSessionFactory = get_session_factory_from_request(request)
+    session_factory: DbSessionFactory = get_read_session_factory_from_request(request)
 
     if cursor is not None:
         pagination_per_page = validate_cursor_pagination(
@@ -865,7 +868,7 @@ async def get_account_credit_history(request: web.Request) -> web.Response:
         raise web.HTTPUnprocessableEntity(text=e.json())
 
     cursor = query_params.cursor
-    session_factory: DbSessionFactory = get_session_factory_from_request(request)
+    session_factory: DbSessionFactory = get_read_session_factory_from_request(request)
 
     if cursor is not None:
         pagination_per_page = validate_cursor_pagination(
@@ -1170,7 +1173,7 @@ async def get_account_credit_history_summary(request: web.Request) -> web.Respon
     except ValidationError as e:
         raise web.HTTPUnprocessableEntity(text=e.json())
 
-    session_factory: DbSessionFactory = get_session_factory_from_request(request)
+    session_factory: DbSessionFactory = get_read_session_factory_from_request(request)
 
     with session_factory() as session:
         summary = get_address_credit_history_summary(
@@ -1228,7 +1231,7 @@ async def get_resource_consumed_credits_controller(
     """
     item_hash = get_item_hash_str_from_request(request)
 
-    session_factory: DbSessionFactory = get_session_factory_from_request(request)
+    session_factory: DbSessionFactory = get_read_session_factory_from_request(request)
 
     with session_factory() as session:
         consumed_credits = get_resource_consumed_credits(
@@ -1267,7 +1270,7 @@ async def get_account_post_types(request: web.Request) -> web.Response:
     """
     address = _get_address_from_request(request)
 
-    session_factory: DbSessionFactory = get_session_factory_from_request(request)
+    session_factory: DbSessionFactory = get_read_session_factory_from_request(request)
 
     with session_factory() as session:
         post_types = get_distinct_post_types_for_address(
@@ -1306,7 +1309,7 @@ async def get_account_channels(request: web.Request) -> web.Response:
     """
     address = _get_address_from_request(request)
 
-    session_factory: DbSessionFactory = get_session_factory_from_request(request)
+    session_factory: DbSessionFactory = get_read_session_factory_from_request(request)
 
     with session_factory() as session:
         channels = get_distinct_channels_for_address(session=session, address=address)
@@ -4,22 +4,24 @@ from typing import Dict, List, Optional
 
 from aiohttp import web
 from pydantic import BaseModel, Field, ValidationError, field_validator
-from sqlalchemy import select
 
 from aleph.db.accessors.aggregates import (
-    count_aggregates,
     get_aggregates,
-    get_aggregates_by_owner,
+    get_aggregates_by_owner_async,
+    make_dirty_aggregate_keys_query,
     refresh_aggregate,
 )
-from aleph.db.models import AggregateDb
 from aleph.schemas.messages_query_params import (
     DEFAULT_MESSAGES_PER_PAGE,
     LIST_FIELD_SEPARATOR,
 )
 from aleph.toolkit.cursor import decode_aggregate_cursor, encode_aggregate_cursor
 from aleph.types.sort_order import SortByAggregate, SortOrder
-from aleph.web.controllers.app_state_getters import get_session_factory_from_request
+from aleph.web.controllers.app_state_getters import (
+    get_async_session_factory_from_request,
+    get_node_cache_from_request,
+    get_read_session_factory_from_request,
+)
 from aleph.web.controllers.utils import validate_cursor_pagination
 
 LOGGER = logging.getLogger(__name__)
@@ -117,22 +119,20 @@ async def address_aggregate(request: web.Request) -> web.Response:
         raise web.HTTPUnprocessableEntity(
             text=e.json(), content_type="application/json"
         )
-    session_factory = request.app["session_factory"]
-    with session_factory() as session:
-        dirty_aggregates = session.execute(
-            select(AggregateDb.key).where(
-                (AggregateDb.owner == address)
-                & (AggregateDb.owner == address)
-                & AggregateDb.dirty
-            )
-        ).scalars()
+    async_session_factory = get_async_session_factory_from_request(request)
+    async with async_session_factory() as session:
+        dirty_aggregates = (
+            (await session.execute(make_dirty_aggregate_keys_query(owner=address)))
+            .scalars()
+            .all()
+        )
         for key in dirty_aggregates:
             LOGGER.info("Refreshing dirty aggregate %s/%s", address, key)
-            refresh_aggregate(session=session, owner=address, key=key)
-            session.commit()
+            await session.run_sync(refresh_aggregate, owner=address, key=key)
+            await session.commit()
 
         aggregates = list(
-            get_aggregates_by_owner(
+            await get_aggregates_by_owner_async(
                 session=session,
                 owner=address,
                 with_info=query_params.with_info,
@@ -249,7 +249,7 @@ async def view_aggregates_list(request: web.Request) -> web.Response:
             text=e.json(), content_type="application/json"
         )
 
-    session_factory = get_session_factory_from_request(request)
+    session_factory = get_read_session_factory_from_request(request)
 
     if query_params.cursor is not None:
         pagination = validate_cursor_pagination(
@@ -310,6 +310,13 @@ async def view_aggregates_list(request: web.Request) -> web.Response:
         }
         return web.json_response(output)
 
+    node_cache = get_node_cache_from_request(request)
+    total_aggregates = await node_cache.count_aggregates(
+        session_factory,
+        keys=query_params.keys,
+        addresses=query_params.addresses,
+    )
+
     with session_factory() as session:
         page_aggregates = get_aggregates(
             session=session,
@@ -321,12 +328,6 @@ async def view_aggregates_list(request: web.Request) -> web.Response:
             pagination=query_params.pagination,
         )
 
-        total_aggregates = count_aggregates(
-            session=session,
-            keys=query_params.keys,
-            addresses=query_params.addresses,
-        )
-
         output = {
             "aggregates": [
                 {
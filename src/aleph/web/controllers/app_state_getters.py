@@ -13,10 +13,11 @@ from aleph_p2p_client import AlephP2PServiceClient
 from configmanager import Config
 
 from aleph.chains.signature_verifier import SignatureVerifier
+from aleph.services.cache.message_cache import MessageCache
 from aleph.services.cache.node_cache import NodeCache
 from aleph.services.ipfs import IpfsService
 from aleph.storage import StorageService
-from aleph.types.db_session import DbSessionFactory
+from aleph.types.db_session import AsyncDbSessionFactory, DbSessionFactory
 
 APP_STATE_CONFIG = "config"
 APP_STATE_MQ_CONN = "mq_conn"
@@ -24,9 +25,13 @@ APP_STATE_MQ_CHANNEL = "mq_channel"
 APP_STATE_NODE_CACHE = "node_cache"
 APP_STATE_P2P_CLIENT = "p2p_client"
 APP_STATE_SESSION_FACTORY = "session_factory"
+APP_STATE_ASYNC_SESSION_FACTORY = "async_session_factory"
+APP_STATE_READ_SESSION_FACTORY = "read_session_factory"
+APP_STATE_ASYNC_READ_SESSION_FACTORY = "async_read_session_factory"
 APP_STATE_STORAGE_SERVICE = "storage_service"
 APP_STATE_SIGNATURE_VERIFIER = "signature_verifier"
 APP_STATE_MESSAGE_BROADCASTER = "message_broadcaster"
+APP_STATE_MESSAGE_CACHE = "message_cache"
 APP_STATE_STATUS_BROADCASTER = "status_broadcaster"
 
 T = TypeVar("T")
@@ -81,6 +86,10 @@ def get_node_cache_from_request(request: web.Request) -> NodeCache:
     return cast(NodeCache, request.app[APP_STATE_NODE_CACHE])
 
 
+def get_message_cache_from_request(request: web.Request) -> Optional[MessageCache]:
+    return cast(Optional[MessageCache], request.app.get(APP_STATE_MESSAGE_CACHE))
+
+
 def get_p2p_client_from_request(request: web.Request) -> AlephP2PServiceClient:
     return cast(AlephP2PServiceClient, request.app[APP_STATE_P2P_CLIENT])
 
@@ -89,6 +98,33 @@ def get_session_factory_from_request(request: web.Request) -> DbSessionFactory:
     return cast(DbSessionFactory, request.app[APP_STATE_SESSION_FACTORY])
 
 
+def get_async_session_factory_from_request(
+    request: web.Request,
+) -> AsyncDbSessionFactory:
+    return cast(AsyncDbSessionFactory, request.app[APP_STATE_ASYNC_SESSION_FACTORY])
+
+
+def get_read_session_factory_from_request(request: web.Request) -> DbSessionFactory:
+    """
+    Session factory for read-only queries that tolerate replication lag.
+    Falls back to the primary if no read replica is configured.
+    """
+    if (session_factory := request.app.get(APP_STATE_READ_SESSION_FACTORY)) is None:
+        return get_session_factory_from_request(request)
+    return cast(DbSessionFactory, session_factory)
+
+
+def get_async_read_session_factory_from_request(
+    request: web.Request,
+) -> AsyncDbSessionFactory:
+    """Async version of `get_read_session_factory_from_request`."""
+    if (
+        session_factory := request.app.get(APP_STATE_ASYNC_READ_SESSION_FACTORY)
+    ) is None:
+        return get_async_session_factory_from_request(request)
+    return cast(AsyncDbSessionFactory, session_factory)
+
+
 def get_storage_service_from_request(request: web.Request) -> StorageService:
     return cast(StorageService, request.app[APP_STATE_STORAGE_SERVICE])
 
@@ -17,6 +17,7 @@ from aleph.web.controllers.app_state_getters import (
     get_ipfs_service_from_request,
     get_session_factory_from_request,
     get_signature_verifier_from_request,
+    get_storage_service_from_request,
 )
 from aleph.web.controllers.storage import (
     MultipartUploadedCar,
@@ -229,6 +230,9 @@ async def ipfs_add_file(request: web.Request):
                         session=session, file_hash=cid, hours=grace_period
                     )
                 session.commit()
+            await get_storage_service_from_request(request).notify_content_available(
+                cid
+            )
         except Exception:
             # Bare `Exception` is intentional: any post-pin failure must
             # apply the grace period, including non-HTTP errors like DB
@@ -8,6 +8,7 @@ from aiohttp import WSCloseCode, WSMsgType, web
 from pydantic import BaseModel, ValidationError
 
 from aleph.db.accessors.metrics import query_metric_ccn, query_metric_crn
+from aleph.services.cache.counters import BufferedCounters
 from aleph.services.cache.node_cache import NodeCache
 from aleph.types.db_session import DbSessionFactory
 from aleph.types.sort_order import SortOrderForMetrics
@@ -21,8 +22,10 @@ from aleph.web.controllers.app_state_getters import (
 )
 from aleph.web.controllers.metrics import (
     format_dataclass_for_prometheus,
+    format_peer_scores_for_prometheus,
     get_metrics,
     get_metrics_with_ws,
+    get_pipeline_histograms_for_prometheus,
 )
 
 logger = logging.getLogger(__name__)
@@ -42,11 +45,13 @@ class StatusBroadcaster:
         self,
         session_factory: DbSessionFactory,
         node_cache: NodeCache,
+        counters: BufferedCounters,
         max_connections: int = 1000,
         poll_interval: float = 10.0,
     ):
         self._session_factory = session_factory
         self._node_cache = node_cache
+        self._counters = counters
         self._clients: Set[web.WebSocketResponse] = set()
         self._task: Optional[asyncio.Task] = None
         self._poll_interval = poll_interval
@@ -54,9 +59,9 @@ class StatusBroadcaster:
         # Connection limit (same on every worker — from config).
         self.max_connections: int = max_connections
         self._semaphore = asyncio.Semaphore(max_connections)
-        # Note: counter state lives in Redis (see WS_*_KEY constants). This
-        # class never holds it locally so that all gunicorn workers share
-        # the same observed values.
+        # Note: counter state lives in Redis (see WS_*_KEY constants) so that
+        # all gunicorn workers share the same observed values. Updates are
+        # buffered locally and flushed periodically by `counters`.
 
     @property
     def is_at_capacity(self) -> bool:
@@ -67,22 +72,22 @@ class StatusBroadcaster:
 
     async def record_rejection(self) -> None:
         """Increment the shared 'connection rejected' counter."""
-        await self._node_cache.incr(WS_STATUS_CONNECTIONS_REJECTED_KEY)
+        self._counters.incr(WS_STATUS_CONNECTIONS_REJECTED_KEY)
 
     async def add(self, ws: web.WebSocketResponse):
         if ws in self._clients:
             return
         self._clients.add(ws)
-        await self._node_cache.incr(WS_STATUS_CONNECTIONS_ACTIVE_KEY)
+        self._counters.incr(WS_STATUS_CONNECTIONS_ACTIVE_KEY)
         if self._task is None or self._task.done():
             self._task = asyncio.create_task(self._poll_loop())
 
     async def remove(self, ws: web.WebSocketResponse):
-        # Guard against double-remove: Redis DECR must be idempotent-safe.
+        # Guard against double-remove: the active counter must be idempotent-safe.
         if ws not in self._clients:
             return
         self._clients.discard(ws)
-        await self._node_cache.decr(WS_STATUS_CONNECTIONS_ACTIVE_KEY)
+        self._counters.decr(WS_STATUS_CONNECTIONS_ACTIVE_KEY)
 
     async def shutdown(self):
         """Graceful shutdown — called from aiohttp on_cleanup."""
@@ -91,11 +96,9 @@ class StatusBroadcaster:
             self._task = None
         # Decrement the shared active counter once per client this worker
         # owned, so the Redis value reflects only clients still connected
-        # through other workers.
+        # through other workers. The counters are flushed on app cleanup.
         if self._clients:
-            await self._node_cache.decrby(
-                WS_STATUS_CONNECTIONS_ACTIVE_KEY, len(self._clients)
-            )
+            self._counters.decr(WS_STATUS_CONNECTIONS_ACTIVE_KEY, len(self._clients))
             self._clients.clear()
 
     async def _poll_loop(self):
@@ -220,9 +223,27 @@ async def metrics(request: web.Request) -> web.Response:
             schema:
               type: string
     """
-    return web.Response(
-        text=format_dataclass_for_prometheus(await _get_full_metrics(request))
-    )
+    text = format_dataclass_for_prometheus(await _get_full_metrics(request))
+
+    try:
+        peer_scores = await get_node_cache_from_request(request).get_peer_scores()
+    except Exception:
+        logger.exception("Could not fetch peer scores")
+        peer_scores = {}
+    if peer_scores:
+        text += "\n" + format_peer_scores_for_prometheus(peer_scores)
+
+    try:
+        pipeline_histograms = await get_pipeline_histograms_for_prometheus(
+            get_node_cache_from_request(request)
+        )
+    except Exception:
+        logger.exception("Could not fetch pipeline histograms")
+        pipeline_histograms = ""
+    if pipeline_histograms:
+        text += "\n" + pipeline_histograms
+
+    return web.Response(text=text)
 
 
 async def metrics_json(request: web.Request) -> web.Response:
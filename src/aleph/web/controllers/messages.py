@@ -1,7 +1,9 @@
 import asyncio
 import json
 import logging
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from collections import defaultdict
+from hashlib import sha256
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 import aio_pika.abc
 import aiohttp.web_ws
@@ -52,21 +54,33 @@ from aleph.schemas.messages_query_params import (
     MessageQueryParams,
     WsMessageQueryParams,
 )
+from aleph.services.cache.counters import BufferedCounters
+from aleph.services.cache.message_cache import MessageCache
 from aleph.services.cache.node_cache import NodeCache
 from aleph.toolkit.cursor import decode_message_cursor, encode_message_cursor
+from aleph.toolkit.lru_cache import LRUCache
 from aleph.types.content_format import ContentFormat
 from aleph.types.db_session import DbSession, DbSessionFactory
 from aleph.types.message_status import MessageStatus, RemovedMessageReason
+from aleph.types.sort_order import SortBy
+from aleph.utils import run_in_executor
 from aleph.web.controllers.app_state_getters import (
     APP_STATE_MESSAGE_BROADCASTER,
+    get_async_read_session_factory_from_request,
+    get_async_session_factory_from_request,
     get_config_from_request,
+    get_message_cache_from_request,
     get_node_cache_from_request,
-    get_session_factory_from_request,
+    get_read_session_factory_from_request,
 )
 from aleph.web.controllers.utils import (
+    check_not_modified,
     get_item_hash_from_request,
+    get_page_start,
     get_path_page,
     mq_make_aleph_message_topic_queue,
+    set_etag,
+    set_next_page_start,
     validate_cursor_pagination,
 )
 
@@ -74,6 +88,8 @@ LOGGER = logging.getLogger(__name__)
 
 
 _SEND_BATCH_SIZE = 100
+# Number of messages read from the DB at once by the NDJSON export.
+EXPORT_BATCH_SIZE = 1000
 _HEALTH_CHECK_INTERVAL = 5
 
 # Redis keys for WS message metrics. Shared across gunicorn workers so
@@ -98,6 +114,105 @@ class _WsClient:
         self.exclude_content = exclude_content
 
 
+def _message_tags(message: AlephMessage) -> List[str]:
+    nested_content = getattr(message.content, "content", None)
+    tags = getattr(nested_content, "tags", None) or []
+    # Tags are user-defined, skip values that cannot be used as index keys
+    return [tag for tag in tags if isinstance(tag, str)]
+
+
+# Filters used to index WS clients, from the most to the least selective, and the
+# values of a message for each of them. A client is indexed on its most selective
+# filter only: the other filters are checked by message_matches_filters.
+_INDEXED_FILTERS: List[Tuple[str, Callable[[AlephMessage], Iterable[Any]]]] = [
+    ("hashes", lambda message: [message.item_hash]),
+    (
+        "content_hashes",
+        lambda message: [getattr(message.content, "item_hash", None)],
+    ),
+    ("refs", lambda message: [getattr(message.content, "ref", None)]),
+    ("addresses", lambda message: [message.sender]),
+    ("owners", lambda message: [getattr(message.content, "address", None)]),
+    ("tags", _message_tags),
+    ("content_types", lambda message: [getattr(message.content, "type", None)]),
+    ("channels", lambda message: [message.channel]),
+    ("chains", lambda message: [message.chain]),
+    ("message_type", lambda message: [message.type]),
+]
+
+
+class _SubscriptionIndex:
+    """
+    Inverted index of the WS clients on their filters.
+
+    Finding the clients interested in a message only requires a lookup for each
+    indexed filter, instead of checking the filters of every client. Clients
+    without filters match every message and are kept apart.
+    """
+
+    def __init__(self):
+        self._unfiltered: Set[_WsClient] = set()
+        self._index: Dict[str, Dict[Any, Set[_WsClient]]] = {
+            query_field: defaultdict(set) for query_field, _ in _INDEXED_FILTERS
+        }
+        self._entries: Dict[_WsClient, Tuple[str, List[Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._unfiltered) + len(self._entries)
+
+    def add(self, client: _WsClient) -> None:
+        for query_field, _ in _INDEXED_FILTERS:
+            if values := getattr(client.query_params, query_field):
+                if not isinstance(values, list):
+                    values = [values]
+                for value in values:
+                    self._index[query_field][value].add(client)
+                self._entries[client] = (query_field, values)
+                return
+
+        self._unfiltered.add(client)
+
+    def remove(self, client: _WsClient) -> None:
+        self._unfiltered.discard(client)
+        if (entry := self._entries.pop(client, None)) is None:
+            return
+
+        query_field, values = entry
+        clients_by_value = self._index[query_field]
+        for value in values:
+            clients = clients_by_value.get(value)
+            if clients is None:
+                continue
+            clients.discard(client)
+            if not clients:
+                del clients_by_value[value]
+
+    def clear(self) -> None:
+        self._unfiltered.clear()
+        for clients_by_value in self._index.values():
+            clients_by_value.clear()
+        self._entries.clear()
+
+    def match(self, message: AlephMessage) -> List[_WsClient]:
+        """Returns the clients whose filters match the message."""
+        candidates: Set[_WsClient] = set()
+        for query_field, get_message_values in _INDEXED_FILTERS:
+            clients_by_value = self._index[query_field]
+            if not clients_by_value:
+                continue
+            for value in get_message_values(message):
+                if (clients := clients_by_value.get(value)) is not None:
+                    candidates.update(clients)
+
+        matching_clients = list(self._unfiltered)
+        matching_clients.extend(
+            client
+            for client in candidates
+            if message_matches_filters(message, client.query_params)
+        )
+        return matching_clients
+
+
 class MessageBroadcaster:
     """Single MQ consumer that fans out messages to all connected WS clients."""
 
@@ -106,11 +221,14 @@ class MessageBroadcaster:
         mq_conn: aio_pika.abc.AbstractConnection,
         config: Config,
         node_cache: NodeCache,
+        counters: BufferedCounters,
     ):
         self._mq_conn = mq_conn
         self._config = config
         self._node_cache = node_cache
+        self._counters = counters
         self._clients: Set[_WsClient] = set()
+        self._subscriptions = _SubscriptionIndex()
         self._channel: Optional[aio_pika.abc.AbstractChannel] = None
         self._queue: Optional[aio_pika.abc.AbstractQueue] = None
         self._consumer_tag: Optional[aio_pika.abc.ConsumerTag] = None
@@ -124,13 +242,18 @@ class MessageBroadcaster:
         # Connection limit (same on every worker — from config).
         self.max_connections: int = config.websocket.max_message_connections.value
         self._semaphore = asyncio.Semaphore(self.max_connections)
-        # Note: counter state lives in Redis (see WS_*_KEY constants). This
-        # class never holds it locally so that all gunicorn workers share
-        # the same observed values.
+        # Limits the history replays that run at the same time, for example
+        # when all the clients reconnect after a restart.
+        self._history_semaphore = asyncio.Semaphore(
+            config.websocket.max_concurrent_history_replays.value
+        )
+        # Note: counter state lives in Redis (see WS_*_KEY constants) so that
+        # all gunicorn workers share the same observed values. Updates are
+        # buffered locally and flushed periodically by `counters`.
 
     async def record_rejection(self) -> None:
         """Increment the shared 'connection rejected' counter."""
-        await self._node_cache.incr(WS_MESSAGES_CONNECTIONS_REJECTED_KEY)
+        self._counters.incr(WS_MESSAGES_CONNECTIONS_REJECTED_KEY)
 
     @property
     def is_at_capacity(self) -> bool:
@@ -139,6 +262,9 @@ class MessageBroadcaster:
     def acquire_slot(self) -> asyncio.Semaphore:
         return self._semaphore
 
+    def acquire_history_slot(self) -> asyncio.Semaphore:
+        return self._history_semaphore
+
     async def _start_consumer(self):
         """Create channel, queue, and consumer."""
         self._channel = await self._mq_conn.channel()
@@ -177,7 +303,7 @@ class MessageBroadcaster:
 
     async def _restart_consumer(self):
         """Restart the consumer after a channel failure."""
-        await self._node_cache.incr(WS_BROADCASTER_CONSUMER_RESTARTS_KEY)
+        self._counters.incr(WS_BROADCASTER_CONSUMER_RESTARTS_KEY)
         LOGGER.warning("MessageBroadcaster: restarting consumer")
         async with self._consumer_lock:
             await self._stop_consumer()
@@ -202,7 +328,8 @@ class MessageBroadcaster:
         if client in self._clients:
             return
         self._clients.add(client)
-        await self._node_cache.incr(WS_MESSAGES_CONNECTIONS_ACTIVE_KEY)
+        self._subscriptions.add(client)
+        self._counters.incr(WS_MESSAGES_CONNECTIONS_ACTIVE_KEY)
         # Start the shared consumer and health task exactly once, even when
         # many clients connect concurrently. The lock makes the
         # check-and-start atomic so a second queue is never bound.
@@ -213,11 +340,12 @@ class MessageBroadcaster:
                 self._health_task = asyncio.create_task(self._health_check_loop())
 
     async def remove(self, client: _WsClient):
-        # Guard against double-remove: Redis DECR must be idempotent-safe.
+        # Guard against double-remove: the active counter must be idempotent-safe.
         if client not in self._clients:
             return
         self._clients.discard(client)
-        await self._node_cache.decr(WS_MESSAGES_CONNECTIONS_ACTIVE_KEY)
+        self._subscriptions.remove(client)
+        self._counters.decr(WS_MESSAGES_CONNECTIONS_ACTIVE_KEY)
         if not self._clients:
             if self._health_task and not self._health_task.done():
                 self._health_task.cancel()
@@ -234,12 +362,11 @@ class MessageBroadcaster:
             await self._stop_consumer()
         # Decrement the shared active counter once per client this worker
         # owned, so the Redis value reflects only clients still connected
-        # through other workers.
+        # through other workers. The counters are flushed on app cleanup.
         if self._clients:
-            await self._node_cache.decrby(
-                WS_MESSAGES_CONNECTIONS_ACTIVE_KEY, len(self._clients)
-            )
+            self._counters.decr(WS_MESSAGES_CONNECTIONS_ACTIVE_KEY, len(self._clients))
             self._clients.clear()
+            self._subscriptions.clear()
 
     async def _on_message(self, mq_message: aio_pika.abc.AbstractMessage):
         """Called for each message from RabbitMQ. Fan out to matching clients."""
@@ -251,8 +378,8 @@ class MessageBroadcaster:
             LOGGER.exception("MessageBroadcaster: failed to parse MQ message")
             return
 
-        await self._node_cache.incr(WS_MESSAGES_BROADCAST_TOTAL_KEY)
-        clients = list(self._clients)
+        self._counters.incr(WS_MESSAGES_BROADCAST_TOTAL_KEY)
+        clients = self._subscriptions.match(message)
         if not clients:
             return
 
@@ -301,8 +428,6 @@ class MessageBroadcaster:
         """Send a message to a single client. Returns False if client is dead."""
         if client.ws.closed:
             return False
-        if not message_matches_filters(message, client.query_params):
-            return True
         try:
             payload = json_no_content if client.exclude_content else json_full
             await client.ws.send_str(payload)
@@ -364,6 +489,32 @@ def message_to_dict(
     return message_dict
 
 
+# Serialized messages, see serialize_message.
+_SERIALIZED_MESSAGES: LRUCache[Tuple[str, ContentFormat, int], bytes] = LRUCache(
+    maxsize=10_000
+)
+
+
+def serialize_message(
+    message: MessageDb, content_format: ContentFormat = ContentFormat.FULL
+) -> bytes:
+    """
+    Serializes `message_to_dict(message, content_format)` to JSON.
+
+    Processed messages do not change, except for new confirmations. Serializations
+    are cached per message, content format and number of confirmations.
+    """
+    key = (message.item_hash, content_format, len(message.confirmations))
+    serialized_message = _SERIALIZED_MESSAGES.get(key)
+    if serialized_message is None:
+        serialized_message = aleph_json.dumps(
+            message_to_dict(message, content_format=content_format)
+        )
+        _SERIALIZED_MESSAGES.set(key, serialized_message)
+
+    return serialized_message
+
+
 def format_response_dict(
     messages: List[Dict[str, Any]], pagination: int, page: int, total_messages: int
 ) -> Dict[str, Any]:
@@ -429,7 +580,7 @@ def _list_forgotten_messages(
     for key in ("content_format", "exclude_content", "cursor", "message_statuses"):
         find_filters.pop(key, None)
 
-    session_factory = get_session_factory_from_request(request)
+    session_factory = get_read_session_factory_from_request(request)
     with session_factory() as session:
         forgotten_messages = list(
             session.execute(
@@ -486,7 +637,7 @@ def _list_removed_messages(
     for key in ("content_format", "exclude_content", "cursor", "message_statuses"):
         find_filters.pop(key, None)
 
-    session_factory = get_session_factory_from_request(request)
+    session_factory = get_read_session_factory_from_request(request)
     with session_factory() as session:
         removed_messages = list(
             session.execute(
@@ -735,7 +886,8 @@ async def view_messages_list(request: web.Request) -> web.Response:
     pagination_per_page = query_params.pagination
     cursor = find_filters.pop("cursor", None)
 
-    session_factory = get_session_factory_from_request(request)
+    session_factory = get_read_session_factory_from_request(request)
+    async_session_factory = get_async_read_session_factory_from_request(request)
 
     if cursor is not None:
         # Cursor mode: no count needed
@@ -759,8 +911,8 @@ async def view_messages_list(request: web.Request) -> web.Response:
         if content_format != ContentFormat.FULL:
             messages_query = messages_query.options(defer(MessageDb.content))
 
-        with session_factory() as session:
-            messages = list(session.execute(messages_query).scalars())
+        async with async_session_factory() as session:
+            messages = list((await session.execute(messages_query)).scalars())
 
         has_more = len(messages) > pagination_per_page
         if has_more:
@@ -786,21 +938,51 @@ async def view_messages_list(request: web.Request) -> web.Response:
     else:
         # Legacy page mode (backward compat)
         pagination_page = query_params.page
+        node_cache = get_node_cache_from_request(request)
+        page_boundary_ttl = get_config_from_request(
+            request
+        ).perf.page_boundary_cache_ttl.value
+
+        # Deep pages are fetched from the closest known page boundary with
+        # the cursor predicate, instead of a large OFFSET.
+        use_page_boundaries = (
+            page_boundary_ttl > 0
+            and pagination_per_page > 0
+            and query_params.sort_by == SortBy.TIME
+            and not query_params.start_block
+            and not query_params.end_block
+        )
+        boundary_filters = {k: v for k, v in find_filters.items() if k != "page"}
+        page_filters = dict(find_filters)
+        if use_page_boundaries:
+            page, after_time, after_hash = await get_page_start(
+                node_cache, boundary_filters, pagination_page
+            )
+            page_filters.update(page=page, after_time=after_time, after_hash=after_hash)
 
-        with session_factory() as session:
-            messages_query = make_matching_messages_query(
-                include_confirmations=True, **find_filters
+        messages_query = make_matching_messages_query(
+            include_confirmations=True, **page_filters
+        )
+        if content_format != ContentFormat.FULL:
+            messages_query = messages_query.options(defer(MessageDb.content))
+        async with async_session_factory() as session:
+            messages = list((await session.execute(messages_query)).scalars())
+
+        if use_page_boundaries and len(messages) == pagination_per_page:
+            await set_next_page_start(
+                node_cache,
+                boundary_filters,
+                page=pagination_page,
+                last_time=messages[-1].time,
+                last_hash=messages[-1].item_hash,
+                ttl=page_boundary_ttl,
             )
-            if content_format != ContentFormat.FULL:
-                messages_query = messages_query.options(defer(MessageDb.content))
-            messages = list(session.execute(messages_query).scalars())
 
         # If the result set is smaller than the page size, we already know
         # the total count without running a separate COUNT query.
         if pagination_per_page and len(messages) < pagination_per_page:
             total_msgs = (pagination_page - 1) * pagination_per_page + len(messages)
         else:
-            node_cache = get_node_cache_from_request(request)
             total_msgs = await node_cache.count_messages(session_factory, query_params)
 
         return format_response(
@@ -812,6 +994,100 @@ async def view_messages_list(request: web.Request) -> web.Response:
         )
 
 
+async def view_messages_export(request: web.Request) -> web.StreamResponse:
+    """
+    Export all the messages matching the filters as newline-delimited JSON.
+
+    Messages are read from the DB in batches and written to the response as they
+    come, so the memory used does not depend on the number of messages.
+
+    ---
+    summary: Export messages
+    tags:
+      - Messages
+    description: >-
+      Accepts the same filters as /api/v0/messages.json. Pagination parameters
+      are ignored: every matching message is returned, one JSON object per line.
+      Forgotten and removed messages cannot be exported.
+    responses:
+      '200':
+        description: Matching messages, one per line
+        content:
+          application/x-ndjson:
+            schema:
+              type: object
+      '422':
+        description: Validation error
+    """
+
+    try:
+        query_params = MessageQueryParams.model_validate(request.query)
+    except ValidationError as e:
+        raise web.HTTPUnprocessableEntity(text=e.json())
+
+    if query_params.cursor is not None:
+        raise web.HTTPUnprocessableEntity(
+            text="cursor is not supported, the export returns all matching messages"
+        )
+    if set(query_params.message_statuses or []) & {
+        MessageStatus.FORGOTTEN,
+        MessageStatus.REMOVED,
+    }:
+        raise web.HTTPUnprocessableEntity(
+            text="forgotten and removed messages cannot be exported"
+        )
+
+    content_format: ContentFormat = query_params.content_format or ContentFormat.FULL
+    find_filters = query_params.model_dump(
+        exclude_none=True,
+        exclude={"content_format", "exclude_content", "cursor", "page", "pagination"},
+    )
+
+    messages_query = make_matching_messages_query(
+        include_confirmations=True, page=1, pagination=0, **find_filters
+    ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    if content_format != ContentFormat.FULL:
+        messages_query = messages_query.options(defer(MessageDb.content))
+
+    response = web.StreamResponse()
+    response.content_type = "application/x-ndjson"
+    await response.prepare(request)
+
+    session_factory = get_read_session_factory_from_request(request)
+    with session_factory() as session:
+        # Server-side cursor: only one batch of messages is in memory at a time.
+        batches = session.execute(messages_query).scalars().partitions()
+        while batch := await run_in_executor(None, next, batches, None):
+            lines = b"".join(
+                aleph_json.dumps(message_to_dict(message, content_format)) + b"\n"
+                for message in batch
+            )
+            # Waits for the client to read the data, i.e. no more batches are
+            # read from the DB than the client can consume.
+            await response.write(lines)
+
+    await response.write_eof()
+    return response
+
+
+def _get_history(
+    session_factory: DbSessionFactory,
+    history: int,
+    find_filters: Dict[str, Any],
+    content_format: ContentFormat,
+) -> List[MessageDb]:
+    messages_query = make_matching_messages_query(
+        pagination=history,
+        include_confirmations=True,
+        **find_filters,
+    )
+    if content_format != ContentFormat.FULL:
+        messages_query = messages_query.options(defer(MessageDb.content))
+
+    with session_factory() as session:
+        return list(session.execute(messages_query).scalars())
+
+
 async def _send_history_to_ws(
     ws: aiohttp.web_ws.WebSocketResponse,
     session_factory: DbSessionFactory,
@@ -822,26 +1098,33 @@ async def _send_history_to_ws(
     content_format: ContentFormat = query_params.content_format or ContentFormat.FULL
     find_filters.pop("content_format", None)
     find_filters.pop("exclude_content", None)
+    find_filters.pop("history_batch", None)
 
     # The websocket payload supports two states only: content present or absent.
     # `headers` is not implemented here, so it degrades to `none`.
     if content_format == ContentFormat.HEADERS:
         content_format = ContentFormat.NONE
 
-    messages_query = make_matching_messages_query(
-        pagination=history,
-        include_confirmations=True,
-        **find_filters,
+    messages = await run_in_executor(
+        None, _get_history, session_factory, history, find_filters, content_format
     )
-    if content_format != ContentFormat.FULL:
-        messages_query = messages_query.options(defer(MessageDb.content))
+    # Oldest messages first
+    serialized_messages = [
+        serialize_message(message, content_format) for message in reversed(messages)
+    ]
 
-    with session_factory() as session:
-        messages = list(session.execute(messages_query).scalars())
+    if query_params.history_batch:
+        await ws.send_str(
+            (b"[" + b",".join(serialized_messages) + b"]").decode("utf-8")
+        )
+        return
 
-    for message in reversed(messages):
-        msg_dict = message_to_dict(message, content_format=content_format)
-        await ws.send_str(aleph_json.dumps(msg_dict).decode("utf-8"))
+    # One frame per message. Yield to the event loop between batches so that
+    # replays do not delay the live fan-out.
+    for i in range(0, len(serialized_messages), _SEND_BATCH_SIZE):
+        for serialized_message in serialized_messages[i : i + _SEND_BATCH_SIZE]:
+            await ws.send_str(serialized_message.decode("utf-8"))
+        await asyncio.sleep(0)
 
 
 def message_matches_filters(
@@ -922,7 +1205,7 @@ async def messages_ws(request: web.Request) -> web.WebSocketResponse:
         return ws
 
     async with broadcaster.acquire_slot():
-        session_factory = get_session_factory_from_request(request)
+        session_factory = get_read_session_factory_from_request(request)
 
         try:
             query_params = WsMessageQueryParams.model_validate(request.query)
@@ -933,12 +1216,13 @@ async def messages_ws(request: web.Request) -> web.WebSocketResponse:
 
         if history:
             try:
-                await _send_history_to_ws(
-                    ws=ws,
-                    session_factory=session_factory,
-                    history=history,
-                    query_params=query_params,
-                )
+                async with broadcaster.acquire_history_slot():
+                    await _send_history_to_ws(
+                        ws=ws,
+                        session_factory=session_factory,
+                        history=history,
+                        query_params=query_params,
+                    )
             except ConnectionError:
                 LOGGER.info("Could not send history, aborting message websocket")
                 return ws
@@ -1079,6 +1363,29 @@ def _get_message_with_status(
     raise NotImplementedError(f"Unknown message status: {status}")
 
 
+def _load_message_with_status(session: DbSession, item_hash: str) -> MessageWithStatus:
+    message_status_db = get_message_status(
+        session=session, item_hash=ItemHash(item_hash)
+    )
+    if message_status_db is None:
+        raise web.HTTPNotFound()
+    return _get_message_with_status(session=session, status_db=message_status_db)
+
+
+def _message_response(request: web.Request, body: bytes) -> web.Response:
+    """
+    Returns the response of view_message, or 304 if the client already has it.
+
+    The status and confirmations of a message change over time, so the ETag is
+    derived from the response itself.
+    """
+    etag = sha256(body).hexdigest()
+    check_not_modified(request, etag)
+    response = web.json_response(body=body)
+    set_etag(response, etag)
+    return response
+
+
 async def view_message(request: web.Request):
     """
     Get a single message by item hash.
@@ -1105,16 +1412,29 @@ async def view_message(request: web.Request):
     """
     item_hash = get_item_hash_from_request(request)
 
-    session_factory: DbSessionFactory = request.app["session_factory"]
-    with session_factory() as session:
-        message_status_db = get_message_status(session=session, item_hash=item_hash)
-        if message_status_db is None:
-            raise web.HTTPNotFound()
-        message_with_status = _get_message_with_status(
-            session=session, status_db=message_status_db
+    message_cache = get_message_cache_from_request(request)
+    if message_cache is not None:
+        cached_response = await message_cache.get(item_hash, MessageCache.MESSAGE)
+        if cached_response is not None:
+            return _message_response(request, cached_response)
+        cache_version = message_cache.version
+
+    async_session_factory = get_async_session_factory_from_request(request)
+    async with async_session_factory() as session:
+        message_with_status = await session.run_sync(
+            _load_message_with_status, item_hash
+        )
+
+    body = message_with_status.model_dump_json().encode()
+    # Only processed messages are stable enough to be cached.
+    if message_cache is not None and isinstance(
+        message_with_status, ProcessedMessageStatus
+    ):
+        await message_cache.set(
+            item_hash, MessageCache.MESSAGE, body, version=cache_version
         )
 
-    return web.json_response(text=message_with_status.model_dump_json())
+    return _message_response(request, body)
 
 
 async def view_message_content(request: web.Request):
@@ -1148,13 +1468,22 @@ async def view_message_content(request: web.Request):
     """
     item_hash = get_item_hash_from_request(request)
 
-    session_factory: DbSessionFactory = request.app["session_factory"]
-    with session_factory() as session:
-        message_status_db = get_message_status(session=session, item_hash=item_hash)
-        if message_status_db is None:
-            raise web.HTTPNotFound()
-        message_with_status = _get_message_with_status(
-            session=session, status_db=message_status_db
+    # The content of a message is determined by its hash.
+    check_not_modified(request, item_hash)
+
+    message_cache = get_message_cache_from_request(request)
+    if message_cache is not None:
+        cached_response = await message_cache.get(item_hash, MessageCache.CONTENT)
+        if cached_response is not None:
+            response = web.json_response(body=cached_response)
+            set_etag(response, item_hash)
+            return response
+        cache_version = message_cache.version
+
+    async_session_factory = get_async_session_factory_from_request(request)
+    async with async_session_factory() as session:
+        message_with_status = await session.run_sync(
+            _load_message_with_status, item_hash
         )
 
     if not isinstance(message_with_status, ProcessedMessageStatus):
@@ -1173,7 +1502,15 @@ async def view_message_content(request: web.Request):
         # POST messages wrap the user payload in content.content
         content = content["content"]
 
-    return web.json_response(text=json.dumps(content))
+    body = json.dumps(content).encode()
+    if message_cache is not None:
+        await message_cache.set(
+            item_hash, MessageCache.CONTENT, body, version=cache_version
+        )
+
+    response = web.json_response(body=body)
+    set_etag(response, item_hash)
+    return response
 
 
 async def view_message_status(request: web.Request):
@@ -1278,7 +1615,7 @@ async def view_message_hashes(request: web.Request):
     pagination_page = query_params.page
     pagination_per_page = query_params.pagination
 
-    session_factory = get_session_factory_from_request(request)
+    session_factory = get_read_session_factory_from_request(request)
     with session_factory() as session:
         hashes = get_matching_hashes(session, **find_filters)
 
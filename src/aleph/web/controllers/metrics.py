@@ -7,7 +7,7 @@ from urllib.parse import urljoin
 
 import aiohttp
 from aiocache import cached
-from aleph_message.models import Chain
+from aleph_message.models import Chain, MessageType
 from dataclasses_json import DataClassJsonMixin
 from web3 import AsyncHTTPProvider, AsyncWeb3
 
@@ -15,14 +15,17 @@ from aleph.config import get_config
 from aleph.db.accessors.chains import get_last_height
 from aleph.db.accessors.messages import count_matching_messages_fast
 from aleph.db.models import FilePinDb, PeerDb, PendingMessageDb, PendingTxDb
-from aleph.services.cache.node_cache import NodeCache
+from aleph.services.cache.node_cache import NodeCache, PeerScore
 from aleph.toolkit.metrics_keys import (
+    PIPELINE_STAGE_DURATION_METRIC,
     STORE_FETCH_IPFS_DURATION_MS_SUM_KEY,
     STORE_FETCH_IPFS_FAILED_KEY,
     STORE_FETCH_IPFS_TOTAL_KEY,
     STORE_FETCH_STORAGE_DURATION_MS_SUM_KEY,
     STORE_FETCH_STORAGE_FAILED_KEY,
     STORE_FETCH_STORAGE_TOTAL_KEY,
+    PipelineStage,
+    pipeline_stage_keys,
 )
 from aleph.types.chain_sync import ChainEventType
 from aleph.types.db_session import DbSessionFactory
@@ -73,6 +76,71 @@ def format_dataclass_for_prometheus(instance) -> str:
     return "\n".join(result)
 
 
+def format_peer_scores_for_prometheus(peer_scores: Dict[str, PeerScore]) -> str:
+    """Turn HTTP peer scores into Prometheus text format, one series per peer."""
+
+    fields = {
+        "pyaleph_p2p_peer_latency_seconds": "latency",
+        "pyaleph_p2p_peer_success_rate": "success_rate",
+        "pyaleph_p2p_peer_bytes_per_second": "bytes_per_second",
+        "pyaleph_p2p_peer_requests_total": "requests",
+        "pyaleph_p2p_peer_score": "score",
+    }
+
+    result = []
+    for metric_name, field in fields.items():
+        for peer_uri, peer_score in sorted(peer_scores.items()):
+            labels = format_dict_for_prometheus({"peer": peer_uri})
+            result.append(f"{metric_name}{labels} {getattr(peer_score, field)}")
+    return "\n".join(result)
+
+
+async def get_pipeline_histograms_for_prometheus(node_cache: NodeCache) -> str:
+    """
+    Read the pipeline stage latency histograms from Redis and turn them into
+    Prometheus text format. Histograms without observations are skipped.
+    """
+
+    histograms = [
+        (stage, message_type, *pipeline_stage_keys(stage, message_type))
+        for stage in PipelineStage
+        for message_type in MessageType
+    ]
+    keys = [
+        key
+        for _, _, bucket_keys, count_key, duration_ms_sum_key in histograms
+        for key in (*bucket_keys.values(), count_key, duration_ms_sum_key)
+    ]
+    values = iter(_parse_int_value(value) for value in await node_cache.get_many(keys))
+
+    result = []
+    for stage, message_type, bucket_keys, _, _ in histograms:
+        bucket_counts = {le: next(values) for le in bucket_keys}
+        count, duration_ms_sum = next(values), next(values)
+        if not count:
+            continue
+
+        labels = {"stage": stage.value, "message_type": message_type.value}
+        cumulative_count = 0
+        for le, bucket_count in bucket_counts.items():
+            cumulative_count += bucket_count
+            bucket_labels = format_dict_for_prometheus({**labels, "le": le})
+            result.append(
+                f"{PIPELINE_STAGE_DURATION_METRIC}_bucket{bucket_labels} {cumulative_count}"
+            )
+        formatted_labels = format_dict_for_prometheus(labels)
+        result.append(
+            f"{PIPELINE_STAGE_DURATION_METRIC}_sum{formatted_labels} {duration_ms_sum / 1000}"
+        )
+        result.append(
+            f"{PIPELINE_STAGE_DURATION_METRIC}_count{formatted_labels} {count}"
+        )
+
+    if not result:
+        return ""
+    return "\n".join([f"# TYPE {PIPELINE_STAGE_DURATION_METRIC} histogram", *result])
+
+
 @dataclass
 class BuildInfo:
     """Dataclass used to export aleph node build info."""
@@ -234,9 +302,8 @@ async def get_metrics(
     )
 
 
-async def _read_int_key(node_cache: NodeCache, key: str) -> int:
-    """Read an integer Redis value. Returns 0 if the key does not exist."""
-    value = await node_cache.get(key)
+def _parse_int_value(value: Optional[bytes]) -> int:
+    """Parse an integer Redis value. Returns 0 if the key does not exist."""
     if value is None:
         return 0
     try:
@@ -245,6 +312,23 @@ async def _read_int_key(node_cache: NodeCache, key: str) -> int:
         return 0
 
 
+# Metrics fields read from Redis, with their key.
+_REDIS_METRICS_KEYS = {
+    "pyaleph_ws_messages_broadcast_total": _WS_MESSAGES_BROADCAST_TOTAL_KEY,
+    "pyaleph_ws_messages_connections_active": _WS_MESSAGES_CONNECTIONS_ACTIVE_KEY,
+    "pyaleph_ws_messages_connections_rejected_total": _WS_MESSAGES_CONNECTIONS_REJECTED_KEY,
+    "pyaleph_ws_broadcaster_consumer_restarts_total": _WS_BROADCASTER_CONSUMER_RESTARTS_KEY,
+    "pyaleph_ws_status_connections_active": _WS_STATUS_CONNECTIONS_ACTIVE_KEY,
+    "pyaleph_ws_status_connections_rejected_total": _WS_STATUS_CONNECTIONS_REJECTED_KEY,
+    "pyaleph_store_fetch_ipfs_total": STORE_FETCH_IPFS_TOTAL_KEY,
+    "pyaleph_store_fetch_ipfs_failed_total": STORE_FETCH_IPFS_FAILED_KEY,
+    "pyaleph_store_fetch_ipfs_duration_ms_sum": STORE_FETCH_IPFS_DURATION_MS_SUM_KEY,
+    "pyaleph_store_fetch_storage_total": STORE_FETCH_STORAGE_TOTAL_KEY,
+    "pyaleph_store_fetch_storage_failed_total": STORE_FETCH_STORAGE_FAILED_KEY,
+    "pyaleph_store_fetch_storage_duration_ms_sum": STORE_FETCH_STORAGE_DURATION_MS_SUM_KEY,
+}
+
+
 async def get_metrics_with_ws(
     session_factory: DbSessionFactory,
     node_cache: NodeCache,
@@ -258,43 +342,10 @@ async def get_metrics_with_ws(
     # Copy to avoid mutating the cached dataclass
     metrics = replace(cached_metrics)
 
-    # Counters and active gauges: shared Redis state.
-    metrics.pyaleph_ws_messages_broadcast_total = await _read_int_key(
-        node_cache, _WS_MESSAGES_BROADCAST_TOTAL_KEY
-    )
-    metrics.pyaleph_ws_messages_connections_active = await _read_int_key(
-        node_cache, _WS_MESSAGES_CONNECTIONS_ACTIVE_KEY
-    )
-    metrics.pyaleph_ws_messages_connections_rejected_total = await _read_int_key(
-        node_cache, _WS_MESSAGES_CONNECTIONS_REJECTED_KEY
-    )
-    metrics.pyaleph_ws_broadcaster_consumer_restarts_total = await _read_int_key(
-        node_cache, _WS_BROADCASTER_CONSUMER_RESTARTS_KEY
-    )
-    metrics.pyaleph_ws_status_connections_active = await _read_int_key(
-        node_cache, _WS_STATUS_CONNECTIONS_ACTIVE_KEY
-    )
-    metrics.pyaleph_ws_status_connections_rejected_total = await _read_int_key(
-        node_cache, _WS_STATUS_CONNECTIONS_REJECTED_KEY
-    )
-    metrics.pyaleph_store_fetch_ipfs_total = await _read_int_key(
-        node_cache, STORE_FETCH_IPFS_TOTAL_KEY
-    )
-    metrics.pyaleph_store_fetch_ipfs_failed_total = await _read_int_key(
-        node_cache, STORE_FETCH_IPFS_FAILED_KEY
-    )
-    metrics.pyaleph_store_fetch_ipfs_duration_ms_sum = await _read_int_key(
-        node_cache, STORE_FETCH_IPFS_DURATION_MS_SUM_KEY
-    )
-    metrics.pyaleph_store_fetch_storage_total = await _read_int_key(
-        node_cache, STORE_FETCH_STORAGE_TOTAL_KEY
-    )
-    metrics.pyaleph_store_fetch_storage_failed_total = await _read_int_key(
-        node_cache, STORE_FETCH_STORAGE_FAILED_KEY
-    )
-    metrics.pyaleph_store_fetch_storage_duration_ms_sum = await _read_int_key(
-        node_cache, STORE_FETCH_STORAGE_DURATION_MS_SUM_KEY
-    )
+    # Counters and active gauges: shared Redis state, read in a single round trip.
+    values = await node_cache.get_many(list(_REDIS_METRICS_KEYS.values()))
+    for field_name, value in zip(_REDIS_METRICS_KEYS, values):
+        setattr(metrics, field_name, _parse_int_value(value))
 
     # Config-value gauges: same on every worker, read from the local instance.
     if message_broadcaster:
@@ -1,5 +1,5 @@
 import datetime as dt
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from aiohttp import web
 from aleph_message.models import ItemHash
@@ -16,8 +16,7 @@ from sqlalchemy import select
 from aleph.db.accessors.posts import (
     MergedPost,
     MergedPostV0,
-    count_matching_posts,
-    get_matching_posts,
+    get_matching_posts_async,
     get_matching_posts_legacy,
 )
 from aleph.db.models import ChainTxDb, message_confirmations
@@ -26,13 +25,22 @@ from aleph.schemas.messages_query_params import (
     DEFAULT_PAGE,
     LIST_FIELD_SEPARATOR,
 )
+from aleph.services.cache.node_cache import NodeCache
 from aleph.toolkit.cursor import decode_message_cursor, encode_message_cursor
 from aleph.types.db_session import DbSession, DbSessionFactory
 from aleph.types.sort_order import SortBy, SortOrder
+from aleph.web.controllers.app_state_getters import (
+    get_async_read_session_factory_from_request,
+    get_config_from_request,
+    get_node_cache_from_request,
+    get_read_session_factory_from_request,
+)
 from aleph.web.controllers.utils import (
     Pagination,
     cond_output,
+    get_page_start,
     get_path_page,
+    set_next_page_start,
     validate_cursor_pagination,
 )
 
@@ -187,6 +195,55 @@ def merged_post_v0_to_dict(
     }
 
 
+async def _get_page_filters(
+    request: web.Request, node_cache: NodeCache, find_filters: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Returns the filters used to fetch the requested page and, if the page can be
+    fetched from a page boundary instead of with an OFFSET, the filters that
+    identify the boundaries of the query.
+    """
+    config = get_config_from_request(request)
+    if (
+        not config.perf.page_boundary_cache_ttl.value
+        or not find_filters.get("pagination")
+        or find_filters.get("sort_by") != SortBy.TIME
+    ):
+        return find_filters, None
+
+    boundary_filters = {k: v for k, v in find_filters.items() if k != "page"}
+    page, after_time, after_hash = await get_page_start(
+        node_cache, boundary_filters, find_filters["page"]
+    )
+    page_filters = {
+        **find_filters,
+        "page": page,
+        "after_time": after_time,
+        "after_hash": after_hash,
+    }
+    return page_filters, boundary_filters
+
+
+async def _set_next_page_start(
+    request: web.Request,
+    node_cache: NodeCache,
+    boundary_filters: Optional[Dict[str, Any]],
+    page: int,
+    posts: List[Any],
+) -> None:
+    if boundary_filters is None or len(posts) < boundary_filters["pagination"]:
+        return
+
+    await set_next_page_start(
+        node_cache,
+        boundary_filters,
+        page=page,
+        last_time=posts[-1].last_updated,
+        last_hash=posts[-1].original_item_hash,
+        ttl=get_config_from_request(request).perf.page_boundary_cache_ttl.value,
+    )
+
+
 def get_query_params(request: web.Request) -> PostQueryParams:
     try:
         query_params = PostQueryParams.model_validate(request.query)
@@ -290,7 +347,7 @@ async def view_posts_list_v0(request: web.Request) -> web.Response:
 
     cursor = find_filters.pop("cursor", None)
 
-    session_factory: DbSessionFactory = request.app["session_factory"]
+    session_factory: DbSessionFactory = get_read_session_factory_from_request(request)
 
     if cursor is not None:
         pagination_per_page = validate_cursor_pagination(cursor, pagination_per_page)
@@ -332,11 +389,20 @@ async def view_posts_list_v0(request: web.Request) -> web.Response:
         }
         return cond_output(request, context, "TODO.html")
 
+    node_cache = get_node_cache_from_request(request)
+    total_posts = await node_cache.count_posts(session_factory, find_filters)
+    page_filters, boundary_filters = await _get_page_filters(
+        request, node_cache, find_filters
+    )
+
     with session_factory() as session:
-        total_posts = count_matching_posts(session=session, **find_filters)
-        results = get_matching_posts_legacy(session=session, **find_filters)
+        results = list(get_matching_posts_legacy(session=session, **page_filters))
         posts = [merged_post_v0_to_dict(session, post) for post in results]
 
+    await _set_next_page_start(
+        request, node_cache, boundary_filters, page=pagination_page, posts=results
+    )
+
     context = {"posts": posts}
 
     if pagination_per_page is not None:
@@ -461,7 +527,8 @@ async def view_posts_list_v1(request) -> web.Response:
 
     cursor = find_filters.pop("cursor", None)
 
-    session_factory: DbSessionFactory = request.app["session_factory"]
+    session_factory: DbSessionFactory = get_read_session_factory_from_request(request)
+    async_session_factory = get_async_read_session_factory_from_request(request)
 
     if cursor is not None:
         pagination_per_page = validate_cursor_pagination(cursor, pagination_per_page)
@@ -474,11 +541,11 @@ async def view_posts_list_v1(request) -> web.Response:
             find_filters["after_time"] = after_time
             find_filters["after_hash"] = after_hash
 
-        with session_factory() as session:
-            results = get_matching_posts(
+        async with async_session_factory() as session:
+            results = await get_matching_posts_async(
                 session=session, cursor_mode=True, **find_filters
             )
-            posts = [merged_post_to_dict(post) for post in results]
+        posts = [merged_post_to_dict(post) for post in results]
 
         has_more = len(posts) > pagination_per_page
         if has_more:
@@ -499,10 +566,19 @@ async def view_posts_list_v1(request) -> web.Response:
         }
         return cond_output(request, context, "TODO.html")
 
-    with session_factory() as session:
-        total_posts = count_matching_posts(session=session, **find_filters)
-        results = get_matching_posts(session=session, **find_filters)
-        posts = [merged_post_to_dict(post) for post in results]
+    node_cache = get_node_cache_from_request(request)
+    total_posts = await node_cache.count_posts(session_factory, find_filters)
+    page_filters, boundary_filters = await _get_page_filters(
+        request, node_cache, find_filters
+    )
+
+    async with async_session_factory() as session:
+        results = await get_matching_posts_async(session=session, **page_filters)
+    posts = [merged_post_to_dict(post) for post in results]
+
+    await _set_next_page_start(
+        request, node_cache, boundary_filters, page=pagination_page, posts=results
+    )
 
     context = {"posts": posts}
 
@@ -66,6 +66,7 @@ from aleph.types.cost import CostType
 from aleph.types.db_session import DbSession
 from aleph.types.message_status import MessageStatus
 from aleph.web.controllers.app_state_getters import (
+    get_read_session_factory_from_request,
     get_session_factory_from_request,
     get_storage_service_from_request,
 )
@@ -704,7 +705,7 @@ async def get_costs(request: web.Request) -> web.Response:
             text="include_details=2 requires at least one of 'address' or 'item_hash' filters to avoid fetching breakdowns for all resources"
         )
 
-    session_factory = get_session_factory_from_request(request)
+    session_factory = get_read_session_factory_from_request(request)
 
     with session_factory() as session:
         # Get cost summary
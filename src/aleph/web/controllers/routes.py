@@ -71,6 +71,7 @@ def register_routes(app: web.Application, swagger: Optional[SwaggerDocs]):
         web.get("/api/v0/channels/list.json", channels.used_channels),
         web.get("/api/v0/info/public.json", info.public_multiaddress),
         web.get("/api/v0/messages.json", messages.view_messages_list),
+        web.get("/api/v0/messages.ndjson", messages.view_messages_export),
         web.post("/api/v0/messages", p2p.pub_message),
         web.get("/api/v0/messages/hashes", messages.view_message_hashes),
         web.get("/api/v0/messages/{item_hash}", messages.view_message),
@@ -50,10 +50,13 @@ from aleph.web.controllers.app_state_getters import (
     get_storage_service_from_request,
 )
 from aleph.web.controllers.utils import (
+    CONTENT_CACHE_CONTROL,
     add_grace_period_for_file,
     broadcast_and_process_message,
     broadcast_status_to_http_status,
+    check_not_modified,
     mq_make_aleph_message_topic_queue,
+    set_etag,
 )
 
 logger = logging.getLogger(__name__)
@@ -580,6 +583,8 @@ async def get_hash(request):
         logger.warning(e.args[0])
         raise web.HTTPBadRequest(text="Invalid hash provided")
 
+    check_not_modified(request, file_hash, CONTENT_CACHE_CONTROL)
+
     config = get_config_from_request(request)
     max_file_size = config.storage.max_file_size.value
 
@@ -612,6 +617,7 @@ async def get_hash(request):
     }
 
     response = await run_in_executor(None, web.json_response, result)
+    set_etag(response, file_hash, CONTENT_CACHE_CONTROL)
     response.enable_compression()
     return response
 
@@ -653,6 +659,8 @@ async def get_raw_hash(request):
     except UnknownHashError:
         raise web.HTTPBadRequest(text="Invalid hash")
 
+    check_not_modified(request, file_hash, CONTENT_CACHE_CONTROL)
+
     session_factory = get_session_factory_from_request(request)
     with session_factory() as session:
         file_metadata = get_file(session=session, file_hash=file_hash)
@@ -676,7 +684,9 @@ async def get_raw_hash(request):
         # but the actual tar archive streamed from IPFS /get has a different size.
         if not is_directory:
             headers["Content-Length"] = str(size)
-        return web.Response(status=200, headers=headers)
+        response = web.Response(status=200, headers=headers)
+        set_etag(response, file_hash, CONTENT_CACHE_CONTROL)
+        return response
 
     storage_service = get_storage_service_from_request(request)
 
@@ -702,6 +712,7 @@ async def get_raw_hash(request):
     if not is_directory:
         response.content_length = size
     response.headers["Accept-Ranges"] = "none"
+    set_etag(response, file_hash, CONTENT_CACHE_CONTROL)
 
     await response.prepare(request)
 
@@ -4,12 +4,12 @@ import json
 import logging
 from io import BytesIO, StringIO
 from math import ceil
-from typing import Any, Dict, List, Mapping, Optional, Union, overload
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union, overload
 
 import aio_pika
 import aio_pika.abc
 import aiohttp_jinja2
-from aiohttp import web
+from aiohttp import hdrs, web
 from aiohttp.web_request import FileField
 from aleph_message.models import ItemHash
 from aleph_p2p_client import AlephP2PServiceClient
@@ -20,8 +20,10 @@ import aleph.toolkit.json as aleph_json
 from aleph.db.accessors.files import insert_grace_period_file_pin
 from aleph.schemas.messages_query_params import DEFAULT_MESSAGES_PER_PAGE
 from aleph.schemas.pending_messages import BasePendingMessage, parse_message
+from aleph.services.cache.node_cache import NodeCache
 from aleph.services.ipfs import IpfsService
 from aleph.services.p2p.pubsub import publish as pub_p2p
+from aleph.toolkit.cursor import decode_message_cursor, encode_message_cursor
 from aleph.toolkit.shield import shielded
 from aleph.toolkit.timestamp import utc_now
 from aleph.types.db_session import DbSession
@@ -463,3 +465,86 @@ def validate_cursor_pagination(cursor: Optional[str], pagination: int) -> int:
             text="pagination=0 is not allowed with cursor-based pagination"
         )
     return min(pagination, CURSOR_MAX_PAGINATION)
+
+
+async def get_page_start(
+    node_cache: NodeCache, filters: Dict[str, Any], page: int
+) -> Tuple[int, Optional[dt.datetime], Optional[str]]:
+    """
+    Converts a page number into a keyset position, to avoid large OFFSETs.
+
+    Returns the page relative to the closest known page boundary and the
+    (time, item hash) keyset of that boundary. If no boundary is known, the page
+    is returned as is, without keyset.
+
+    :param filters: Query filters, including the page size but not the page.
+    """
+    if page <= 1:
+        return page, None, None
+
+    boundary = await node_cache.get_page_boundary(filters, page)
+    if boundary is None:
+        return page, None, None
+
+    boundary_page, cursor = boundary
+    after_time, after_hash = decode_message_cursor(cursor)
+    return page - boundary_page + 1, after_time, after_hash
+
+
+async def set_next_page_start(
+    node_cache: NodeCache,
+    filters: Dict[str, Any],
+    page: int,
+    last_time: dt.datetime,
+    last_hash: str,
+    ttl: int,
+) -> None:
+    """
+    Records the keyset of the last item of a page as the start of the next page.
+    """
+    await node_cache.set_page_boundary(
+        filters, page + 1, encode_message_cursor(last_time, last_hash), ttl=ttl
+    )
+
+
+# Hash-addressed content never changes, but it can be deleted by a FORGET
+# message or the garbage collector. Caches must revalidate it regularly so that
+# deleted content is not served for long.
+CONTENT_CACHE_CONTROL = "public, max-age=3600"
+
+
+def check_not_modified(
+    request: web.Request, etag: str, cache_control: Optional[str] = None
+) -> None:
+    """
+    Raises 304 Not Modified if the If-None-Match header of the request matches
+    the (strong) ETag of the resource.
+
+    Call it before any DB or storage access when the ETag can be derived from the
+    request alone, e.g. from a content hash.
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return
+
+    # If-None-Match uses the weak comparison: W/"x" matches "x". "*" is ignored
+    # as the resource may not exist.
+    if any(tag.value == etag for tag in if_none_match):
+        raise web.HTTPNotModified(headers=_cache_headers(etag, cache_control))
+
+
+def set_etag(
+    response: web.StreamResponse, etag: str, cache_control: Optional[str] = None
+) -> None:
+    """
+    Sets the ETag and Cache-Control headers of a response. Must be called before
+    the response is prepared.
+    """
+    response.headers.update(_cache_headers(etag, cache_control))
+
+
+def _cache_headers(etag: str, cache_control: Optional[str]) -> Dict[str, str]:
+    headers: Dict[str, str] = {hdrs.ETAG: f'"{etag}"'}
+    if cache_control is not None:
+        headers[hdrs.CACHE_CONTROL] = cache_control
+    return headers
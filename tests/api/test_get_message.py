@@ -4,6 +4,7 @@ from typing import Any, Mapping, Sequence
 import pytest
 import pytz
 from aleph_message.models import Chain, ItemType, MessageType
+from sqlalchemy import update
 
 from aleph.db.models import (
     ForgottenMessageDb,
@@ -21,10 +22,12 @@ from aleph.schemas.api.messages import (
     RemovedMessageStatus,
     RemovingMessageStatus,
 )
+from aleph.services.cache.message_cache import MessageCache
 from aleph.toolkit.timestamp import timestamp_to_datetime
 from aleph.types.channel import Channel
 from aleph.types.db_session import DbSessionFactory
 from aleph.types.message_status import ErrorCode, MessageStatus, RemovedMessageReason
+from aleph.web.controllers.app_state_getters import APP_STATE_MESSAGE_CACHE
 
 MESSAGE_URI = "/api/v0/messages/{}"
 MESSAGE_CONTENT_URI = "/api/v0/messages/{}/content"
@@ -409,3 +412,86 @@ async def test_get_pending_message_status(
         assert "retries" not in response_json["messages"][0]
         assert "fetched" not in response_json["messages"][0]
         assert "check_message" not in response_json["messages"][0]
+
+
+@pytest.mark.asyncio
+async def test_get_message_from_cache(
+    fixture_messages_with_status: Mapping[MessageStatus, Sequence[Any]],
+    session_factory: DbSessionFactory,
+    aiohttp_client,
+    ccn_test_aiohttp_app,
+    mocker,
+):
+    message_cache = MessageCache(engine=mocker.MagicMock(), max_size=10)
+    message_cache._start_listening()
+    ccn_test_aiohttp_app[APP_STATE_MESSAGE_CACHE] = message_cache
+    ccn_api_client = await aiohttp_client(ccn_test_aiohttp_app)
+
+    processed_message = fixture_messages_with_status[MessageStatus.PROCESSED][0]
+    item_hash = processed_message.item_hash
+
+    response = await ccn_api_client.get(MESSAGE_URI.format(item_hash))
+    assert response.status == 200, await response.text()
+    cached_response = await response.read()
+
+    with session_factory() as session:
+        session.execute(
+            update(MessageStatusDb)
+            .where(MessageStatusDb.item_hash == item_hash)
+            .values(status=MessageStatus.FORGOTTEN)
+        )
+        session.commit()
+
+    # Served from the cache until the database notifies the change
+    response = await ccn_api_client.get(MESSAGE_URI.format(item_hash))
+    assert response.status == 200, await response.text()
+    assert await response.read() == cached_response
+
+    message_cache._on_notification(
+        None, 0, MessageCache.NOTIFICATION_CHANNEL, item_hash
+    )
+    response = await ccn_api_client.get(MESSAGE_URI.format(item_hash))
+    assert response.status == 404, await response.text()
+
+
+@pytest.mark.asyncio
+async def test_get_message_not_modified(
+    fixture_messages_with_status: Mapping[MessageStatus, Sequence[Any]],
+    ccn_api_client,
+    mocker,
+):
+    processed_message = fixture_messages_with_status[MessageStatus.PROCESSED][0]
+    item_hash = processed_message.item_hash
+
+    # The content ETag is the item hash, 304s do not read the DB
+    response = await ccn_api_client.get(MESSAGE_CONTENT_URI.format(item_hash))
+    assert response.status == 200, await response.text()
+    assert response.headers["ETag"] == f'"{item_hash}"'
+
+    get_message_status_mock = mocker.patch(
+        "aleph.web.controllers.messages.get_message_status"
+    )
+    response = await ccn_api_client.get(
+        MESSAGE_CONTENT_URI.format(item_hash),
+        headers={"If-None-Match": f'"{item_hash}"'},
+    )
+    assert response.status == 304
+    get_message_status_mock.assert_not_called()
+    mocker.stopall()
+
+    # The ETag of the message changes with its status and confirmations
+    response = await ccn_api_client.get(MESSAGE_URI.format(item_hash))
+    assert response.status == 200, await response.text()
+    etag = response.headers["ETag"]
+
+    response = await ccn_api_client.get(
+        MESSAGE_URI.format(item_hash), headers={"If-None-Match": etag}
+    )
+    assert response.status == 304
+    assert response.headers["ETag"] == etag
+
+    response = await ccn_api_client.get(
+        MESSAGE_URI.format(item_hash), headers={"If-None-Match": '"outdated"'}
+    )
+    assert response.status == 200, await response.text()
+    assert response.headers["ETag"] == etag
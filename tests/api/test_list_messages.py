@@ -35,6 +35,7 @@ from .utils import get_messages_by_keys
 
 MESSAGES_URI = "/api/v0/messages.json"
 MESSAGES_PAGE_URI = "/api/v0/messages/page/{page}.json"
+MESSAGES_EXPORT_URI = "/api/v0/messages.ndjson"
 
 
 def check_message_fields(messages: Iterable[Dict]):
@@ -585,6 +586,77 @@ async def test_pagination(fixture_messages, ccn_api_client):
         assert response.status == 422, await response.text()
 
 
+@pytest.mark.asyncio()
+async def test_pagination_from_page_boundaries(fixture_messages, ccn_api_client):
+    """
+    Pages after a page that was already served start from its last message
+    instead of using an OFFSET. The results must be the same.
+    """
+    all_messages = await fetch_messages_with_pagination_expect_success(
+        ccn_api_client, page=1, pagination=0
+    )
+    all_hashes = [msg["item_hash"] for msg in all_messages]
+    pagination = 2
+
+    async def fetch_page_hashes(page: int):
+        messages = await fetch_messages_with_pagination_expect_success(
+            ccn_api_client, page=page, pagination=pagination
+        )
+        return [msg["item_hash"] for msg in messages]
+
+    def expected_page_hashes(page: int):
+        return all_hashes[(page - 1) * pagination : page * pagination]
+
+    # Page 3 relative to the boundary recorded by page 1
+    assert await fetch_page_hashes(1) == expected_page_hashes(1)
+    assert await fetch_page_hashes(3) == expected_page_hashes(3)
+
+    n_pages = (len(all_hashes) + pagination - 1) // pagination
+    for page in range(1, n_pages + 2):
+        assert await fetch_page_hashes(page) == expected_page_hashes(page)
+
+
+async def export_messages(api_client, **params) -> List[Dict[str, Any]]:
+    response = await api_client.get(MESSAGES_EXPORT_URI, params=params)
+    assert response.status == 200, await response.text()
+    assert response.content_type == "application/x-ndjson"
+    body = await response.text()
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.mark.asyncio()
+async def test_export_messages(fixture_messages, ccn_api_client, mocker):
+    # Read the messages in several batches
+    mocker.patch("aleph.web.controllers.messages.EXPORT_BATCH_SIZE", 3)
+
+    all_messages = await fetch_messages_with_pagination_expect_success(
+        ccn_api_client, page=1, pagination=0
+    )
+    exported_messages = await export_messages(ccn_api_client, pagination=2)
+    check_message_fields(exported_messages)
+    assert [msg["item_hash"] for msg in exported_messages] == [
+        msg["item_hash"] for msg in all_messages
+    ]
+    assert_messages_equal(exported_messages, fixture_messages)
+
+    exported_messages = await export_messages(ccn_api_client, channels="unit-tests")
+    assert_messages_equal(
+        exported_messages, get_messages_by_keys(fixture_messages, channel="unit-tests")
+    )
+    assert all(msg["channel"] == "unit-tests" for msg in exported_messages)
+
+
+@pytest.mark.asyncio()
+async def test_export_messages_invalid_params(fixture_messages, ccn_api_client):
+    for params in (
+        {"cursor": ""},
+        {"msgStatuses": "forgotten"},
+        {"pagination": -1},
+    ):
+        response = await ccn_api_client.get(MESSAGES_EXPORT_URI, params=params)
+        assert response.status == 422, params
+
+
 @pytest.mark.asyncio()
 @pytest.mark.parametrize("sort_order", [-1, 1])
 async def test_sort_by_tx_time(fixture_messages, ccn_api_client, sort_order: int):
@@ -937,6 +1009,41 @@ async def test_exclude_content_ws_history_default(
         assert "content" in payload
 
 
+@pytest.mark.asyncio
+async def test_ws_history_batch(
+    fixture_messages: Sequence[Dict[str, Any]],
+    session_factory: DbSessionFactory,
+):
+    """_send_history_to_ws with historyBatch=true sends a single JSON array."""
+    from unittest.mock import AsyncMock
+
+    from aleph.web.controllers.messages import _send_history_to_ws
+
+    history = len(fixture_messages)
+
+    ws = AsyncMock()
+    await _send_history_to_ws(
+        ws=ws,
+        session_factory=session_factory,
+        history=history,
+        query_params=WsMessageQueryParams(history=history),
+    )
+    expected_messages = [
+        json.loads(call.args[0]) for call in ws.send_str.call_args_list
+    ]
+
+    ws = AsyncMock()
+    await _send_history_to_ws(
+        ws=ws,
+        session_factory=session_factory,
+        history=history,
+        query_params=WsMessageQueryParams(history=history, historyBatch=True),
+    )
+
+    assert ws.send_str.call_count == 1
+    assert json.loads(ws.send_str.call_args.args[0]) == expected_messages
+
+
 @pytest.mark.asyncio
 async def test_ws_history_connection_error_is_swallowed(mocker):
     """A lost peer during history streaming must abort the WS, not 500.
@@ -967,7 +1074,9 @@ async def test_ws_history_connection_error_is_swallowed(mocker):
     config.websocket.heartbeat.value = 1
     mocker.patch.object(messages_module, "get_config_from_request", return_value=config)
     mocker.patch.object(
-        messages_module, "get_session_factory_from_request", return_value=MagicMock()
+        messages_module,
+        "get_read_session_factory_from_request",
+        return_value=MagicMock(),
     )
 
     @asynccontextmanager
@@ -481,6 +481,55 @@ async def test_get_raw_hash_head(api_client, session_factory: DbSessionFactory,
     storage_service.get_hash_content.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_get_raw_hash_not_modified(
+    api_client, session_factory: DbSessionFactory, mocker
+):
+    file_content = b"Some content"
+    file_hash = "0214e5578f5acb5d36ea62255cbf1157a4bdde7b9612b5db4899b2175e310b6f"
+    with session_factory() as session:
+        upsert_file(
+            session=session,
+            file_hash=file_hash,
+            size=len(file_content),
+            file_type=FileType.FILE,
+        )
+        session.commit()
+
+    storage_service = api_client.app[APP_STATE_STORAGE_SERVICE]
+    await storage_service.storage_engine.write(file_hash, file_content)
+
+    response = await api_client.get(f"{GET_STORAGE_RAW_URI}/{file_hash}")
+    assert response.status == 200
+    etag = response.headers["ETag"]
+    assert etag == f'"{file_hash}"'
+    # Forgotten content must not stay in caches for long
+    assert response.headers["Cache-Control"] == "public, max-age=3600"
+
+    # Revalidations are answered without reading the DB or the storage
+    get_file_mock = mocker.patch("aleph.web.controllers.storage.get_file")
+    mocker.patch.object(storage_service, "get_hash_content")
+    mocker.patch.object(storage_service, "get_hash_content_iterator")
+    for uri in (GET_STORAGE_RAW_URI, GET_STORAGE_URI):
+        response = await api_client.get(
+            f"{uri}/{file_hash}", headers={"If-None-Match": etag}
+        )
+        assert response.status == 304
+        assert response.headers["ETag"] == etag
+        assert await response.read() == b""
+    get_file_mock.assert_not_called()
+    storage_service.get_hash_content.assert_not_called()
+    storage_service.get_hash_content_iterator.assert_not_called()
+
+    mocker.stopall()
+
+    response = await api_client.get(
+        f"{GET_STORAGE_RAW_URI}/{file_hash}", headers={"If-None-Match": '"other"'}
+    )
+    assert response.status == 200
+    assert response.headers["ETag"] == etag
+
+
 @pytest.mark.asyncio
 async def test_get_raw_hash_streaming(
     api_client, session_factory: DbSessionFactory, mocker
@@ -15,3 +15,11 @@ def test_repair_flag_enables_repair():
 def test_no_repair_flag_disables_repair():
     args = parse_args(["--no-repair"])
     assert args.repair is False
+
+
+def test_requeue_dead_letters():
+    assert parse_args([]).requeue_dead_letters is None
+    assert parse_args(["--requeue-dead-letters"]).requeue_dead_letters == []
+    assert parse_args(
+        ["--requeue-dead-letters", "hash-1", "hash-2"]
+    ).requeue_dead_letters == ["hash-1", "hash-2"]
@@ -29,7 +29,13 @@ from sqlalchemy import text
 
 import aleph.config
 from aleph.db.accessors.files import insert_message_file_pin, upsert_file_tag
-from aleph.db.connection import make_db_url, make_engine, make_session_factory
+from aleph.db.connection import (
+    make_async_engine,
+    make_async_session_factory,
+    make_db_url,
+    make_engine,
+    make_session_factory,
+)
 from aleph.db.models import (
     AlephBalanceDb,
     MessageStatusDb,
@@ -37,6 +43,7 @@ from aleph.db.models import (
     StoredFileDb,
 )
 from aleph.db.models.aggregates import AggregateDb, AggregateElementDb
+from aleph.services.cache.message_cache import MessageCache
 from aleph.services.cache.node_cache import NodeCache
 from aleph.services.ipfs import IpfsService
 from aleph.services.storage.fileystem_engine import FileSystemStorageEngine
@@ -49,12 +56,14 @@ from aleph.toolkit.constants import (
     SETTINGS_AGGREGATE_KEY,
     SETTINGS_AGGREGATE_OWNER,
 )
+from aleph.toolkit.metrics_keys import PIPELINE_STAGE_DURATION_METRIC
 from aleph.toolkit.timestamp import timestamp_to_datetime
 from aleph.types.db_session import DbSession, DbSessionFactory
 from aleph.types.files import FileTag, FileType
 from aleph.types.message_status import MessageStatus
 from aleph.web import create_aiohttp_app
 from aleph.web.controllers.app_state_getters import (
+    APP_STATE_ASYNC_SESSION_FACTORY,
     APP_STATE_CONFIG,
     APP_STATE_NODE_CACHE,
     APP_STATE_P2P_CLIENT,
@@ -113,6 +122,16 @@ def session_factory(mock_config):
     return make_session_factory(engine)
 
 
+@pytest_asyncio.fixture
+async def async_session_factory(session_factory):
+    # Depends on session_factory, which resets the DB schema.
+    engine = make_async_engine(
+        config=aleph.config.app_config, application_name="aleph-tests"
+    )
+    yield make_async_session_factory(engine)
+    await engine.dispose()
+
+
 def _create_test_config() -> Config:
     """Create a fresh config with test-specific values."""
     config: Config = Config(aleph.config.get_defaults())
@@ -175,6 +194,17 @@ async def node_cache(mock_config: Config):
         redis_port=mock_config.redis.port.value,
         message_count_cache_ttl=mock_config.perf.message_count_cache_ttl.value,
     ) as node_cache:
+        # Cached values must not leak from one test to the next
+        for prefix in (
+            NodeCache.MESSAGE_COUNT_KEY_PREFIX,
+            NodeCache.POST_COUNT_KEY_PREFIX,
+            NodeCache.AGGREGATE_COUNT_KEY_PREFIX,
+            NodeCache.PAGE_BOUNDARIES_KEY_PREFIX,
+            MessageCache.REDIS_KEY_PREFIX,
+            PIPELINE_STAGE_DURATION_METRIC,
+        ):
+            async for key in node_cache.redis_client.scan_iter(f"{prefix}*"):
+                await node_cache.redis_client.delete(key)
         yield node_cache
 
 
@@ -199,7 +229,13 @@ async def test_storage_service(mock_config: Config, mocker) -> StorageService:
 
 
 @pytest.fixture
-def ccn_test_aiohttp_app(mocker, mock_config, session_factory, node_cache: NodeCache):
+def ccn_test_aiohttp_app(
+    mocker,
+    mock_config,
+    session_factory,
+    async_session_factory,
+    node_cache: NodeCache,
+):
     # Make aiohttp return the stack trace on 500 errors
     event_loop = asyncio.get_event_loop()
     event_loop.set_debug(True)
@@ -210,6 +246,7 @@ def ccn_test_aiohttp_app(mocker, mock_config, session_factory, node_cache: NodeC
     app[APP_STATE_P2P_CLIENT] = mocker.AsyncMock()
     app[APP_STATE_STORAGE_SERVICE] = mocker.AsyncMock()
     app[APP_STATE_SESSION_FACTORY] = session_factory
+    app[APP_STATE_ASYNC_SESSION_FACTORY] = async_session_factory
 
     return app
 
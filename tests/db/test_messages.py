@@ -1,20 +1,26 @@
 import datetime as dt
 from copy import copy
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import pytest
 import pytz
 from aleph_message.models import Chain, ItemHash, ItemType, MessageType
 from message_test_helpers import make_validated_message_from_dict
-from sqlalchemy import insert, select, text
+from sqlalchemy import insert, inspect, select, text
 
 from aleph.db.accessors.messages import (
     append_to_forgotten_by,
+    append_to_forgotten_by_many,
+    count_matching_messages,
+    count_matching_messages_by_day,
     forget_message,
+    forget_messages,
     get_distinct_channels,
     get_forgotten_message,
     get_message_by_item_hash,
     get_message_status,
+    get_message_statuses,
+    get_messages_by_item_hashes,
     get_unconfirmed_messages,
     make_confirmation_upsert_query,
     make_message_upsert_query,
@@ -62,6 +68,20 @@ def fixture_message() -> MessageDb:
     )
 
 
+def make_message_copy(message: MessageDb, **kwargs) -> MessageDb:
+    """
+    Returns a new message with the columns of `message`, updated with `kwargs`.
+    Unlike copy(), the new message does not share the ORM state of `message`
+    and can be added to the same session.
+    """
+
+    columns = {
+        column.key: getattr(message, column.key)
+        for column in inspect(MessageDb).column_attrs
+    }
+    return MessageDb(**{**columns, **kwargs})
+
+
 def assert_messages_equal(expected: MessageDb, actual: MessageDb):
     assert actual.item_hash == expected.item_hash
     assert actual.chain == expected.chain
@@ -186,6 +206,73 @@ async def test_message_count(
         assert fast_count == 1
 
 
+@pytest.mark.asyncio
+async def test_count_matching_messages_by_day(
+    session_factory: DbSessionFactory, fixture_message: MessageDb
+):
+    start_time = fixture_message.time
+    messages = []
+    for i, (chain, channel, hours) in enumerate(
+        [
+            (Chain.ETH, "CHANEL-N5", 0),
+            (Chain.ETH, "TEST", 3),
+            (Chain.SOL, "TEST", 30),
+            (Chain.ETH, None, 50),
+            (Chain.SOL, "CHANEL-N5", 100),
+        ]
+    ):
+        messages.append(
+            make_message_copy(
+                fixture_message,
+                item_hash=f"{i:064x}",
+                chain=chain,
+                channel=Channel(channel) if channel is not None else None,
+                time=start_time + dt.timedelta(hours=hours),
+            )
+        )
+
+    with session_factory() as session:
+        session.add_all(messages)
+        session.commit()
+
+    day = dt.timedelta(days=1)
+    filters_list: List[Dict[str, Any]] = [
+        {"chains": [Chain.SOL]},
+        {"channels": ["TEST", "CHANEL-N5"]},
+        {"message_types": [MessageType.aggregate], "chains": [Chain.ETH]},
+        {"message_types": [MessageType.post]},
+        {"message_statuses": [MessageStatus.PROCESSED], "channels": ["TEST"]},
+        {"start_date": start_time + dt.timedelta(hours=1)},
+        {"end_date": start_time + 2 * day},
+        {"start_date": start_time, "end_date": start_time + dt.timedelta(hours=2)},
+        {
+            "chains": [Chain.ETH, Chain.SOL],
+            "start_date": start_time - 10 * day,
+            "end_date": start_time + 10 * day,
+        },
+        {
+            "channels": ["TEST"],
+            "start_date": start_time.timestamp(),
+            "end_date": (start_time + 2 * day).timestamp(),
+        },
+    ]
+
+    with session_factory() as session:
+        assert count_matching_messages_by_day(session) == len(messages)
+        for filters in filters_list:
+            assert count_matching_messages_by_day(
+                session, **filters
+            ) == count_matching_messages(session, **filters), filters
+
+    # The trigger keeps the counters in sync with deletions
+    with session_factory() as session:
+        session.delete(session.get(MessageDb, messages[2].item_hash))
+        session.commit()
+
+    with session_factory() as session:
+        assert count_matching_messages_by_day(session, chains=[Chain.SOL]) == 1
+
+
 @pytest.mark.asyncio
 async def test_upsert_query_confirmation(
     session_factory: DbSessionFactory, fixture_message: MessageDb
@@ -498,6 +585,74 @@ async def test_forget_message(
         ]
 
 
+@pytest.mark.asyncio
+async def test_forget_messages(
+    session_factory: DbSessionFactory, fixture_message: MessageDb
+):
+    other_message = make_message_copy(fixture_message, item_hash="b" * 64)
+    item_hashes = [fixture_message.item_hash, other_message.item_hash]
+
+    with session_factory() as session:
+        for message in (fixture_message, other_message):
+            session.add(message)
+            session.add(
+                MessageStatusDb(
+                    item_hash=message.item_hash,
+                    status=MessageStatus.PROCESSED,
+                    reception_time=message.time,
+                )
+            )
+        session.commit()
+
+    forget_message_hash = "c" * 64
+    forgotten_at = dt.datetime(2023, 5, 1, tzinfo=dt.timezone.utc)
+
+    with session_factory() as session:
+        assert {
+            message.item_hash
+            for message in get_messages_by_item_hashes(
+                session=session, item_hashes=item_hashes + ["d" * 64]
+            )
+        } == set(item_hashes)
+
+        forget_messages(
+            session=session,
+            item_hashes=item_hashes,
+            forget_message_hash=forget_message_hash,
+            forgotten_at=forgotten_at,
+        )
+        # No-op
+        forget_messages(
+            session=session,
+            item_hashes=[],
+            forget_message_hash=forget_message_hash,
+            forgotten_at=forgotten_at,
+        )
+        append_to_forgotten_by_many(
+            session=session,
+            forgotten_message_hashes=item_hashes,
+            forget_message_hash="e" * 64,
+        )
+        session.commit()
+
+        assert not get_messages_by_item_hashes(session=session, item_hashes=item_hashes)
+        message_statuses = get_message_statuses(
+            session=session, item_hashes=item_hashes
+        )
+        assert {status.item_hash for status in message_statuses} == set(item_hashes)
+        assert all(
+            status.status == MessageStatus.FORGOTTEN for status in message_statuses
+        )
+
+        for item_hash in item_hashes:
+            forgotten_message = get_forgotten_message(
+                session=session, item_hash=item_hash
+            )
+            assert forgotten_message
+            assert forgotten_message.forgotten_by == [forget_message_hash, "e" * 64]
+            assert forgotten_message.forgotten_at == forgotten_at
+
+
 @pytest.mark.asyncio
 async def test_forget_message_with_confirmations(
     session_factory: DbSessionFactory, fixture_message: MessageDb
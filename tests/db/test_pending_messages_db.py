@@ -1,16 +1,19 @@
 import datetime as dt
-from typing import List
+import json
+from typing import List, Set
 
 import pytest
 from aleph_message.models import Chain, ItemType, MessageType
 
 from aleph.db.accessors.pending_messages import (
     count_pending_messages,
+    get_next_pending_message,
     get_next_pending_messages,
 )
 from aleph.db.models import ChainTxDb, PendingMessageDb
 from aleph.types.chain_sync import ChainSyncProtocol
 from aleph.types.db_session import DbSessionFactory
+from aleph.types.message_shard import MessageShard
 
 
 @pytest.fixture
@@ -148,3 +151,45 @@ async def test_get_pending_messages(
         )
         assert len(pending_messages) == 2
         assert [m.id for m in pending_messages] == [404, 27]
+
+
+@pytest.mark.asyncio
+async def test_get_next_pending_message_shards(
+    session_factory: DbSessionFactory, fixture_pending_messages: List[PendingMessageDb]
+):
+    for pending_message in fixture_pending_messages:
+        assert pending_message.item_content is not None
+        pending_message.content = json.loads(pending_message.item_content)
+
+    with session_factory() as session:
+        session.add_all(fixture_pending_messages)
+        session.commit()
+
+    current_time = max(
+        pending_message.next_attempt for pending_message in fixture_pending_messages
+    )
+    nb_shards = 2
+    shards = [MessageShard(nb_shards=nb_shards, index=i) for i in range(nb_shards)]
+    shards.append(MessageShard(nb_shards=nb_shards))
+
+    item_hashes_by_shard = {}
+    with session_factory() as session:
+        for shard in shards:
+            item_hashes: Set[str] = set()
+            while next_message := get_next_pending_message(
+                session=session,
+                current_time=current_time,
+                exclude_item_hashes=list(item_hashes),
+                shard=shard,
+            ):
+                item_hashes.add(next_message.item_hash)
+            item_hashes_by_shard[shard.name] = item_hashes
+
+    # The FORGET goes to the global shard
+    assert item_hashes_by_shard["global"] == {
+        "448b3c6f6455e6f4216b01b43522bddc3564a14c04799ed0ce8af4857c7ba15f"
+    }
+    # The AGGREGATE and the STORE have the same owner: they go to the same shard
+    assert sorted(
+        len(item_hashes_by_shard[shard.name]) for shard in shards[:nb_shards]
+    ) == [0, 2]
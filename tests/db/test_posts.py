@@ -14,6 +14,7 @@ from aleph.db.accessors.posts import (
     count_matching_posts,
     delete_post,
     get_matching_posts,
+    get_matching_posts_async,
     get_matching_posts_legacy,
     get_original_post,
     get_post,
@@ -23,7 +24,7 @@ from aleph.db.models import ChainTxDb, MessageDb, message_confirmations
 from aleph.db.models.posts import PostDb
 from aleph.types.chain_sync import ChainSyncProtocol
 from aleph.types.channel import Channel
-from aleph.types.db_session import DbSessionFactory
+from aleph.types.db_session import AsyncDbSessionFactory, DbSessionFactory
 from aleph.types.sort_order import SortBy, SortOrder
 
 
@@ -329,6 +330,35 @@ async def test_get_matching_posts(
         assert nb_matching_channel_posts == 1
 
 
+@pytest.mark.asyncio
+async def test_get_matching_posts_async(
+    original_post: PostDb,
+    first_amend_post: PostDb,
+    post_from_second_user: PostDb,
+    session_factory: DbSessionFactory,
+    async_session_factory: AsyncDbSessionFactory,
+):
+    with session_factory() as session:
+        session.add(original_post)
+        session.add(first_amend_post)
+        original_post.latest_amend = first_amend_post.item_hash
+        session.add(post_from_second_user)
+        session.commit()
+
+    async with async_session_factory() as session:
+        matching_posts = await get_matching_posts_async(session=session)
+        assert len(matching_posts) == 2
+
+        matching_hash_posts = await get_matching_posts_async(
+            session=session, hashes=[original_post.item_hash]
+        )
+        assert_posts_equal(
+            merged_post=one(matching_hash_posts),
+            original=original_post,
+            last_amend=first_amend_post,
+        )
+
+
 @pytest.mark.asyncio
 async def test_get_matching_posts_legacy(
     original_post: PostDb,
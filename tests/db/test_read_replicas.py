@@ -0,0 +1,108 @@
+import asyncio
+from typing import Optional
+
+import pytest
+
+from aleph.db.read_replicas import ReadReplica, ReadReplicas
+
+
+def _make_replica(mocker, name: str, lag: Optional[float]) -> ReadReplica:
+    return ReadReplica(
+        name=name,
+        engine=mocker.MagicMock(),
+        async_engine=mocker.MagicMock(),
+        session_factory=mocker.MagicMock(return_value=name),
+        async_session_factory=mocker.MagicMock(return_value=name),
+        lag=lag,
+    )
+
+
+def _make_read_replicas(mocker, *replicas: ReadReplica) -> ReadReplicas:
+    return ReadReplicas(
+        session_factory=mocker.MagicMock(return_value="primary"),
+        async_session_factory=mocker.MagicMock(return_value="primary"),
+        replicas=list(replicas),
+        max_staleness=5,
+        check_interval=2,
+        check_timeout=0.05,
+    )
+
+
+def test_read_replicas_round_robin(mocker):
+    read_replicas = _make_read_replicas(
+        mocker,
+        _make_replica(mocker, "replica-1", lag=0),
+        _make_replica(mocker, "replica-2", lag=4.5),
+        # Too far behind the primary
+        _make_replica(mocker, "replica-3", lag=30),
+        # Unreachable
+        _make_replica(mocker, "replica-4", lag=None),
+    )
+
+    sessions = [read_replicas.session() for _ in range(4)]
+    assert sessions == ["replica-1", "replica-2", "replica-1", "replica-2"]
+    assert read_replicas.async_session() in ("replica-1", "replica-2")
+
+
+def test_read_replicas_fallback_to_primary(mocker):
+    assert _make_read_replicas(mocker).session() == "primary"
+
+    read_replicas = _make_read_replicas(
+        mocker,
+        _make_replica(mocker, "replica-1", lag=10),
+        _make_replica(mocker, "replica-2", lag=None),
+    )
+    assert read_replicas.session() == "primary"
+    assert read_replicas.async_session() == "primary"
+
+
+@pytest.mark.asyncio
+async def test_read_replicas_check_lags(mocker):
+    replica = _make_replica(mocker, "replica-1", lag=None)
+    connection = mocker.AsyncMock()
+    connection.execute.return_value.scalar = mocker.MagicMock(return_value=1.5)
+    replica.async_engine.connect.return_value.__aenter__.return_value = connection
+    read_replicas = _make_read_replicas(mocker, replica)
+
+    await read_replicas.check_lags()
+    assert replica.lag == 1.5
+    assert read_replicas.session() == "replica-1"
+
+    # Connection errors take the replica out of the rotation
+    replica.async_engine.connect.side_effect = ConnectionRefusedError()
+    await read_replicas.check_lags()
+    assert replica.lag is None
+    assert read_replicas.session() == "primary"
+
+
+@pytest.mark.asyncio
+async def test_read_replicas_check_lag_timeout(mocker):
+    replica = _make_replica(mocker, "replica-1", lag=0)
+
+    async def hanging_execute(*args, **kwargs):
+        await asyncio.sleep(60)
+
+    connection = mocker.AsyncMock()
+    connection.execute.side_effect = hanging_execute
+    replica.async_engine.connect.return_value.__aenter__.return_value = connection
+    read_replicas = _make_read_replicas(mocker, replica)
+
+    # A hung replica does not keep its last measured lag
+    await read_replicas.check_lags()
+    assert replica.lag is None
+    assert read_replicas.session() == "primary"
+
+
+@pytest.mark.asyncio
+async def test_read_replicas_close_awaits_check_task(mocker):
+    replica = _make_replica(mocker, "replica-1", lag=None)
+    replica.async_engine.dispose = mocker.AsyncMock()
+    read_replicas = _make_read_replicas(mocker, replica)
+    mocker.patch.object(read_replicas, "check_lags")
+
+    await read_replicas.open()
+    check_task = read_replicas._check_task
+    assert check_task is not None
+
+    await read_replicas.close()
+    assert check_task.done()
@@ -10,6 +10,7 @@ from aleph.db.accessors.vms import (
     get_instance,
     get_program,
     get_vms_dependent_volumes,
+    get_vms_depending_on_volumes,
     get_vprogram,
 )
 from aleph.db.models import ProgramDb, RuntimeDb, VProgramDb, VProgramVerifiedVolumeDb
@@ -105,6 +106,29 @@ def test_get_vms_dependent_volumes_sees_vprogram_refs(
         assert get_vms_dependent_volumes(session=session, volume_hash="00" * 32) is None
 
 
+def test_get_vms_depending_on_volumes(
+    session_factory: DbSessionFactory, vprogram: VProgramDb
+):
+    volume_hashes = [
+        RUNTIME_REF,
+        WORKLOAD_REF,
+        WORKLOAD_HASH_TREE,
+        VOLUME_REF,
+        VOLUME_HASH_TREE,
+    ]
+    with session_factory() as session:
+        session.add(vprogram)
+        session.commit()
+
+    with session_factory() as session:
+        dependent_vms = get_vms_depending_on_volumes(
+            session=session, volume_hashes=volume_hashes + ["00" * 32]
+        )
+        assert dependent_vms == {
+            volume_hash: VPROGRAM_HASH for volume_hash in volume_hashes
+        }
+
+
 def test_get_vms_dependent_volumes_multiple_matches(
     session_factory: DbSessionFactory, vprogram: VProgramDb
 ):
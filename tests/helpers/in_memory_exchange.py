@@ -0,0 +1,35 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+import aio_pika.abc
+
+
+class InMemoryExchange:
+    """
+    Stand-in for an aio_pika exchange that keeps published messages in a list.
+
+    Each publish takes `confirm_delay` seconds to be confirmed, like a round trip
+    to the broker. `max_in_flight` records how many publishes were pipelined.
+    """
+
+    def __init__(self, confirm_delay: float = 0.0, fail_on: Optional[str] = None):
+        self.confirm_delay = confirm_delay
+        # Routing key of a message that the broker refuses
+        self.fail_on = fail_on
+
+        self.messages: List[Tuple[bytes, str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def publish(
+        self, message: aio_pika.abc.AbstractMessage, routing_key: str, **kwargs
+    ) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.confirm_delay)
+            if routing_key == self.fail_on:
+                raise ConnectionError(f"Could not publish {routing_key}")
+            self.messages.append((message.body, routing_key))
+        finally:
+            self.in_flight -= 1
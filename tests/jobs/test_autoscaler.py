@@ -0,0 +1,144 @@
+import pytest
+from configmanager import Config
+
+from aleph.jobs.autoscaler import JobsAutoscaler, WorkloadSample, compute_scale
+from aleph.jobs.fetch_pending_messages import FETCH_CONCURRENCY_KEY
+
+
+@pytest.mark.parametrize(
+    "backlog,throughput,expected",
+    [
+        # 1000 messages at 1/s: more than the 100s target, scale up
+        (1000, 1, 8),
+        # 50 messages at 1/s: within the target
+        (50, 1, 4),
+        # Mostly drained
+        (20, 1, 2),
+        (0, 0, 2),
+        # Stuck with a backlog
+        (10, 0, 8),
+    ],
+)
+def test_compute_scale(backlog: int, throughput: float, expected: int):
+    assert (
+        compute_scale(
+            current=4,
+            minimum=2,
+            maximum=16,
+            backlog=backlog,
+            throughput=throughput,
+            target_drain_time=100,
+        )
+        == expected
+    )
+
+
+def test_compute_scale_bounds():
+    assert (
+        compute_scale(12, 2, 16, backlog=1000, throughput=1, target_drain_time=1) == 16
+    )
+    assert compute_scale(3, 2, 16, backlog=0, throughput=1, target_drain_time=1) == 2
+
+
+def _make_sample(
+    time: float, messages_to_process: int, processed_total: int
+) -> WorkloadSample:
+    return WorkloadSample(
+        time=time,
+        messages_to_fetch=0,
+        messages_to_process=messages_to_process,
+        pending_txs=0,
+        fetched_total=0,
+        processed_total=processed_total,
+    )
+
+
+@pytest.fixture
+def node_cache(mocker):
+    return mocker.AsyncMock()
+
+
+@pytest.fixture
+def jobs_runner(mocker):
+    return mocker.AsyncMock()
+
+
+@pytest.fixture
+def autoscaler(mock_config: Config, mocker, node_cache, jobs_runner) -> JobsAutoscaler:
+    mock_config.aleph.jobs.pending_messages.shards.value = 1
+    mock_config.aleph.jobs.pending_messages.max_concurrency.value = 10
+    mock_config.aleph.jobs.autoscaling.max_shards.value = 8
+    mock_config.aleph.jobs.autoscaling.max_fetch_concurrency.value = 40
+    mock_config.aleph.jobs.autoscaling.target_drain_time.value = 100
+    mock_config.aleph.jobs.autoscaling.cooldown.value = 600
+
+    autoscaler = JobsAutoscaler(
+        config=mock_config,
+        session_factory=mocker.MagicMock(),
+        node_cache=node_cache,
+        jobs_runner=jobs_runner,
+    )
+    autoscaler.last_resharding_time = 0
+    return autoscaler
+
+
+@pytest.mark.asyncio
+async def test_scale_message_processors(autoscaler: JobsAutoscaler, jobs_runner):
+    restart_message_processors = jobs_runner.restart_message_processors
+
+    # The first sample only sets the reference for the throughput
+    await autoscaler.scale(_make_sample(1000, 10000, processed_total=0))
+    restart_message_processors.assert_not_called()
+
+    # 10 messages/s, 1000s to drain the backlog
+    await autoscaler.scale(_make_sample(1010, 10000, processed_total=100))
+    restart_message_processors.assert_called_once_with(
+        config=autoscaler.config, nb_shards=2, terminate_timeout=60
+    )
+    assert autoscaler.nb_shards == 2
+
+    # Cooldown
+    restart_message_processors.reset_mock()
+    autoscaler.last_resharding_time = 1010
+    await autoscaler.scale(_make_sample(1020, 10000, processed_total=200))
+    restart_message_processors.assert_not_called()
+
+    # The new shards did not improve the throughput
+    await autoscaler.scale(_make_sample(1700, 10000, processed_total=7100))
+    restart_message_processors.assert_not_called()
+    assert autoscaler.nb_shards == 2
+
+    # Drained
+    await autoscaler.scale(_make_sample(1710, 0, processed_total=7200))
+    restart_message_processors.assert_called_once_with(
+        config=autoscaler.config, nb_shards=1, terminate_timeout=60
+    )
+    assert autoscaler.nb_shards == 1
+
+
+@pytest.mark.asyncio
+async def test_scale_fetch_concurrency(autoscaler: JobsAutoscaler, node_cache):
+    sample = WorkloadSample(
+        time=1000,
+        messages_to_fetch=5000,
+        messages_to_process=0,
+        pending_txs=0,
+        fetched_total=0,
+        processed_total=0,
+    )
+    await autoscaler.scale(sample)
+    await autoscaler.scale(
+        WorkloadSample(
+            time=1010,
+            messages_to_fetch=5000,
+            messages_to_process=0,
+            pending_txs=0,
+            fetched_total=100,
+            processed_total=0,
+        )
+    )
+
+    assert autoscaler.fetch_concurrency == 20
+    node_cache.set.assert_called_once_with(
+        FETCH_CONCURRENCY_KEY, 20, expiration=3 * autoscaler.interval
+    )
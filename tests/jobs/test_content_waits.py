@@ -0,0 +1,219 @@
+import datetime as dt
+
+import pytest
+from aleph_message.models import Chain, ItemType, MessageType
+from sqlalchemy import select, update
+
+from aleph.db.accessors.pending_messages import get_next_pending_messages
+from aleph.db.models import ContentWaitDb, PendingMessageDb
+from aleph.jobs.content_waits import ContentWaitResolver
+from aleph.jobs.job_utils import MessageJob
+from aleph.toolkit.timestamp import timestamp_to_datetime, utc_now
+from aleph.types.db_session import DbSessionFactory
+from aleph.types.message_processing_result import WillRetryMessage
+from aleph.types.message_status import FileUnavailable, MessageContentUnavailable
+
+CONTENT_HASH = "a7c5b0e1ea7e0a2d8ac9c2ecd5ff36dd3eb79b0f9d0c6bb0dc73bc7fd2c1c2a7"
+FILE_HASH = "QmPZrod87ceK4yVvXQzRexDcuDgmLxBiNJ1ajLecPJYbpT"
+
+
+def _make_pending(item_hash: str, item_type: ItemType) -> PendingMessageDb:
+    return PendingMessageDb(
+        item_hash=item_hash,
+        type=MessageType.store,
+        chain=Chain.ETH,
+        sender="0xsender",
+        signature=None,
+        item_type=item_type,
+        item_content=None,
+        time=timestamp_to_datetime(1700000000),
+        channel=None,
+        reception_time=timestamp_to_datetime(1700000000),
+        fetched=False,
+        check_message=False,
+        retries=0,
+        next_attempt=dt.datetime(2023, 1, 1, tzinfo=dt.timezone.utc),
+    )
+
+
+@pytest.fixture
+def message_job(session_factory: DbSessionFactory, mocker) -> MessageJob:
+    return MessageJob(
+        session_factory=session_factory,
+        message_handler=mocker.AsyncMock(),
+        max_retries=3,
+        pending_message_queue=mocker.MagicMock(),
+    )
+
+
+@pytest.fixture
+def storage_service(mocker):
+    return mocker.AsyncMock()
+
+
+@pytest.fixture
+def pending_message_exchange(mocker):
+    return mocker.AsyncMock()
+
+
+@pytest.fixture
+def resolver(
+    session_factory: DbSessionFactory, storage_service, pending_message_exchange
+) -> ContentWaitResolver:
+    return ContentWaitResolver(
+        session_factory=session_factory,
+        storage_service=storage_service,
+        pending_message_exchange=pending_message_exchange,
+        max_retries=3,
+        max_concurrency=10,
+    )
+
+
+async def _park(
+    session_factory: DbSessionFactory,
+    message_job: MessageJob,
+    pending_message: PendingMessageDb,
+    exception: Exception,
+):
+    with session_factory() as session:
+        session.add(pending_message)
+        session.commit()
+
+        result = await message_job.handle_processing_error(
+            session=session, pending_message=pending_message, exception=exception
+        )
+        session.commit()
+
+    assert isinstance(result, WillRetryMessage)
+
+
+@pytest.mark.asyncio
+async def test_park_pending_messages(
+    session_factory: DbSessionFactory, message_job: MessageJob
+):
+    content_message = _make_pending(CONTENT_HASH, ItemType.storage)
+    file_message = _make_pending("b" * 64, ItemType.inline)
+
+    await _park(
+        session_factory,
+        message_job,
+        content_message,
+        MessageContentUnavailable(CONTENT_HASH),
+    )
+    await _park(session_factory, message_job, file_message, FileUnavailable(FILE_HASH))
+
+    with session_factory() as session:
+        content_waits = {
+            content_wait.hash: content_wait
+            for content_wait in session.execute(select(ContentWaitDb)).scalars()
+        }
+        assert content_waits[CONTENT_HASH].item_type == ItemType.storage
+        assert content_waits[FILE_HASH].item_type == ItemType.ipfs
+
+        pending_messages = session.execute(select(PendingMessageDb)).scalars().all()
+        assert {
+            (pending_message.waiting_for, pending_message.retries)
+            for pending_message in pending_messages
+        } == {(CONTENT_HASH, 1), (FILE_HASH, 1)}
+
+        # Waiting messages are not retried
+        assert not list(get_next_pending_messages(session, current_time=utc_now()))
+
+
+@pytest.mark.asyncio
+async def test_release_arrived_content(
+    session_factory: DbSessionFactory,
+    message_job: MessageJob,
+    resolver: ContentWaitResolver,
+    storage_service,
+    pending_message_exchange,
+):
+    await _park(
+        session_factory,
+        message_job,
+        _make_pending(CONTENT_HASH, ItemType.storage),
+        MessageContentUnavailable(CONTENT_HASH),
+    )
+    storage_service.node_cache.pop_arrived_content.return_value = [CONTENT_HASH]
+
+    assert await resolver.release_arrived_content() == 1
+
+    with session_factory() as session:
+        assert session.execute(select(ContentWaitDb)).scalar_one_or_none() is None
+        pending_messages = list(
+            get_next_pending_messages(session, current_time=utc_now())
+        )
+        assert [pending_message.item_hash for pending_message in pending_messages] == [
+            CONTENT_HASH
+        ]
+        assert pending_messages[0].waiting_for is None
+    pending_message_exchange.publish.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_probe_content_waits(
+    session_factory: DbSessionFactory,
+    message_job: MessageJob,
+    resolver: ContentWaitResolver,
+    mocker,
+):
+    await _park(
+        session_factory,
+        message_job,
+        _make_pending(CONTENT_HASH, ItemType.storage),
+        MessageContentUnavailable(CONTENT_HASH),
+    )
+    await _park(
+        session_factory,
+        message_job,
+        _make_pending("b" * 64, ItemType.inline),
+        FileUnavailable(FILE_HASH),
+    )
+    mocker.patch.object(
+        resolver, "probe", side_effect=lambda content_hash, _: content_hash == FILE_HASH
+    )
+
+    assert await resolver.probe_content_waits() == 2
+
+    with session_factory() as session:
+        content_wait = session.execute(select(ContentWaitDb)).scalar_one()
+        assert content_wait.hash == CONTENT_HASH
+        assert content_wait.probes == 1
+
+        pending_messages = list(
+            get_next_pending_messages(session, current_time=utc_now())
+        )
+        assert [pending_message.item_hash for pending_message in pending_messages] == [
+            "b" * 64
+        ]
+
+    # Not due yet
+    assert await resolver.probe_content_waits() == 0
+
+
+@pytest.mark.asyncio
+async def test_probe_content_waits_give_up(
+    session_factory: DbSessionFactory,
+    message_job: MessageJob,
+    resolver: ContentWaitResolver,
+    mocker,
+):
+    await _park(
+        session_factory,
+        message_job,
+        _make_pending(CONTENT_HASH, ItemType.storage),
+        MessageContentUnavailable(CONTENT_HASH),
+    )
+    with session_factory() as session:
+        session.execute(update(ContentWaitDb).values(probes=resolver.max_retries - 1))
+        session.commit()
+    mocker.patch.object(resolver, "probe", return_value=False)
+
+    assert await resolver.probe_content_waits() == 1
+
+    with session_factory() as session:
+        assert session.execute(select(ContentWaitDb)).scalar_one_or_none() is None
+        pending_message = session.execute(select(PendingMessageDb)).scalar_one()
+        assert pending_message.waiting_for is None
+        # The message is rejected if its last attempt fails
+        assert pending_message.retries == resolver.max_retries
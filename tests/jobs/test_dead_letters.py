@@ -0,0 +1,124 @@
+import datetime as dt
+
+import pytest
+from aleph_message.models import Chain, ItemHash, ItemType, MessageType
+from sqlalchemy import select
+
+from aleph.db.accessors.dead_letters import (
+    get_dead_letter_messages,
+    requeue_dead_letter_messages,
+)
+from aleph.db.accessors.messages import get_message_status
+from aleph.db.models import MessageStatusDb, PendingMessageDb
+from aleph.jobs.job_utils import MessageJob
+from aleph.jobs.retry_policies import MISSING_DEPENDENCY_RETRY_POLICY
+from aleph.types.db_session import DbSessionFactory
+from aleph.types.message_processing_result import RejectedMessage, WillRetryMessage
+from aleph.types.message_status import (
+    ErrorCode,
+    MessageOrigin,
+    MessageStatus,
+    StoreRefNotFound,
+)
+
+ITEM_HASH = ItemHash("f1a2b3c4d5e6f708192a3b4c5d6e7f8091a2b3c4d5e6f708192a3b4c5d6e7f80")
+
+
+@pytest.fixture
+def pending_message() -> PendingMessageDb:
+    return PendingMessageDb(
+        item_hash=ITEM_HASH,
+        type=MessageType.store,
+        chain=Chain.ETH,
+        sender="0x51A58800b26AA1451aaA803d1746687cB88E0501",
+        signature="0x",
+        item_type=ItemType.inline,
+        item_content='{"address":"0x51A58800b26AA1451aaA803d1746687cB88E0501","time":1644857371.0}',
+        time=dt.datetime(2022, 2, 14, 16, 49, 31, tzinfo=dt.timezone.utc),
+        channel="TEST",
+        reception_time=dt.datetime(2022, 2, 14, 16, 50, tzinfo=dt.timezone.utc),
+        check_message=True,
+        next_attempt=dt.datetime(2022, 2, 14, 16, 50, tzinfo=dt.timezone.utc),
+        retries=0,
+        fetched=True,
+        origin=MessageOrigin.P2P,
+    )
+
+
+@pytest.mark.asyncio
+async def test_dead_letter_and_requeue(
+    session_factory: DbSessionFactory, pending_message: PendingMessageDb, mocker
+):
+    message_job = MessageJob(
+        session_factory=session_factory,
+        message_handler=mocker.AsyncMock(),
+        max_retries=3,
+        pending_message_queue=mocker.MagicMock(),
+    )
+    max_attempts = MISSING_DEPENDENCY_RETRY_POLICY.get_max_attempts(3)
+
+    with session_factory() as session:
+        session.add(pending_message)
+        session.add(
+            MessageStatusDb(
+                item_hash=ITEM_HASH,
+                status=MessageStatus.PENDING,
+                reception_time=pending_message.reception_time,
+            )
+        )
+        session.commit()
+
+        # The retry policy of the error scales the max_retries of the job
+        for _ in range(max_attempts):
+            result = await message_job.handle_processing_error(
+                session=session,
+                pending_message=pending_message,
+                exception=StoreRefNotFound(),
+            )
+            assert isinstance(result, WillRetryMessage)
+            session.commit()
+            # The jobs load the pending message again before each attempt
+            session.refresh(pending_message)
+
+        assert pending_message.retries == max_attempts
+        error_history = pending_message.error_history
+        assert error_history is not None
+        assert len(error_history) == max_attempts
+        assert error_history[0]["error_code"] == ErrorCode.STORE_REF_NOT_FOUND
+
+        result = await message_job.handle_processing_error(
+            session=session,
+            pending_message=pending_message,
+            exception=StoreRefNotFound(),
+        )
+        assert isinstance(result, RejectedMessage)
+        session.commit()
+
+    with session_factory() as session:
+        assert session.execute(select(PendingMessageDb)).scalar_one_or_none() is None
+        status = get_message_status(session=session, item_hash=ITEM_HASH)
+        assert status and status.status == MessageStatus.REJECTED
+
+        dead_letter_messages = get_dead_letter_messages(session)
+        assert len(dead_letter_messages) == 1
+        dead_letter_message = dead_letter_messages[0]
+        assert dead_letter_message.item_hash == ITEM_HASH
+        assert dead_letter_message.error_code == ErrorCode.STORE_REF_NOT_FOUND
+        assert len(dead_letter_message.error_history) == max_attempts + 1
+
+        assert requeue_dead_letter_messages(session, item_hashes=["other"]) == 0
+        assert requeue_dead_letter_messages(session) == 1
+        session.commit()
+
+    with session_factory() as session:
+        assert get_dead_letter_messages(session) == []
+        status = get_message_status(session=session, item_hash=ITEM_HASH)
+        assert status and status.status == MessageStatus.PENDING
+
+        requeued_message = session.execute(select(PendingMessageDb)).scalar_one()
+        assert requeued_message.item_hash == ITEM_HASH
+        assert requeued_message.retries == 0
+        assert not requeued_message.fetched
+        assert requeued_message.check_message
+        assert requeued_message.origin == MessageOrigin.P2P
+        assert requeued_message.reception_time == pending_message.reception_time
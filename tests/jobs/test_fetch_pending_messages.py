@@ -19,6 +19,7 @@ from aleph.db.accessors.pending_messages import make_pending_message_fetched_sta
 from aleph.db.models import MessageDb, PendingMessageDb
 from aleph.jobs.fetch_pending_messages import (
     ACTIVE_FETCH_TASKS_KEY,
+    FETCH_CONCURRENCY_KEY,
     MetricState,
     PendingMessageFetcher,
 )
@@ -148,6 +149,22 @@ async def test_publish_metric_only_writes_on_change(
     assert state["last"] == 6
 
 
+@pytest.mark.asyncio
+async def test_get_max_concurrency_follows_autoscaler(mocker):
+    """The concurrency set by the autoscaler overrides the config value."""
+    node_cache = mocker.AsyncMock()
+
+    node_cache.get.return_value = b"25"
+    assert await PendingMessageFetcher._get_max_concurrency(node_cache, 10) == 25
+    node_cache.get.assert_called_with(FETCH_CONCURRENCY_KEY)
+
+    node_cache.get.return_value = None
+    assert await PendingMessageFetcher._get_max_concurrency(node_cache, 10) == 10
+
+    node_cache.get.side_effect = ConnectionError()
+    assert await PendingMessageFetcher._get_max_concurrency(node_cache, 10) == 10
+
+
 @pytest.mark.asyncio
 async def test_drain_cancels_and_clears_in_flight(fetcher: PendingMessageFetcher):
     """``_drain`` cancels every in-flight task and empties the dict."""
@@ -71,3 +71,41 @@ async def test_stop_kills_stubborn_processes_after_timeout():
 @pytest.mark.asyncio
 async def test_stop_is_safe_with_empty_runner():
     await JobsRunner(processes=[], tasks=[]).stop(terminate_timeout=0.5)
+
+
+@pytest.mark.asyncio
+async def test_restart_message_processors_after_stop(mocker, mock_config):
+    runner = JobsRunner()
+    start_message_processors = mocker.patch.object(runner, "start_message_processors")
+
+    await runner.stop(terminate_timeout=0.5)
+    await runner.restart_message_processors(mock_config, nb_shards=2)
+    start_message_processors.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_autoscaler_restart(mocker, mock_config):
+    runner = JobsRunner()
+    start_message_processors = mocker.patch.object(runner, "start_message_processors")
+    restart_started = asyncio.Event()
+
+    async def slow_stop_processes(processes, terminate_timeout):
+        restart_started.set()
+        await asyncio.sleep(60)
+
+    # The autoscaler is re-sharding the processors when the node stops
+    mocker.patch("aleph.jobs.stop_processes", side_effect=slow_stop_processes)
+
+    async def resharding_autoscaler():
+        await runner.restart_message_processors(mock_config, nb_shards=2)
+
+    autoscaler = mocker.AsyncMock()
+    autoscaler.run.side_effect = resharding_autoscaler
+    autoscaler_task = asyncio.create_task(runner.run_autoscaler(autoscaler))
+    await asyncio.wait_for(restart_started.wait(), timeout=5)
+
+    mocker.patch("aleph.jobs.stop_processes")
+    await runner.stop(terminate_timeout=0.5)
+
+    assert autoscaler_task.cancelled()
+    start_message_processors.assert_not_called()
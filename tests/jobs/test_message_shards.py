@@ -0,0 +1,30 @@
+from configmanager import Config
+
+from aleph.jobs.process_pending_messages import make_message_shards
+from aleph.toolkit.constants import PRICE_AGGREGATE_OWNER
+
+
+def test_make_message_shards_disabled(mock_config: Config):
+    assert make_message_shards(mock_config) == [None]
+
+
+def test_make_message_shards(mock_config: Config):
+    mock_config.aleph.jobs.pending_messages.shards.value = 3
+
+    shards = [shard for shard in make_message_shards(mock_config) if shard is not None]
+    assert [shard.name for shard in shards] == ["0", "1", "2", "global"]
+    assert all(shard.nb_shards == 3 for shard in shards)
+
+    global_senders = shards[-1].global_senders
+    assert PRICE_AGGREGATE_OWNER in global_senders
+    assert set(mock_config.aleph.balances.addresses.value) <= global_senders
+
+
+def test_make_message_shards_override(mock_config: Config):
+    shards = [
+        shard
+        for shard in make_message_shards(mock_config, nb_shards=2)
+        if shard is not None
+    ]
+    assert [shard.name for shard in shards] == ["0", "1", "global"]
+    assert make_message_shards(mock_config, nb_shards=1) == [None]
@@ -1,10 +1,23 @@
-"""Tests for the retry-backoff jitter applied to pending-message scheduling."""
+"""Tests for the retry policies applied to pending-message scheduling."""
 
 import datetime as dt
 
 import pytest
+import sqlalchemy.exc
 
 from aleph.jobs.job_utils import MAX_RETRY_INTERVAL, compute_next_retry_interval
+from aleph.jobs.retry_policies import (
+    DEFAULT_RETRY_POLICY,
+    MISSING_DEPENDENCY_RETRY_POLICY,
+    TRANSIENT_DB_ERROR_RETRY_POLICY,
+    RetryPolicy,
+    get_retry_policy,
+)
+from aleph.types.message_status import (
+    FileUnavailable,
+    ForgetTargetNotFound,
+    StoreRefNotFound,
+)
 
 
 def test_compute_next_retry_interval_zero_attempts_bounded_by_one_second():
@@ -44,3 +57,33 @@ def test_compute_next_retry_interval_is_jittered():
     # should yield many distinct values; collapsing to <5 would be a sign
     # the function reverted to a deterministic formula.
     assert len(samples) >= 5
+
+
+@pytest.mark.parametrize(
+    "exception,expected_policy",
+    [
+        (StoreRefNotFound(), MISSING_DEPENDENCY_RETRY_POLICY),
+        (ForgetTargetNotFound(target_hash="abc"), MISSING_DEPENDENCY_RETRY_POLICY),
+        (
+            sqlalchemy.exc.OperationalError("UPDATE ...", {}, Exception("deadlock")),
+            TRANSIENT_DB_ERROR_RETRY_POLICY,
+        ),
+        (FileUnavailable("abc"), DEFAULT_RETRY_POLICY),
+        (ValueError("unexpected"), DEFAULT_RETRY_POLICY),
+    ],
+)
+def test_get_retry_policy(exception, expected_policy):
+    assert get_retry_policy(exception) == expected_policy
+
+
+def test_retry_policy_bounds():
+    policy = RetryPolicy(base=0.5, cap=30, max_retries_factor=2)
+    for attempts in range(25):
+        cap = dt.timedelta(seconds=min(0.5 * 2**attempts, 30))
+        assert compute_next_retry_interval(attempts, policy) <= cap
+
+    assert policy.get_max_attempts(10) == 20
+    assert DEFAULT_RETRY_POLICY.get_max_attempts(10) == 10
+    # The config bounds all the policies
+    assert policy.get_max_attempts(0) == 0
+    assert MISSING_DEPENDENCY_RETRY_POLICY.get_max_attempts(0) == 0
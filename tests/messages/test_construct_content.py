@@ -0,0 +1,182 @@
+import datetime as dt
+import json
+from typing import Any, Dict
+
+import pytest
+from aleph_message.models import Chain, ItemType, MessageType, PostContent
+from pydantic import ValidationError
+
+import aleph.db.models.messages as messages_module
+from aleph.db.models import MessageDb, PendingMessageDb
+from aleph.db.models.messages import construct_message_content, validate_message_content
+from aleph.handlers.message_handler import BaseMessageHandler
+from aleph.schemas.message_content import ContentSource, MessageContent
+
+ADDRESS = "0x9319Ad3B7A8E0eE24f2E639c40D8eD124C5520Ba"
+ITEM_HASH = "b3d17833bcefb7a6eb2d9fa7c77cca3eea3a73a33b9a1fd6a0fd6be5ff0d4a8e"
+
+
+@pytest.mark.parametrize(
+    "message_type,content",
+    [
+        (
+            MessageType.aggregate,
+            {"address": ADDRESS, "time": 1700000000, "key": "k", "content": {"a": 1}},
+        ),
+        (
+            MessageType.forget,
+            {"address": ADDRESS, "time": 1700000000.5, "hashes": [ITEM_HASH]},
+        ),
+        (
+            MessageType.post,
+            {
+                "address": ADDRESS,
+                "time": 1700000000.0,
+                "type": "test",
+                "ref": ITEM_HASH,
+                "content": {"body": "Hello"},
+            },
+        ),
+        (
+            MessageType.store,
+            {
+                "address": ADDRESS,
+                "time": 1700000000.0,
+                "item_type": "storage",
+                "item_hash": ITEM_HASH,
+                "tags": ["a"],
+            },
+        ),
+    ],
+)
+def test_construct_message_content(
+    mocker, message_type: MessageType, content: Dict[str, Any]
+):
+    validate = mocker.spy(messages_module, "validate_message_content")
+
+    constructed = construct_message_content(message_type, content)
+    validate.assert_not_called()
+    assert constructed == validate_message_content(message_type, content)
+
+
+@pytest.mark.parametrize(
+    "message_type,content",
+    [
+        # Contents with nested models
+        (
+            MessageType.post,
+            {
+                "address": ADDRESS,
+                "time": 1700000000.0,
+                "type": "test",
+                "ref": {
+                    "chain": "ETH",
+                    "channel": None,
+                    "item_content": "{}",
+                    "item_hash": ITEM_HASH,
+                    "item_type": "inline",
+                    "sender": ADDRESS,
+                    "signature": "0x",
+                    "time": 1700000000.0,
+                    "type": "POST",
+                },
+                "content": {},
+            },
+        ),
+        (
+            MessageType.store,
+            {
+                "address": ADDRESS,
+                "time": 1700000000.0,
+                "item_type": "storage",
+                "item_hash": ITEM_HASH,
+                "payment": {"type": "credit"},
+            },
+        ),
+        (
+            MessageType.aggregate,
+            {
+                "address": ADDRESS,
+                "time": 1700000000,
+                "key": {"name": "k"},
+                "content": {},
+            },
+        ),
+    ],
+)
+def test_construct_message_content_validates_nested_models(
+    mocker, message_type: MessageType, content: Dict[str, Any]
+):
+    validate = mocker.spy(messages_module, "validate_message_content")
+    construct_message_content(message_type, content)
+    validate.assert_called_once()
+
+
+def test_construct_message_content_missing_fields():
+    with pytest.raises(ValidationError):
+        construct_message_content(MessageType.post, {"address": ADDRESS, "time": 1})
+
+
+def _make_pending_post(item_content: str) -> PendingMessageDb:
+    return PendingMessageDb(
+        item_hash=ITEM_HASH,
+        type=MessageType.post,
+        chain=Chain.ETH,
+        sender=ADDRESS,
+        signature="0x",
+        item_type=ItemType.inline,
+        item_content=item_content,
+        time=dt.datetime(2023, 11, 14, tzinfo=dt.timezone.utc),
+        channel=None,
+        reception_time=dt.datetime(2023, 11, 14, tzinfo=dt.timezone.utc),
+        check_message=True,
+        fetched=True,
+        retries=0,
+    )
+
+
+def test_from_pending_message_reuses_parsed_content(mocker):
+    content = {"address": ADDRESS, "time": 1700000000.0, "type": "test"}
+    item_content = json.dumps(content)
+    pending_message = _make_pending_post(item_content)
+    parsed_content = PostContent.model_validate(content)
+    validate = mocker.spy(messages_module, "validate_message_content")
+
+    message = MessageDb.from_pending_message(
+        pending_message=pending_message,
+        content_dict=content,
+        content_size=len(item_content),
+        parsed_content=parsed_content,
+    )
+    validate.assert_not_called()
+    assert message.parsed_content is parsed_content
+
+
+@pytest.mark.asyncio
+async def test_fetch_pending_message_trusts_fetched_content(mocker, mock_config):
+    content = {"address": ADDRESS, "time": 1700000000.0, "type": "test"}
+    item_content = json.dumps(content)
+    storage_service = mocker.AsyncMock()
+    storage_service.get_message_content.return_value = MessageContent(
+        hash=ITEM_HASH,
+        source=ContentSource.INLINE,
+        value=dict(content),
+        raw_value=item_content,
+    )
+    message_handler = BaseMessageHandler(
+        storage_service=storage_service, config=mock_config
+    )
+    validate = mocker.spy(messages_module, "validate_message_content")
+
+    # Not fetched yet: the content is validated
+    pending_message = _make_pending_post(item_content)
+    pending_message.content = None
+    await message_handler.fetch_pending_message(pending_message)
+    validate.assert_called_once()
+
+    # Validated by the fetch job or on reception
+    validate.reset_mock()
+    pending_message.content = dict(content)
+    message = await message_handler.fetch_pending_message(pending_message)
+    validate.assert_not_called()
+    assert message.parsed_content == PostContent.model_validate(content)
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from aleph.services.cache.counters import BufferedCounters
+
+
+@pytest.mark.asyncio
+async def test_buffered_counters_flush_in_batches(mocker):
+    node_cache = mocker.AsyncMock()
+    counters = BufferedCounters(node_cache=node_cache, flush_interval=0.01)
+
+    for _ in range(100):
+        counters.incr("broadcast_total")
+    counters.incr("connections_active", 3)
+    counters.decr("connections_active")
+    counters.incr("rejected_total")
+    counters.decr("rejected_total")
+
+    await asyncio.sleep(0.05)
+
+    # Null deltas are not sent to Redis
+    node_cache.incrby_many.assert_awaited_once_with(
+        {"broadcast_total": 100, "connections_active": 2}
+    )
+    await counters.close()
+
+
+@pytest.mark.asyncio
+async def test_buffered_counters_flush_on_close(mocker):
+    node_cache = mocker.AsyncMock()
+    counters = BufferedCounters(node_cache=node_cache, flush_interval=60)
+
+    counters.incr("broadcast_total")
+    await counters.close()
+
+    node_cache.incrby_many.assert_awaited_once_with({"broadcast_total": 1})
+
+
+@pytest.mark.asyncio
+async def test_buffered_counters_keep_deltas_on_error(mocker):
+    node_cache = mocker.AsyncMock()
+    node_cache.incrby_many.side_effect = [ConnectionError(), None]
+    counters = BufferedCounters(node_cache=node_cache, flush_interval=60)
+
+    counters.incr("broadcast_total", 2)
+    with pytest.raises(ConnectionError):
+        await counters.flush()
+
+    counters.incr("broadcast_total")
+    await counters.close()
+
+    node_cache.incrby_many.assert_awaited_with({"broadcast_total": 3})
+
+
+@pytest.mark.asyncio
+async def test_buffered_counters_close_waits_for_flush(mocker):
+    flush_started = asyncio.Event()
+    flushed = []
+
+    async def slow_incrby_many(deltas):
+        flush_started.set()
+        await asyncio.sleep(0.05)
+        flushed.append(deltas)
+
+    node_cache = mocker.AsyncMock()
+    node_cache.incrby_many.side_effect = slow_incrby_many
+    counters = BufferedCounters(node_cache=node_cache, flush_interval=0.01)
+
+    counters.incr("broadcast_total")
+    await flush_started.wait()
+    counters.incr("broadcast_total")
+    await counters.close()
+
+    # The in-flight flush completed instead of being cancelled
+    assert flushed == [{"broadcast_total": 1}, {"broadcast_total": 1}]
+
+
+@pytest.mark.asyncio
+async def test_buffered_counters_keep_deltas_on_cancel(mocker):
+    node_cache = mocker.AsyncMock()
+    counters = BufferedCounters(node_cache=node_cache, flush_interval=60)
+
+    node_cache.incrby_many.side_effect = asyncio.CancelledError()
+    counters.incr("broadcast_total", 2)
+    with pytest.raises(asyncio.CancelledError):
+        await counters.flush()
+
+    node_cache.incrby_many.side_effect = None
+    await counters.close()
+
+    assert node_cache.incrby_many.await_count == 2
+    node_cache.incrby_many.assert_awaited_with({"broadcast_total": 2})
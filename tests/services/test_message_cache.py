@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from aleph.services.cache.message_cache import MessageCache
+from aleph.services.cache.node_cache import NodeCache
+
+ITEM_HASH = "b3d17833bcefb7a6eb2d9fa7c77cca3eea3a73a33b9a1fd6a0fd6be5ff0d4a8e"
+
+
+def _notify(message_cache: MessageCache, item_hash: str) -> None:
+    message_cache._on_notification(
+        None, 0, MessageCache.NOTIFICATION_CHANNEL, item_hash
+    )
+
+
+@pytest.mark.asyncio
+async def test_message_cache(mocker):
+    message_cache = MessageCache(engine=mocker.MagicMock(), max_size=10)
+
+    # Nothing is cached until the cache listens to the notifications
+    version = message_cache.version
+    await message_cache.set(ITEM_HASH, MessageCache.MESSAGE, b"{}", version=version)
+    assert await message_cache.get(ITEM_HASH, MessageCache.MESSAGE) is None
+
+    message_cache._start_listening()
+    version = message_cache.version
+    await message_cache.set(ITEM_HASH, MessageCache.MESSAGE, b"{}", version=version)
+    await message_cache.set(ITEM_HASH, MessageCache.CONTENT, b"[]", version=version)
+    assert await message_cache.get(ITEM_HASH, MessageCache.MESSAGE) == b"{}"
+    assert await message_cache.get(ITEM_HASH, MessageCache.CONTENT) == b"[]"
+
+    _notify(message_cache, ITEM_HASH)
+    assert await message_cache.get(ITEM_HASH, MessageCache.MESSAGE) is None
+    assert await message_cache.get(ITEM_HASH, MessageCache.CONTENT) is None
+
+    # A response read before a change is not cached
+    await message_cache.set(ITEM_HASH, MessageCache.MESSAGE, b"{}", version=version)
+    assert await message_cache.get(ITEM_HASH, MessageCache.MESSAGE) is None
+
+    await message_cache.close()
+
+
+@pytest.mark.asyncio
+async def test_message_cache_redis(mocker, node_cache: NodeCache):
+    message_caches = [
+        MessageCache(
+            engine=mocker.MagicMock(), max_size=10, node_cache=node_cache, redis_ttl=60
+        )
+        for _ in range(2)
+    ]
+    for message_cache in message_caches:
+        message_cache._start_listening()
+
+    first_cache, second_cache = message_caches
+    await first_cache.set(
+        ITEM_HASH, MessageCache.MESSAGE, b"{}", version=first_cache.version
+    )
+    assert await second_cache.get(ITEM_HASH, MessageCache.MESSAGE) == b"{}"
+
+    for message_cache in message_caches:
+        _notify(message_cache, ITEM_HASH)
+    # Let the Redis evictions run
+    await asyncio.sleep(0.01)
+
+    for message_cache in message_caches:
+        assert await message_cache.get(ITEM_HASH, MessageCache.MESSAGE) is None
+        await message_cache.close()
@@ -1,4 +1,8 @@
+import asyncio
+
 import pytest
+import pytest_asyncio
+from configmanager import Config
 
 from aleph.services.cache.node_cache import NodeCache
 
@@ -27,6 +31,16 @@ async def test_incr_decr(node_cache: NodeCache):
     assert await node_cache.get(key) == b"42"
 
 
+@pytest.mark.asyncio
+async def test_incrby_many(node_cache: NodeCache):
+    keys = ["test_incrby_many_1", "test_incrby_many_2"]
+    await node_cache.redis_client.delete(*keys)
+    await node_cache.set(keys[0], 10)
+
+    await node_cache.incrby_many({keys[0]: 5, keys[1]: -2})
+    assert await node_cache.get_many(keys) == [b"15", b"-2"]
+
+
 @pytest.mark.asyncio
 async def test_api_servers_cache(node_cache: NodeCache):
     await node_cache.redis_client.delete(node_cache.API_SERVERS_KEY)
@@ -47,3 +61,214 @@ async def test_api_servers_cache(node_cache: NodeCache):
     assert await node_cache.has_api_server(api_server_2)
 
     await node_cache.redis_client.delete(node_cache.API_SERVERS_KEY)
+
+
+@pytest.mark.asyncio
+async def test_peer_scores(node_cache: NodeCache):
+    fast_peer = "https://api2.aleph.im"
+    slow_peer = "https://api3.aleph.im"
+    await node_cache.redis_client.delete(
+        node_cache.PEER_SCORES_KEY,
+        f"{node_cache.PEER_STATS_KEY_PREFIX}{fast_peer}",
+        f"{node_cache.PEER_STATS_KEY_PREFIX}{slow_peer}",
+    )
+
+    assert await node_cache.get_peer_scores() == {}
+
+    await node_cache.record_peer_request(
+        fast_peer, latency=0.1, success=True, n_bytes=1000, alpha=0.5
+    )
+    await node_cache.record_peer_request(
+        fast_peer, latency=0.3, success=False, alpha=0.5
+    )
+    await node_cache.record_peer_request(slow_peer, latency=2, success=True)
+
+    peer_scores = await node_cache.get_peer_scores()
+    assert set(peer_scores) == {fast_peer, slow_peer}
+
+    fast_peer_score = peer_scores[fast_peer]
+    assert fast_peer_score.latency == pytest.approx(0.2)
+    assert fast_peer_score.success_rate == pytest.approx(0.5)
+    # Failed requests do not update the throughput
+    assert fast_peer_score.bytes_per_second == pytest.approx(10_000)
+    assert fast_peer_score.requests == 2
+    assert fast_peer_score.score == pytest.approx(2.5)
+
+    assert peer_scores[slow_peer].score == pytest.approx(0.5)
+
+    scores = await node_cache.get_api_server_scores(
+        [fast_peer, slow_peer, "https://unknown.aleph.im"]
+    )
+    assert scores == {
+        fast_peer: pytest.approx(2.5),
+        slow_peer: pytest.approx(0.5),
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_many(node_cache: NodeCache):
+    await node_cache.redis_client.delete("test_get_many_1", "test_get_many_2")
+    await node_cache.set("test_get_many_1", 1)
+
+    assert await node_cache.get_many(["test_get_many_1", "test_get_many_2"]) == [
+        b"1",
+        None,
+    ]
+    assert await node_cache.get_many([]) == []
+
+
+@pytest_asyncio.fixture
+async def local_node_caches(mock_config: Config):
+    """Two node caches with a local cache, as if they were used by two processes."""
+
+    def make_node_cache():
+        return NodeCache(
+            redis_host=mock_config.redis.host.value,
+            redis_port=mock_config.redis.port.value,
+            message_count_cache_ttl=mock_config.perf.message_count_cache_ttl.value,
+            local_cache_ttls={NodeCache.API_SERVERS_KEY: 60, "test_local:": 60},
+        )
+
+    async with make_node_cache() as node_cache_1, make_node_cache() as node_cache_2:
+        # Let the invalidation listeners subscribe
+        await asyncio.sleep(0.1)
+        yield node_cache_1, node_cache_2
+
+
+@pytest.mark.asyncio
+async def test_local_cache(local_node_caches):
+    node_cache_1, node_cache_2 = local_node_caches
+    key = "test_local:key"
+    await node_cache_1.redis_client.delete(key)
+
+    await node_cache_1.set(key, "cached")
+    assert await node_cache_1.get(key) == b"cached"
+
+    # Values modified behind the back of the node cache are not seen until the TTL
+    await node_cache_1.redis_client.set(key, "modified")
+    assert await node_cache_1.get(key) == b"cached"
+
+    # Keys without a local TTL are always read from Redis
+    await node_cache_1.redis_client.set("test_not_local", "v1")
+    assert await node_cache_1.get("test_not_local") == b"v1"
+    await node_cache_1.redis_client.set("test_not_local", "v2")
+    assert await node_cache_1.get("test_not_local") == b"v2"
+
+    # Modifications through a node cache evict the local copies of other processes
+    assert await node_cache_2.get(key) == b"modified"
+    await node_cache_1.set(key, "updated")
+    await asyncio.sleep(0.1)
+    assert await node_cache_2.get(key) == b"updated"
+
+
+@pytest.mark.asyncio
+async def test_local_cache_api_servers(local_node_caches):
+    node_cache_1, node_cache_2 = local_node_caches
+    await node_cache_1.redis_client.delete(NodeCache.API_SERVERS_KEY)
+
+    assert await node_cache_2.get_api_servers() == set()
+
+    await node_cache_1.add_api_server("https://api2.aleph.im")
+    await asyncio.sleep(0.1)
+    assert await node_cache_2.get_api_servers() == {"https://api2.aleph.im"}
+
+    await node_cache_1.remove_api_server("https://api2.aleph.im")
+    await asyncio.sleep(0.1)
+    assert await node_cache_2.get_api_servers() == set()
+
+
+@pytest.mark.asyncio
+async def test_get_or_compute(node_cache: NodeCache):
+    key = "test_get_or_compute"
+    await node_cache.redis_client.delete(
+        key, f"{key}{NodeCache.REVALIDATION_LOCK_SUFFIX}"
+    )
+
+    n_calls = 0
+    computed = asyncio.Event()
+
+    async def compute() -> int:
+        nonlocal n_calls
+        n_calls += 1
+        await computed.wait()
+        return n_calls
+
+    # Concurrent misses compute the value once
+    tasks = [
+        asyncio.create_task(
+            node_cache.get_or_compute(key, compute, soft_ttl=60, hard_ttl=60)
+        )
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    computed.set()
+    assert await asyncio.gather(*tasks) == [1] * 5
+    assert n_calls == 1
+
+    # Fresh value
+    assert await node_cache.get_or_compute(key, compute, soft_ttl=60, hard_ttl=60) == 1
+    assert n_calls == 1
+
+    # Stale value: served as is and recomputed in the background
+    assert await node_cache.get_or_compute(key, compute, soft_ttl=0, hard_ttl=60) == 1
+    await asyncio.gather(*node_cache._revalidation_tasks)
+    assert n_calls == 2
+    assert await node_cache.get_or_compute(key, compute, soft_ttl=60, hard_ttl=60) == 2
+
+    # The revalidation lock prevents another recomputation for soft_ttl seconds
+    assert await node_cache.get_or_compute(key, compute, soft_ttl=0, hard_ttl=60) == 2
+    await asyncio.gather(*node_cache._revalidation_tasks)
+    assert n_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_get_or_compute_legacy_value(node_cache: NodeCache):
+    key = "test_get_or_compute_legacy_value"
+    await node_cache.set(key, 12)
+
+    async def compute() -> int:
+        return 42
+
+    assert await node_cache.get_or_compute(key, compute, soft_ttl=60, hard_ttl=60) == 42
+
+
+@pytest.mark.asyncio
+async def test_page_boundaries(node_cache: NodeCache):
+    filters = {"pagination": 20, "test": "test_page_boundaries"}
+    await node_cache.redis_client.delete(node_cache._page_boundaries_key(filters))
+
+    assert await node_cache.get_page_boundary(filters, page=5) is None
+
+    await node_cache.set_page_boundary(filters, page=2, cursor="cursor-2", ttl=60)
+    await node_cache.set_page_boundary(filters, page=4, cursor="cursor-4", ttl=60)
+
+    assert await node_cache.get_page_boundary(filters, page=1) is None
+    assert await node_cache.get_page_boundary(filters, page=3) == (2, "cursor-2")
+    assert await node_cache.get_page_boundary(filters, page=4) == (4, "cursor-4")
+    assert await node_cache.get_page_boundary(filters, page=1000) == (4, "cursor-4")
+    assert (
+        await node_cache.get_page_boundary({**filters, "pagination": 10}, page=3)
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_waited_content(node_cache: NodeCache):
+    await node_cache.redis_client.delete(
+        node_cache.WAITED_CONTENT_KEY, node_cache.ARRIVED_CONTENT_KEY
+    )
+
+    # Contents that nothing waits for are not recorded
+    assert not await node_cache.mark_content_arrived("not-waited")
+    assert await node_cache.pop_arrived_content(10) == []
+
+    await node_cache.add_waited_content("hash-1", "hash-2", "hash-3")
+    await node_cache.remove_waited_content("hash-3")
+    assert await node_cache.mark_content_arrived("hash-1")
+    assert not await node_cache.mark_content_arrived("hash-3")
+
+    assert await node_cache.pop_arrived_content(10) == ["hash-1"]
+    assert await node_cache.pop_arrived_content(10) == []
+    # Arrived contents are not waited for anymore
+    assert not await node_cache.mark_content_arrived("hash-1")
+    assert await node_cache.mark_content_arrived("hash-2")
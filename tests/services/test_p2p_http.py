@@ -1,17 +1,111 @@
+import base64
+from hashlib import sha256
+
 import pytest
 import pytest_asyncio
+from aiohttp import web
 
 from aleph.services.p2p import http as p2p_http
 
+FILE_CONTENT = b"Ich bin ein Berliner" * 10_000
+FILE_HASH = sha256(FILE_CONTENT).hexdigest()
+
 
 @pytest_asyncio.fixture(autouse=True)
 async def _reset_p2p_sessions():
     """Ensure tests start and end with an empty SESSIONS dict."""
     await p2p_http.close_sessions()
+    p2p_http.RAW_CONTENT_PEERS.clear()
+    p2p_http.LEGACY_CONTENT_PEERS.clear()
     yield
     await p2p_http.close_sessions()
 
 
+async def _get_json_content(request: web.Request) -> web.Response:
+    file_hash = request.match_info["file_hash"]
+    if file_hash != FILE_HASH:
+        raise web.HTTPNotFound()
+
+    return web.json_response(
+        {
+            "status": "success",
+            "hash": file_hash,
+            "engine": "storage",
+            "content": base64.encodebytes(FILE_CONTENT).decode("utf-8"),
+        }
+    )
+
+
+def _make_peer_app(raw_content: bytes | None) -> web.Application:
+    app = web.Application()
+    app["requests"] = []
+
+    @web.middleware
+    async def log_requests(request: web.Request, handler):
+        request.app["requests"].append(request.path)
+        return await handler(request)
+
+    app.middlewares.append(log_requests)
+
+    if raw_content is not None:
+
+        async def get_raw_content(request: web.Request) -> web.Response:
+            if request.match_info["file_hash"] != FILE_HASH:
+                raise web.HTTPNotFound(text="Not found")
+            return web.Response(body=raw_content)
+
+        app.router.add_get("/api/v0/storage/raw/{file_hash}", get_raw_content)
+
+    app.router.add_get("/api/v0/storage/{file_hash}", _get_json_content)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_get_peer_hash_content_raw(aiohttp_server):
+    server = await aiohttp_server(_make_peer_app(raw_content=FILE_CONTENT))
+    base_uri = str(server.make_url("")).rstrip("/")
+
+    content = await p2p_http.get_peer_hash_content(base_uri, FILE_HASH, timeout=5)
+    assert content == FILE_CONTENT
+    assert server.app["requests"] == [f"/api/v0/storage/raw/{FILE_HASH}"]
+    assert base_uri in p2p_http.RAW_CONTENT_PEERS
+
+    # The peer is known to serve raw content, a 404 means that the file is missing
+    missing_hash = sha256(b"missing").hexdigest()
+    assert (
+        await p2p_http.get_peer_hash_content(base_uri, missing_hash, timeout=5)
+    ) is None
+    assert server.app["requests"][1:] == [f"/api/v0/storage/raw/{missing_hash}"]
+
+
+@pytest.mark.asyncio
+async def test_get_peer_hash_content_legacy_peer(aiohttp_server):
+    server = await aiohttp_server(_make_peer_app(raw_content=None))
+    base_uri = str(server.make_url("")).rstrip("/")
+
+    content = await p2p_http.get_peer_hash_content(base_uri, FILE_HASH, timeout=5)
+    assert content == FILE_CONTENT
+    assert server.app["requests"] == [
+        f"/api/v0/storage/raw/{FILE_HASH}",
+        f"/api/v0/storage/{FILE_HASH}",
+    ]
+
+    # The peer is now known to only serve the JSON endpoint
+    content = await p2p_http.get_peer_hash_content(base_uri, FILE_HASH, timeout=5)
+    assert content == FILE_CONTENT
+    assert server.app["requests"][2:] == [f"/api/v0/storage/{FILE_HASH}"]
+
+
+@pytest.mark.asyncio
+async def test_get_peer_hash_content_bad_hash(aiohttp_server):
+    server = await aiohttp_server(_make_peer_app(raw_content=b"not the right file"))
+    base_uri = str(server.make_url("")).rstrip("/")
+
+    assert (
+        await p2p_http.get_peer_hash_content(base_uri, FILE_HASH, timeout=5)
+    ) is None
+
+
 @pytest.mark.asyncio
 async def test_close_sessions_clears_cache_and_closes_sessions():
     # Force a session into the module-level cache by calling the request helper
@@ -31,3 +125,33 @@ async def test_close_sessions_clears_cache_and_closes_sessions():
 async def test_close_sessions_is_idempotent():
     await p2p_http.close_sessions()
     await p2p_http.close_sessions()
+
+
+@pytest.mark.asyncio
+async def test_sort_peers_by_score(mocker):
+    node_cache = mocker.AsyncMock()
+    node_cache.get_api_server_scores.return_value = {
+        "http://slow": 0.5,
+        "http://fast": 10.0,
+        "http://average": 2.0,
+    }
+
+    sorted_peers = await p2p_http.sort_peers_by_score(
+        ["http://slow", "http://new", "http://fast", "http://average"],
+        node_cache=node_cache,
+    )
+
+    # Unknown peers are ranked with the median score (ties are in random order)
+    assert sorted_peers[0] == "http://fast"
+    assert set(sorted_peers[1:3]) == {"http://average", "http://new"}
+    assert sorted_peers[3] == "http://slow"
+
+
+@pytest.mark.asyncio
+async def test_sort_peers_without_scores(mocker):
+    node_cache = mocker.AsyncMock()
+    node_cache.get_api_server_scores.return_value = {}
+
+    peers = ["http://a", "http://b", "http://c"]
+    sorted_peers = await p2p_http.sort_peers_by_score(peers, node_cache=node_cache)
+    assert sorted(sorted_peers) == peers
@@ -0,0 +1,68 @@
+import datetime as dt
+
+import pytest
+from aleph_message.models import MessageType
+
+from aleph.services.cache.counters import BufferedCounters
+from aleph.services.cache.node_cache import NodeCache
+from aleph.services.pipeline_metrics import PipelineMetrics
+from aleph.toolkit.metrics_keys import PipelineStage
+from aleph.web.controllers.metrics import get_pipeline_histograms_for_prometheus
+
+
+@pytest.mark.asyncio
+async def test_pipeline_histograms(node_cache: NodeCache):
+    assert await get_pipeline_histograms_for_prometheus(node_cache) == ""
+
+    pipeline_metrics = PipelineMetrics(
+        BufferedCounters(node_cache=node_cache, flush_interval=60)
+    )
+    pipeline_metrics.observe(PipelineStage.FETCH, MessageType.store, 0.2)
+    pipeline_metrics.observe(PipelineStage.FETCH, MessageType.store, 7)
+    pipeline_metrics.observe(PipelineStage.FETCH, MessageType.store, 5000)
+    # Negative durations (clock skew) go to the first bucket
+    start = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+    pipeline_metrics.observe_since(
+        PipelineStage.CHAIN_SYNC,
+        MessageType.post,
+        start=start,
+        end=start - dt.timedelta(seconds=1),
+    )
+    await pipeline_metrics.close()
+
+    lines = (await get_pipeline_histograms_for_prometheus(node_cache)).splitlines()
+    assert lines[0] == "# TYPE pyaleph_pipeline_stage_duration_seconds histogram"
+
+    fetch_labels = 'stage="fetch",message_type="STORE"'
+    assert (
+        f'pyaleph_pipeline_stage_duration_seconds_bucket{{{fetch_labels},le="0.1"}} 0'
+        in lines
+    )
+    assert (
+        f'pyaleph_pipeline_stage_duration_seconds_bucket{{{fetch_labels},le="0.25"}} 1'
+        in lines
+    )
+    assert (
+        f'pyaleph_pipeline_stage_duration_seconds_bucket{{{fetch_labels},le="10"}} 2'
+        in lines
+    )
+    assert (
+        f'pyaleph_pipeline_stage_duration_seconds_bucket{{{fetch_labels},le="3600"}} 2'
+        in lines
+    )
+    assert (
+        f'pyaleph_pipeline_stage_duration_seconds_bucket{{{fetch_labels},le="+Inf"}} 3'
+        in lines
+    )
+    assert (
+        f"pyaleph_pipeline_stage_duration_seconds_sum{{{fetch_labels}}} 5007.2" in lines
+    )
+    assert f"pyaleph_pipeline_stage_duration_seconds_count{{{fetch_labels}}} 3" in lines
+
+    chain_sync_labels = 'stage="chain_sync",message_type="POST"'
+    assert (
+        f'pyaleph_pipeline_stage_duration_seconds_bucket{{{chain_sync_labels},le="0.05"}} 1'
+        in lines
+    )
+    # Stages without observations are not exported
+    assert not any('stage="process"' in line for line in lines)
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from typing import AsyncIterable, Dict, Optional
 
@@ -121,6 +122,44 @@ async def test_hash_content_from_network_store_value(mocker, use_ipfs: bool):
     assert content == expected_content
 
 
+@pytest.mark.asyncio
+async def test_hash_content_concurrent_fetches(mocker):
+    content_hash = "1234"
+    expected_content = b"unus pro omnibus"
+
+    async def slow_request_hash(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return expected_content
+
+    request_hash_mock = mocker.patch(
+        "aleph.storage.p2p_http_request_hash", side_effect=slow_request_hash
+    )
+    mocker.patch.object(StorageService, "_verify_content_hash")
+
+    storage_engine = MockStorageEngine(files={})
+    write_mock = mocker.patch.object(
+        storage_engine, "write", wraps=storage_engine.write
+    )
+    storage_manager = StorageService(
+        storage_engine,
+        ipfs_service=mocker.AsyncMock(),
+        node_cache=mocker.AsyncMock(),
+    )
+
+    contents = await asyncio.gather(
+        *(
+            storage_manager.get_hash_content(
+                content_hash, use_network=True, use_ipfs=False
+            )
+            for _ in range(10)
+        )
+    )
+
+    assert all(content.value == expected_content for content in contents)
+    assert request_hash_mock.call_count == 1
+    assert write_mock.call_count == 1
+
+
 @pytest.mark.asyncio
 async def test_hash_content_from_network_invalid_hash(mocker):
     content_hash = "1234"
@@ -0,0 +1,37 @@
+import pytest
+
+from aleph.toolkit.lru_cache import LRUCache
+
+
+def test_lru_cache():
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    assert len(cache) == 2
+
+    # "b" is the least recently used value
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    # Updating a value marks it as recently used
+    cache.set("a", 4)
+    cache.set("d", 5)
+    assert cache.get("a") == 4
+    assert "c" not in cache
+
+    assert cache.pop("a") == 4
+    assert cache.pop("a") is None
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_lru_cache_invalid_size():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
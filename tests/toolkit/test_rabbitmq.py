@@ -0,0 +1,93 @@
+import asyncio
+
+import aio_pika
+import pytest
+from in_memory_exchange import InMemoryExchange
+
+from aleph.toolkit.rabbitmq import BatchPublisher
+
+
+def _message(i: int) -> aio_pika.Message:
+    return aio_pika.Message(body=f"{i}".encode("utf-8"))
+
+
+@pytest.mark.asyncio
+async def test_batch_publisher_batch_size():
+    exchange = InMemoryExchange(confirm_delay=0.01)
+    publisher = BatchPublisher(exchange=exchange, max_batch_size=10, max_delay=60)
+
+    for i in range(25):
+        await publisher.publish(_message(i), routing_key=f"key.{i}")
+
+    # Two full batches were published, the third one waits
+    assert len(exchange.messages) == 20
+    assert exchange.max_in_flight == 10
+
+    await publisher.flush()
+    assert [routing_key for _, routing_key in exchange.messages] == [
+        f"key.{i}" for i in range(25)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_publisher_max_delay():
+    exchange = InMemoryExchange()
+    publisher = BatchPublisher(exchange=exchange, max_batch_size=10, max_delay=0.01)
+
+    await publisher.publish(_message(0), routing_key="key.0")
+    assert exchange.messages == []
+
+    await asyncio.sleep(0.05)
+    assert exchange.messages == [(b"0", "key.0")]
+
+    await publisher.publish(_message(1), routing_key="key.1")
+    await publisher.close()
+    assert exchange.messages == [(b"0", "key.0"), (b"1", "key.1")]
+
+
+@pytest.mark.asyncio
+async def test_batch_publisher_error():
+    exchange = InMemoryExchange(fail_on="key.1")
+    publisher = BatchPublisher(exchange=exchange, max_batch_size=10, max_delay=60)
+
+    for i in range(3):
+        await publisher.publish(_message(i), routing_key=f"key.{i}")
+
+    with pytest.raises(ConnectionError):
+        await publisher.flush()
+    # The other messages of the batch are published anyway
+    assert [routing_key for _, routing_key in exchange.messages] == ["key.0", "key.2"]
+
+
+@pytest.mark.asyncio
+async def test_batch_publisher_delayed_flush_error():
+    exchange = InMemoryExchange(fail_on="key.1")
+    publisher = BatchPublisher(exchange=exchange, max_batch_size=10, max_delay=0.01)
+
+    for i in range(3):
+        await publisher.publish(_message(i), routing_key=f"key.{i}")
+    await asyncio.sleep(0.05)
+    assert [routing_key for _, routing_key in exchange.messages] == ["key.0", "key.2"]
+
+    # The failed message is kept for the next flush
+    exchange.fail_on = None
+    await publisher.flush()
+    assert [routing_key for _, routing_key in exchange.messages] == [
+        "key.0",
+        "key.2",
+        "key.1",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_publisher_publish_during_delayed_flush():
+    exchange = InMemoryExchange(confirm_delay=0.05)
+    publisher = BatchPublisher(exchange=exchange, max_batch_size=10, max_delay=0.01)
+
+    await publisher.publish(_message(0), routing_key="key.0")
+    await asyncio.sleep(0.03)
+    # The first batch is in flight
+    await publisher.publish(_message(1), routing_key="key.1")
+
+    await asyncio.sleep(0.2)
+    assert exchange.messages == [(b"0", "key.0"), (b"1", "key.1")]
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from aleph.toolkit.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_calls():
+    single_flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def compute() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 42
+
+    tasks = [asyncio.create_task(single_flight.run("key", compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert "key" in single_flight
+
+    release.set()
+    assert await asyncio.gather(*tasks) == [42] * 5
+    assert calls == 1
+    assert len(single_flight) == 0
+
+    # Once the call is over, a new call is started
+    assert await single_flight.run("key", compute) == 42
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_exceptions():
+    single_flight: SingleFlight[int] = SingleFlight()
+
+    async def fail() -> int:
+        await asyncio.sleep(0)
+        raise ValueError("nope")
+
+    results = await asyncio.gather(
+        single_flight.run("key", fail),
+        single_flight.run("key", fail),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancellation():
+    single_flight: SingleFlight[int] = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+    cancelled = False
+
+    async def compute() -> int:
+        nonlocal cancelled
+        started.set()
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        return 42
+
+    first = asyncio.create_task(single_flight.run("key", compute))
+    second = asyncio.create_task(single_flight.run("key", compute))
+    await started.wait()
+
+    # Cancelling one caller does not cancel the shared call
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert not cancelled
+
+    release.set()
+    assert await second == 42
+
+    # The call is cancelled once all the callers are cancelled
+    release.clear()
+    started.clear()
+    third = asyncio.create_task(single_flight.run("key", compute))
+    await started.wait()
+    third.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await third
+    await asyncio.sleep(0)
+    assert cancelled
+    assert "key" not in single_flight
@@ -31,7 +31,7 @@ async def test_get_resource_consumed_credits_controller_success():
             "aleph.web.controllers.accounts.get_item_hash_str_from_request"
         ) as mock_get_hash,
         patch(
-            "aleph.web.controllers.accounts.get_session_factory_from_request"
+            "aleph.web.controllers.accounts.get_read_session_factory_from_request"
         ) as mock_get_factory,
         patch(
             "aleph.web.controllers.accounts.get_resource_consumed_credits"
@@ -81,7 +81,7 @@ async def test_get_resource_consumed_credits_controller_zero_credits():
             "aleph.web.controllers.accounts.get_item_hash_str_from_request"
         ) as mock_get_hash,
         patch(
-            "aleph.web.controllers.accounts.get_session_factory_from_request"
+            "aleph.web.controllers.accounts.get_read_session_factory_from_request"
         ) as mock_get_factory,
         patch(
             "aleph.web.controllers.accounts.get_resource_consumed_credits"
@@ -124,7 +124,7 @@ async def test_get_resource_consumed_credits_controller_large_credits():
             "aleph.web.controllers.accounts.get_item_hash_str_from_request"
         ) as mock_get_hash,
         patch(
-            "aleph.web.controllers.accounts.get_session_factory_from_request"
+            "aleph.web.controllers.accounts.get_read_session_factory_from_request"
         ) as mock_get_factory,
         patch(
             "aleph.web.controllers.accounts.get_resource_consumed_credits"
@@ -167,7 +167,7 @@ async def test_get_account_post_types_controller_success():
             "aleph.web.controllers.accounts._get_address_from_request"
         ) as mock_get_address,
         patch(
-            "aleph.web.controllers.accounts.get_session_factory_from_request"
+            "aleph.web.controllers.accounts.get_read_session_factory_from_request"
         ) as mock_get_factory,
         patch(
             "aleph.web.controllers.accounts.get_distinct_post_types_for_address"
@@ -217,7 +217,7 @@ async def test_get_account_post_types_controller_empty():
             "aleph.web.controllers.accounts._get_address_from_request"
         ) as mock_get_address,
         patch(
-            "aleph.web.controllers.accounts.get_session_factory_from_request"
+            "aleph.web.controllers.accounts.get_read_session_factory_from_request"
         ) as mock_get_factory,
         patch(
             "aleph.web.controllers.accounts.get_distinct_post_types_for_address"
@@ -260,7 +260,7 @@ async def test_get_account_post_types_controller_single_type():
             "aleph.web.controllers.accounts._get_address_from_request"
         ) as mock_get_address,
         patch(
-            "aleph.web.controllers.accounts.get_session_factory_from_request"
+            "aleph.web.controllers.accounts.get_read_session_factory_from_request"
         ) as mock_get_factory,
         patch(
             "aleph.web.controllers.accounts.get_distinct_post_types_for_address"
@@ -303,7 +303,7 @@ async def test_get_account_channels_controller_success():
             "aleph.web.controllers.accounts._get_address_from_request"
         ) as mock_get_address,
         patch(
-            "aleph.web.controllers.accounts.get_session_factory_from_request"
+            "aleph.web.controllers.accounts.get_read_session_factory_from_request"
         ) as mock_get_factory,
         patch(
             "aleph.web.controllers.accounts.get_distinct_channels_for_address"
@@ -353,7 +353,7 @@ async def test_get_account_channels_controller_empty():
             "aleph.web.controllers.accounts._get_address_from_request"
         ) as mock_get_address,
         patch(
-            "aleph.web.controllers.accounts.get_session_factory_from_request"
+            "aleph.web.controllers.accounts.get_read_session_factory_from_request"
         ) as mock_get_factory,
         patch(
             "aleph.web.controllers.accounts.get_distinct_channels_for_address"
@@ -396,7 +396,7 @@ async def test_get_account_channels_controller_single_channel():
             "aleph.web.controllers.accounts._get_address_from_request"
         ) as mock_get_address,
         patch(
-            "aleph.web.controllers.accounts.get_session_factory_from_request"
+            "aleph.web.controllers.accounts.get_read_session_factory_from_request"
         ) as mock_get_factory,
         patch(
             "aleph.web.controllers.accounts.get_distinct_channels_for_address"
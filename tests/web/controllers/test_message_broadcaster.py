@@ -1,28 +1,33 @@
 import asyncio
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
+from aleph_message.models import Chain, MessageType
 
-from aleph.web.controllers.messages import MessageBroadcaster, _WsClient
+from aleph.schemas.messages_query_params import WsMessageQueryParams
+from aleph.web.controllers.messages import (
+    MessageBroadcaster,
+    _SubscriptionIndex,
+    _WsClient,
+    message_matches_filters,
+)
 
 
 def _make_broadcaster() -> MessageBroadcaster:
     """Build a MessageBroadcaster with all external deps mocked."""
     config = MagicMock()
     config.websocket.max_message_connections.value = 100
+    config.websocket.max_concurrent_history_replays.value = 10
 
     node_cache = MagicMock()
-
-    async def _noop(*args, **kwargs):
-        # Yield control so concurrent add() calls interleave deterministically.
-        await asyncio.sleep(0)
-
-    node_cache.incr = _noop
-    node_cache.decr = _noop
-    node_cache.decrby = _noop
+    # Counter updates are buffered locally and never await.
+    counters = MagicMock()
 
     mq_conn = MagicMock()
-    return MessageBroadcaster(mq_conn=mq_conn, config=config, node_cache=node_cache)
+    return MessageBroadcaster(
+        mq_conn=mq_conn, config=config, node_cache=node_cache, counters=counters
+    )
 
 
 def _make_client() -> _WsClient:
@@ -161,3 +166,81 @@ async def test_restart_consumer_concurrent_with_add_does_not_deadlock():
     assert start_calls == 1
     assert stop_calls == 1
     assert broadcaster._consumer_tag is not None
+
+
+ITEM_HASH = "a" * 64
+OTHER_HASH = "b" * 64
+CONTENT_HASH = "c" * 64
+
+
+def _make_message(**fields) -> SimpleNamespace:
+    nested_content = SimpleNamespace(tags=fields.pop("tags", []))
+    content = SimpleNamespace(
+        address=fields.pop("owner", "0xowner"),
+        ref=fields.pop("ref", None),
+        type=fields.pop("content_type", None),
+        item_hash=fields.pop("content_hash", None),
+        content=nested_content,
+    )
+    message_fields = {
+        "item_hash": ITEM_HASH,
+        "sender": "0xsender",
+        "type": MessageType.post,
+        "chain": Chain.ETH,
+        "channel": "TEST",
+        **fields,
+    }
+    return SimpleNamespace(content=content, **message_fields)
+
+
+def test_subscription_index_matches_filters():
+    filters_list = [
+        {},
+        {"addresses": ["0xsender"]},
+        {"addresses": ["0xother", "0xsender"], "channels": ["OTHER"]},
+        {"owners": ["0xowner"]},
+        {"hashes": [ITEM_HASH]},
+        {"refs": ["ref"]},
+        {"content_types": ["test-type"]},
+        {"content_hashes": [CONTENT_HASH]},
+        {"channels": ["TEST"], "tags": ["b"]},
+        {"chains": [Chain.SOL]},
+        {"message_type": MessageType.aggregate},
+        {"message_type": MessageType.post, "chains": [Chain.ETH]},
+        {"tags": ["a", "c"]},
+    ]
+    clients = [
+        _WsClient(MagicMock(), WsMessageQueryParams(**filters), exclude_content=False)
+        for filters in filters_list
+    ]
+
+    index = _SubscriptionIndex()
+    for client in clients:
+        index.add(client)
+    assert len(index) == len(clients)
+
+    messages = [
+        _make_message(),
+        _make_message(ref="ref", content_type="test-type", tags=["a", "b"]),
+        _make_message(
+            item_hash=OTHER_HASH,
+            sender="0xother",
+            chain=Chain.SOL,
+            channel="OTHER",
+            content_hash=CONTENT_HASH,
+            type=MessageType.aggregate,
+        ),
+    ]
+    for message in messages:
+        expected = [
+            client
+            for client in clients
+            if message_matches_filters(message, client.query_params)
+        ]
+        assert set(index.match(message)) == set(expected)
+        assert len(index.match(message)) == len(expected)
+
+    for client in clients:
+        index.remove(client)
+    assert len(index) == 0
+    assert index.match(messages[0]) == []
@@ -1,10 +1,12 @@
 from dataclasses import dataclass
 
+from aleph.services.cache.node_cache import PeerScore
 from aleph.web.controllers.metrics import (
     BuildInfo,
     Metrics,
     format_dataclass_for_prometheus,
     format_dict_for_prometheus,
+    format_peer_scores_for_prometheus,
 )
 
 
@@ -41,6 +43,26 @@ def test_format_dataclass_for_prometheus() -> None:
     )
 
 
+def test_format_peer_scores_for_prometheus():
+    peer_scores = {
+        "http://api2.aleph.im": PeerScore(
+            latency=0.5,
+            success_rate=1.0,
+            bytes_per_second=2048.0,
+            requests=3,
+            score=2.0,
+        )
+    }
+
+    assert format_peer_scores_for_prometheus(peer_scores) == (
+        'pyaleph_p2p_peer_latency_seconds{peer="http://api2.aleph.im"} 0.5\n'
+        'pyaleph_p2p_peer_success_rate{peer="http://api2.aleph.im"} 1.0\n'
+        'pyaleph_p2p_peer_bytes_per_second{peer="http://api2.aleph.im"} 2048.0\n'
+        'pyaleph_p2p_peer_requests_total{peer="http://api2.aleph.im"} 3\n'
+        'pyaleph_p2p_peer_score{peer="http://api2.aleph.im"} 2.0'
+    )
+
+
 def test_metrics():
     metrics = Metrics(
         pyaleph_build_info=BuildInfo(